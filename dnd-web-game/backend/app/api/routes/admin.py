@@ -0,0 +1,45 @@
+"""
+Admin API Routes.
+
+Operational endpoints for inspecting a running worker. Requests must carry
+the ADMIN_TOKEN setting in an X-Admin-Token header; with no token
+configured the endpoints are only available in DEBUG mode.
+"""
+import hmac
+import sys
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config import get_settings
+from app.core.startup_profile import get_startup_profile
+
+router = APIRouter()
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Allow the request only with the admin token (or in DEBUG without one)."""
+    settings = get_settings()
+    if settings.ADMIN_TOKEN:
+        if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+            raise HTTPException(status_code=403, detail="Admin token required")
+    elif not settings.DEBUG:
+        raise HTTPException(status_code=404, detail="Not found")
+
+
+@router.get("/startup", dependencies=[Depends(require_admin)])
+async def get_startup():
+    """
+    Startup profile of this worker.
+
+    Per-router import times (with how many modules each pulled in),
+    subsystems preloaded in the lifespan hook, and time until ready.
+    """
+    return get_startup_profile().snapshot()
+
+
+@router.get("/modules", dependencies=[Depends(require_admin)])
+async def get_loaded_modules(prefix: str = "app."):
+    """Modules currently imported in this worker, filtered by name prefix."""
+    names = sorted(name for name in sys.modules if name.startswith(prefix))
+    return {"count": len(names), "modules": names}
@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 
 from app.services.campaign_editor import campaign_editor
-from app.services.campaign_generator import campaign_generator
+from app.services.campaign_generator import get_campaign_generator
 from app.core.errors import GameError, CampaignError, ErrorCode
 from app.middleware.auth import get_current_user_optional
 
@@ -85,7 +85,7 @@ async def load_campaign_for_editing(
     try:
         # Get campaign from generator's memory or database
         # For now, we'll use the campaign generator's stored campaigns
-        campaign = await campaign_generator.get_campaign(campaign_id)
+        campaign = await get_campaign_generator().get_campaign(campaign_id)
 
         if not campaign:
             raise CampaignError(
@@ -316,7 +316,7 @@ async def save_campaign(
 
         # In a full implementation, this would save to database
         # For now, update the campaign generator's memory
-        await campaign_generator.store_campaign(campaign)
+        await get_campaign_generator().store_campaign(campaign)
 
         return {
             "success": True,
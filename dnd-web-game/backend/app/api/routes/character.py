@@ -13,7 +13,6 @@ import json
 import os
 import uuid
 
-from app.services.pdf_parser import DnDBeyondPDFParser
 from app.services.json_parser import DnDBeyondJSONParser
 from app.services.character_service import (
     to_combatant_data,
@@ -130,6 +129,8 @@ async def import_pdf(
 
     # Parse PDF
     try:
+        from app.services.pdf_parser import DnDBeyondPDFParser
+
         parser = DnDBeyondPDFParser()
         character = parser.parse(tmp_path)
     except Exception as e:
@@ -17,8 +17,15 @@ from app.core.character_builder import (
 
 router = APIRouter()
 
-# Singleton builder instance
-_builder = CharacterBuilder()
+# Singleton builder instance, created on first use
+_builder: Optional[CharacterBuilder] = None
+
+
+def _get_builder() -> CharacterBuilder:
+    global _builder
+    if _builder is None:
+        _builder = CharacterBuilder()
+    return _builder
 
 
 # ==================== Request/Response Models ====================
@@ -258,7 +265,7 @@ async def get_standard_array():
 @router.post("/build/new")
 async def create_new_build():
     """Start a new character build."""
-    build = _builder.create_new_build()
+    build = _get_builder().create_new_build()
 
     return {
         "build_id": build.id,
@@ -270,7 +277,7 @@ async def create_new_build():
 @router.get("/build/{build_id}")
 async def get_build(build_id: str):
     """Get the current state of a build."""
-    build = _builder.get_build(build_id)
+    build = _get_builder().get_build(build_id)
 
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {build_id}")
@@ -300,7 +307,7 @@ async def get_build(build_id: str):
 @router.delete("/build/{build_id}")
 async def delete_build(build_id: str):
     """Delete a character build."""
-    if _builder.delete_build(build_id):
+    if _get_builder().delete_build(build_id):
         return {"success": True, "message": "Build deleted"}
     else:
         raise HTTPException(status_code=404, detail=f"Build not found: {build_id}")
@@ -311,18 +318,18 @@ async def delete_build(build_id: str):
 @router.post("/build/species")
 async def set_species(request: SetSpeciesRequest):
     """Set the species for a character build."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_species(build, request.species_id)
+    result = _get_builder().set_species(build, request.species_id)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
 
     # Set size if provided and required
     if request.size and result.data.get("size_choice_required"):
-        size_result = _builder.set_size_choice(build, request.size)
+        size_result = _get_builder().set_size_choice(build, request.size)
         if not size_result.valid:
             raise HTTPException(status_code=400, detail=size_result.errors)
 
@@ -336,18 +343,18 @@ async def set_species(request: SetSpeciesRequest):
 @router.post("/build/class")
 async def set_class(request: SetClassRequest):
     """Set the class for a character build."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_class(build, request.class_id)
+    result = _get_builder().set_class(build, request.class_id)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
 
     # Set skill choices if provided
     if request.skill_choices:
-        skill_result = _builder.set_skill_choices(build, request.skill_choices)
+        skill_result = _get_builder().set_skill_choices(build, request.skill_choices)
         if not skill_result.valid:
             raise HTTPException(status_code=400, detail=skill_result.errors)
 
@@ -361,11 +368,11 @@ async def set_class(request: SetClassRequest):
 @router.post("/build/skills")
 async def set_skill_choices(build_id: str, skills: List[str]):
     """Set skill proficiency choices."""
-    build = _builder.get_build(build_id)
+    build = _get_builder().get_build(build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {build_id}")
 
-    result = _builder.set_skill_choices(build, skills)
+    result = _get_builder().set_skill_choices(build, skills)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
@@ -376,11 +383,11 @@ async def set_skill_choices(build_id: str, skills: List[str]):
 @router.post("/build/background")
 async def set_background(request: SetBackgroundRequest):
     """Set the background for a character build."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_background(build, request.background_id)
+    result = _get_builder().set_background(build, request.background_id)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
@@ -395,17 +402,17 @@ async def set_background(request: SetBackgroundRequest):
 @router.post("/build/abilities")
 async def set_ability_scores(request: SetAbilityScoresRequest):
     """Set ability scores and background bonuses."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
     # Set base scores
-    scores_result = _builder.set_ability_scores(build, request.scores, request.method)
+    scores_result = _get_builder().set_ability_scores(build, request.scores, request.method)
     if not scores_result.valid:
         raise HTTPException(status_code=400, detail=scores_result.errors)
 
     # Set background bonuses
-    bonuses_result = _builder.set_ability_bonuses(build, request.bonuses)
+    bonuses_result = _get_builder().set_ability_bonuses(build, request.bonuses)
     if not bonuses_result.valid:
         raise HTTPException(status_code=400, detail=bonuses_result.errors)
 
@@ -421,11 +428,11 @@ async def set_ability_scores(request: SetAbilityScoresRequest):
 @router.post("/build/feat")
 async def set_origin_feat(request: SetFeatRequest):
     """Set the origin feat for a character build."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_origin_feat(build, request.feat_id)
+    result = _get_builder().set_origin_feat(build, request.feat_id)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
@@ -440,11 +447,11 @@ async def set_origin_feat(request: SetFeatRequest):
 @router.post("/build/equipment")
 async def set_equipment(request: SetEquipmentRequest):
     """Set equipment choices for a character build."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_equipment_choices(build, request.choices)
+    result = _get_builder().set_equipment_choices(build, request.choices)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
@@ -458,11 +465,11 @@ async def set_equipment(request: SetEquipmentRequest):
 @router.post("/build/fighting-style")
 async def set_fighting_style(request: SetFightingStyleRequest):
     """Set fighting style for applicable classes."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_fighting_style(build, request.style_id)
+    result = _get_builder().set_fighting_style(build, request.style_id)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
@@ -473,11 +480,11 @@ async def set_fighting_style(request: SetFightingStyleRequest):
 @router.post("/build/weapon-masteries")
 async def set_weapon_masteries(request: SetWeaponMasteriesRequest):
     """Set weapon mastery choices for applicable classes."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_weapon_masteries(build, request.weapons)
+    result = _get_builder().set_weapon_masteries(build, request.weapons)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
@@ -488,11 +495,11 @@ async def set_weapon_masteries(request: SetWeaponMasteriesRequest):
 @router.post("/build/details")
 async def set_details(request: SetDetailsRequest):
     """Set character details (name, appearance, etc.)."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_details(
+    result = _get_builder().set_details(
         build,
         request.name,
         request.appearance,
@@ -512,11 +519,11 @@ async def set_details(request: SetDetailsRequest):
 @router.post("/build/level")
 async def set_level(request: SetLevelRequest):
     """Set character level (1-20)."""
-    build = _builder.get_build(request.build_id)
+    build = _get_builder().get_build(request.build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {request.build_id}")
 
-    result = _builder.set_level(build, request.level)
+    result = _get_builder().set_level(build, request.level)
 
     if not result.valid:
         raise HTTPException(status_code=400, detail=result.errors)
@@ -532,11 +539,11 @@ async def set_level(request: SetLevelRequest):
 @router.get("/build/{build_id}/validate")
 async def validate_build(build_id: str):
     """Validate the current build state."""
-    build = _builder.get_build(build_id)
+    build = _get_builder().get_build(build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {build_id}")
 
-    result = _builder.validate_build(build)
+    result = _get_builder().validate_build(build)
 
     return {
         "valid": result.valid,
@@ -549,11 +556,11 @@ async def validate_build(build_id: str):
 @router.post("/build/{build_id}/finalize")
 async def finalize_build(build_id: str):
     """Finalize the build and create the character."""
-    build = _builder.get_build(build_id)
+    build = _get_builder().get_build(build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {build_id}")
 
-    success, result = _builder.finalize_character(build)
+    success, result = _get_builder().finalize_character(build)
 
     if not success:
         raise HTTPException(status_code=400, detail=result.get("errors", ["Unknown error"]))
@@ -578,11 +585,11 @@ async def finalize_build(build_id: str):
 @router.get("/build/{build_id}/preview")
 async def preview_build(build_id: str):
     """Preview what the finalized character would look like."""
-    build = _builder.get_build(build_id)
+    build = _get_builder().get_build(build_id)
     if not build:
         raise HTTPException(status_code=404, detail=f"Build not found: {build_id}")
 
-    success, result = _builder.finalize_character(build)
+    success, result = _get_builder().finalize_character(build)
 
     if not success:
         # Still return what we can preview
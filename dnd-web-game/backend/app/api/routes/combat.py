@@ -7,13 +7,18 @@ Endpoints for managing combat encounters:
 - Handle reactions
 - Query combat state
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, Callable, List, Optional, Dict, Any, Set
+import asyncio
+import logging
 
 from app.core.combat_engine import (
     CombatEngine,
     CombatPhase,
+    ActionResult,
     ActionType,
     BonusActionType,
     load_weapon_data,
@@ -25,8 +30,8 @@ from app.core.movement import (
     find_path,
     get_reachable_cells,
     check_opportunity_attack_triggers,
-    get_threatened_squares,
 )
+from app.core.threat_map import get_threat_map
 from app.core.reactions import (
     ReactionsManager,
     ReactionType,
@@ -43,20 +48,46 @@ from app.core.combat_storage import (
     active_grids,
     reactions_managers,
     persist_combat_state,
+    combat_session,
+    with_combat_lock,
+    with_combat_session,
     create_combat_state,
     end_combat_state,
 )
 from app.database.dependencies import get_combat_repo
+from app.database.engine import get_session_context
 from app.database.repositories import CombatStateRepository
+from app.services.ai_dm_stream import format_sse
+from app.config import get_settings
 
 # Import Advanced AI System
-from app.core.ai import get_ai_for_combatant, coordinate_enemies
+from app.core.ai import TurnOutcome, take_ai_turn
 
 # Feature flag for advanced AI (can be toggled per encounter)
 USE_ADVANCED_AI = True
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Enemy AI (pathfinding, target scoring) runs on this bounded pool so a big
+# monster round never blocks the event loop for other combats
+_enemy_turn_executor: Optional[ThreadPoolExecutor] = None
+
+# Streamed rounds still running (kept referenced until they finish)
+_running_rounds: Set[asyncio.Task] = set()
+
+
+def get_enemy_turn_executor() -> ThreadPoolExecutor:
+    """Get the shared enemy turn executor, creating it on first use."""
+    global _enemy_turn_executor
+    if _enemy_turn_executor is None:
+        _enemy_turn_executor = ThreadPoolExecutor(
+            max_workers=get_settings().ENEMY_TURN_WORKERS,
+            thread_name_prefix="enemy-turn",
+        )
+    return _enemy_turn_executor
+
 
 # =============================================================================
 # Request/Response Models
@@ -400,6 +431,7 @@ async def start_combat(
 
 
 @router.post("/{combat_id}/end")
+@with_combat_session
 async def end_combat(
     combat_id: str,
     reason: str = "manual",
@@ -447,6 +479,7 @@ async def end_combat(
 
 
 @router.get("/{combat_id}/state", response_model=CombatStateResponse)
+@with_combat_lock
 async def get_combat_state(combat_id: str):
     """Get the current state of a combat encounter."""
     engine = active_combats.get(combat_id)
@@ -505,6 +538,7 @@ async def get_combat_state(combat_id: str):
 # =============================================================================
 
 @router.post("/action", response_model=ActionResponse)
+@with_combat_session
 async def take_action(
     request: ActionRequest,
     combat_repo: CombatStateRepository = Depends(get_combat_repo),
@@ -633,6 +667,7 @@ async def take_action(
 
 
 @router.post("/bonus-action", response_model=ActionResponse)
+@with_combat_session
 async def take_bonus_action(
     request: BonusActionRequest,
     combat_repo: CombatStateRepository = Depends(get_combat_repo),
@@ -711,6 +746,7 @@ async def take_bonus_action(
 
 
 @router.post("/move", response_model=MoveResponse)
+@with_combat_session
 async def move_combatant(
     request: MoveRequest,
     combat_repo: CombatStateRepository = Depends(get_combat_repo),
@@ -864,6 +900,7 @@ class LegendaryActionResponse(BaseModel):
 
 
 @router.post("/legendary-action", response_model=LegendaryActionResponse)
+@with_combat_session
 async def use_legendary_action(
     request: LegendaryActionRequest,
     combat_repo: CombatStateRepository = Depends(get_combat_repo),
@@ -890,12 +927,7 @@ async def use_legendary_action(
     )
 
     # Persist state after legendary action
-    await persist_combat_state(
-        request.combat_id,
-        engine.state,
-        combat_repo,
-        reason="legendary_action"
-    )
+    await persist_combat_state(request.combat_id, engine, combat_repo)
 
     return LegendaryActionResponse(
         success=result.success,
@@ -907,6 +939,7 @@ async def use_legendary_action(
 
 
 @router.post("/reaction", response_model=ReactionResponse)
+@with_combat_session
 async def use_reaction(
     request: ReactionRequest,
     combat_repo: CombatStateRepository = Depends(get_combat_repo),
@@ -1081,202 +1114,168 @@ async def use_reaction(
     )
 
 
-def process_enemy_turn_advanced(
-    engine: CombatEngine,
-    grid: CombatGrid,
-    enemy
-) -> Optional[EnemyAction]:
-    """
-    Advanced enemy AI using tactical decision-making system.
-
-    Uses role-based behaviors (Brute, Striker, Caster, etc.) and
-    intelligent target prioritization.
-
-    Returns an EnemyAction describing what the enemy did.
-    """
+def _attack_details(engine: CombatEngine, enemy, result: ActionResult) -> Dict[str, Any]:
+    """Hit, damage and roll details of an enemy attack result, for EnemyAction."""
     import re
-    from app.core.initiative import CombatantType
 
-    tracker = engine.state.initiative_tracker
+    hit = result.extra_data.get("hit", False) if result.extra_data and result.success else False
+    damage = result.damage_dealt if hit else 0
+
+    # Extract attack details
+    attack_roll_obj = result.extra_data.get("attack_roll") if result.extra_data else None
+    critical = result.extra_data.get("critical_hit", False) if result.extra_data else False
+    critical_miss = result.extra_data.get("critical_miss", False) if result.extra_data else False
+    target_ac = result.extra_data.get("target_ac") if result.extra_data else None
+
+    natural_roll = None
+    attack_modifier = None
+    attack_total = None
+    advantage = False
+    disadvantage = False
+    second_roll = None
+
+    if attack_roll_obj and hasattr(attack_roll_obj, "total"):
+        attack_total = attack_roll_obj.total
+        natural_roll = attack_roll_obj.base_roll
+        attack_modifier = attack_roll_obj.modifier
+        advantage = attack_roll_obj.advantage
+        disadvantage = attack_roll_obj.disadvantage
+        if len(attack_roll_obj.rolls) > 1:
+            if advantage:
+                second_roll = min(attack_roll_obj.rolls)
+            elif disadvantage:
+                second_roll = max(attack_roll_obj.rolls)
+
+    # Get damage details
+    enemy_stats = engine.state.combatant_stats.get(enemy.id, {})
+    damage_dice = enemy_stats.get("damage_dice", "1d6")
+    damage_type = enemy_stats.get("damage_type", "slashing")
+
+    # Parse damage formula
+    damage_modifier = 0
+    damage_rolls = []
+    if hit and damage > 0:
+        match = re.match(r"(\d+)d(\d+)(?:\+(\d+))?", damage_dice)
+        if match:
+            num_dice = int(match.group(1))
+            die_size = int(match.group(2))
+            damage_modifier = int(match.group(3)) if match.group(3) else 0
+            dice_total = damage - damage_modifier
+            if critical:
+                num_dice *= 2
+            if num_dice > 0 and dice_total > 0:
+                avg_per_die = dice_total / num_dice
+                for i in range(num_dice):
+                    roll = min(max(1, round(avg_per_die)), die_size)
+                    damage_rolls.append(roll)
+                current_total = sum(damage_rolls)
+                if current_total != dice_total and damage_rolls:
+                    diff = dice_total - current_total
+                    damage_rolls[-1] = max(1, min(die_size, damage_rolls[-1] + diff))
 
-    # Get the AI behavior for this enemy
-    ai = get_ai_for_combatant(engine, enemy.id)
+    return {
+        "damage_dealt": damage,
+        "hit": hit,
+        "attack_roll": attack_total,
+        "natural_roll": natural_roll,
+        "attack_modifier": attack_modifier,
+        "target_ac": target_ac,
+        "critical": critical,
+        "critical_miss": critical_miss,
+        "advantage": advantage,
+        "disadvantage": disadvantage,
+        "second_roll": second_roll,
+        "damage_formula": damage_dice,
+        "damage_rolls": damage_rolls if damage_rolls else None,
+        "damage_modifier": damage_modifier,
+        "damage_type": damage_type,
+    }
 
-    # Get the AI's decision
-    decision = ai.decide_action()
 
-    if not decision:
+def _turn_action(engine: CombatEngine, enemy, outcome: TurnOutcome) -> EnemyAction:
+    """Describe an AI turn carried out by take_ai_turn as an EnemyAction."""
+    movement = {
+        "movement_path": [list(cell) for cell in outcome.movement_path] if outcome.movement_path else None,
+        "old_position": list(outcome.old_position) if outcome.moved else None,
+        "new_position": list(outcome.new_position) if outcome.moved else None,
+    }
+
+    if outcome.action_type == "multiattack" and outcome.results:
+        result = outcome.results[0]
+        hits = result.extra_data.get("hits", 0) if result.extra_data else 0
+        hit_text = f"{hits} hits for {outcome.damage_dealt} damage!" if hits else "Miss!"
         return EnemyAction(
             enemy_id=enemy.id,
             enemy_name=enemy.name,
-            action_type="none",
-            description=f"{enemy.name} considers their options."
-        )
-
-    # Convert AI decision to action
-    action_type = decision.action_type
-
-    # Handle different action types
-    if action_type == "attack" or action_type == "ranged_attack":
-        target_id = decision.target_id
-        target = tracker.get_combatant(target_id) if target_id else None
-
-        if not target:
-            # No valid target, try to move
-            return _execute_ai_movement(engine, grid, enemy, decision)
-
-        # Check if we need to move to reach the target
-        enemy_pos = engine.state.positions.get(enemy.id)
-        target_pos = engine.state.positions.get(target_id)
-
-        if enemy_pos and target_pos:
-            dx = abs(target_pos[0] - enemy_pos[0])
-            dy = abs(target_pos[1] - enemy_pos[1])
-            is_adjacent = (dx <= 1 and dy <= 1 and (dx + dy) > 0)
-
-            # Move if needed for melee
-            if action_type == "attack" and not is_adjacent:
-                move_result = _execute_ai_movement(engine, grid, enemy, decision)
-                # After moving, check if now adjacent
-                enemy_pos = engine.state.positions.get(enemy.id)
-                if enemy_pos:
-                    dx = abs(target_pos[0] - enemy_pos[0])
-                    dy = abs(target_pos[1] - enemy_pos[1])
-                    is_adjacent = (dx <= 1 and dy <= 1 and (dx + dy) > 0)
-
-                if not is_adjacent:
-                    # Couldn't reach, just return the move
-                    return move_result
-
-        # Execute the attack
-        result = engine.take_action(
-            action_type=ActionType.ATTACK,
-            target_id=target_id
-        )
-
-        hit = result.extra_data.get("hit", False) if result.extra_data and result.success else False
-        damage = result.damage_dealt if hit else 0
-
-        # Extract attack details
-        attack_roll_obj = result.extra_data.get("attack_roll") if result.extra_data else None
-        critical = result.extra_data.get("critical_hit", False) if result.extra_data else False
-        critical_miss = result.extra_data.get("critical_miss", False) if result.extra_data else False
-        target_ac = result.extra_data.get("target_ac") if result.extra_data else None
-
-        natural_roll = None
-        attack_modifier = None
-        attack_total = None
-        advantage = False
-        disadvantage = False
-        second_roll = None
-
-        if attack_roll_obj and hasattr(attack_roll_obj, "total"):
-            attack_total = attack_roll_obj.total
-            natural_roll = attack_roll_obj.base_roll
-            attack_modifier = attack_roll_obj.modifier
-            advantage = attack_roll_obj.advantage
-            disadvantage = attack_roll_obj.disadvantage
-            if len(attack_roll_obj.rolls) > 1:
-                if advantage:
-                    second_roll = min(attack_roll_obj.rolls)
-                elif disadvantage:
-                    second_roll = max(attack_roll_obj.rolls)
-
-        # Get damage details
-        enemy_stats = engine.state.combatant_stats.get(enemy.id, {})
-        damage_dice = enemy_stats.get("damage_dice", "1d6")
-        damage_type = enemy_stats.get("damage_type", "slashing")
-
-        # Parse damage formula
-        damage_modifier = 0
-        damage_rolls = []
-        if hit and damage > 0:
-            match = re.match(r"(\d+)d(\d+)(?:\+(\d+))?", damage_dice)
-            if match:
-                num_dice = int(match.group(1))
-                die_size = int(match.group(2))
-                damage_modifier = int(match.group(3)) if match.group(3) else 0
-                dice_total = damage - damage_modifier
-                if critical:
-                    num_dice *= 2
-                if num_dice > 0 and dice_total > 0:
-                    avg_per_die = dice_total / num_dice
-                    for i in range(num_dice):
-                        roll = min(max(1, round(avg_per_die)), die_size)
-                        damage_rolls.append(roll)
-                    current_total = sum(damage_rolls)
-                    if current_total != dice_total and damage_rolls:
-                        diff = dice_total - current_total
-                        damage_rolls[-1] = max(1, min(die_size, damage_rolls[-1] + diff))
-
-        # Build description with AI reasoning
-        hit_text = f"Hit for {damage} damage!" if hit else "Miss!"
-        description = f"{enemy.name} {decision.reasoning} - {hit_text}"
-
+            action_type="attack",
+            description=f"{enemy.name} {outcome.reasoning} - {hit_text}",
+            target_id=outcome.target_id,
+            damage_dealt=outcome.damage_dealt,
+            hit=hits > 0,
+            **movement
+        )
+
+    if outcome.action_type in ("attack", "ranged_attack") and outcome.results:
+        # Roll details of the first swing; damage covers every attack
+        details = _attack_details(engine, enemy, outcome.results[0])
+        details["damage_dealt"] = outcome.damage_dealt
+        details["hit"] = details["hit"] or outcome.damage_dealt > 0
+        hit_text = f"Hit for {outcome.damage_dealt} damage!" if details["hit"] else "Miss!"
         return EnemyAction(
             enemy_id=enemy.id,
             enemy_name=enemy.name,
             action_type="attack",
-            description=description,
-            target_id=target_id,
-            damage_dealt=damage,
-            hit=hit,
-            attack_roll=attack_total,
-            natural_roll=natural_roll,
-            attack_modifier=attack_modifier,
-            target_ac=target_ac,
-            critical=critical,
-            critical_miss=critical_miss,
-            advantage=advantage,
-            disadvantage=disadvantage,
-            second_roll=second_roll,
-            damage_formula=damage_dice,
-            damage_rolls=damage_rolls if damage_rolls else None,
-            damage_modifier=damage_modifier,
-            damage_type=damage_type
+            description=f"{enemy.name} {outcome.reasoning} - {hit_text}",
+            target_id=outcome.target_id,
+            **details,
+            **movement
         )
 
-    elif action_type == "dash":
-        return _execute_ai_movement(engine, grid, enemy, decision, is_dash=True)
+    if outcome.action_type in ("dodge", "disengage", "hide", "dash"):
+        action_type = outcome.action_type
+    else:
+        action_type = "move" if outcome.moved else "none"
+    return EnemyAction(
+        enemy_id=enemy.id,
+        enemy_name=enemy.name,
+        action_type=action_type,
+        description=f"{enemy.name} {outcome.reasoning}",
+        target_id=outcome.target_id,
+        **movement
+    )
 
-    elif action_type == "move":
-        return _execute_ai_movement(engine, grid, enemy, decision)
 
-    elif action_type == "dodge":
-        # Apply dodging condition - attackers have disadvantage until start of next turn
-        enemy_stats = engine.state.combatant_stats.get(enemy.id, {})
-        conditions = enemy_stats.get("conditions", [])
+def process_enemy_turn_advanced(
+    engine: CombatEngine,
+    grid: CombatGrid,
+    enemy
+) -> Optional[EnemyAction]:
+    """
+    Advanced enemy AI using tactical decision-making system.
 
-        if "dodging" not in conditions:
-            conditions.append("dodging")
-            enemy_stats["conditions"] = conditions
+    Uses role-based behaviors (Brute, Striker, Caster, etc.) and
+    intelligent target prioritization.
 
-        return EnemyAction(
-            enemy_id=enemy.id,
-            enemy_name=enemy.name,
-            action_type="dodge",
-            description=f"{enemy.name} takes the Dodge action. Attacks against them have disadvantage. {decision.reasoning}",
-            effects=["dodging"],
-        )
+    Returns an EnemyAction describing what the enemy did.
+    """
+    # Planned turns (bosses, within the planner's time budget) and the role
+    # behavior's greedy choices run through the same executor the
+    # simulator uses
+    decision, outcome = take_ai_turn(engine, grid, enemy.id)
+    if outcome is not None:
+        return _turn_action(engine, enemy, outcome)
 
-    elif action_type == "disengage":
-        # Mark as disengaged for this turn
+    if not decision:
         return EnemyAction(
             enemy_id=enemy.id,
             enemy_name=enemy.name,
-            action_type="disengage",
-            description=f"{enemy.name} disengages. {decision.reasoning}"
+            action_type="none",
+            description=f"{enemy.name} considers their options."
         )
 
-    elif action_type == "hide":
-        return EnemyAction(
-            enemy_id=enemy.id,
-            enemy_name=enemy.name,
-            action_type="hide",
-            description=f"{enemy.name} attempts to hide. {decision.reasoning}"
-        )
+    action_type = getattr(decision.action_type, "value", decision.action_type)
 
-    elif action_type in ("spell", "cantrip"):
+    if action_type in ("spell", "cantrip"):
         # Enemy spell casting implementation
         from app.core.spell_system import cast_spell, SpellRegistry
 
@@ -1333,7 +1332,13 @@ def process_enemy_turn_advanced(
         slot_level = None if spell.level == 0 else spell.level
 
         # Cast the spell
-        result = cast_spell(caster_data, spell_id, slot_level, targets)
+        result = cast_spell(
+            caster_data, spell_id, slot_level, targets,
+            combat_state={
+                "round_number": engine.state.initiative_tracker.current_round,
+                "dice": engine.state.dice,
+            },
+        )
 
         # Apply damage if any
         total_damage = 0
@@ -1364,107 +1369,6 @@ def process_enemy_turn_advanced(
     )
 
 
-def _execute_ai_movement(
-    engine: CombatEngine,
-    grid: CombatGrid,
-    enemy,
-    decision,
-    is_dash: bool = False
-) -> Optional[EnemyAction]:
-    """Execute movement based on AI decision."""
-    from app.core.initiative import CombatantType
-
-    enemy_pos = engine.state.positions.get(enemy.id)
-    if not enemy_pos:
-        return None
-
-    # Determine target position
-    target_pos = None
-    target_name = "their objective"
-
-    if decision.target_id:
-        target_pos = engine.state.positions.get(decision.target_id)
-        target = engine.state.initiative_tracker.get_combatant(decision.target_id)
-        if target:
-            target_name = target.name
-    elif decision.position:
-        target_pos = decision.position
-
-    if not target_pos:
-        return EnemyAction(
-            enemy_id=enemy.id,
-            enemy_name=enemy.name,
-            action_type="none",
-            description=f"{enemy.name} has nowhere to move."
-        )
-
-    # Get enemy speed
-    enemy_stats = engine.state.combatant_stats.get(enemy.id, {})
-    speed = enemy_stats.get("speed", 30)
-    if is_dash:
-        speed *= 2
-
-    # Get reachable cells
-    reachable = get_reachable_cells(
-        grid,
-        enemy_pos[0],
-        enemy_pos[1],
-        speed,
-        include_occupied=False
-    )
-
-    if not reachable:
-        return EnemyAction(
-            enemy_id=enemy.id,
-            enemy_name=enemy.name,
-            action_type="none",
-            description=f"{enemy.name} cannot move."
-        )
-
-    # Find closest cell to target
-    best_cell = None
-    best_dist = float('inf')
-
-    for (rx, ry, cost) in reachable:
-        dist = abs(target_pos[0] - rx) + abs(target_pos[1] - ry)
-        if dist < best_dist:
-            best_dist = dist
-            best_cell = (rx, ry)
-
-    if best_cell and best_cell != tuple(enemy_pos):
-        old_pos = list(enemy_pos)
-
-        # Get path for animation
-        path_result = find_path(
-            grid,
-            enemy_pos[0],
-            enemy_pos[1],
-            best_cell[0],
-            best_cell[1],
-            max_movement=speed
-        )
-
-        # Update position
-        engine.state.positions[enemy.id] = best_cell
-        grid.set_occupant(enemy_pos[0], enemy_pos[1], None)
-        grid.set_occupant(best_cell[0], best_cell[1], enemy.id)
-
-        movement_path = [[x, y] for x, y in path_result.path] if path_result.success else None
-        action_type = "dash" if is_dash else "move"
-
-        return EnemyAction(
-            enemy_id=enemy.id,
-            enemy_name=enemy.name,
-            action_type=action_type,
-            description=f"{enemy.name} {'dashes' if is_dash else 'moves'} toward {target_name}. {decision.reasoning}",
-            movement_path=movement_path,
-            old_position=old_pos,
-            new_position=list(best_cell)
-        )
-
-    return None
-
-
 def process_enemy_turn(engine: CombatEngine, grid: CombatGrid, enemy) -> Optional[EnemyAction]:
     """
     Simple enemy AI: Find nearest player and attack if adjacent, otherwise move toward them.
@@ -1667,16 +1571,29 @@ def process_enemy_turn(engine: CombatEngine, grid: CombatGrid, enemy) -> Optiona
         )
 
 
-@router.post("/{combat_id}/end-turn", response_model=EndTurnResponse)
-async def end_turn(
+def resolve_enemy_turn(engine: CombatEngine, grid: CombatGrid, enemy) -> Optional[EnemyAction]:
+    """Run one enemy's AI turn (advanced AI, falling back to simple AI)."""
+    # Use advanced AI if enabled, fallback to simple AI
+    if USE_ADVANCED_AI:
+        try:
+            return process_enemy_turn_advanced(engine, grid, enemy)
+        except Exception as e:
+            # Fallback to simple AI on error
+            print(f"[AI] Advanced AI error: {e}, falling back to simple AI")
+    return process_enemy_turn(engine, grid, enemy)
+
+
+async def _end_turn_locked(
     combat_id: str,
-    combat_repo: CombatStateRepository = Depends(get_combat_repo),
-):
+    combat_repo: CombatStateRepository,
+    on_enemy_action: Optional[Callable[[EnemyAction], None]] = None,
+) -> EndTurnResponse:
     """
-    End the current combatant's turn and advance to the next.
-    If the next combatant is an enemy, process all enemy turns automatically
-    until it's a player's turn again.
-    Persists state to database after turn changes.
+    End the current turn and run enemy turns until a player is up.
+
+    Must be called with the combat session held. Each enemy turn runs on
+    the enemy turn executor so pathfinding and scoring never block the
+    event loop; on_enemy_action is called as each action resolves.
     """
     engine = active_combats.get(combat_id)
     grid = active_grids.get(combat_id)
@@ -1690,6 +1607,7 @@ async def end_turn(
 
     enemy_actions: List[EnemyAction] = []
     tracker = engine.state.initiative_tracker
+    loop = asyncio.get_running_loop()
 
     # End current turn and advance
     try:
@@ -1717,21 +1635,15 @@ async def end_turn(
         if next_combatant.combatant_type == CombatantType.PLAYER:
             break
 
-        # Enemy turn - process with AI
+        # Enemy turn - process with AI off the event loop
         if grid:
-            # Use advanced AI if enabled, fallback to simple AI
-            if USE_ADVANCED_AI:
-                try:
-                    action = process_enemy_turn_advanced(engine, grid, next_combatant)
-                except Exception as e:
-                    # Fallback to simple AI on error
-                    print(f"[AI] Advanced AI error: {e}, falling back to simple AI")
-                    action = process_enemy_turn(engine, grid, next_combatant)
-            else:
-                action = process_enemy_turn(engine, grid, next_combatant)
-
+            action = await loop.run_in_executor(
+                get_enemy_turn_executor(), resolve_enemy_turn, engine, grid, next_combatant
+            )
             if action:
                 enemy_actions.append(action)
+                if on_enemy_action:
+                    on_enemy_action(action)
 
         # Advance to next combatant
         try:
@@ -1748,7 +1660,7 @@ async def end_turn(
     combat_result = tracker.get_combat_result()
 
     # Persist state to database
-    await persist_combat_state(combat_id, engine, combat_repo)
+    await persist_combat_state(combat_id, engine, combat_repo, end_of_turn=True)
 
     # If combat ended, update database record
     if combat_over and combat_result:
@@ -1766,11 +1678,77 @@ async def end_turn(
     )
 
 
+@router.post("/{combat_id}/end-turn", response_model=EndTurnResponse)
+@with_combat_session
+async def end_turn(
+    combat_id: str,
+    combat_repo: CombatStateRepository = Depends(get_combat_repo),
+):
+    """
+    End the current combatant's turn and advance to the next.
+    If the next combatant is an enemy, process all enemy turns automatically
+    until it's a player's turn again.
+    Persists state to database after turn changes.
+    """
+    return await _end_turn_locked(combat_id, combat_repo)
+
+
+@router.post("/{combat_id}/end-turn/stream")
+async def end_turn_stream(combat_id: str):
+    """
+    End the turn like /end-turn, streaming enemy actions as Server-Sent Events.
+
+    Emits an "enemy_action" event as each enemy turn resolves, then
+    "turn_ended" with the full end-turn response, or "error" with a status
+    code and detail. The round runs in its own task holding the combat
+    lock and its own database session (the request's session is closed
+    when the client disconnects), so it completes and persists either way.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def run_round() -> None:
+        try:
+            async with get_session_context() as session:
+                combat_repo = CombatStateRepository(session)
+                async with combat_session(combat_id, combat_repo):
+                    response = await _end_turn_locked(
+                        combat_id,
+                        combat_repo,
+                        on_enemy_action=lambda action: events.put_nowait(
+                            ("enemy_action", action.model_dump())
+                        ),
+                    )
+            events.put_nowait(("turn_ended", response.model_dump()))
+        except HTTPException as e:
+            events.put_nowait(("error", {"status_code": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            logger.exception(f"Streamed end turn failed for combat {combat_id}")
+            events.put_nowait(("error", {"status_code": 500, "detail": str(e)}))
+
+    task = asyncio.create_task(run_round())
+    _running_rounds.add(task)
+    task.add_done_callback(_running_rounds.discard)
+
+    async def stream() -> AsyncIterator[str]:
+        while True:
+            event, data = await events.get()
+            yield format_sse(data, event=event)
+            if event != "enemy_action":
+                return
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # =============================================================================
 # Query Endpoints
 # =============================================================================
 
 @router.get("/{combat_id}/reachable")
+@with_combat_lock
 async def get_reachable_positions(combat_id: str):
     """
     Get all positions the current combatant can reach with their remaining movement.
@@ -1824,6 +1802,7 @@ async def get_reachable_positions(combat_id: str):
 
 
 @router.get("/{combat_id}/threat-zones")
+@with_combat_lock
 async def get_threat_zones(
     combat_id: str,
     combatant_id: Optional[str] = None
@@ -1861,38 +1840,31 @@ async def get_threat_zones(
 
     threat_zones = {}
     tracker = engine.state.initiative_tracker
+    threat_map = get_threat_map(engine.state)
 
     # Get threat zones for enemies (or specific combatant)
     for combatant in tracker.combatants:
-        if not combatant.is_active:
-            continue
         if combatant_id and combatant.id != combatant_id:
             continue
         # Only show enemy threats (players don't need to see their own)
         if combatant.combatant_type == CombatantType.PLAYER:
             continue
-
-        # Get enemy's reach (default 5ft for melee)
-        stats = engine.state.combatant_stats.get(combatant.id, {})
-        reach = stats.get("reach", 5)
-
-        # Get position
-        pos = engine.state.positions.get(combatant.id)
-        if not pos:
+        # Inactive, unplaced and incapacitated creatures threaten nothing
+        if combatant.id not in threat_map.sources:
             continue
 
-        # Calculate threatened squares
-        threatened = get_threatened_squares(grid, combatant.id, reach)
+        stats = engine.state.combatant_stats.get(combatant.id, {})
         threat_zones[combatant.id] = {
             "name": combatant.name,
-            "reach": reach,
-            "cells": [{"x": x, "y": y} for x, y in threatened]
+            "reach": stats.get("reach", 5),
+            "cells": [{"x": x, "y": y} for x, y in threat_map.threatened_cells(combatant.id)]
         }
 
     return {"threat_zones": threat_zones}
 
 
 @router.get("/{combat_id}/targets")
+@with_combat_lock
 async def get_valid_targets(
     combat_id: str,
     combatant_id: Optional[str] = None,
@@ -1960,6 +1932,7 @@ async def get_valid_targets(
 
 
 @router.get("/{combat_id}/initiative")
+@with_combat_lock
 async def get_initiative_order(combat_id: str):
     """
     Get the current initiative order.
@@ -1979,6 +1952,7 @@ async def get_initiative_order(combat_id: str):
 
 
 @router.get("/{combat_id}/events")
+@with_combat_lock
 async def get_combat_events(combat_id: str, count: int = 20):
     """
     Get recent combat events.
@@ -2021,6 +1995,7 @@ class ClassFeatureResponse(BaseModel):
 
 
 @router.post("/{combat_id}/action-surge", response_model=ClassFeatureResponse)
+@with_combat_session
 async def use_action_surge(
     combat_id: str,
     combatant_id: str = Query(..., description="The fighter using Action Surge"),
@@ -2065,6 +2040,7 @@ async def use_action_surge(
 
 
 @router.post("/{combat_id}/divine-smite", response_model=ClassFeatureResponse)
+@with_combat_session
 async def use_divine_smite(
     combat_id: str,
     slot_level: int = 1,
@@ -2110,6 +2086,7 @@ async def use_divine_smite(
 
 
 @router.get("/{combat_id}/class-features/{combatant_id}")
+@with_combat_lock
 async def get_class_features(combat_id: str, combatant_id: str):
     """
     Get available class features and their resources for a combatant.
@@ -2255,6 +2232,7 @@ class DeathSaveResponse(BaseModel):
 
 
 @router.post("/{combat_id}/death-save/{combatant_id}", response_model=DeathSaveResponse)
+@with_combat_session
 async def roll_death_save(
     combat_id: str,
     combatant_id: str,
@@ -2380,6 +2358,7 @@ async def roll_death_save(
 
 
 @router.post("/{combat_id}/stabilize", response_model=DeathSaveResponse)
+@with_combat_session
 async def stabilize_combatant(
     combat_id: str,
     request: StabilizeRequest,
@@ -2520,6 +2499,7 @@ async def stabilize_combatant(
 
 
 @router.get("/{combat_id}/death-saves/{combatant_id}")
+@with_combat_lock
 async def get_death_save_status(combat_id: str, combatant_id: str):
     """
     Get the current death save status for a combatant.
@@ -9,10 +9,12 @@ Endpoints for:
 - Usage statistics and rate limiting
 """
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import AsyncIterator, Optional, Dict, Any, List
 
 from app.services.ai_dm import get_ai_dm, DMMode
+from app.services.ai_dm_stream import format_sse
 from app.services.ai_dm_personalities import DMPersonality, DMTone, DMVerbosity
 
 router = APIRouter()
@@ -380,6 +382,51 @@ async def generate_narrative(request: NarrativeRequest):
     }
 
 
+@router.post("/stream")
+async def stream_narrative(request: NarrativeRequest):
+    """
+    Stream narrative content as Server-Sent Events.
+
+    Takes the same body as /generate. Emits a "chunk" event per piece of
+    generated text, then a "done" event with the full content. Identical
+    requests in flight share one upstream generation.
+    """
+    dm = get_ai_dm()
+    context_type = request.context_type.lower()
+
+    try:
+        chunks = dm.stream_narrative(context_type, request.context_data)
+        # Validate the context type before the response starts
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def events() -> AsyncIterator[str]:
+        content = []
+        if first is not None:
+            content.append(first)
+            yield format_sse({"text": first}, event="chunk")
+            async for chunk in chunks:
+                content.append(chunk)
+                yield format_sse({"text": chunk}, event="chunk")
+        yield format_sse(
+            {
+                "generated": bool(content),
+                "context_type": context_type,
+                "content": "".join(content) or None,
+            },
+            event="done",
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # =============================================================================
 # Personality Endpoints
 # =============================================================================
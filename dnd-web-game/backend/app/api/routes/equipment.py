@@ -10,14 +10,15 @@ Provides endpoints for equipment management:
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
-import json
-from pathlib import Path
 
 from app.models.equipment import CharacterEquipment, InventoryItem, EquipmentSlot, ItemRarity
 from app.core.combat_storage import active_combats
+from app.core.rules_catalog import get_rules_catalog
 
 router = APIRouter(prefix="/equipment", tags=["equipment"])
 
+EQUIPMENT_DIR = "rules/2024/equipment"
+
 
 # ============================================================================
 # Request/Response Models
@@ -107,33 +108,13 @@ def calculate_encumbrance_status(equipment: CharacterEquipment, strength: int =
 
 
 def load_item_data() -> ItemDataResponse:
-    """Load all item data from JSON files."""
-    data_path = Path(__file__).parent.parent.parent / "data" / "rules" / "2024" / "equipment"
-
-    weapons = []
-    armor = []
-    gear = []
-
-    # Load weapons
-    weapons_file = data_path / "weapons.json"
-    if weapons_file.exists():
-        with open(weapons_file, "r", encoding="utf-8") as f:
-            weapons_data = json.load(f)
-            weapons = weapons_data.get("weapons", [])
-
-    # Load armor
-    armor_file = data_path / "armor.json"
-    if armor_file.exists():
-        with open(armor_file, "r", encoding="utf-8") as f:
-            armor_data = json.load(f)
-            armor = armor_data.get("armor", [])
-
-    # Load adventuring gear
-    gear_file = data_path / "adventuring_gear.json"
-    if gear_file.exists():
-        with open(gear_file, "r", encoding="utf-8") as f:
-            gear_data = json.load(f)
-            gear = gear_data.get("gear", gear_data.get("items", []))
+    """Load all item data from the rules catalog."""
+    catalog = get_rules_catalog()
+
+    weapons = catalog.get(f"{EQUIPMENT_DIR}/weapons.json", {}).get("weapons", [])
+    armor = catalog.get(f"{EQUIPMENT_DIR}/armor.json", {}).get("armor", [])
+    gear_data = catalog.get(f"{EQUIPMENT_DIR}/adventuring_gear.json", {})
+    gear = gear_data.get("gear", gear_data.get("items", []))
 
     return ItemDataResponse(weapons=weapons, armor=armor, gear=gear)
 
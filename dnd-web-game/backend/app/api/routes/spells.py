@@ -17,7 +17,9 @@ from app.core.spell_system import (
 from app.core.class_spellcasting import (
     get_spellcasting_summary, is_spellcasting_class
 )
-from app.core.combat_storage import active_combats
+from app.core.combat_storage import active_combats, combat_session, with_combat_session
+from app.core.movement import get_visibility_from
+from app.core.aoe_templates import AREA_SHAPES, DIRECTED_SHAPES
 
 router = APIRouter()
 
@@ -43,18 +45,17 @@ async def list_spells(
     """
     registry = SpellRegistry.get_instance()
 
-    spells = registry.search_spells(
+    total, filtered_spells = registry.search_spells_page(
         query=search,
         level=level,
         school=school,
         class_name=class_name,
         ritual=ritual,
         concentration=concentration,
+        limit=limit,
+        offset=offset,
     )
 
-    total = len(spells)
-    filtered_spells = spells[offset:offset + limit]
-
     return SpellListResponse(
         spells=filtered_spells,
         total=total,
@@ -266,35 +267,36 @@ async def prepare_spells(
 
     Only for prepared casters (Wizard, Cleric, Druid, Paladin).
     Can only be done outside of combat (or before combat starts).
+    Without a combat ID, the character's combat is looked up in the combat
+    store. Either way the update runs under that combat's lock and is
+    flushed like any other combat mutation.
     """
-    # Get character data
-    character_data = None
-    combat_engine = None
+    if combat_id is None:
+        combat_id = next(
+            (cid for cid, combat in active_combats.items() if character_id in combat.state.combatant_stats),
+            None,
+        )
+        if combat_id is None:
+            raise HTTPException(status_code=404, detail=f"Character '{character_id}' not found")
+
+    async with combat_session(combat_id):
+        if combat_id not in active_combats:
+            raise HTTPException(status_code=404, detail=f"Combat '{combat_id}' not found")
 
-    if combat_id and combat_id in active_combats:
         combat_engine = active_combats[combat_id]
         character_data = combat_engine.state.combatant_stats.get(character_id)
+        if not character_data:
+            raise HTTPException(status_code=404, detail=f"Character '{character_id}' not found")
 
-    if not character_data:
-        for cid, combat in active_combats.items():
-            if character_id in combat.state.combatant_stats:
-                character_data = combat.state.combatant_stats[character_id]
-                combat_engine = combat
-                break
-
-    if not character_data:
-        raise HTTPException(status_code=404, detail=f"Character '{character_id}' not found")
-
-    spellcasting_data = character_data.get("spellcasting", {})
-    spell_caster = SpellCaster(character_data, spellcasting_data)
+        spellcasting_data = character_data.get("spellcasting", {})
+        spell_caster = SpellCaster(character_data, spellcasting_data)
 
-    success, message = spell_caster.prepare_spells(request.spell_ids)
+        success, message = spell_caster.prepare_spells(request.spell_ids)
 
-    if not success:
-        raise HTTPException(status_code=400, detail=message)
+        if not success:
+            raise HTTPException(status_code=400, detail=message)
 
-    # Update character data in combat state
-    if combat_engine:
+        # Update character data in combat state
         combat_engine.state.combatant_stats[character_id]["spellcasting"] = spell_caster.to_dict()
 
     return {
@@ -307,6 +309,7 @@ async def prepare_spells(
 # ==================== Combat Spellcasting ====================
 
 @router.post("/combat/{combat_id}/cast")
+@with_combat_session
 async def cast_spell_in_combat(
     combat_id: str,
     request: CastSpellRequest,
@@ -332,9 +335,26 @@ async def cast_spell_in_combat(
     if current_combatant and current_combatant.id != request.caster_id:
         raise HTTPException(status_code=400, detail="It's not your turn to act")
 
+    # Area spells aimed at a point: place the template and, when no targets
+    # were picked, catch everyone standing inside it
+    target_ids = list(request.target_ids)
+    area_placement = {}
+    spell = SpellRegistry.get_instance().get_spell(request.spell_id)
+    positions = combat_engine.state.positions
+    caster_cell = positions.cell_of(request.caster_id)
+    if request.target_point and spell and spell.area_size and spell.target_type in AREA_SHAPES:
+        point = (request.target_point.get("x", 0), request.target_point.get("y", 0))
+        if caster_cell and (spell.target_type in DIRECTED_SHAPES or "self" in spell.range.lower()):
+            origin, toward = caster_cell, point
+        else:
+            origin, toward = point, None
+        area_placement = {"area_origin": origin, "area_toward": toward}
+        if not target_ids:
+            target_ids = positions.in_template(spell.target_type, spell.area_size, origin, toward)
+
     # Get target data
     targets = []
-    for target_id in request.target_ids:
+    for target_id in target_ids:
         target_data = combat_engine.state.combatant_stats.get(target_id)
         if target_data:
             # Include position for range calculations
@@ -351,7 +371,9 @@ async def cast_spell_in_combat(
         slot_level=request.slot_level,
         targets=targets,
         combat_state={
-            "round_number": combat_engine.state.initiative_tracker.current_round
+            "round_number": combat_engine.state.initiative_tracker.current_round,
+            "dice": combat_engine.state.dice,
+            **area_placement,
         }
     )
 
@@ -409,6 +431,7 @@ async def cast_spell_in_combat(
         # Handle concentration
         if result.concentration_started:
             combat_engine.state.combatant_stats[request.caster_id]["spellcasting"]["concentrating_on"] = result.spell_id
+            combat_engine.state.mark_stats_dirty(request.caster_id)
 
         # Add combat event
         combat_engine.state.add_event(
@@ -434,6 +457,7 @@ async def cast_spell_in_combat(
                 combat_engine.state.current_turn.action_taken = True
             elif "bonus" in casting_time:
                 combat_engine.state.current_turn.bonus_action_taken = True
+            combat_engine.state.mark_dirty("current_turn")
 
     # Build combat_state for frontend to update HP
     # ALWAYS include targeted combatants so frontend can update HP display
@@ -513,8 +537,10 @@ async def get_spell_targets(
     if not caster_pos:
         raise HTTPException(status_code=404, detail=f"Caster '{caster_id}' not found in combat")
 
-    caster_x = caster_pos.get("x", 0)
-    caster_y = caster_pos.get("y", 0)
+    if isinstance(caster_pos, dict):
+        caster_x, caster_y = caster_pos.get("x", 0), caster_pos.get("y", 0)
+    else:
+        caster_x, caster_y = caster_pos[0], caster_pos[1]
 
     # Parse spell range
     range_str = spell.range.lower()
@@ -533,7 +559,23 @@ async def get_spell_targets(
 
     targets: List[SpellTargetInfo] = []
 
-    for combatant_id, pos in combat_engine.state.positions.items():
+    # Only combatants within range are considered; the spatial index visits
+    # just the grid buckets around the caster
+    positions = combat_engine.state.positions
+    in_range = {
+        combatant_id: positions[combatant_id]
+        for combatant_id in positions.within((caster_x, caster_y), max_range // 5)
+    }
+    in_range.setdefault(caster_id, caster_pos)
+
+    # Sight lines to every candidate in one pass (cached on the grid)
+    visibility = {}
+    if combat_engine.state.grid:
+        visibility = get_visibility_from(
+            combat_engine.state.grid, caster_x, caster_y, in_range
+        )
+
+    for combatant_id, pos in in_range.items():
         if combatant_id == caster_id:
             # Self is always a valid target for self spells
             if spell.target_type and "self" in spell.target_type.value:
@@ -550,9 +592,15 @@ async def get_spell_targets(
         if not combatant or not combatant.is_active:
             continue
 
+        sight = visibility.get(combatant_id)
+        if sight and not sight.has_line_of_sight:
+            continue
+
         # Calculate distance (5 ft per cell)
-        target_x = pos.get("x", 0)
-        target_y = pos.get("y", 0)
+        if isinstance(pos, dict):
+            target_x, target_y = pos.get("x", 0), pos.get("y", 0)
+        else:
+            target_x, target_y = pos[0], pos[1]
         dx = abs(target_x - caster_x)
         dy = abs(target_y - caster_y)
         distance_cells = max(dx, dy)
@@ -572,7 +620,9 @@ async def get_spell_targets(
                 name=combatant_stats.get("name", combatant.name),
                 distance=distance_feet,
                 is_ally=is_ally,
-                is_self=False
+                is_self=False,
+                cover=sight.cover if sight else 0,
+                obscured=sight.obscured if sight else None,
             ))
 
     return {
@@ -584,6 +634,7 @@ async def get_spell_targets(
 
 
 @router.post("/combat/{combat_id}/concentration-check")
+@with_combat_session
 async def concentration_check(
     combat_id: str,
     caster_id: str,
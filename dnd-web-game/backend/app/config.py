@@ -11,13 +11,56 @@ class Settings:
 
     # API Keys
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
+    # Override the API endpoint (e.g. a proxy); empty uses the default
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "")
 
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./game.db")
 
+    # Combat session store: "memory://" keeps combats in-process,
+    # "sqlite:///path" shares them between workers on the same host
+    COMBAT_STORE_URL: str = os.getenv("COMBAT_STORE_URL", "memory://")
+
+    # Combat persistence: 0 writes every change immediately, >0 buffers
+    # changes and flushes them every N seconds or at end of turn
+    COMBAT_WRITE_BEHIND_SECONDS: float = float(os.getenv("COMBAT_WRITE_BEHIND_SECONDS", "0"))
+
+    # Threads resolving enemy AI turns off the event loop
+    ENEMY_TURN_WORKERS: int = int(os.getenv("ENEMY_TURN_WORKERS", "4"))
+
+    # Wall-clock budget per AI planner decision (bosses and creatures with
+    # ai_behavior.planner); 0 disables the planner
+    AI_PLANNER_BUDGET_MS: float = float(os.getenv("AI_PLANNER_BUDGET_MS", "20"))
+
+    # AI DM response cache: SQLite file for a persistent tier (empty keeps
+    # responses in memory only) and the TTL of cached narration
+    AI_DM_CACHE_PATH: str = os.getenv("AI_DM_CACHE_PATH", "")
+    AI_DM_CACHE_TTL_MINUTES: int = int(os.getenv("AI_DM_CACHE_TTL_MINUTES", "30"))
+
+    # Compiled rules data bundle (see app.core.rules_catalog); rebuilt when
+    # app/data changes. Off by default: an absolute path, or a file name kept
+    # in backend/.cache. Empty parses the JSON in every process instead
+    RULES_BUNDLE_PATH: str = os.getenv("RULES_BUNDLE_PATH", "")
+    # Watch app/data for edits and reload the rules registries
+    RULES_HOT_RELOAD: bool = os.getenv("RULES_HOT_RELOAD", "false").lower() == "true"
+    RULES_RELOAD_INTERVAL_SECONDS: float = float(os.getenv("RULES_RELOAD_INTERVAL_SECONDS", "2"))
+
+    # Startup: routers to mount (comma-separated names from app.main.ROUTERS,
+    # empty mounts all) and subsystems to load before serving (see
+    # app.main.PRELOADERS; "all" loads every one)
+    APP_ROUTERS: str = os.getenv("APP_ROUTERS", "")
+    STARTUP_PRELOAD: str = os.getenv("STARTUP_PRELOAD", "")
+    # Token for the /api/admin endpoints (X-Admin-Token); empty allows them
+    # in DEBUG only
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
     # Server
     HOST: str = os.getenv("HOST", "127.0.0.1")
     PORT: int = int(os.getenv("PORT", "8000"))
+    # Worker processes forked by ``python -m app.server``, and whether the
+    # master runs the warmup pass (app.core.warmup) before forking them
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    WARMUP: bool = os.getenv("WARMUP", "true").lower() == "true"
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
 
     # CORS - Frontend URL
@@ -5,12 +5,37 @@ Provides tactical decision-making for enemy combatants using
 utility-based scoring to evaluate and select optimal actions.
 
 Modules:
+- battlefield: Immutable per-turn battlefield snapshot shared by all AI
+- expected_value: Memoized hit, damage, save and kill probabilities
+- planner: Time-budgeted whole-turn planner for bosses and opted-in AI
+- execution: Carries out AI turns on the combat engine
 - targeting: Target evaluation and prioritization
 - behaviors: Role-specific AI behaviors (Brute, Striker, Caster, etc.)
 - coordination: Multi-enemy tactical coordination
 - tactical_ai: Main AI decision framework
 - environmental: Environmental hazard awareness
 """
+from .battlefield import (
+    BattlefieldSnapshot,
+    CombatantView,
+    get_battlefield_snapshot,
+)
+from .expected_value import (
+    AttackOutcome,
+    AttackProfile,
+    DefenseProfile,
+    SaveOutcome,
+    evaluate_attacks,
+    evaluate_save,
+    evaluate_targets,
+)
+from .planner import (
+    AnytimePlanner,
+    PlannerMetrics,
+    TurnPlan,
+    get_planner_stats,
+)
+from .execution import TurnOutcome, coordinate_decision, execute_decision, execute_plan, take_ai_turn
 from .targeting import TargetEvaluator, TargetPriority, TargetScore
 from .environmental import (
     EnvironmentalAnalyzer,
@@ -40,10 +65,34 @@ from .coordination import (
     CoordinationPlan,
     TargetAssignment,
     coordinate_enemies,
+    get_coordinator,
 )
 from .tactical_ai import TacticalAI, get_ai_for_role, get_ai_for_combatant
 
 __all__ = [
+    # Battlefield
+    'BattlefieldSnapshot',
+    'CombatantView',
+    'get_battlefield_snapshot',
+    # Expected value
+    'AttackOutcome',
+    'AttackProfile',
+    'DefenseProfile',
+    'SaveOutcome',
+    'evaluate_attacks',
+    'evaluate_save',
+    'evaluate_targets',
+    # Planner
+    'AnytimePlanner',
+    'PlannerMetrics',
+    'TurnPlan',
+    'get_planner_stats',
+    # Execution
+    'TurnOutcome',
+    'coordinate_decision',
+    'execute_decision',
+    'execute_plan',
+    'take_ai_turn',
     # Targeting
     'TargetEvaluator',
     'TargetPriority',
@@ -74,6 +123,7 @@ __all__ = [
     'CoordinationPlan',
     'TargetAssignment',
     'coordinate_enemies',
+    'get_coordinator',
     # Main AI
     'TacticalAI',
     'get_ai_for_role',
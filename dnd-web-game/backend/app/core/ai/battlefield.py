@@ -0,0 +1,334 @@
+"""
+D&D 5e AI Battlefield Snapshot.
+
+An immutable, per-turn view of the combat that every AI component reads
+instead of re-walking the initiative tracker and combatant stats:
+- Side partitions (allies/enemies) in initiative order
+- Positions, HP ratios, conditions and threat estimates per combatant
+- Manhattan and Chebyshev distance matrices between positioned combatants
+- Nearby-ally counts used for isolation scoring
+
+The snapshot is built in one pass and memoized on the combat state, keyed
+on everything it was built from, so the behavior, its target evaluator and
+the coordinator share one copy until the battlefield actually changes.
+"""
+from array import array
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+from app.core.dice import compile_dice_notation
+
+if TYPE_CHECKING:
+    from app.core.combat_engine import CombatEngine
+
+# Allies within this many squares (Manhattan) count as protecting a target
+NEARBY_ALLY_RANGE = 2
+
+
+def _as_position(pos: Any) -> Optional[Tuple[int, int]]:
+    """Normalize a stored position ((x, y), [x, y] or {"x", "y"})."""
+    if not pos:
+        return None
+    if isinstance(pos, dict):
+        return (pos.get("x", 0), pos.get("y", 0))
+    return (pos[0], pos[1])
+
+
+def _as_number(value: Any, default: float) -> float:
+    """Return value if it is numeric, otherwise the default."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return default
+
+
+def _as_conditions(combatant: Any, stats: Dict[str, Any]) -> Tuple[str, ...]:
+    """Merge conditions tracked on the combatant and in its stats."""
+    merged: Dict[str, None] = {}
+    for source in (getattr(combatant, "conditions", None), stats.get("conditions")):
+        if isinstance(source, (list, tuple, set, frozenset)):
+            merged.update(dict.fromkeys(source))
+    return tuple(merged)
+
+
+def estimate_threat(stats: Dict[str, Any]) -> Tuple[float, Tuple[str, ...]]:
+    """
+    Estimate a combatant's damage output potential from its stats.
+
+    Args:
+        stats: Combatant stats dict
+
+    Returns:
+        Tuple of (score 0-100, reasons)
+    """
+    score = 0.0
+    reasons = []
+
+    # Equipped weapon
+    equipment = stats.get("equipment") or {}
+    main_weapon = equipment.get("main_hand") if isinstance(equipment, dict) else None
+    if isinstance(main_weapon, dict):
+        damage_dice = main_weapon.get("damage_dice", "1d6")
+        try:
+            avg_damage = compile_dice_notation(damage_dice).mean
+        except ValueError:
+            avg_damage = 3.5  # Default to 1d6 average
+        score += avg_damage * 2
+
+        if avg_damage >= 10:
+            reasons.append(f"High damage weapon ({damage_dice})")
+
+    # Spellcasting
+    spellcasting = stats.get("spellcasting")
+    if isinstance(spellcasting, dict):
+        spell_slots = spellcasting.get("spell_slots") or {}
+        total_slots = sum(
+            v for v in spell_slots.values() if isinstance(v, int)
+        ) if isinstance(spell_slots, dict) else 0
+        if total_slots > 0:
+            score += total_slots * 5
+            reasons.append(f"Has {total_slots} spell slots")
+
+    # Level
+    score += _as_number(stats.get("level", 1), 1) * 3
+
+    return min(score, 100.0), tuple(reasons)
+
+
+@dataclass(frozen=True)
+class CombatantView:
+    """Read-only view of one combatant at snapshot time."""
+    id: str
+    name: str
+    side: str  # "player", "enemy", ... (stats "type", else combatant type)
+    is_active: bool
+    position: Optional[Tuple[int, int]]
+    hp: int
+    max_hp: int
+    ac: int
+    conditions: Tuple[str, ...]
+    char_class: str
+    threat: float
+    threat_reasons: Tuple[str, ...]
+
+    @property
+    def hp_ratio(self) -> float:
+        """Current HP as a fraction of max HP."""
+        return self.hp / self.max_hp if self.max_hp > 0 else 0.0
+
+    def to_entry(self) -> Dict[str, Any]:
+        """Mutable dict in the format TacticalAI situations use."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "ac": self.ac,
+            "position": self.position or (0, 0),
+            "conditions": list(self.conditions),
+            "class": self.char_class,
+        }
+
+
+@dataclass(frozen=True)
+class BattlefieldSnapshot:
+    """
+    Immutable view of the battlefield for one turn.
+
+    Distances are in squares between positioned combatants; lookups for
+    unpositioned combatants return None.
+    """
+    fingerprint: Tuple
+    round_number: int
+    combatants: Mapping[str, CombatantView]
+    order: Tuple[str, ...]  # Initiative order, active or not
+    occupants: Mapping[Tuple[int, int], Tuple[str, ...]]  # position -> ids
+    nearby_allies: Mapping[str, int]
+    _index: Mapping[str, int]
+    _manhattan: array
+    _chebyshev: array
+
+    @classmethod
+    def capture(
+        cls,
+        engine: "CombatEngine",
+        fingerprint: Optional[Tuple] = None,
+    ) -> "BattlefieldSnapshot":
+        """
+        Build a snapshot from the engine's current state in one pass.
+
+        Args:
+            engine: The combat engine instance
+            fingerprint: Precomputed battlefield_fingerprint(), if any
+
+        Returns:
+            New BattlefieldSnapshot
+        """
+        state = engine.state
+        tracker = state.initiative_tracker
+        all_stats = state.combatant_stats
+        positions = state.positions
+
+        views: Dict[str, CombatantView] = {}
+        for c in tracker.combatants:
+            stats = all_stats.get(c.id, {})
+            side = stats.get("type") or getattr(getattr(c, "combatant_type", None), "value", None)
+            if not isinstance(side, str):
+                side = "enemy"
+            threat, threat_reasons = estimate_threat(stats)
+            views[c.id] = CombatantView(
+                id=c.id,
+                name=c.name,
+                side=side,
+                is_active=bool(c.is_active),
+                position=_as_position(positions.get(c.id)),
+                hp=_as_number(stats.get("current_hp", getattr(c, "current_hp", 0)), 0),
+                max_hp=_as_number(stats.get("max_hp", getattr(c, "max_hp", 1)), 1),
+                ac=_as_number(stats.get("ac", 10), 10),
+                conditions=_as_conditions(c, stats),
+                char_class=str(stats.get("class") or ""),
+                threat=threat,
+                threat_reasons=threat_reasons,
+            )
+
+        # Distance matrices over positioned combatants, row-major
+        placed = [v for v in views.values() if v.position is not None]
+        n = len(placed)
+        manhattan = array("i", [0]) * (n * n)
+        chebyshev = array("i", [0]) * (n * n)
+        nearby = dict.fromkeys(views, 0)
+        for i, a in enumerate(placed):
+            ax, ay = a.position
+            for j in range(i + 1, n):
+                b = placed[j]
+                dx = abs(ax - b.position[0])
+                dy = abs(ay - b.position[1])
+                manhattan[i * n + j] = manhattan[j * n + i] = dx + dy
+                chebyshev[i * n + j] = chebyshev[j * n + i] = max(dx, dy)
+                if (
+                    a.is_active and b.is_active and a.side == b.side
+                    and dx + dy <= NEARBY_ALLY_RANGE
+                ):
+                    nearby[a.id] += 1
+                    nearby[b.id] += 1
+
+        occupants: Dict[Tuple[int, int], Tuple[str, ...]] = {}
+        for cid, pos in positions.items():
+            pos = _as_position(pos)
+            if pos is not None:
+                occupants[pos] = occupants.get(pos, ()) + (cid,)
+
+        return cls(
+            fingerprint=fingerprint if fingerprint is not None else battlefield_fingerprint(engine),
+            round_number=tracker.current_round,
+            combatants=MappingProxyType(views),
+            order=tuple(views),
+            occupants=MappingProxyType(occupants),
+            nearby_allies=MappingProxyType(nearby),
+            _index=MappingProxyType({v.id: i for i, v in enumerate(placed)}),
+            _manhattan=manhattan,
+            _chebyshev=chebyshev,
+        )
+
+    def get(self, combatant_id: str) -> Optional[CombatantView]:
+        """Get a combatant's view, or None if unknown."""
+        return self.combatants.get(combatant_id)
+
+    def position(self, combatant_id: str) -> Optional[Tuple[int, int]]:
+        """Get a combatant's position, or None if unpositioned."""
+        view = self.combatants.get(combatant_id)
+        return view.position if view else None
+
+    def distance(self, a: str, b: str) -> Optional[int]:
+        """Manhattan distance in squares between two combatants."""
+        i, j = self._index.get(a), self._index.get(b)
+        if i is None or j is None:
+            return None
+        return self._manhattan[i * len(self._index) + j]
+
+    def chebyshev_distance(self, a: str, b: str) -> Optional[int]:
+        """Chebyshev (diagonal-movement) distance in squares."""
+        i, j = self._index.get(a), self._index.get(b)
+        if i is None or j is None:
+            return None
+        return self._chebyshev[i * len(self._index) + j]
+
+    def allies_of(self, combatant_id: str, positioned: bool = False) -> List[CombatantView]:
+        """Active combatants on the same side, excluding the combatant itself."""
+        me = self.combatants.get(combatant_id)
+        side = me.side if me else None
+        return [
+            v for v in self.combatants.values()
+            if v.id != combatant_id and v.is_active and v.side == side
+            and (not positioned or v.position is not None)
+        ]
+
+    def enemies_of(self, combatant_id: str, positioned: bool = False) -> List[CombatantView]:
+        """Active combatants on any other side."""
+        me = self.combatants.get(combatant_id)
+        side = me.side if me else None
+        return [
+            v for v in self.combatants.values()
+            if v.is_active and v.side != side
+            and (not positioned or v.position is not None)
+        ]
+
+    def is_occupied(self, pos: Tuple[int, int], ignore: Optional[str] = None) -> bool:
+        """Check whether any combatant (other than ``ignore``) stands at pos."""
+        return any(cid != ignore for cid in self.occupants.get(pos, ()))
+
+    def live_occupants(self, ignore: Optional[str] = None) -> Dict[Tuple[int, int], str]:
+        """Position -> ID of each active, positioned combatant (other than ``ignore``)."""
+        return {
+            v.position: v.id for v in self.combatants.values()
+            if v.is_active and v.position is not None and v.id != ignore
+        }
+
+
+def battlefield_fingerprint(engine: "CombatEngine") -> Tuple:
+    """
+    Cheap key of everything a snapshot is built from.
+
+    Covers the event sequence plus each combatant's activity, position,
+    HP and conditions, so direct state edits that skip the event log
+    (AI movement, damage application) still invalidate the snapshot.
+    """
+    state = engine.state
+    all_stats = state.combatant_stats
+    positions = state.positions
+    combatants = []
+    for c in state.initiative_tracker.combatants:
+        stats = all_stats.get(c.id, {})
+        combatants.append((
+            c.id,
+            bool(c.is_active),
+            _as_position(positions.get(c.id)),
+            stats.get("current_hp"),
+            stats.get("max_hp"),
+            _as_conditions(c, stats),
+        ))
+    return (
+        state.event_sequence,
+        state.initiative_tracker.current_round,
+        tuple(combatants),
+    )
+
+
+def get_battlefield_snapshot(engine: "CombatEngine") -> BattlefieldSnapshot:
+    """
+    Get the current battlefield snapshot, rebuilding it only on change.
+
+    Args:
+        engine: The combat engine instance
+
+    Returns:
+        BattlefieldSnapshot shared by every AI reading the same state
+    """
+    fingerprint = battlefield_fingerprint(engine)
+    cached = getattr(engine.state, "battlefield_snapshot", None)
+    if isinstance(cached, BattlefieldSnapshot) and cached.fingerprint == fingerprint:
+        return cached
+
+    snapshot = BattlefieldSnapshot.capture(engine, fingerprint)
+    engine.state.battlefield_snapshot = snapshot
+    return snapshot
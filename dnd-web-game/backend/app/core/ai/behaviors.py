@@ -15,8 +15,11 @@ from enum import Enum
 
 import re
 
+from .battlefield import get_battlefield_snapshot
+from .planner import AnytimePlanner, PlannerMetrics, TurnPlan, planner_budget_ms
 from .targeting import TargetEvaluator, TargetPriority
 from app.core.movement import find_path
+from app.core.threat_map import get_faction, get_threat_map
 
 if TYPE_CHECKING:
     from app.core.combat_engine import CombatEngine
@@ -138,55 +141,75 @@ class BaseBehavior:
         self.combatant_id = combatant_id
         self.combatant = engine.state.initiative_tracker.get_combatant(combatant_id)
         self.stats = engine.state.combatant_stats.get(combatant_id, {})
-        self.target_evaluator = TargetEvaluator(engine, combatant_id)
+        # One snapshot per decision, shared with the target evaluator
+        self.battlefield = get_battlefield_snapshot(engine)
+        self.target_evaluator = TargetEvaluator(engine, combatant_id, self.battlefield)
+        self.last_plan: Optional[TurnPlan] = None
+        self.planner_metrics: Optional[PlannerMetrics] = None
+
+    @property
+    def use_planner(self) -> bool:
+        """Whether this combatant plans whole turns (bosses, or ai_behavior.planner)."""
+        if planner_budget_ms() <= 0:
+            return False
+        ai_config = self.stats.get("ai_behavior") or {}
+        return self.ROLE == AIRole.BOSS or bool(ai_config.get("planner"))
+
+    def plan_turn(self, max_nodes: Optional[int] = None) -> Optional[AIDecision]:
+        """
+        Plan the whole turn with the anytime planner.
 
-    def get_position(self) -> Optional[Tuple[int, int]]:
-        """Get current position."""
-        pos = self.engine.state.positions.get(self.combatant_id)
-        if pos:
-            if isinstance(pos, dict):
-                return (pos.get("x", 0), pos.get("y", 0))
-            return tuple(pos)
-        return None
+        Args:
+            max_nodes: Search by node budget instead of wall-clock time
 
-    def get_enemies(self) -> List[str]:
-        """Get list of enemy combatant IDs."""
-        enemies = []
-        my_type = self.combatant.combatant_type if self.combatant else None
+        Returns:
+            Decision for the planned action (or move), or None when the
+            planner is off for this combatant or found nothing to do
+        """
+        if not self.use_planner:
+            return None
 
-        for cid in self.engine.state.positions.keys():
-            c = self.engine.state.initiative_tracker.get_combatant(cid)
-            if c and c.is_active and c.combatant_type != my_type:
-                enemies.append(cid)
+        planner = AnytimePlanner(self.engine, self.combatant_id, self.battlefield, max_nodes=max_nodes)
+        plan = planner.plan()
+        self.last_plan, self.planner_metrics = plan, planner.metrics
+        if plan is None:
+            return None
 
-        return enemies
+        action = plan.step("action")
+        move = plan.step("move")
+        if action is None and move is None:
+            return None
 
-    def get_allies(self) -> List[str]:
-        """Get list of allied combatant IDs."""
-        allies = []
-        my_type = self.combatant.combatant_type if self.combatant else None
+        if action is not None:
+            # The route resolves a targeted "attack" as the creature's attack action
+            action_type = "attack" if action.action_type == "multiattack" else action.action_type
+        else:
+            action_type = "move"
+        return AIDecision(
+            action_type=action_type,
+            target_id=action.target_id if action else None,
+            position=move.position if move else None,
+            ability_id=action.ability_id if action else None,
+            score=plan.value,
+            reasoning=plan.reasoning,
+        )
+
+    def get_position(self) -> Optional[Tuple[int, int]]:
+        """Get current position."""
+        return self.battlefield.position(self.combatant_id)
 
-        for cid in self.engine.state.positions.keys():
-            if cid == self.combatant_id:
-                continue
-            c = self.engine.state.initiative_tracker.get_combatant(cid)
-            if c and c.is_active and c.combatant_type == my_type:
-                allies.append(cid)
+    def get_enemies(self) -> List[str]:
+        """Get list of positioned enemy combatant IDs."""
+        return [v.id for v in self.battlefield.enemies_of(self.combatant_id, positioned=True)]
 
-        return allies
+    def get_allies(self) -> List[str]:
+        """Get list of positioned allied combatant IDs."""
+        return [v.id for v in self.battlefield.allies_of(self.combatant_id, positioned=True)]
 
     def get_distance_to(self, target_id: str) -> int:
         """Get distance to another combatant."""
-        my_pos = self.get_position()
-        target_pos = self.engine.state.positions.get(target_id)
-
-        if not my_pos or not target_pos:
-            return 999
-
-        if isinstance(target_pos, dict):
-            target_pos = (target_pos.get("x", 0), target_pos.get("y", 0))
-
-        return abs(my_pos[0] - target_pos[0]) + abs(my_pos[1] - target_pos[1])
+        distance = self.battlefield.distance(self.combatant_id, target_id)
+        return 999 if distance is None else distance
 
     def can_reach_melee(self, target_id: str) -> bool:
         """Check if target is in melee range."""
@@ -194,6 +217,20 @@ class BaseBehavior:
 
     def can_reach_with_movement(self, target_id: str, movement: int) -> bool:
         """Check if target is reachable with available movement."""
+        grid = getattr(self.engine.state, "grid", None)
+        my_pos = self.get_position()
+        target_pos = self.battlefield.position(target_id)
+
+        if grid and my_pos and target_pos and grid.is_valid_position(my_pos[0], my_pos[1]):
+            # One cached flood fill per mover answers every target check.
+            # Occupancy comes from live positions; grid cells can be stale.
+            distance_field = grid.get_distance_field(
+                my_pos[0], my_pos[1], ally_ids=set(self.get_allies()),
+                occupants=self.battlefield.live_occupants(ignore=self.combatant_id),
+            )
+            cost = distance_field.cost_to_adjacent(target_pos[0], target_pos[1])
+            return cost is not None and cost <= movement
+
         # Distance - 1 because we need to be adjacent, not on top
         return self.get_distance_to(target_id) <= movement + 1
 
@@ -392,6 +429,7 @@ class RangedStrikerAI(BaseBehavior):
 
     OPTIMAL_MIN_RANGE = 4  # 20ft minimum
     OPTIMAL_MAX_RANGE = 12  # 60ft maximum
+    THREAT_PENALTY = 25  # Per enemy whose reach covers a square
 
     def decide_action(self) -> AIDecision:
         """Decide the best action for a ranged striker."""
@@ -484,7 +522,8 @@ class RangedStrikerAI(BaseBehavior):
                         best_pos[0], best_pos[1],
                         max_movement=self.get_available_movement() * 5,  # Convert squares to feet
                         mover_id=self.combatant_id,
-                        ally_ids=ally_ids
+                        ally_ids=ally_ids,
+                        occupants=self.battlefield.live_occupants(ignore=self.combatant_id)
                     )
                     if path_result.success:
                         movement_path = path_result.path
@@ -514,6 +553,9 @@ class RangedStrikerAI(BaseBehavior):
         movement = self.get_available_movement()
         best_pos = None
         best_score = -999
+        threat = get_threat_map(self.engine.state).heatmap(
+            get_faction(self.engine.state, self.combatant_id)
+        )
 
         # Check positions within movement range
         for dx in range(-movement, movement + 1):
@@ -530,10 +572,8 @@ class RangedStrikerAI(BaseBehavior):
                 # Score position based on enemy distances
                 min_enemy_dist = 999
                 for eid in enemies:
-                    epos = self.engine.state.positions.get(eid)
+                    epos = self.battlefield.position(eid)
                     if epos:
-                        if isinstance(epos, dict):
-                            epos = (epos.get("x", 0), epos.get("y", 0))
                         dist = abs(test_pos[0] - epos[0]) + abs(test_pos[1] - epos[1])
                         min_enemy_dist = min(min_enemy_dist, dist)
 
@@ -545,6 +585,9 @@ class RangedStrikerAI(BaseBehavior):
                 else:
                     score = min_enemy_dist * 10
 
+                # Squares inside enemy reach invite opportunity attacks next turn
+                score -= self.THREAT_PENALTY * threat.get(test_pos, 0)
+
                 if score > best_score:
                     best_score = score
                     best_pos = test_pos
@@ -567,13 +610,8 @@ class RangedStrikerAI(BaseBehavior):
                 return False
 
         # Check for other combatants
-        for cid, cpos in self.engine.state.positions.items():
-            if cid == self.combatant_id:
-                continue
-            if isinstance(cpos, dict):
-                cpos = (cpos.get("x", 0), cpos.get("y", 0))
-            if cpos[0] == pos[0] and cpos[1] == pos[1]:
-                return False
+        if self.battlefield.is_occupied(pos, ignore=self.combatant_id):
+            return False
 
         # Environmental awareness - avoid harmful surfaces
         surface_manager = getattr(self.engine.state, 'surface_manager', None)
@@ -921,10 +959,8 @@ class SpellcasterAI(BaseBehavior):
             # Get enemy positions
             enemy_positions = {}
             for eid in enemies:
-                pos = self.engine.state.positions.get(eid)
+                pos = self.battlefield.position(eid)
                 if pos:
-                    if isinstance(pos, dict):
-                        pos = (pos.get("x", 0), pos.get("y", 0))
                     enemy_positions[eid] = pos
 
             if not enemy_positions:
@@ -991,17 +1027,15 @@ class SupportAI(BaseBehavior):
         # Check for critically wounded allies
         critical_allies = []
         for ally_id in allies:
-            ally_stats = self.engine.state.combatant_stats.get(ally_id, {})
-            current = ally_stats.get("current_hp", 1)
-            max_hp = ally_stats.get("max_hp", 1)
-            if current / max_hp < 0.25:
-                critical_allies.append((ally_id, current / max_hp))
+            hp_pct = self.battlefield.get(ally_id).hp_ratio
+            if hp_pct < 0.25:
+                critical_allies.append((ally_id, hp_pct))
 
         if critical_allies:
             # Sort by lowest HP%
             critical_allies.sort(key=lambda x: x[1])
             target_id = critical_allies[0][0]
-            target = self.engine.state.initiative_tracker.get_combatant(target_id)
+            target = self.battlefield.get(target_id)
 
             return AIDecision(
                 action_type="spell",
@@ -1015,17 +1049,14 @@ class SupportAI(BaseBehavior):
         # Check for wounded allies (<50%)
         wounded_allies = []
         for ally_id in allies:
-            ally_stats = self.engine.state.combatant_stats.get(ally_id, {})
-            current = ally_stats.get("current_hp", 1)
-            max_hp = ally_stats.get("max_hp", 1)
-            hp_pct = current / max_hp
+            hp_pct = self.battlefield.get(ally_id).hp_ratio
             if 0.25 <= hp_pct < 0.5:
                 wounded_allies.append((ally_id, hp_pct))
 
         if wounded_allies:
             wounded_allies.sort(key=lambda x: x[1])
             target_id = wounded_allies[0][0]
-            target = self.engine.state.initiative_tracker.get_combatant(target_id)
+            target = self.battlefield.get(target_id)
 
             return AIDecision(
                 action_type="spell",
@@ -1219,25 +1250,11 @@ class SkirmisherAI(BaseBehavior):
         allies = self.get_allies()
 
         for eid in enemies:
-            epos = self.engine.state.positions.get(eid)
-            if not epos:
-                continue
-
-            if isinstance(epos, dict):
-                epos = (epos.get("x", 0), epos.get("y", 0))
-
             # Check if any ally is adjacent
             for ally_id in allies:
-                apos = self.engine.state.positions.get(ally_id)
-                if not apos:
-                    continue
-
-                if isinstance(apos, dict):
-                    apos = (apos.get("x", 0), apos.get("y", 0))
-
-                dist = abs(epos[0] - apos[0]) + abs(epos[1] - apos[1])
-                if dist <= 1:
-                    target = self.engine.state.initiative_tracker.get_combatant(eid)
+                dist = self.battlefield.distance(eid, ally_id)
+                if dist is not None and dist <= 1:
+                    target = self.battlefield.get(eid)
                     flank_targets.append({
                         "target_id": eid,
                         "target_name": target.name if target else "enemy",
@@ -6,13 +6,24 @@ Coordinates multiple enemies for tactical advantage:
 - Flanking positioning
 - Target distribution (avoid overkill)
 - Synchronized actions (buff/attack combos)
+
+The coordinator for a combat lives on its state (see get_coordinator) and
+keeps its plan between turns. A plan is rebuilt only when the fight
+materially changes - a different strategy is called for, a combatant
+joins or drops, or an assigned target moves out of its attacker's reach -
+and otherwise has just its flank squares patched up. The standing plan is
+saved with the engine (CombatEngine.to_dict), so it survives the combat
+moving between workers of a shared session store.
 """
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import List, Dict, Optional, Tuple, Set, TYPE_CHECKING
 from enum import Enum
 
+from .battlefield import get_battlefield_snapshot
+from .expected_value import AttackProfile, DefenseProfile, evaluate_attacks
 from .targeting import TargetEvaluator, TargetPriority
 from app.core.movement import find_path
+from app.core.threat_map import get_faction, get_threat_map
 
 if TYPE_CHECKING:
     from app.core.combat_engine import CombatEngine
@@ -38,6 +49,11 @@ class TargetAssignment:
     priority: int  # Lower = higher priority
     reasoning: str
 
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TargetAssignment":
+        """Rebuild an assignment saved by CoordinationPlan.to_dict."""
+        return cls(**data)
+
 
 @dataclass
 class CoordinationPlan:
@@ -50,6 +66,31 @@ class CoordinationPlan:
     expected_damage: int  # Estimated total damage this round
     notes: List[str] = field(default_factory=list)
 
+    def to_dict(self) -> Dict:
+        """Convert to a JSON-safe dictionary."""
+        return {
+            "strategy": self.strategy.value,
+            "primary_target": self.primary_target,
+            "assignments": [asdict(a) for a in self.assignments],
+            "flank_positions": {eid: list(pos) for eid, pos in self.flank_positions.items()},
+            "focus_target_hp": self.focus_target_hp,
+            "expected_damage": self.expected_damage,
+            "notes": list(self.notes),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CoordinationPlan":
+        """Rebuild a plan saved by to_dict."""
+        return cls(
+            strategy=CoordinationStrategy(data["strategy"]),
+            primary_target=data.get("primary_target"),
+            assignments=[TargetAssignment.from_dict(a) for a in data.get("assignments", [])],
+            flank_positions={eid: tuple(pos) for eid, pos in data.get("flank_positions", {}).items()},
+            focus_target_hp=data.get("focus_target_hp", 0),
+            expected_damage=data.get("expected_damage", 0),
+            notes=list(data.get("notes", [])),
+        )
+
 
 class CombatCoordinator:
     """
@@ -67,15 +108,155 @@ class CombatCoordinator:
             engine: The combat engine instance
         """
         self.engine = engine
-        self._target_evaluator_cache = {}
+        # Every plan and evaluator reads the same snapshot
+        self.battlefield = get_battlefield_snapshot(engine)
+        self._target_evaluator_cache: Dict[str, TargetEvaluator] = {}
+
+        # Standing plan, what it was planned for, and where its targets stood
+        self._plan: Optional[CoordinationPlan] = None
+        self._plan_key: Optional[Tuple] = None
+        self._anchors: Dict[str, Tuple[int, int]] = {}
+        self.plan_stats = {"built": 0, "reused": 0, "repaired": 0}
+
+    def to_dict(self) -> Dict:
+        """Serialize the standing plan and what it was planned for."""
+        if self._plan is None:
+            return {}
+        strategy, enemy_ids, player_ids = self._plan_key
+        return {
+            "plan": self._plan.to_dict(),
+            "strategy": strategy.value,
+            "enemy_ids": list(enemy_ids),
+            "player_ids": list(player_ids),
+            "anchors": {tid: list(pos) for tid, pos in self._anchors.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, engine: "CombatEngine", data: Dict) -> "CombatCoordinator":
+        """Rebuild a coordinator (and its standing plan) saved by to_dict."""
+        coordinator = cls(engine)
+        if data.get("plan"):
+            coordinator._plan = CoordinationPlan.from_dict(data["plan"])
+            coordinator._plan_key = (
+                CoordinationStrategy(data["strategy"]),
+                tuple(data.get("enemy_ids", [])),
+                tuple(data.get("player_ids", [])),
+            )
+            coordinator._anchors = {tid: tuple(pos) for tid, pos in data.get("anchors", {}).items()}
+        return coordinator
+
+    def refresh(self) -> None:
+        """Move to the engine's current battlefield snapshot."""
+        self.battlefield = get_battlefield_snapshot(self.engine)
 
     def get_target_evaluator(self, combatant_id: str) -> TargetEvaluator:
         """Get or create a target evaluator for a combatant."""
-        if combatant_id not in self._target_evaluator_cache:
-            self._target_evaluator_cache[combatant_id] = TargetEvaluator(
-                self.engine, combatant_id
-            )
-        return self._target_evaluator_cache[combatant_id]
+        evaluator = self._target_evaluator_cache.get(combatant_id)
+        if evaluator is None:
+            evaluator = TargetEvaluator(self.engine, combatant_id, self.battlefield)
+            self._target_evaluator_cache[combatant_id] = evaluator
+        elif evaluator.battlefield is not self.battlefield:
+            evaluator.battlefield = self.battlefield
+        return evaluator
+
+    def coordinate(
+        self,
+        enemy_ids: List[str],
+        player_ids: List[str],
+    ) -> CoordinationPlan:
+        """
+        Get a plan for this turn, reusing the standing plan while it holds.
+
+        Args:
+            enemy_ids: List of enemy combatant IDs to coordinate
+            player_ids: List of player/ally IDs (targets)
+
+        Returns:
+            CoordinationPlan with target assignments
+        """
+        self.refresh()
+        strategy = self.get_recommended_strategy(enemy_ids, player_ids)
+        key = (strategy, tuple(enemy_ids), tuple(player_ids))
+
+        plan = self._plan
+        if plan is not None and key == self._plan_key and self._plan_holds(plan):
+            if self._repair_flanks(plan):
+                self.plan_stats["repaired"] += 1
+            else:
+                self.plan_stats["reused"] += 1
+            return plan
+
+        plan = self.create_plan(enemy_ids, player_ids, strategy)
+        self._plan, self._plan_key = plan, key
+        self._anchors = self._target_positions(plan)
+        self.plan_stats["built"] += 1
+        return plan
+
+    def _target_positions(self, plan: CoordinationPlan) -> Dict[str, Tuple[int, int]]:
+        """Current positions of a plan's assigned targets."""
+        positions = {}
+        for assignment in plan.assignments:
+            pos = self.battlefield.position(assignment.target_id)
+            if pos:
+                positions[assignment.target_id] = pos
+        return positions
+
+    def _plan_holds(self, plan: CoordinationPlan) -> bool:
+        """
+        Whether a standing plan still fits the battlefield.
+
+        It stops holding when an assigned enemy or target has dropped, or
+        when a target has moved since planning and its attacker can no
+        longer reach it this turn.
+        """
+        for assignment in plan.assignments:
+            enemy = self.battlefield.get(assignment.enemy_id)
+            target = self.battlefield.get(assignment.target_id)
+            if not enemy or not enemy.is_active or not target or not target.is_active:
+                return False
+
+            target_pos = self.battlefield.position(assignment.target_id)
+            if target_pos == self._anchors.get(assignment.target_id):
+                continue
+            enemy_pos = self.battlefield.position(assignment.enemy_id)
+            if not enemy_pos or not target_pos:
+                return False
+            stats = self.engine.state.combatant_stats.get(assignment.enemy_id, {})
+            reach = (stats.get("speed", 30) + stats.get("reach", 5)) // 5
+            if max(abs(enemy_pos[0] - target_pos[0]), abs(enemy_pos[1] - target_pos[1])) > reach:
+                return False
+        return True
+
+    def _repair_flanks(self, plan: CoordinationPlan) -> bool:
+        """
+        Patch flank squares of a standing plan after small board changes.
+
+        Focus-fire squares follow a target that moved; any square someone
+        else now stands in is re-picked (or dropped if none is free).
+
+        Returns:
+            True if the plan was changed
+        """
+        current = self._target_positions(plan)
+        moved = {tid for tid, pos in current.items() if self._anchors.get(tid) != pos}
+        self._anchors = current
+        targets = {a.enemy_id: a.target_id for a in plan.assignments}
+
+        repaired = False
+        for enemy_id in list(plan.flank_positions):
+            pos = plan.flank_positions[enemy_id]
+            follows_target = plan.strategy == CoordinationStrategy.FOCUS_FIRE
+            stale = follows_target and targets.get(enemy_id) in moved
+            if not stale and not self.battlefield.is_occupied(pos, ignore=enemy_id):
+                continue
+
+            del plan.flank_positions[enemy_id]
+            if follows_target:
+                new_pos = self._find_flank_position(enemy_id, targets[enemy_id], plan.flank_positions)
+                if new_pos:
+                    plan.flank_positions[enemy_id] = new_pos
+            repaired = True
+        return repaired
 
     def create_plan(
         self,
@@ -130,9 +311,7 @@ class CombatCoordinator:
             return self._empty_plan(enemy_ids, CoordinationStrategy.FOCUS_FIRE)
 
         primary = targets[0]
-        primary_combatant = self.engine.state.initiative_tracker.get_combatant(
-            primary.target_id
-        )
+        primary_combatant = self.battlefield.get(primary.target_id)
         primary_stats = self.engine.state.combatant_stats.get(primary.target_id, {})
         primary_hp = primary_stats.get("current_hp", 1)
 
@@ -142,11 +321,11 @@ class CombatCoordinator:
         flank_positions = {}
 
         for i, eid in enumerate(enemy_ids):
-            enemy = self.engine.state.initiative_tracker.get_combatant(eid)
+            enemy = self.battlefield.get(eid)
             enemy_stats = self.engine.state.combatant_stats.get(eid, {})
 
             # Estimate damage this enemy can deal
-            est_damage = self._estimate_damage(enemy_stats)
+            est_damage = self._estimate_damage(enemy_stats, primary_stats)
             expected_damage += est_damage
 
             # Determine role - first two melee, rest can be backup
@@ -206,7 +385,7 @@ class CombatCoordinator:
         target_scores = {t.target_id: t for t in all_targets}
 
         for eid in enemy_ids:
-            enemy = self.engine.state.initiative_tracker.get_combatant(eid)
+            enemy = self.battlefield.get(eid)
 
             # Find least-targeted player that's still valid
             best_target = None
@@ -270,15 +449,15 @@ class CombatCoordinator:
         target_damage_assigned: Dict[str, int] = {}
 
         for eid in enemy_ids:
-            enemy = self.engine.state.initiative_tracker.get_combatant(eid)
+            enemy = self.battlefield.get(eid)
             enemy_stats = self.engine.state.combatant_stats.get(eid, {})
-            est_damage = self._estimate_damage(enemy_stats)
 
             # Find best target that isn't "overkilled"
             assigned_target = None
             for target in priority_targets:
                 target_stats = self.engine.state.combatant_stats.get(target.target_id, {})
                 target_hp = target_stats.get("current_hp", 1)
+                est_damage = self._estimate_damage(enemy_stats, target_stats)
 
                 damage_so_far = target_damage_assigned.get(target.target_id, 0)
 
@@ -331,10 +510,8 @@ class CombatCoordinator:
         # Find center of players
         player_positions = []
         for pid in player_ids:
-            pos = self.engine.state.positions.get(pid)
+            pos = self.battlefield.position(pid)
             if pos:
-                if isinstance(pos, dict):
-                    pos = (pos.get("x", 0), pos.get("y", 0))
                 player_positions.append(pos)
 
         if not player_positions:
@@ -355,7 +532,7 @@ class CombatCoordinator:
         ]
 
         for i, eid in enumerate(enemy_ids):
-            enemy = self.engine.state.initiative_tracker.get_combatant(eid)
+            enemy = self.battlefield.get(eid)
 
             # Assign surround position
             dir_idx = i % len(directions)
@@ -369,17 +546,15 @@ class CombatCoordinator:
             nearest_player = None
             nearest_dist = 999
             for pid in player_ids:
-                ppos = self.engine.state.positions.get(pid)
+                ppos = self.battlefield.position(pid)
                 if ppos:
-                    if isinstance(ppos, dict):
-                        ppos = (ppos.get("x", 0), ppos.get("y", 0))
                     dist = abs(surround_pos[0] - ppos[0]) + abs(surround_pos[1] - ppos[1])
                     if dist < nearest_dist:
                         nearest_dist = dist
                         nearest_player = pid
 
             if nearest_player:
-                target = self.engine.state.initiative_tracker.get_combatant(nearest_player)
+                target = self.battlefield.get(nearest_player)
                 assignments.append(TargetAssignment(
                     enemy_id=eid,
                     enemy_name=enemy.name if enemy else "enemy",
@@ -437,7 +612,7 @@ class CombatCoordinator:
         targets = evaluator.evaluate_all_targets(player_ids, TargetPriority.NEAREST) if evaluator else []
 
         for eid in melee:
-            enemy = self.engine.state.initiative_tracker.get_combatant(eid)
+            enemy = self.battlefield.get(eid)
             target = targets[0] if targets else None
 
             assignments.append(TargetAssignment(
@@ -458,7 +633,7 @@ class CombatCoordinator:
             )
 
             for eid in casters:
-                enemy = self.engine.state.initiative_tracker.get_combatant(eid)
+                enemy = self.battlefield.get(eid)
                 target = caster_targets[0] if caster_targets else None
 
                 assignments.append(TargetAssignment(
@@ -500,49 +675,13 @@ class CombatCoordinator:
             notes=["No valid targets found"],
         )
 
-    def _estimate_damage(self, enemy_stats: Dict) -> int:
-        """Estimate damage an enemy can deal in one round."""
-        damage = 0
-
-        # Check equipped weapon
-        equipment = enemy_stats.get("equipment", {})
-        main_weapon = equipment.get("main_hand", {})
-
-        if main_weapon:
-            damage_dice = main_weapon.get("damage_dice", "1d6")
-            damage = self._parse_avg_dice(damage_dice)
-
-            # Add ability modifier (assume STR or DEX)
-            str_mod = (enemy_stats.get("strength", 10) - 10) // 2
-            dex_mod = (enemy_stats.get("dexterity", 10) - 10) // 2
-            damage += max(str_mod, dex_mod)
-
-        # Fallback estimate based on CR/level
-        if damage == 0:
-            level = enemy_stats.get("level", 1)
-            damage = 5 + level  # Rough estimate
-
-        return max(1, damage)
-
-    def _parse_avg_dice(self, dice_str: str) -> int:
-        """Parse average value from dice string."""
-        try:
-            if "d" not in dice_str.lower():
-                return int(dice_str)
-
-            parts = dice_str.lower().split("d")
-            num_dice = int(parts[0]) if parts[0] else 1
-            die_size = int(parts[1].split("+")[0].split("-")[0])
-
-            avg = num_dice * (die_size + 1) // 2
-
-            if "+" in dice_str:
-                mod = int(dice_str.split("+")[1])
-                avg += mod
-
-            return avg
-        except (ValueError, IndexError):
-            return 4  # Default
+    def _estimate_damage(self, enemy_stats: Dict, target_stats: Optional[Dict] = None) -> int:
+        """Expected damage an enemy deals in one round (against a target, if given)."""
+        target = DefenseProfile.from_stats(target_stats or {})
+        outcome = evaluate_attacks(
+            (AttackProfile.from_stats(enemy_stats),), target, enemy_stats.get("conditions") or (),
+        )
+        return round(outcome.expected_damage)
 
     def _find_flank_position(
         self,
@@ -551,13 +690,10 @@ class CombatCoordinator:
         existing_positions: Dict[str, Tuple[int, int]],
     ) -> Optional[Tuple[int, int]]:
         """Find optimal flanking position for an enemy."""
-        target_pos = self.engine.state.positions.get(target_id)
+        target_pos = self.battlefield.position(target_id)
         if not target_pos:
             return None
 
-        if isinstance(target_pos, dict):
-            target_pos = (target_pos.get("x", 0), target_pos.get("y", 0))
-
         # Adjacent positions
         adjacent = [
             (target_pos[0] - 1, target_pos[1]),
@@ -567,14 +703,17 @@ class CombatCoordinator:
         ]
 
         taken_positions = set(existing_positions.values())
+        open_positions = [
+            pos for pos in adjacent
+            if pos not in taken_positions and self._is_position_valid(pos)
+        ]
+        if not open_positions:
+            return None
 
-        for pos in adjacent:
-            if pos not in taken_positions:
-                # Check if position is valid
-                if self._is_position_valid(pos):
-                    return pos
-
-        return None
+        # Of the open squares, take the one the fewest hostile creatures can reach
+        threat_map = get_threat_map(self.engine.state)
+        faction = get_faction(self.engine.state, enemy_id)
+        return min(open_positions, key=lambda pos: threat_map.threat_count(pos, faction))
 
     def _is_position_valid(self, pos: Tuple[int, int]) -> bool:
         """Check if a position is valid for movement."""
@@ -591,13 +730,7 @@ class CombatCoordinator:
                 return False
 
         # Check for other combatants
-        for cid, cpos in self.engine.state.positions.items():
-            if isinstance(cpos, dict):
-                cpos = (cpos.get("x", 0), cpos.get("y", 0))
-            if cpos[0] == pos[0] and cpos[1] == pos[1]:
-                return False
-
-        return True
+        return not self.battlefield.is_occupied(pos)
 
     def get_recommended_strategy(
         self,
@@ -675,6 +808,7 @@ class CombatCoordinator:
             }
         """
         movement_commands = {}
+        battlefield = get_battlefield_snapshot(self.engine)
 
         for enemy_id, target_pos in plan.flank_positions.items():
             # Get enemy's current position
@@ -719,7 +853,8 @@ class CombatCoordinator:
                     target_pos[0], target_pos[1],
                     max_movement=movement_remaining,
                     mover_id=enemy_id,
-                    ally_ids=ally_ids
+                    ally_ids=ally_ids,
+                    occupants=battlefield.live_occupants(ignore=enemy_id)
                 )
 
                 if path_result.success:
@@ -769,6 +904,19 @@ def coordinate_enemies(
     Returns:
         CoordinationPlan with optimal strategy and assignments
     """
-    coordinator = CombatCoordinator(engine)
-    strategy = coordinator.get_recommended_strategy(enemy_ids, player_ids)
-    return coordinator.create_plan(enemy_ids, player_ids, strategy)
+    return get_coordinator(engine).coordinate(enemy_ids, player_ids)
+
+
+def get_coordinator(engine: "CombatEngine") -> CombatCoordinator:
+    """
+    Get the combat's coordinator, creating it on first use.
+
+    The coordinator keeps its target evaluators and standing plan across
+    turns, so repeated coordination of the same fight is cheap. A plan
+    restored with the engine is rehydrated by CombatEngine.from_dict.
+    """
+    coordinator = getattr(engine.state, "coordinator", None)
+    if not isinstance(coordinator, CombatCoordinator) or coordinator.engine is not engine:
+        coordinator = CombatCoordinator(engine)
+        engine.state.coordinator = coordinator
+    return coordinator
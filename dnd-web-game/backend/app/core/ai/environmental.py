@@ -12,6 +12,8 @@ from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple, TYPE_CHECKING, Set
 from enum import Enum
 
+from app.core.threat_map import get_faction, get_threat_map
+
 if TYPE_CHECKING:
     from app.core.combat_engine import CombatEngine
 
@@ -411,7 +413,8 @@ class EnvironmentalAnalyzer:
         self,
         current_position: Tuple[int, int],
         movement_range: int,
-        combatant_stats: Dict
+        combatant_stats: Dict,
+        combatant_id: Optional[str] = None
     ) -> List[Tuple[Tuple[int, int], float]]:
         """
         Get list of safe positions within movement range.
@@ -422,12 +425,17 @@ class EnvironmentalAnalyzer:
             current_position: Current position
             movement_range: Available movement in cells
             combatant_stats: Stats for resistance/immunity checks
+            combatant_id: If given, squares in hostile reach count as dangerous
 
         Returns:
             List of (position, danger_score) tuples, sorted by safety
         """
         safe_positions = []
-        grid = getattr(self.engine.state, 'grid', None)
+        state = self.engine.state
+        grid = getattr(state, 'grid', None)
+        threat = {}
+        if combatant_id:
+            threat = get_threat_map(state).heatmap(get_faction(state, combatant_id))
 
         # Check positions within movement range
         for dx in range(-movement_range, movement_range + 1):
@@ -451,19 +459,12 @@ class EnvironmentalAnalyzer:
                         continue
 
                 # Check for other combatants
-                occupied = False
-                for cid, cpos in self.engine.state.positions.items():
-                    if isinstance(cpos, dict):
-                        cpos = (cpos.get("x", 0), cpos.get("y", 0))
-                    if cpos[0] == test_pos[0] and cpos[1] == test_pos[1]:
-                        occupied = True
-                        break
-
-                if occupied:
+                if state.positions.occupant_at(*test_pos) is not None:
                     continue
 
                 # Calculate danger score
                 danger = self.get_position_hazard_score(test_pos, combatant_stats)
+                danger += 10.0 * threat.get(test_pos, 0)  # Opportunity attack risk
                 safe_positions.append((test_pos, danger))
 
         # Sort by danger (safest first)
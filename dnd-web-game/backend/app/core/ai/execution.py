@@ -0,0 +1,342 @@
+"""
+D&D 5e AI Turn Execution.
+
+The one place AI turns are carried out, shared by the enemy-turn route
+and the headless simulator. take_ai_turn asks the creature's AI for a
+planned turn (bosses and opted-in AI) or a greedy decision, then runs it.
+Greedy attacks by enemies with allies follow the combat's standing
+coordination plan (see get_coordinator) when its assigned target is in reach.
+
+A plan runs step by step and in the planner's order: Disengage before the
+move it protects, the move to the planned cell, the action (every attack
+of a multiattack, or each attack the creature is allowed), then the bonus
+action. Every step goes through the same engine calls the player routes
+use, so movement costs, opportunity attacks, ranges and attack limits all
+apply.
+"""
+from dataclasses import dataclass, field, replace
+from typing import Any, List, Optional, Tuple, TYPE_CHECKING
+
+from app.core.combat_engine import ActionResult, ActionType, BonusActionType
+from app.core.initiative import CombatantType
+from app.core.movement import CombatGrid, find_path, get_reachable_cells
+from .battlefield import get_battlefield_snapshot
+from .behaviors import AIDecision
+from .coordination import get_coordinator
+from .planner import PlanStep, TurnPlan
+from .tactical_ai import get_ai_for_combatant
+
+if TYPE_CHECKING:
+    from app.core.combat_engine import CombatEngine
+
+
+# Planned action steps resolved as one engine action
+SIMPLE_ACTIONS = {
+    "dodge": ActionType.DODGE,
+    "disengage": ActionType.DISENGAGE,
+    "hide": ActionType.HIDE,
+}
+
+# Decisions resolved as an attack on the decision's target
+ATTACK_ACTIONS = {"attack", "ranged_attack", "multiattack"}
+
+# Every decision execute_decision carries out; callers resolve the rest (spells)
+DECISION_ACTIONS = ATTACK_ACTIONS | set(SIMPLE_ACTIONS) | {"move", "dash"}
+
+
+@dataclass
+class TurnOutcome:
+    """What carrying out an AI turn did."""
+    action_type: str = "none"  # Action taken: "attack", "multiattack", "dodge", ... or "none"
+    target_id: Optional[str] = None
+    reasoning: str = ""
+    old_position: Optional[Tuple[int, int]] = None
+    new_position: Optional[Tuple[int, int]] = None
+    movement_path: Optional[List[Tuple[int, int]]] = None
+    results: List[ActionResult] = field(default_factory=list)  # Action results, in order
+    bonus_result: Optional[ActionResult] = None
+
+    @property
+    def moved(self) -> bool:
+        """Whether the creature changed position."""
+        return self.new_position is not None and self.new_position != self.old_position
+
+    @property
+    def damage_dealt(self) -> int:
+        """Total damage of every successful action result."""
+        return sum(r.damage_dealt for r in self.results if r.success)
+
+
+def take_ai_turn(
+    engine: "CombatEngine",
+    grid: CombatGrid,
+    combatant_id: str,
+    ai: Any = None,
+    max_nodes: Optional[int] = None,
+) -> Tuple[Optional[AIDecision], Optional[TurnOutcome]]:
+    """
+    Let the current combatant's AI choose its turn and carry it out.
+
+    Args:
+        engine: The combat engine instance
+        grid: The combat grid (occupants are kept in sync with moves)
+        combatant_id: ID of the acting combatant
+        ai: AI behavior to ask (default: get_ai_for_combatant)
+        max_nodes: Plan by node budget instead of wall-clock time
+
+    Returns:
+        (decision, outcome). The outcome is None when the AI had nothing
+        to do or chose a decision the caller resolves itself (spells).
+    """
+    if ai is None:
+        ai = get_ai_for_combatant(engine, combatant_id)
+
+    decision = ai.plan_turn(max_nodes=max_nodes)
+    if decision is not None and ai.last_plan is not None:
+        return decision, execute_plan(engine, grid, combatant_id, ai.last_plan)
+
+    decision = ai.decide_action()
+    if decision is None:
+        return None, None
+    decision = coordinate_decision(engine, combatant_id, decision)
+    return decision, execute_decision(engine, grid, combatant_id, decision)
+
+
+def coordinate_decision(engine: "CombatEngine", combatant_id: str, decision: AIDecision) -> AIDecision:
+    """
+    Point an enemy's greedy attack at its coordinated target.
+
+    The enemy side shares one standing CoordinationPlan; an attack is
+    retargeted to the enemy's assignment when that target is active and
+    within its move plus reach this turn. Anything else is left as is.
+    """
+    action_type = getattr(decision.action_type, "value", decision.action_type)
+    combatant = engine.state.initiative_tracker.get_combatant(combatant_id)
+    if action_type not in ATTACK_ACTIONS or combatant is None \
+            or combatant.combatant_type != CombatantType.ENEMY:
+        return decision
+
+    battlefield = get_battlefield_snapshot(engine)
+    allies = battlefield.allies_of(combatant_id, positioned=True)
+    if not allies:
+        return decision
+    enemy_ids = sorted([combatant_id] + [v.id for v in allies])
+    player_ids = sorted(v.id for v in battlefield.enemies_of(combatant_id, positioned=True))
+
+    plan = get_coordinator(engine).coordinate(enemy_ids, player_ids)
+    assignment = next((a for a in plan.assignments if a.enemy_id == combatant_id), None)
+    if assignment is None or assignment.target_id == decision.target_id:
+        return decision
+
+    target = battlefield.get(assignment.target_id)
+    distance = battlefield.chebyshev_distance(combatant_id, assignment.target_id)
+    speed = engine.state.combatant_stats.get(combatant_id, {}).get("speed", 30)
+    turn = engine.state.current_turn
+    remaining = speed - (turn.movement_used if turn else 0)
+    reach = attack_reach(engine, combatant_id, action_type)
+    if target is None or not target.is_active or distance is None or distance > remaining // 5 + reach:
+        return decision
+
+    return replace(
+        decision,
+        target_id=assignment.target_id,
+        position=None,
+        reasoning=assignment.reasoning,
+    )
+
+
+def execute_decision(
+    engine: "CombatEngine",
+    grid: CombatGrid,
+    combatant_id: str,
+    decision: AIDecision,
+) -> Optional[TurnOutcome]:
+    """
+    Carry out a single greedy AI decision for the current combatant.
+
+    Attacks close in on the target first when it is out of reach; Dodge,
+    Disengage and Hide move to the decision's position afterwards.
+
+    Returns:
+        TurnOutcome, or None if the decision is not one this resolves
+    """
+    action_type = getattr(decision.action_type, "value", decision.action_type)
+    if action_type not in DECISION_ACTIONS:
+        return None
+
+    outcome = TurnOutcome(reasoning=decision.reasoning)
+    target_id = decision.target_id
+    target_pos = engine.state.positions.get(target_id) if target_id else None
+
+    if action_type in ATTACK_ACTIONS:
+        reach = attack_reach(engine, combatant_id, action_type)
+        move_toward(engine, grid, combatant_id, target_pos, reach, outcome)
+        if _is_active(engine, combatant_id):
+            step = PlanStep(kind="action", action_type=action_type, target_id=target_id, reach=reach)
+            _run_action(engine, combatant_id, step, outcome)
+    elif action_type in ("move", "dash"):
+        if action_type == "dash":
+            outcome.results.append(engine.take_action(ActionType.DASH))
+        outcome.action_type = action_type
+        goal = decision.position or target_pos
+        move_toward(engine, grid, combatant_id, goal, 0 if decision.position else 1, outcome)
+    else:
+        _run_action(engine, combatant_id, PlanStep(kind="action", action_type=action_type), outcome)
+        if decision.position:
+            move_toward(engine, grid, combatant_id, decision.position, 0, outcome)
+    return outcome
+
+
+def attack_reach(engine: "CombatEngine", combatant_id: str, action_type: str) -> int:
+    """Attack range in squares for an attack decision."""
+    if action_type != "ranged_attack":
+        return 1
+    stats = engine.state.combatant_stats.get(combatant_id, {})
+    equipment = stats.get("equipment") or {}
+    ranged = equipment.get("ranged") if isinstance(equipment, dict) else None
+    weapon_range = ranged.get("range", 80) if isinstance(ranged, dict) else 80
+    return max(1, int(weapon_range) // 5)
+
+
+def execute_plan(
+    engine: "CombatEngine",
+    grid: CombatGrid,
+    combatant_id: str,
+    plan: TurnPlan,
+) -> TurnOutcome:
+    """
+    Carry out a planned turn for the current combatant.
+
+    Args:
+        engine: The combat engine instance
+        grid: The combat grid (occupants are kept in sync with moves)
+        combatant_id: ID of the acting combatant
+        plan: Plan from AnytimePlanner.plan()
+
+    Returns:
+        TurnOutcome describing what happened
+    """
+    outcome = TurnOutcome(reasoning=plan.reasoning)
+    for step in plan.steps:
+        if not _is_active(engine, combatant_id):
+            break  # Dropped by an opportunity attack
+        if step.kind == "move":
+            move_toward(engine, grid, combatant_id, step.position, 0, outcome)
+        elif step.kind == "action":
+            _run_action(engine, combatant_id, step, outcome)
+        elif step.kind == "bonus":
+            _run_bonus(engine, step, outcome)
+    return outcome
+
+
+def move_toward(
+    engine: "CombatEngine",
+    grid: CombatGrid,
+    combatant_id: str,
+    goal: Optional[Tuple[int, int]],
+    stop_within: int,
+    outcome: TurnOutcome,
+) -> bool:
+    """
+    Move as close to goal as remaining movement allows.
+
+    Args:
+        goal: Cell to head for
+        stop_within: Squares from goal that count as arrived (0: the cell itself)
+        outcome: Updated with the old and new position and the path
+
+    Returns:
+        True if the creature moved
+    """
+    start = engine.state.positions.get(combatant_id)
+    turn = engine.state.current_turn
+    if not start or not goal or turn is None:
+        return False
+    start, goal = tuple(start), tuple(goal)
+
+    speed = engine.state.combatant_stats.get(combatant_id, {}).get("speed", 30)
+    remaining = max(0, speed - turn.movement_used)
+    if remaining < 5 or _chebyshev(start, goal) <= stop_within:
+        return False
+
+    # Same live occupancy and allies the planner and behaviors searched with
+    view = get_battlefield_snapshot(engine)
+    allies = {v.id for v in view.allies_of(combatant_id)}
+    occupants = view.live_occupants(ignore=combatant_id)
+
+    best, best_key = None, (_chebyshev(start, goal), 0)
+    for x, y, cost in get_reachable_cells(
+        grid, start[0], start[1], remaining, include_occupied=False, mover_id=combatant_id,
+        ally_ids=allies, occupants=occupants,
+    ):
+        key = (max(_chebyshev((x, y), goal), stop_within), cost)
+        if key < best_key:
+            best, best_key = (x, y), key
+    if best is None:
+        return False
+
+    path = find_path(
+        grid, start[0], start[1], best[0], best[1], max_movement=remaining,
+        mover_id=combatant_id, ally_ids=allies, occupants=occupants,
+    )
+    if not engine.move_combatant(combatant_id, best[0], best[1]).success:
+        return False
+
+    grid.set_occupant(start[0], start[1], None)
+    # Opportunity attacks may drop the mover on the way
+    if _is_active(engine, combatant_id):
+        grid.set_occupant(best[0], best[1], combatant_id)
+    if outcome.old_position is None:
+        outcome.old_position = start
+    outcome.new_position = best
+    outcome.movement_path = list(path.path) if path.success else None
+    return True
+
+
+def _run_action(engine: "CombatEngine", combatant_id: str, step: PlanStep, outcome: TurnOutcome) -> None:
+    """Resolve the planned action, re-checking reach after the move."""
+    outcome.action_type = step.action_type
+    outcome.target_id = step.target_id
+
+    if step.action_type in SIMPLE_ACTIONS:
+        outcome.results.append(engine.take_action(SIMPLE_ACTIONS[step.action_type]))
+        return
+
+    target = engine.state.initiative_tracker.get_combatant(step.target_id) if step.target_id else None
+    if target is None or not target.is_active or not _within(engine, combatant_id, target.id, step.reach):
+        outcome.action_type = "none"  # The move fell short or the target is gone
+        return
+
+    if step.action_type == "multiattack":
+        outcome.results.append(engine.take_action(ActionType.MULTIATTACK, target_id=target.id))
+        return
+
+    # Extra Attack: keep swinging while attacks remain and the target stands
+    turn = engine.state.current_turn
+    while target.is_active and turn.can_attack():
+        result = engine.take_action(ActionType.ATTACK, target_id=target.id)
+        outcome.results.append(result)
+        if not result.success:
+            break
+
+
+def _run_bonus(engine: "CombatEngine", step: PlanStep, outcome: TurnOutcome) -> None:
+    """Resolve the planned bonus action."""
+    if step.action_type == "disengage":
+        outcome.bonus_result = engine.take_bonus_action(
+            BonusActionType.CUNNING_ACTION, cunning_type="disengage",
+        )
+
+
+def _is_active(engine: "CombatEngine", combatant_id: str) -> bool:
+    combatant = engine.state.initiative_tracker.get_combatant(combatant_id)
+    return bool(combatant and combatant.is_active)
+
+
+def _within(engine: "CombatEngine", a: str, b: str, squares: int) -> bool:
+    pos_a, pos_b = engine.state.positions.get(a), engine.state.positions.get(b)
+    return bool(pos_a and pos_b) and _chebyshev(tuple(pos_a), tuple(pos_b)) <= squares
+
+
+def _chebyshev(a: Tuple[int, int], b: Tuple[int, int]) -> int:
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
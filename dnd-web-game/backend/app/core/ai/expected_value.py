@@ -0,0 +1,570 @@
+"""
+D&D 5e AI Expected-Value Engine.
+
+Closed-form outcome math for AI scoring, in place of ad-hoc dice
+averages:
+- Hit and critical chance from attack bonus, AC, crit range and
+  advantage/disadvantage (from get_attack_modifiers)
+- Exact damage distributions per dice expression, with resistance,
+  immunity and vulnerability applied
+- Kill probability for one attack or a full multiattack pattern
+- Saving throw failure chance and expected save-for-half damage
+
+Results are memoized on (attack profiles, defense profile), both frozen,
+so scoring the same attack against identical targets is a dict lookup.
+"""
+import math
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Sequence, Tuple
+
+from app.core.condition_effects import get_attack_modifiers, get_save_modifiers
+from app.core.dice import compile_dice_notation
+from app.core.subclass_registry import get_critical_range
+
+# Memoized (attacks, defense) evaluations kept per process
+EV_CACHE_SIZE = 4096
+
+# Damage assumed for unparseable dice notation
+DEFAULT_DAMAGE_DICE = "1d6"
+
+ABILITIES = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+_ABILITY_ABBREVIATIONS = {
+    "str": "strength", "dex": "dexterity", "con": "constitution",
+    "int": "intelligence", "wis": "wisdom", "cha": "charisma",
+}
+
+# Probability mass function: ((damage, probability), ...) sorted by damage
+PMF = Tuple[Tuple[int, float], ...]
+
+
+# =============================================================================
+# PROFILES
+# =============================================================================
+
+@dataclass(frozen=True)
+class AttackProfile:
+    """One weapon or natural attack, as the AI sees it."""
+    name: str
+    attack_bonus: int
+    damage_dice: str
+    reach: int = 1  # Squares (range for ranged attacks)
+    ranged: bool = False
+    damage_type: str = ""
+    crit_range: int = 20  # Lowest natural roll that crits
+
+    @classmethod
+    def from_stats(cls, stats: Dict[str, Any]) -> "AttackProfile":
+        """
+        The stat-line attack of a combatant (weapon or monster default).
+
+        Args:
+            stats: Combatant stats dict
+
+        Returns:
+            AttackProfile for the combatant's basic attack
+        """
+        crit_range = 20
+        class_id = str(stats.get("class_id") or stats.get("class") or "").lower()
+        subclass_id = str(stats.get("subclass_id") or "").lower()
+        if class_id == "fighter" and subclass_id:
+            crit_range = get_critical_range(subclass_id, _as_int(stats.get("level", 1), 1))
+
+        return cls(
+            name="attack",
+            attack_bonus=_as_int(stats.get("attack_bonus", 0), 0),
+            damage_dice=str(stats.get("damage_dice") or DEFAULT_DAMAGE_DICE),
+            damage_type=str(stats.get("damage_type") or "").lower(),
+            crit_range=crit_range,
+        )
+
+
+@dataclass(frozen=True)
+class DefenseProfile:
+    """Everything about a target that changes how attacks against it land."""
+    ac: int
+    hp: int
+    resistances: FrozenSet[str] = frozenset()
+    immunities: FrozenSet[str] = frozenset()
+    vulnerabilities: FrozenSet[str] = frozenset()
+    conditions: FrozenSet[str] = frozenset()
+    saves: Tuple[Tuple[str, int], ...] = ()  # (ability, save bonus)
+
+    @classmethod
+    def from_stats(
+        cls,
+        stats: Dict[str, Any],
+        conditions: Optional[Iterable[str]] = None,
+    ) -> "DefenseProfile":
+        """
+        Build a target's defense profile from its stats.
+
+        Args:
+            stats: Target stats dict
+            conditions: Conditions to use instead of stats["conditions"]
+
+        Returns:
+            DefenseProfile
+        """
+        if conditions is None:
+            conditions = stats.get("conditions") or ()
+        return cls(
+            ac=_as_int(stats.get("ac", 10), 10),
+            hp=_as_int(stats.get("current_hp", stats.get("hp", 1)), 1),
+            resistances=_lowered(stats.get("resistances")),
+            immunities=_lowered(stats.get("immunities")),
+            vulnerabilities=_lowered(stats.get("vulnerabilities")),
+            conditions=_lowered(conditions),
+            saves=tuple((ability, _save_bonus(stats, ability)) for ability in ABILITIES),
+        )
+
+    def with_hp(self, hp: float) -> "DefenseProfile":
+        """The same target with a different amount of HP left."""
+        return replace(self, hp=max(0, math.ceil(hp)))
+
+    def save_bonus(self, ability: str) -> int:
+        """Saving throw bonus for an ability (full name or abbreviation)."""
+        ability = _ABILITY_ABBREVIATIONS.get(ability.lower(), ability.lower())
+        return dict(self.saves).get(ability, 0)
+
+    def damage_multiplier(self, damage_type: str) -> float:
+        """Multiplier the target applies to a damage type."""
+        if not damage_type:
+            return 1.0
+        if damage_type in self.immunities:
+            return 0.0
+        if damage_type in self.resistances:
+            return 0.5
+        if damage_type in self.vulnerabilities:
+            return 2.0
+        return 1.0
+
+
+@dataclass(frozen=True)
+class AttackOutcome:
+    """Expected result of a set of attacks against one target."""
+    hit_chance: float  # Per attack (first attack for mixed patterns)
+    crit_chance: float
+    expected_damage: float
+    kill_chance: float
+    kill_chance_on_hit: float  # Kill chance given the first attack hits
+
+
+@dataclass(frozen=True)
+class SaveOutcome:
+    """Expected result of a saving-throw effect against one target."""
+    fail_chance: float
+    expected_damage: float
+    kill_chance: float
+
+
+def _as_int(value: Any, default: int) -> int:
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return int(value)
+    return default
+
+
+def _lowered(values: Any) -> FrozenSet[str]:
+    if not isinstance(values, (list, tuple, set, frozenset)):
+        return frozenset()
+    return frozenset(str(v).lower() for v in values)
+
+
+def _save_bonus(stats: Dict[str, Any], ability: str) -> int:
+    """Save bonus from explicit saving throws, else the ability modifier."""
+    saving_throws = stats.get("saving_throws")
+    if isinstance(saving_throws, dict):
+        for key in (ability, ability[:3]):
+            if key in saving_throws:
+                return _as_int(saving_throws[key], 0)
+    mod = stats.get(f"{ability[:3]}_mod")
+    if isinstance(mod, int):
+        return mod
+    scores = stats.get("stats")
+    if isinstance(scores, dict) and isinstance(scores.get(ability), int):
+        return (scores[ability] - 10) // 2
+    return 0
+
+
+# =============================================================================
+# ROLL PROBABILITIES
+# =============================================================================
+
+def _roll_mode(p: float, advantage: bool, disadvantage: bool) -> float:
+    """Apply advantage/disadvantage to a single-d20 success chance."""
+    if advantage and not disadvantage:
+        return 1 - (1 - p) ** 2
+    if disadvantage and not advantage:
+        return p * p
+    return p
+
+
+def hit_probability(
+    attack_bonus: int,
+    target_ac: int,
+    advantage: bool = False,
+    disadvantage: bool = False,
+    crit_range: int = 20,
+) -> float:
+    """
+    Chance that an attack roll hits.
+
+    A natural 1 always misses; a natural roll in the crit range always hits.
+
+    Args:
+        attack_bonus: Total attack modifier
+        target_ac: Target's armor class
+        advantage: Roll twice, keep the higher
+        disadvantage: Roll twice, keep the lower
+        crit_range: Lowest natural roll that crits
+
+    Returns:
+        Hit probability
+    """
+    needed = max(2, min(target_ac - attack_bonus, crit_range))
+    p = max(0, 21 - needed) / 20
+    return _roll_mode(p, advantage, disadvantage)
+
+
+def critical_probability(
+    advantage: bool = False,
+    disadvantage: bool = False,
+    crit_range: int = 20,
+) -> float:
+    """Chance of rolling a critical hit."""
+    return _roll_mode((21 - crit_range) / 20, advantage, disadvantage)
+
+
+def save_fail_probability(
+    save_dc: int,
+    save_bonus: int,
+    advantage: bool = False,
+    disadvantage: bool = False,
+) -> float:
+    """
+    Chance that a saving throw fails (no automatic results on 1 or 20).
+
+    Args:
+        save_dc: Difficulty class
+        save_bonus: Target's saving throw bonus
+        advantage: Target rolls with advantage
+        disadvantage: Target rolls with disadvantage
+
+    Returns:
+        Failure probability
+    """
+    p_success = min(1.0, max(0.0, (21 - (save_dc - save_bonus)) / 20))
+    return 1 - _roll_mode(p_success, advantage, disadvantage)
+
+
+# =============================================================================
+# DAMAGE DISTRIBUTIONS
+# =============================================================================
+
+@lru_cache(maxsize=512)
+def damage_distribution(notation: str, critical: bool = False) -> PMF:
+    """
+    Exact probability distribution of a damage roll.
+
+    Args:
+        notation: Dice notation like "2d6+3"
+        critical: Double the dice (critical hit)
+
+    Returns:
+        ((damage, probability), ...) with damage floored at 0
+    """
+    try:
+        expression = compile_dice_notation(notation)
+    except ValueError:
+        expression = compile_dice_notation(DEFAULT_DAMAGE_DICE)
+    if critical:
+        expression = expression.critical
+
+    dist: Dict[int, float] = {0: 1.0}
+    for count, sides, flat_mod in expression.components:
+        if sides:
+            sign = -1 if count < 0 else 1
+            face = 1 / sides
+            for _ in range(abs(count)):
+                rolled: Dict[int, float] = {}
+                for total, p in dist.items():
+                    for value in range(1, sides + 1):
+                        key = total + sign * value
+                        rolled[key] = rolled.get(key, 0.0) + p * face
+                dist = rolled
+        if flat_mod:
+            dist = {total + flat_mod: p for total, p in dist.items()}
+
+    floored: Dict[int, float] = {}
+    for total, p in dist.items():
+        key = max(0, total * expression.multiplier)
+        floored[key] = floored.get(key, 0.0) + p
+    return tuple(sorted(floored.items()))
+
+
+def _scaled(pmf: PMF, multiplier: float) -> PMF:
+    """Apply a resistance/vulnerability multiplier (rounding down)."""
+    if multiplier == 1.0:
+        return pmf
+    scaled: Dict[int, float] = {}
+    for damage, p in pmf:
+        key = int(damage * multiplier)
+        scaled[key] = scaled.get(key, 0.0) + p
+    return tuple(sorted(scaled.items()))
+
+
+def _mean(pmf: PMF) -> float:
+    return sum(damage * p for damage, p in pmf)
+
+
+def _convolve(a: Dict[int, float], b: PMF, cap: int) -> Dict[int, float]:
+    """Sum of two damage distributions, lumping totals >= cap together."""
+    out: Dict[int, float] = {}
+    for x, px in a.items():
+        for y, py in b:
+            key = min(cap, x + y)
+            out[key] = out.get(key, 0.0) + px * py
+    return out
+
+
+# =============================================================================
+# EVALUATION
+# =============================================================================
+
+@lru_cache(maxsize=256)
+def _roll_modifiers(
+    attacker_conditions: FrozenSet[str],
+    target_conditions: FrozenSet[str],
+    is_melee: bool,
+    distance_ft: int,
+) -> Tuple[bool, bool, bool]:
+    """(advantage, disadvantage, auto_critical) from both sides' conditions."""
+    mods = get_attack_modifiers(
+        sorted(attacker_conditions), sorted(target_conditions), is_melee, distance_ft,
+    )
+    return mods.advantage, mods.disadvantage, mods.auto_critical
+
+
+def _attack_pmf(
+    attack: AttackProfile,
+    defense: DefenseProfile,
+    advantage: bool,
+    disadvantage: bool,
+    auto_crit: bool,
+) -> Tuple[float, float, PMF]:
+    """(hit chance, crit chance, damage PMF given a hit) of one attack."""
+    p_hit = hit_probability(attack.attack_bonus, defense.ac, advantage, disadvantage, attack.crit_range)
+    p_crit = p_hit if auto_crit else min(
+        p_hit, critical_probability(advantage, disadvantage, attack.crit_range)
+    )
+    if p_hit <= 0:
+        return 0.0, 0.0, ((0, 1.0),)
+
+    multiplier = defense.damage_multiplier(attack.damage_type)
+    on_hit: Dict[int, float] = {}
+    for pmf, weight in (
+        (damage_distribution(attack.damage_dice), (p_hit - p_crit) / p_hit),
+        (damage_distribution(attack.damage_dice, critical=True), p_crit / p_hit),
+    ):
+        if weight <= 0:
+            continue
+        for damage, p in _scaled(pmf, multiplier):
+            on_hit[damage] = on_hit.get(damage, 0.0) + p * weight
+    return p_hit, p_crit, tuple(sorted(on_hit.items()))
+
+
+def _with_misses(p_hit: float, on_hit: PMF) -> PMF:
+    """Unconditional damage PMF: a miss deals 0."""
+    pmf = {0: 1 - p_hit}
+    for damage, p in on_hit:
+        pmf[damage] = pmf.get(damage, 0.0) + p * p_hit
+    return tuple(sorted(pmf.items()))
+
+
+@lru_cache(maxsize=EV_CACHE_SIZE)
+def _evaluate(
+    attacks: Tuple[AttackProfile, ...],
+    defense: DefenseProfile,
+    advantage: bool,
+    disadvantage: bool,
+    auto_crit: bool,
+) -> AttackOutcome:
+    cap = max(1, defense.hp)
+    rolls = [_attack_pmf(a, defense, advantage, disadvantage, auto_crit) for a in attacks]
+    first_hit, first_crit, first_on_hit = rolls[0]
+
+    # Total damage of the rest of the attacks, then with the first added
+    rest: Dict[int, float] = {0: 1.0}
+    for p_hit, _, on_hit in rolls[1:]:
+        rest = _convolve(rest, _with_misses(p_hit, on_hit), cap)
+    total = _convolve(rest, _with_misses(first_hit, first_on_hit), cap)
+    given_hit = _convolve(rest, first_on_hit, cap) if first_hit > 0 else {}
+
+    return AttackOutcome(
+        hit_chance=first_hit,
+        crit_chance=first_crit,
+        expected_damage=sum(p_hit * _mean(on_hit) for p_hit, _, on_hit in rolls),
+        kill_chance=total.get(cap, 0.0),
+        kill_chance_on_hit=given_hit.get(cap, 0.0),
+    )
+
+
+def evaluate_attacks(
+    attacks: Sequence[AttackProfile],
+    target: DefenseProfile,
+    attacker_conditions: Iterable[str] = (),
+    distance_ft: int = 5,
+) -> AttackOutcome:
+    """
+    Expected outcome of making these attacks against one target.
+
+    Args:
+        attacks: One attack, or every attack of a multiattack
+        target: Target's defense profile
+        attacker_conditions: Conditions on the attacker
+        distance_ft: Distance to the target
+
+    Returns:
+        AttackOutcome (memoized)
+    """
+    attacks = tuple(attacks)
+    if not attacks:
+        return AttackOutcome(0.0, 0.0, 0.0, 0.0, 0.0)
+    advantage, disadvantage, auto_crit = _roll_modifiers(
+        frozenset(attacker_conditions), target.conditions, not attacks[0].ranged, distance_ft,
+    )
+    return _evaluate(attacks, target, advantage, disadvantage, auto_crit)
+
+
+def evaluate_targets(
+    attacks: Sequence[AttackProfile],
+    targets: Mapping[str, DefenseProfile],
+    attacker_conditions: Iterable[str] = (),
+    distance_ft: int = 5,
+) -> Dict[str, AttackOutcome]:
+    """
+    Evaluate the same attacks against every target at once.
+
+    Identical targets (a pack of goblins) share one evaluation.
+
+    Args:
+        attacks: Attacks to make
+        targets: Target ID -> defense profile
+        attacker_conditions: Conditions on the attacker
+        distance_ft: Distance used for condition rules (e.g. prone)
+
+    Returns:
+        Target ID -> AttackOutcome
+    """
+    attacks = tuple(attacks)
+    conditions = frozenset(attacker_conditions)
+    return {
+        target_id: evaluate_attacks(attacks, defense, conditions, distance_ft)
+        for target_id, defense in targets.items()
+    }
+
+
+def evaluate_save(
+    save_dc: int,
+    ability: str,
+    damage_dice: str,
+    target: DefenseProfile,
+    damage_type: str = "",
+    half_on_save: bool = True,
+) -> SaveOutcome:
+    """
+    Expected outcome of a saving-throw damage effect against one target.
+
+    Args:
+        save_dc: Difficulty class
+        ability: Saving throw ability
+        damage_dice: Damage on a failed save
+        target: Target's defense profile
+        damage_type: Damage type, for resistances
+        half_on_save: Whether a successful save still takes half
+
+    Returns:
+        SaveOutcome
+    """
+    return _evaluate_save(save_dc, ability.lower(), damage_dice, target, damage_type.lower(), half_on_save)
+
+
+@lru_cache(maxsize=EV_CACHE_SIZE)
+def _evaluate_save(
+    save_dc: int,
+    ability: str,
+    damage_dice: str,
+    target: DefenseProfile,
+    damage_type: str,
+    half_on_save: bool,
+) -> SaveOutcome:
+    ability = _ABILITY_ABBREVIATIONS.get(ability, ability)
+    auto_fail, advantage, disadvantage, _ = get_save_modifiers(sorted(target.conditions), ability)
+    p_fail = 1.0 if auto_fail else save_fail_probability(
+        save_dc, target.save_bonus(ability), advantage, disadvantage,
+    )
+
+    full = _scaled(damage_distribution(damage_dice), target.damage_multiplier(damage_type))
+    half = _scaled(full, 0.5) if half_on_save else ((0, 1.0),)
+    cap = max(1, target.hp)
+    kill = p_fail * sum(p for d, p in full if d >= cap) + (1 - p_fail) * sum(p for d, p in half if d >= cap)
+    return SaveOutcome(
+        fail_chance=p_fail,
+        expected_damage=p_fail * _mean(full) + (1 - p_fail) * _mean(half),
+        kill_chance=kill,
+    )
+
+
+def expected_attack_damage(
+    attack_bonus: int,
+    damage_dice: str,
+    target_ac: int,
+    advantage: bool = False,
+    disadvantage: bool = False,
+) -> float:
+    """
+    Expected damage of one attack, counting critical hits.
+
+    Args:
+        attack_bonus: Total attack modifier
+        damage_dice: Damage notation like "2d6+3"
+        target_ac: Target's armor class
+        advantage: Attack has advantage
+        disadvantage: Attack has disadvantage
+
+    Returns:
+        Expected damage per attack
+    """
+    p_hit, _, on_hit = _attack_pmf(
+        AttackProfile("attack", attack_bonus, damage_dice),
+        DefenseProfile(ac=target_ac, hp=1),
+        advantage, disadvantage, False,
+    )
+    return p_hit * _mean(on_hit)
+
+
+def get_ev_cache_stats() -> Dict[str, Any]:
+    """Memoization statistics for monitoring."""
+    stats = {}
+    for name, fn in (
+        ("attacks", _evaluate),
+        ("saves", _evaluate_save),
+        ("distributions", damage_distribution),
+    ):
+        info = fn.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            "size": info.currsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups * 100, 2) if lookups else 0.0,
+        }
+    return stats
+
+
+def clear_ev_cache() -> None:
+    """Drop all memoized evaluations."""
+    for fn in (_evaluate, _evaluate_save, damage_distribution, _roll_modifiers):
+        fn.cache_clear()
@@ -0,0 +1,788 @@
+"""
+D&D 5e AI Anytime Turn Planner.
+
+Optional lookahead for enemy AI. Instead of scoring a flat list of single
+actions, the planner searches whole turns - (move, action, bonus action)
+sequences - with beam search, valuing each plan by expected damage and
+kill chances from the expected-value engine, minus the damage the creature can
+expect to take where it ends its turn. Creatures with legendary actions
+also count the legendary attacks they can make from that position.
+
+The search is anytime: it runs passes with a widening beam, keeps the best
+complete plan, and stops as soon as the per-decision wall-clock budget runs
+out, so it never holds up an enemy turn longer than the budget allows. The
+budget also covers setup; if it runs out before a plan is complete, the
+planner falls back to the best attack from where the creature stands.
+Plans only contain steps execute_plan can carry out.
+"""
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+import json
+import threading
+import time
+
+from app.config import get_settings
+from app.core.dice import compile_dice_notation
+from app.core.monster_abilities import AbilityType, MonsterAbility, parse_monster_action
+from app.core.monster_catalog import get_monster_catalog
+from .battlefield import BattlefieldSnapshot, CombatantView, get_battlefield_snapshot
+from .expected_value import AttackOutcome, AttackProfile, DefenseProfile, evaluate_attacks
+
+if TYPE_CHECKING:
+    from app.core.combat_engine import CombatEngine
+
+
+# Widest beam tried; a pass that prunes nothing ends the search early
+MAX_BEAM_WIDTH = 32
+
+# Closest enemies considered as move targets
+MAX_TARGETS = 6
+
+# Value weights
+KILL_BONUS = 30.0
+LEGENDARY_DISCOUNT = 0.8  # Legendary attacks land later; targets may move
+APPROACH_PENALTY = 0.5  # Per square to the nearest enemy, for melee creatures
+
+# Plan stages, searched in this order
+STAGE_MOVE = 0
+STAGE_ACTION = 1
+STAGE_BONUS = 2
+STAGE_DONE = 3
+
+
+@dataclass(frozen=True)
+class ActionOption:
+    """An action the planner can choose, with the attacks it makes."""
+    action_type: str  # "multiattack", "attack", "ranged_attack", "dodge", "disengage"
+    attacks: Tuple[AttackProfile, ...] = ()
+    ability_id: Optional[str] = None
+
+    @property
+    def reach(self) -> int:
+        """Squares at which every attack in the action can reach."""
+        return min((a.reach for a in self.attacks), default=0)
+
+
+@dataclass
+class PlanStep:
+    """One step of a planned turn."""
+    kind: str  # "move", "action", "bonus"
+    action_type: str
+    target_id: Optional[str] = None
+    position: Optional[Tuple[int, int]] = None
+    ability_id: Optional[str] = None
+    expected_damage: float = 0.0
+    reach: int = 0  # Squares the planned attack reaches
+    reasoning: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API response."""
+        return {
+            "kind": self.kind,
+            "action_type": self.action_type,
+            "target_id": self.target_id,
+            "position": self.position,
+            "ability_id": self.ability_id,
+            "expected_damage": round(self.expected_damage, 2),
+            "reach": self.reach,
+            "reasoning": self.reasoning,
+        }
+
+
+@dataclass
+class TurnPlan:
+    """A complete planned turn and its value."""
+    steps: List[PlanStep]
+    value: float
+    expected_damage: float
+    end_position: Optional[Tuple[int, int]]
+
+    def step(self, kind: str) -> Optional[PlanStep]:
+        """Get the step of a kind ("move", "action", "bonus"), if planned."""
+        return next((s for s in self.steps if s.kind == kind), None)
+
+    @property
+    def reasoning(self) -> str:
+        """One-line description of the whole plan."""
+        return "Planned: " + " -> ".join(s.reasoning for s in self.steps) if self.steps \
+            else "Planned: hold position"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API response."""
+        return {
+            "steps": [s.to_dict() for s in self.steps],
+            "value": round(self.value, 2),
+            "expected_damage": round(self.expected_damage, 2),
+            "end_position": self.end_position,
+        }
+
+
+@dataclass
+class PlannerMetrics:
+    """What one planning call cost and how far it got."""
+    budget_ms: float
+    time_used_ms: float = 0.0
+    nodes: int = 0  # Partial plans generated
+    passes: int = 0  # Beam passes completed
+    beam_width: int = 0  # Widest completed pass
+    timed_out: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API response."""
+        return {
+            "budget_ms": self.budget_ms,
+            "time_used_ms": round(self.time_used_ms, 3),
+            "nodes": self.nodes,
+            "passes": self.passes,
+            "beam_width": self.beam_width,
+            "timed_out": self.timed_out,
+        }
+
+
+@dataclass
+class _Node:
+    """A partial plan in the beam."""
+    stage: int
+    position: Tuple[int, int]
+    steps: Tuple[PlanStep, ...] = ()
+    value: float = 0.0
+    damage: float = 0.0
+    target_hp: Dict[str, float] = field(default_factory=dict)
+    opportunity_risk: float = 0.0
+    disengaged: bool = False
+    dodging: bool = False
+    estimate: float = 0.0  # Optimistic value still to come (beam ordering only)
+
+
+class _PlannerStats:
+    """Process-wide planner counters (enemy turns run on worker threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        with self._lock:
+            self.decisions = 0
+            self.timeouts = 0
+            self.nodes = 0
+            self.time_ms = 0.0
+            self.max_time_ms = 0.0
+
+    def record(self, metrics: PlannerMetrics) -> None:
+        """Add one planning call."""
+        with self._lock:
+            self.decisions += 1
+            self.timeouts += metrics.timed_out
+            self.nodes += metrics.nodes
+            self.time_ms += metrics.time_used_ms
+            self.max_time_ms = max(self.max_time_ms, metrics.time_used_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals and averages since the last reset."""
+        with self._lock:
+            decisions = self.decisions or 1
+            return {
+                "decisions": self.decisions,
+                "timeouts": self.timeouts,
+                "nodes": self.nodes,
+                "avg_nodes": round(self.nodes / decisions, 1),
+                "avg_time_ms": round(self.time_ms / decisions, 3),
+                "max_time_ms": round(self.max_time_ms, 3),
+            }
+
+
+_stats = _PlannerStats()
+
+
+def get_planner_stats() -> Dict[str, Any]:
+    """Get process-wide planner statistics."""
+    return _stats.get_stats()
+
+
+def reset_planner_stats() -> None:
+    """Reset process-wide planner statistics."""
+    _stats.reset()
+
+
+def planner_budget_ms() -> float:
+    """Configured per-decision planner budget (0 disables the planner)."""
+    return max(0.0, get_settings().AI_PLANNER_BUDGET_MS)
+
+
+class AnytimePlanner:
+    """
+    Beam search over a creature's whole turn under a wall-clock budget.
+
+    Usage:
+        planner = AnytimePlanner(engine, "dragon-1", budget_ms=20)
+        plan = planner.plan()
+        planner.metrics.nodes, planner.metrics.time_used_ms
+    """
+
+    def __init__(
+        self,
+        engine: "CombatEngine",
+        combatant_id: str,
+        battlefield: Optional[BattlefieldSnapshot] = None,
+        budget_ms: Optional[float] = None,
+        max_beam_width: int = MAX_BEAM_WIDTH,
+        max_nodes: Optional[int] = None,
+    ):
+        """
+        Initialize planner.
+
+        Args:
+            engine: The combat engine instance
+            combatant_id: ID of the planning combatant
+            battlefield: Snapshot to plan against (default: current)
+            budget_ms: Wall-clock budget per plan() call (default: settings)
+            max_beam_width: Widest beam to try
+            max_nodes: Node budget; when set it replaces the wall-clock
+                budget, so the same state always yields the same plan
+                (simulations)
+        """
+        self.engine = engine
+        self.combatant_id = combatant_id
+        self.battlefield = battlefield or get_battlefield_snapshot(engine)
+        self.budget_ms = planner_budget_ms() if budget_ms is None else max(0.0, budget_ms)
+        self.max_beam_width = max(1, max_beam_width)
+        self.max_nodes = max_nodes
+        self.metrics = PlannerMetrics(budget_ms=self.budget_ms)
+        self.stats = engine.state.combatant_stats.get(combatant_id, {})
+        self._deadline = 0.0
+        self._multiattack_pattern: Tuple[str, ...] = ()
+
+    # ==================== Search ====================
+
+    def plan(self) -> Optional[TurnPlan]:
+        """
+        Plan the creature's turn.
+
+        Returns:
+            Best complete plan found within the budget (a fallback attack
+            if none was completed), or None if the creature is not on the
+            battlefield
+        """
+        start = time.perf_counter()
+        self._deadline = start + self.budget_ms / 1000 if self.max_nodes is None else float("inf")
+        self.metrics = PlannerMetrics(budget_ms=self.budget_ms)
+
+        best = None
+        me = self.battlefield.get(self.combatant_id)
+        if me is not None and me.position is not None:
+            best = self._search(me)
+
+        self.metrics.time_used_ms = (time.perf_counter() - start) * 1000
+        _stats.record(self.metrics)
+        return best
+
+    def _search(self, me: CombatantView) -> Optional[TurnPlan]:
+        """Run beam passes of doubling width until exhaustive or out of time."""
+        self._me = me
+        self._enemies = sorted(
+            self.battlefield.enemies_of(self.combatant_id, positioned=True),
+            key=lambda v: self.battlefield.distance(self.combatant_id, v.id),
+        )
+        all_stats = self.engine.state.combatant_stats
+        self._defenses = {
+            e.id: DefenseProfile.from_stats(all_stats.get(e.id, {}), e.conditions) for e in self._enemies
+        }
+        self._my_defense = DefenseProfile.from_stats(self.stats, me.conditions)
+        self._potential: Dict[Tuple[int, int], float] = {}
+
+        # Setup counts against the budget too; the (cached) stat-block parse
+        # always runs so that a timeout can still fall back to an attack
+        self._attacks = self._monster_attacks()
+        self._options = self._action_options()
+        if self._out_of_time():
+            return self._fallback_plan()
+        self._incoming = {e.id: self._incoming_damage(e) for e in self._enemies}
+        self._legendary = self._legendary_attacks()
+        if self._out_of_time():
+            return self._fallback_plan()
+        self._moves = self._move_candidates()
+        if self._out_of_time():
+            return self._fallback_plan()
+
+        best: Optional[_Node] = None
+        width = 1
+        while width <= self.max_beam_width:
+            leaves, pruned = self._beam_pass(width)
+            for leaf in leaves:
+                if best is None or leaf.value > best.value:
+                    best = leaf
+            if self.metrics.timed_out:
+                break
+            self.metrics.passes += 1
+            self.metrics.beam_width = width
+            if not pruned:
+                break  # Nothing was cut: this pass was exhaustive
+            width *= 2
+
+        return self._to_plan(best) if best else self._fallback_plan()
+
+    def _fallback_plan(self) -> TurnPlan:
+        """Best single attack from the current position, for when time runs out early."""
+        best = None
+        for option in self._options:
+            if not option.attacks:
+                continue
+            for enemy in self._enemies:
+                if _chebyshev(self._me.position, enemy.position) > option.reach:
+                    continue
+                outcome = self._outcome(option.attacks, enemy, self._me.position, enemy.hp)
+                value = self._damage_value(enemy, min(outcome.expected_damage, enemy.hp), outcome.kill_chance)
+                if best is None or value > best[0]:
+                    best = (value, option, enemy, outcome.expected_damage)
+
+        if best is None:
+            return TurnPlan(steps=[], value=0.0, expected_damage=0.0, end_position=self._me.position)
+        value, option, enemy, damage = best
+        step = PlanStep(
+            kind="action", action_type=option.action_type, target_id=enemy.id,
+            ability_id=option.ability_id, expected_damage=damage, reach=option.reach,
+            reasoning=f"{option.action_type.replace('_', ' ').title()} on {enemy.name}",
+        )
+        return TurnPlan(steps=[step], value=value, expected_damage=damage, end_position=self._me.position)
+
+    def _out_of_time(self) -> bool:
+        if self.max_nodes is not None:
+            if self.metrics.nodes >= self.max_nodes:
+                self.metrics.timed_out = True
+        elif time.perf_counter() >= self._deadline:
+            self.metrics.timed_out = True
+        return self.metrics.timed_out
+
+    def _beam_pass(self, width: int) -> Tuple[List[_Node], bool]:
+        """
+        One beam search pass.
+
+        Returns:
+            (complete plans, whether any partial plan was pruned). On
+            timeout the frontier is completed as-is so the pass still
+            yields plans.
+        """
+        frontier = [_Node(
+            stage=STAGE_MOVE,
+            position=self._me.position,
+            target_hp={e.id: float(e.hp) for e in self._enemies},
+        )]
+        pruned = False
+
+        while frontier[0].stage < STAGE_DONE:
+            children = []
+            for node in frontier:
+                if self._out_of_time():
+                    return [self._finish(n) for n in frontier], pruned
+                children.extend(self._expand(node))
+            self.metrics.nodes += len(children)
+            children.sort(key=lambda n: n.value + n.estimate, reverse=True)
+            pruned = pruned or len(children) > width
+            frontier = children[:width]
+
+        return [self._finish(n) for n in frontier], pruned
+
+    def _expand(self, node: _Node) -> List[_Node]:
+        """Children of a partial plan at its current stage."""
+        if node.stage == STAGE_MOVE:
+            return [self._after_move(node, cell, cost) for cell, cost in self._moves]
+        if node.stage == STAGE_ACTION:
+            return self._after_action(node)
+        return self._after_bonus(node)
+
+    def _after_move(self, node: _Node, cell: Tuple[int, int], cost: int) -> _Node:
+        steps = node.steps
+        risk = 0.0
+        if cell != node.position:
+            steps += (PlanStep(
+                kind="move", action_type="move", position=cell,
+                reasoning=f"Move {cost} ft to {cell}",
+            ),)
+            # Leaving an enemy's reach provokes an opportunity attack
+            for enemy in self._enemies:
+                if _chebyshev(node.position, enemy.position) <= 1 < _chebyshev(cell, enemy.position):
+                    risk += self._incoming[enemy.id]
+        return _Node(
+            stage=STAGE_ACTION, position=cell, steps=steps,
+            value=node.value - risk, target_hp=node.target_hp, opportunity_risk=risk,
+            estimate=self._cell_potential(cell),
+        )
+
+    def _cell_potential(self, cell: Tuple[int, int]) -> float:
+        """Best single-action damage value available from a cell."""
+        if cell not in self._potential:
+            best = 0.0
+            for option in self._options:
+                for enemy in self._enemies:
+                    if option.attacks and _chebyshev(cell, enemy.position) <= option.reach:
+                        outcome = self._outcome(option.attacks, enemy, cell, enemy.hp)
+                        damage = outcome.expected_damage
+                        best = max(best, self._damage_value(enemy, min(damage, enemy.hp), outcome.kill_chance))
+            self._potential[cell] = best
+        return self._potential[cell]
+
+    def _after_action(self, node: _Node) -> List[_Node]:
+        children = [_Node(
+            stage=STAGE_BONUS, position=node.position, steps=node.steps, damage=node.damage,
+            value=node.value, target_hp=node.target_hp,
+            opportunity_risk=node.opportunity_risk,
+        )]
+
+        for option in self._options:
+            if option.action_type == "dodge":
+                children.append(self._with_action(node, option, None, 0.0, dodging=True))
+            elif option.action_type == "disengage":
+                if node.opportunity_risk > 0:
+                    children.append(self._with_action(node, option, None, 0.0, disengaged=True))
+            else:
+                for enemy in self._enemies:
+                    if _chebyshev(node.position, enemy.position) > option.reach:
+                        continue
+                    if node.target_hp.get(enemy.id, 0) <= 0:
+                        continue
+                    outcome = self._outcome(option.attacks, enemy, node.position, node.target_hp[enemy.id])
+                    children.append(self._with_action(
+                        node, option, enemy, outcome.expected_damage, outcome.kill_chance,
+                    ))
+        return children
+
+    def _with_action(
+        self,
+        node: _Node,
+        option: ActionOption,
+        target: Optional[CombatantView],
+        damage: float,
+        kill_chance: float = 0.0,
+        dodging: bool = False,
+        disengaged: bool = False,
+    ) -> _Node:
+        value = node.value
+        target_hp = node.target_hp
+        if target is not None:
+            remaining = target_hp[target.id]
+            value += self._damage_value(target, min(damage, remaining), kill_chance)
+            target_hp = {**target_hp, target.id: remaining - damage}
+        if disengaged:
+            value += node.opportunity_risk
+
+        name = target.name if target else ""
+        reasoning = {
+            "dodge": "Dodge",
+            "disengage": "Disengage before moving",
+        }.get(option.action_type, f"{option.action_type.replace('_', ' ').title()} on {name}")
+        step = PlanStep(
+            kind="action", action_type=option.action_type,
+            target_id=target.id if target else None, ability_id=option.ability_id,
+            expected_damage=damage, reach=option.reach, reasoning=reasoning,
+        )
+        # Disengage happens before the move it protects
+        steps = (step,) + node.steps if disengaged else node.steps + (step,)
+        return _Node(
+            stage=STAGE_BONUS, position=node.position, steps=steps, value=value,
+            damage=node.damage + damage, target_hp=target_hp,
+            opportunity_risk=node.opportunity_risk,
+            disengaged=disengaged, dodging=dodging,
+        )
+
+    def _after_bonus(self, node: _Node) -> List[_Node]:
+        children = [_Node(**{**node.__dict__, "stage": STAGE_DONE})]
+
+        # Cunning Action: Disengage as a bonus action
+        if (
+            str(self.stats.get("class", "")).lower() == "rogue"
+            and node.opportunity_risk > 0 and not node.disengaged
+        ):
+            children.append(_Node(**{
+                **node.__dict__,
+                "stage": STAGE_DONE,
+                "value": node.value + node.opportunity_risk,
+                "disengaged": True,
+                "steps": (PlanStep(
+                    kind="bonus", action_type="disengage",
+                    reasoning="Cunning Action: Disengage",
+                ),) + node.steps,
+            }))
+        return children
+
+    def _finish(self, node: _Node) -> _Node:
+        """Score where the turn ends: retaliation, approach and legendary follow-ups."""
+        value = node.value
+        target_hp = node.target_hp
+
+        # Legendary attacks from the end position (boss lookahead)
+        for attack in self._legendary:
+            best_value, best_target = 0.0, None
+            for enemy in self._enemies:
+                remaining = target_hp.get(enemy.id, 0)
+                if remaining <= 0 or _chebyshev(node.position, enemy.position) > attack.reach:
+                    continue
+                outcome = self._outcome((attack,), enemy, node.position, remaining)
+                damage = outcome.expected_damage
+                gain = self._damage_value(enemy, min(damage, remaining), outcome.kill_chance)
+                if gain > best_value:
+                    best_value, best_target = gain, (enemy.id, damage)
+            if best_target:
+                value += best_value * LEGENDARY_DISCOUNT
+                target_hp = {**target_hp, best_target[0]: target_hp[best_target[0]] - best_target[1]}
+
+        # Expected damage from enemies still standing that can reach us next round
+        incoming = 0.0
+        for enemy in self._enemies:
+            if target_hp.get(enemy.id, 0) <= 0:
+                continue
+            speed = _as_int(self.engine.state.combatant_stats.get(enemy.id, {}).get("speed", 30), 30)
+            if _chebyshev(node.position, enemy.position) <= speed // 5 + 1:
+                incoming += self._incoming[enemy.id]
+        if node.dodging:
+            incoming *= 0.5
+        value -= incoming * self._risk_weight()
+
+        # Melee creatures that end far from everyone are wasting turns
+        if self._enemies and not any(o.attacks and o.attacks[0].ranged for o in self._options):
+            nearest = min(_chebyshev(node.position, e.position) for e in self._enemies)
+            value -= max(0, nearest - 1) * APPROACH_PENALTY
+
+        return _Node(**{**node.__dict__, "stage": STAGE_DONE, "value": value, "estimate": 0.0})
+
+    # ==================== Valuation ====================
+
+    def _outcome(
+        self,
+        attacks: Tuple[AttackProfile, ...],
+        target: CombatantView,
+        position: Tuple[int, int],
+        remaining: float,
+    ) -> AttackOutcome:
+        """Expected outcome of attacking target from position, at remaining HP."""
+        return evaluate_attacks(
+            attacks,
+            self._defenses[target.id].with_hp(remaining),
+            self._me.conditions,
+            _chebyshev(position, target.position) * 5,
+        )
+
+    @staticmethod
+    def _damage_value(target: CombatantView, damage: float, kill_chance: float) -> float:
+        """Damage dealt, weighted by the target's threat, plus a kill bonus."""
+        weight = 1.0 + target.threat / 100
+        return damage * weight + KILL_BONUS * kill_chance
+
+    def _risk_weight(self) -> float:
+        """How much incoming damage matters: more the more hurt we are."""
+        return 0.5 + (1 - self._me.hp_ratio)
+
+    def _incoming_damage(self, enemy: CombatantView) -> float:
+        stats = self.engine.state.combatant_stats.get(enemy.id, {})
+        return evaluate_attacks(
+            (AttackProfile.from_stats(stats),), self._my_defense, enemy.conditions,
+        ).expected_damage
+
+    # ==================== Candidates ====================
+
+    def _move_candidates(self) -> List[Tuple[Tuple[int, int], int]]:
+        """Stay, the cheapest cell next to each close enemy, and a retreat cell."""
+        origin = self._me.position
+        movement = self._movement_remaining()
+        reachable = self._reachable_cells(movement)
+        if not reachable:
+            return [(origin, 0)]
+
+        candidates = {origin: 0}
+        for enemy in self._enemies[:MAX_TARGETS]:
+            best = None
+            for cell, cost in reachable.items():
+                if _chebyshev(cell, enemy.position) == 1 and (best is None or cost < best[1]):
+                    best = (cell, cost)
+            if best is None:
+                # Can't get adjacent: close as much distance as possible
+                best = min(reachable.items(), key=lambda item: (_chebyshev(item[0], enemy.position), item[1]))
+            candidates.setdefault(best[0], best[1])
+
+        if self._enemies:
+            retreat = max(
+                reachable.items(),
+                key=lambda item: (min(_chebyshev(item[0], e.position) for e in self._enemies), -item[1]),
+            )
+            candidates.setdefault(retreat[0], retreat[1])
+
+        return list(candidates.items())
+
+    def _reachable_cells(self, movement: int) -> Dict[Tuple[int, int], int]:
+        """Cells the creature can end its move on, with their cost in feet."""
+        origin = self._me.position
+        grid = getattr(self.engine.state, "grid", None)
+        if grid and grid.is_valid_position(origin[0], origin[1]):
+            allies = {v.id for v in self.battlefield.allies_of(self.combatant_id)}
+            field_ = grid.get_distance_field(
+                origin[0], origin[1], ally_ids=allies,
+                occupants=self.battlefield.live_occupants(ignore=self.combatant_id),
+            )
+            return {(x, y): cost for x, y, cost in field_.reachable(movement)}
+
+        squares = movement // 5
+        cells = {}
+        for dx in range(-squares, squares + 1):
+            for dy in range(-squares, squares + 1):
+                cell = (origin[0] + dx, origin[1] + dy)
+                if (dx or dy) and cell[0] >= 0 and cell[1] >= 0 \
+                        and not self.battlefield.is_occupied(cell, ignore=self.combatant_id):
+                    cells[cell] = max(abs(dx), abs(dy)) * 5
+        return cells
+
+    def _movement_remaining(self) -> int:
+        speed = _as_int(self.stats.get("speed", 30), 30)
+        turn = getattr(self.engine.state, "current_turn", None)
+        used = getattr(turn, "movement_used", 0) if turn and turn.combatant_id == self.combatant_id else 0
+        return max(0, speed - _as_int(used, 0))
+
+    def _action_options(self) -> List[ActionOption]:
+        """Attack actions from the stat block or weapon, plus Dodge and Disengage."""
+        options = []
+        attacks = self._attacks
+
+        if self._multiattack_pattern and attacks:
+            pattern = []
+            for name in self._multiattack_pattern:
+                attack = attacks.get(name.lower())
+                if attack is None and name.lower() == "attack":
+                    attack = next(iter(attacks.values()))
+                if attack is not None:
+                    pattern.append(attack)
+            if pattern:
+                options.append(ActionOption(
+                    "multiattack", tuple(pattern), ability_id=f"{self.combatant_id}_multiattack",
+                ))
+
+        for attack in attacks.values():
+            options.append(ActionOption("ranged_attack" if attack.ranged else "attack", (attack,)))
+
+        if not attacks:
+            # Stat-line weapon attack (characters and simple monsters)
+            options.append(ActionOption("attack", (replace(
+                AttackProfile.from_stats(self.stats), reach=max(1, self._weapon_reach() // 5),
+            ),)))
+            equipment = self.stats.get("equipment") or {}
+            ranged = equipment.get("ranged") if isinstance(equipment, dict) else None
+            if isinstance(ranged, dict):
+                options.append(ActionOption("ranged_attack", (AttackProfile(
+                    name=ranged.get("name", "ranged"),
+                    attack_bonus=_as_int(self.stats.get("attack_bonus", 0), 0),
+                    damage_dice=str(ranged.get("damage_dice") or ranged.get("damage") or "1d6"),
+                    reach=_as_int(ranged.get("range", 80), 80) // 5,
+                    ranged=True,
+                    damage_type=str(ranged.get("damage_type") or "").lower(),
+                ),)))
+
+        options.append(ActionOption("dodge"))
+        options.append(ActionOption("disengage"))
+        return options
+
+    def _monster_attacks(self) -> Dict[str, AttackProfile]:
+        """
+        Weapon attacks by lowercase name: the monster catalog's parsed
+        abilities when the stat block names one, else its own actions.
+        """
+        entry = get_monster_catalog().get(self.stats.get("monster_id") or "")
+        if entry is not None:
+            attacks, self._multiattack_pattern = _attack_table(entry.abilities)
+            return dict(attacks)
+        actions = self.stats.get("actions") or []
+        if not actions:
+            self._multiattack_pattern = ()
+            return {}
+        attacks, self._multiattack_pattern = _parse_actions(
+            json.dumps(actions, sort_keys=True, default=str)
+        )
+        return dict(attacks)
+
+    def _legendary_attacks(self) -> List[AttackProfile]:
+        """One attack per legendary action point that names a known attack."""
+        remaining = self.engine.state.legendary_actions_remaining.get(
+            self.combatant_id, _as_int(self.stats.get("legendary_actions_per_round", 0), 0)
+        )
+        if not remaining:
+            return []
+
+        attacks = self._attacks
+        best = None
+        for action in self.stats.get("legendary_actions") or []:
+            name = action.get("name", "").lower()
+            if "cost" in name:
+                continue  # Multi-point actions: keep the lookahead to 1-point attacks
+            for attack_name, attack in attacks.items():
+                if attack_name in name or attack_name in action.get("description", "").lower():
+                    if best is None or compile_dice_notation(attack.damage_dice).mean > \
+                            compile_dice_notation(best.damage_dice).mean:
+                        best = attack
+        return [best] * remaining if best else []
+
+    def _weapon_reach(self) -> int:
+        equipment = self.stats.get("equipment") or {}
+        weapon = (equipment.get("mainhand") or equipment.get("weapon")) if isinstance(equipment, dict) else None
+        if isinstance(weapon, dict):
+            if "reach" in (weapon.get("properties") or []):
+                return 10
+            return _as_int(weapon.get("reach", 5), 5)
+        return 5
+
+    # ==================== Output ====================
+
+    def _to_plan(self, node: _Node) -> TurnPlan:
+        return TurnPlan(
+            steps=list(node.steps),
+            value=node.value,
+            expected_damage=node.damage,
+            end_position=node.position,
+        )
+
+
+@lru_cache(maxsize=256)
+def _parse_actions(actions_json: str) -> Tuple[Tuple[Tuple[str, AttackProfile], ...], Tuple[str, ...]]:
+    """Parse a stat block's actions once per distinct action list."""
+    return _attack_table(
+        parse_monster_action(action, "") for action in json.loads(actions_json) if isinstance(action, dict)
+    )
+
+
+def _attack_table(
+    abilities: Iterable[MonsterAbility],
+) -> Tuple[Tuple[Tuple[str, AttackProfile], ...], Tuple[str, ...]]:
+    """
+    Weapon attacks and the multiattack pattern from parsed actions.
+
+    Returns:
+        ((lowercase name, AttackProfile) for each weapon attack,
+         the multiattack pattern's attack names)
+    """
+    attacks = {}
+    pattern: Tuple[str, ...] = ()
+    for ability in abilities:
+        if "multiattack" in ability.name.lower():
+            if not pattern:
+                pattern = tuple(ability.multiattack_pattern or ())
+            continue
+        if ability.ability_type not in (AbilityType.MELEE_ATTACK, AbilityType.RANGED_ATTACK):
+            continue
+        if not ability.damage_dice:
+            continue
+        ranged = ability.ability_type == AbilityType.RANGED_ATTACK
+        attacks[ability.name.lower()] = AttackProfile(
+            name=ability.name,
+            attack_bonus=ability.attack_bonus or 0,
+            damage_dice=ability.damage_dice,
+            reach=max(1, (ability.reach or (80 if ranged else 5)) // 5),
+            ranged=ranged,
+            damage_type=(ability.damage_type or "").lower(),
+        )
+    return tuple(attacks.items()), pattern
+
+
+def _chebyshev(a: Tuple[int, int], b: Tuple[int, int]) -> int:
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+def _as_int(value: Any, default: int) -> int:
+    return value if isinstance(value, int) and not isinstance(value, bool) else default
@@ -8,11 +8,17 @@ and the highest-scoring action is selected.
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple, Any, TYPE_CHECKING
 from enum import Enum
-import random
 
 if TYPE_CHECKING:
     from app.core.combat_engine import CombatEngine
 
+from app.core.dice import active_rng
+from app.core.monster_abilities import AbilityType
+from app.core.monster_catalog import get_combatant_abilities
+
+from .battlefield import BattlefieldSnapshot, get_battlefield_snapshot
+from .expected_value import AttackOutcome, AttackProfile, DefenseProfile, evaluate_attacks
+from .planner import AnytimePlanner, PlannerMetrics, TurnPlan, planner_budget_ms
 from .targeting import TargetEvaluator, TargetPriority
 from .environmental import EnvironmentalAnalyzer, get_environmental_analyzer
 
@@ -85,15 +91,24 @@ class TacticalAI:
         self._combatant = None
         self._stats = None
         self._ai_config = {}
+        self._battlefield: Optional[BattlefieldSnapshot] = None
+        self.last_plan: Optional[TurnPlan] = None
+        self.planner_metrics: Optional[PlannerMetrics] = None
         self._target_evaluator = TargetEvaluator(engine, combatant_id)
         self._env_analyzer = get_environmental_analyzer(engine)
         self._load_combatant_data()
 
     def _load_combatant_data(self):
-        """Load combatant data from engine."""
+        """Load combatant data and the current battlefield snapshot from engine."""
         self._combatant = self.engine.state.initiative_tracker.get_combatant(self.combatant_id)
         self._stats = self.engine.state.combatant_stats.get(self.combatant_id, {})
         self._ai_config = self._stats.get("ai_behavior", {})
+        self._battlefield = get_battlefield_snapshot(self.engine)
+
+    @property
+    def battlefield(self) -> BattlefieldSnapshot:
+        """Battlefield snapshot as of the last data refresh."""
+        return self._battlefield
 
     @property
     def combatant(self):
@@ -131,7 +146,13 @@ class TacticalAI:
         if critical:
             return critical
 
-        # 3. Generate all possible actions
+        # 3. Planner mode: search whole turns within the time budget
+        if self._ai_config.get("planner") and planner_budget_ms() > 0:
+            planned = self._plan_turn()
+            if planned:
+                return planned
+
+        # 4. Generate all possible actions
         candidates = self._generate_action_candidates(situation)
 
         if not candidates:
@@ -140,22 +161,49 @@ class TacticalAI:
                 reasoning="No valid actions available"
             )
 
-        # 4. Score each candidate
+        # 5. Score each candidate
         scored = []
         for candidate in candidates:
             score = self._score_action(candidate, situation)
             candidate.score = score
             scored.append(candidate)
 
-        # 5. Select best action (with slight randomization for variety)
+        # 6. Select best action (with slight randomization for variety)
         scored.sort(key=lambda x: x.score, reverse=True)
 
         # Add small random factor to top choices to prevent predictability
         top_choices = [a for a in scored if a.score >= scored[0].score * 0.85]
-        best_action = random.choice(top_choices) if len(top_choices) > 1 else scored[0]
+        best_action = active_rng().choice(top_choices) if len(top_choices) > 1 else scored[0]
 
         return best_action
 
+    def _plan_turn(self) -> Optional[AIDecision]:
+        """
+        Plan (move, action, bonus action) with the anytime planner.
+
+        Returns the planned action (or move), or None to fall back to
+        greedy scoring.
+        """
+        planner = AnytimePlanner(self.engine, self.combatant_id, self._battlefield)
+        plan = planner.plan()
+        self.last_plan, self.planner_metrics = plan, planner.metrics
+        if plan is None:
+            return None
+
+        action = plan.step("action")
+        move = plan.step("move")
+        if action is None and move is None:
+            return None
+
+        return AIDecision(
+            action_type=ActionType(action.action_type) if action else ActionType.MOVE,
+            target_id=action.target_id if action else None,
+            position=move.position if move else None,
+            ability_id=action.ability_id if action else None,
+            score=plan.value,
+            reasoning=plan.reasoning,
+        )
+
     def decide_bonus_action(self) -> Optional[AIDecision]:
         """
         Decide on a bonus action if available.
@@ -406,33 +454,17 @@ class TacticalAI:
         my_max_hp = self._stats.get("max_hp", 1)
         hp_percent = my_hp / my_max_hp if my_max_hp > 0 else 0
 
-        # Get allies and enemies
+        # Get allies and enemies (fresh dicts: callers annotate them)
+        my_side = self._stats.get("type", "enemy")
         allies = []
         enemies = []
-        for c in self.engine.state.initiative_tracker.combatants:
-            if not c.is_active:
-                continue
-            if c.id == self.combatant_id:
+        for view in self._battlefield.combatants.values():
+            if not view.is_active or view.id == self.combatant_id:
                 continue
-
-            c_stats = self.engine.state.combatant_stats.get(c.id, {})
-            c_type = c_stats.get("type", "enemy")
-
-            entry = {
-                "id": c.id,
-                "name": c.name,
-                "hp": c_stats.get("current_hp", 0),
-                "max_hp": c_stats.get("max_hp", 1),
-                "ac": c_stats.get("ac", 10),
-                "position": self.engine.state.positions.get(c.id, (0, 0)),
-                "conditions": c_stats.get("conditions", []),
-                "class": c_stats.get("class", ""),
-            }
-
-            if c_type == self._stats.get("type", "enemy"):
-                allies.append(entry)
+            if view.side == my_side:
+                allies.append(view.to_entry())
             else:
-                enemies.append(entry)
+                enemies.append(view.to_entry())
 
         # Evaluate targets
         enemy_ids = [e["id"] for e in enemies]
@@ -442,9 +474,10 @@ class TacticalAI:
         )
 
         # Convert to dict format for backward compatibility
+        enemies_by_id = {e["id"]: e for e in enemies}
         priority_targets = []
         for score in target_scores:
-            enemy_data = next((e for e in enemies if e["id"] == score.target_id), None)
+            enemy_data = enemies_by_id.get(score.target_id)
             if enemy_data:
                 priority_targets.append({
                     "id": score.target_id,
@@ -739,9 +772,12 @@ class TacticalAI:
         import re
         candidates = []
 
-        # Get monster's actions from stats
-        actions = self._stats.get("actions", [])
-        if not actions:
+        # Parsed actions (legendary actions are spent between turns)
+        abilities = [
+            ability for ability in get_combatant_abilities(self._stats)
+            if ability.ability_type != AbilityType.LEGENDARY_ACTION
+        ]
+        if not abilities:
             return candidates
 
         # Get recharge state from combat engine
@@ -751,8 +787,8 @@ class TacticalAI:
 
         # Check for multiattack first (usually the best option)
         has_multiattack = False
-        for action in actions:
-            action_name = action.get("name", "").lower()
+        for ability in abilities:
+            action_name = ability.name.lower()
 
             if "multiattack" in action_name:
                 has_multiattack = True
@@ -784,7 +820,7 @@ class TacticalAI:
                         action_type=ActionType.ABILITY,
                         target_id=situation["priority_targets"][0]["id"] if situation["priority_targets"] else None,
                         ability_id=ability_id,
-                        reasoning=f"Use {action.get('name', 'Breath Weapon')} on {num_enemies} enemies",
+                        reasoning=f"Use {ability.name} on {num_enemies} enemies",
                         score=80.0 + (num_enemies * 10)  # More enemies = higher value
                     ))
                 elif num_enemies == 1:
@@ -793,7 +829,7 @@ class TacticalAI:
                         action_type=ActionType.ABILITY,
                         target_id=situation["priority_targets"][0]["id"] if situation["priority_targets"] else None,
                         ability_id=ability_id,
-                        reasoning=f"Use {action.get('name', 'Breath Weapon')} on single target",
+                        reasoning=f"Use {ability.name} on single target",
                         score=60.0
                     ))
                 continue
@@ -824,7 +860,7 @@ class TacticalAI:
                         action_type=ActionType.ABILITY,
                         target_id=situation["priority_targets"][0]["id"] if situation["priority_targets"] else None,
                         ability_id=ability_id,
-                        reasoning=f"Use special ability: {action.get('name', 'Unknown')}",
+                        reasoning=f"Use special ability: {ability.name}",
                         score=70.0
                     ))
 
@@ -924,11 +960,9 @@ class TacticalAI:
         # Add priority score from target
         score += target.get("priority_score", 0)
 
-        # Bonus for potential kill (multiple attacks increase chance)
-        target_hp = target.get("hp", 100)
-        estimated_damage = self._estimate_damage() * 2  # Assume 2+ attacks
-        if target_hp <= estimated_damage:
-            score += 30
+        # Bonus for potential kill across the whole attack pattern
+        attacks = (AttackProfile.from_stats(self._stats),) * self._multiattack_count()
+        score += 30 * self._attack_outcome(attacks, target).kill_chance
 
         return score
 
@@ -949,11 +983,11 @@ class TacticalAI:
         # Add priority score from target evaluation
         score += target.get("priority_score", 0)
 
-        # Bonus for potential kill
+        # Bonus for potential kill, and for attacks likely to land
         target_hp = target.get("hp", 100)
-        estimated_damage = self._estimate_damage()
-        if target_hp <= estimated_damage:
-            score += 40  # Big bonus for potential kill
+        outcome = self._attack_outcome((AttackProfile.from_stats(self._stats),), target)
+        score += 40 * outcome.kill_chance_on_hit
+        score += (outcome.hit_chance - 0.5) * 20
 
         # Bonus for attacking low HP targets
         hp_percent = target_hp / max(1, target.get("max_hp", 1))
@@ -1027,6 +1061,28 @@ class TacticalAI:
 
         return score
 
+    def _attack_outcome(self, attacks: Tuple[AttackProfile, ...], target: Dict) -> AttackOutcome:
+        """Expected outcome of attacks against a situation target entry."""
+        stats = self.engine.state.combatant_stats.get(target["id"]) or {
+            "ac": target.get("ac", 10),
+            "current_hp": target.get("hp", 1),
+        }
+        defense = DefenseProfile.from_stats(stats, target.get("conditions"))
+        return evaluate_attacks(
+            attacks,
+            defense.with_hp(target.get("hp", defense.hp)),
+            self._stats.get("conditions") or (),
+            target.get("distance", 5),
+        )
+
+    def _multiattack_count(self) -> int:
+        """Attacks in this creature's multiattack (2 if unstated)."""
+        for ability in get_combatant_abilities(self._stats):
+            if "multiattack" in ability.name.lower():
+                pattern = ability.multiattack_pattern
+                return len(pattern) if pattern else 2
+        return 2
+
     def _estimate_damage(self) -> int:
         """Estimate damage output per attack."""
         damage_dice = self._stats.get("damage_dice", "1d6")
@@ -1126,7 +1182,7 @@ def get_ai_for_combatant(engine: "CombatEngine", combatant_id: str):
         return get_ai_for_role("spellcaster", engine, combatant_id)
 
     # Check for ranged weapon
-    equipment = stats.get("equipment", {})
+    equipment = stats.get("equipment") or {}
     if equipment.get("ranged"):
         return get_ai_for_role("ranged_striker", engine, combatant_id)
 
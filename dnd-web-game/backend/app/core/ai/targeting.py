@@ -8,6 +8,8 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
 from enum import Enum
 
+from .battlefield import BattlefieldSnapshot, estimate_threat, get_battlefield_snapshot
+
 if TYPE_CHECKING:
     from app.core.combat_engine import CombatEngine
 
@@ -89,17 +91,33 @@ class TargetEvaluator:
         "bard": ["strength"],
     }
 
-    def __init__(self, engine: "CombatEngine", evaluator_id: str):
+    def __init__(
+        self,
+        engine: "CombatEngine",
+        evaluator_id: str,
+        battlefield: Optional[BattlefieldSnapshot] = None,
+    ):
         """
         Initialize target evaluator.
 
         Args:
             engine: The combat engine instance
             evaluator_id: ID of the combatant doing the evaluating
+            battlefield: Snapshot to evaluate against (default: current)
         """
         self.engine = engine
         self.evaluator_id = evaluator_id
-        self._cache = {}
+        self._battlefield = battlefield
+
+    @property
+    def battlefield(self) -> BattlefieldSnapshot:
+        """The pinned snapshot, or the engine's current one."""
+        return self._battlefield or get_battlefield_snapshot(self.engine)
+
+    @battlefield.setter
+    def battlefield(self, battlefield: Optional[BattlefieldSnapshot]) -> None:
+        """Re-pin the evaluator (None follows the engine's current snapshot)."""
+        self._battlefield = battlefield
 
     def get_evaluator_position(self) -> Optional[Tuple[int, int]]:
         """Get the position of the evaluating combatant."""
@@ -126,9 +144,10 @@ class TargetEvaluator:
             List of TargetScore sorted by total_score descending
         """
         scores = []
+        battlefield = self.battlefield
 
         for target_id in enemy_ids:
-            score = self.evaluate_target(target_id, priority)
+            score = self._score_target(battlefield, target_id, priority)
             if score:
                 scores.append(score)
 
@@ -151,7 +170,16 @@ class TargetEvaluator:
         Returns:
             TargetScore with breakdown of scoring factors
         """
-        target = self.engine.state.initiative_tracker.get_combatant(target_id)
+        return self._score_target(self.battlefield, target_id, priority)
+
+    def _score_target(
+        self,
+        battlefield: BattlefieldSnapshot,
+        target_id: str,
+        priority: TargetPriority,
+    ) -> Optional[TargetScore]:
+        """Score one target against a battlefield snapshot."""
+        target = battlefield.get(target_id)
         if not target or not target.is_active:
             return None
 
@@ -160,11 +188,14 @@ class TargetEvaluator:
 
         # Calculate individual scores
         hp_score = self._calculate_hp_score(target, target_stats, reasons)
-        threat_score = self._calculate_threat_score(target_stats, reasons)
+        threat_score = target.threat
+        reasons.extend(target.threat_reasons)
         class_score = self._calculate_class_score(target_stats, reasons)
         condition_score = self._calculate_condition_score(target, reasons)
-        position_score = self._calculate_position_score(target_id, reasons)
-        tactical_score = self._calculate_tactical_score(target_id, target_stats, reasons)
+        position_score = self._calculate_position_score(target_id, reasons, battlefield)
+        tactical_score = self._calculate_tactical_score(
+            target_id, target_stats, reasons, battlefield
+        )
 
         # Weight scores based on priority
         weights = self._get_priority_weights(priority)
@@ -235,34 +266,9 @@ class TargetEvaluator:
         """
         Score based on target's damage output potential.
         """
-        score = 0.0
-
-        # Check for equipped weapons
-        equipment = target_stats.get("equipment", {})
-        main_weapon = equipment.get("main_hand")
-        if main_weapon:
-            damage_dice = main_weapon.get("damage_dice", "1d6")
-            # Parse average damage from dice
-            avg_damage = self._estimate_dice_average(damage_dice)
-            score += avg_damage * 2
-
-            if avg_damage >= 10:
-                reasons.append(f"High damage weapon ({damage_dice})")
-
-        # Check for spellcasting
-        spellcasting = target_stats.get("spellcasting")
-        if spellcasting:
-            spell_slots = spellcasting.get("spell_slots", {})
-            total_slots = sum(spell_slots.values())
-            if total_slots > 0:
-                score += total_slots * 5
-                reasons.append(f"Has {total_slots} spell slots")
-
-        # Check level
-        level = target_stats.get("level", 1)
-        score += level * 3
-
-        return min(score, 100.0)
+        score, threat_reasons = estimate_threat(target_stats)
+        reasons.extend(threat_reasons)
+        return score
 
     def _calculate_class_score(
         self,
@@ -333,21 +339,20 @@ class TargetEvaluator:
         self,
         target_id: str,
         reasons: List[str],
+        battlefield: Optional[BattlefieldSnapshot] = None,
     ) -> float:
         """
         Score based on target's position relative to evaluator.
         Closer targets are generally better.
         """
-        my_pos = self.get_evaluator_position()
-        target_pos = self.engine.state.positions.get(target_id)
+        battlefield = battlefield or self.battlefield
+        distance = battlefield.distance(self.evaluator_id, target_id)
 
-        if not my_pos or not target_pos:
+        if distance is None:
             return 50.0  # Default middle score
 
-        if isinstance(target_pos, dict):
-            target_pos = (target_pos.get("x", 0), target_pos.get("y", 0))
-
-        distance = abs(my_pos[0] - target_pos[0]) + abs(my_pos[1] - target_pos[1])
+        my_pos = battlefield.position(self.evaluator_id)
+        target_pos = battlefield.position(target_id)
 
         # Adjacent - highest priority
         if distance <= 1:
@@ -357,29 +362,42 @@ class TargetEvaluator:
         # Close range (2-3 squares)
         if distance <= 3:
             reasons.append("Close range")
-            return 80.0
-
+            score = 80.0
         # Medium range (4-6 squares)
-        if distance <= 6:
-            return 60.0
-
+        elif distance <= 6:
+            score = 60.0
         # Long range (7-12 squares)
-        if distance <= 12:
-            return 40.0
-
+        elif distance <= 12:
+            score = 40.0
         # Very far
-        reasons.append("Far away")
-        return 20.0
+        else:
+            reasons.append("Far away")
+            score = 20.0
+
+        # Cover from the grid's cached sight lines
+        grid = getattr(self.engine.state, "grid", None)
+        if grid:
+            sight = grid.get_sight_line(my_pos[0], my_pos[1], target_pos[0], target_pos[1])
+            if not sight.has_line_of_sight:
+                reasons.append("No line of sight")
+                score -= 20.0
+            elif sight.cover:
+                reasons.append(f"Behind cover (+{sight.cover} AC)")
+                score -= sight.cover * 2
+
+        return score
 
     def _calculate_tactical_score(
         self,
         target_id: str,
         target_stats: Dict,
         reasons: List[str],
+        battlefield: Optional[BattlefieldSnapshot] = None,
     ) -> float:
         """
         Score based on tactical considerations.
         """
+        battlefield = battlefield or self.battlefield
         score = 0.0
 
         # Check if target has used their reaction
@@ -391,28 +409,8 @@ class TargetEvaluator:
                 reasons.append("Reaction already used")
 
         # Check if target is isolated (no allies nearby)
-        target_pos = self.engine.state.positions.get(target_id)
-        if target_pos:
-            if isinstance(target_pos, dict):
-                target_pos = (target_pos.get("x", 0), target_pos.get("y", 0))
-
-            # Count allies near target
-            target_combatant = self.engine.state.initiative_tracker.get_combatant(target_id)
-            ally_count = 0
-
-            if target_combatant:
-                for cid, cpos in self.engine.state.positions.items():
-                    if cid == target_id:
-                        continue
-                    other = self.engine.state.initiative_tracker.get_combatant(cid)
-                    if not other or not other.is_active:
-                        continue
-                    if other.combatant_type == target_combatant.combatant_type:
-                        if isinstance(cpos, dict):
-                            cpos = (cpos.get("x", 0), cpos.get("y", 0))
-                        dist = abs(target_pos[0] - cpos[0]) + abs(target_pos[1] - cpos[1])
-                        if dist <= 2:
-                            ally_count += 1
+        if battlefield.position(target_id):
+            ally_count = battlefield.nearby_allies.get(target_id, 0)
 
             if ally_count == 0:
                 score += 25.0
@@ -452,30 +450,6 @@ class TargetEvaluator:
 
         return weights
 
-    def _estimate_dice_average(self, dice_str: str) -> float:
-        """Estimate average roll from dice string like '2d6'."""
-        try:
-            if "d" not in dice_str.lower():
-                return float(dice_str)
-
-            parts = dice_str.lower().split("d")
-            num_dice = int(parts[0]) if parts[0] else 1
-            die_size = int(parts[1].split("+")[0].split("-")[0])
-
-            avg = num_dice * (die_size + 1) / 2
-
-            # Add modifier if present
-            if "+" in dice_str:
-                mod = int(dice_str.split("+")[1])
-                avg += mod
-            elif "-" in parts[1]:
-                mod = int(parts[1].split("-")[1])
-                avg -= mod
-
-            return avg
-        except (ValueError, IndexError):
-            return 3.5  # Default to 1d6 average
-
     def get_best_target(
         self,
         enemy_ids: List[str],
@@ -568,8 +542,9 @@ class TargetEvaluator:
         targets = []
         save_type_lower = save_type.lower()
 
+        battlefield = self.battlefield
         for eid in enemy_ids:
-            target = self.engine.state.initiative_tracker.get_combatant(eid)
+            target = battlefield.get(eid)
             if not target or not target.is_active:
                 continue
 
@@ -0,0 +1,183 @@
+"""
+Area of Effect Templates.
+
+Rasterizes 5e area shapes (sphere, cylinder, cube, cone, line) onto grid
+cells. A square is inside a template when its centre is, which is the
+grid rule of thumb for "at least half the square is covered".
+
+Masks are computed once per (shape, size, direction, width) as offsets
+from the point of origin and cached, so placing the same Fireball or
+breath weapon again is a translation plus a lookup in the spatial index.
+"""
+import math
+from functools import lru_cache
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+# Distinct template masks kept in memory
+TEMPLATE_CACHE_SIZE = 512
+
+# Half-angle of a 5e cone: its width at any point equals its distance
+# from the origin, so the edges sit atan(1/2) off the centre line.
+CONE_HALF_ANGLE = math.atan(0.5)
+
+# Shapes that are aimed from the origin rather than centred on it
+DIRECTED_SHAPES = frozenset({"cone", "line"})
+
+AREA_SHAPES = frozenset({"sphere", "cylinder", "cube", "cone", "line"})
+
+# The eight compass headings, used when an aimed area has no explicit target
+COMPASS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+
+def shape_name(shape: Any) -> str:
+    """Normalize an AreaShape, SpellTargetType or string to a shape name."""
+    return str(getattr(shape, "value", shape) or "").lower()
+
+
+def _heading(direction: Optional[Cell]) -> Optional[Cell]:
+    """Reduce a direction vector so parallel aims share one cached mask."""
+    if not direction or direction == (0, 0):
+        return None
+    dx, dy = int(direction[0]), int(direction[1])
+    divisor = math.gcd(dx, dy) or 1
+    return dx // divisor, dy // divisor
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _mask(shape: str, size_ft: int, heading: Optional[Cell], width_ft: int) -> FrozenSet[Cell]:
+    size = size_ft / 5
+    cells = set()
+
+    if shape in ("sphere", "cylinder"):
+        reach = int(size)
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                if dx * dx + dy * dy <= size * size:
+                    cells.add((dx, dy))
+        return frozenset(cells)
+
+    if shape == "cube":
+        side = max(1, int(round(size)))
+        if heading is None:
+            # Centred on the point of origin
+            start = -(side // 2)
+            return frozenset(
+                (start + i, start + j) for i in range(side) for j in range(side)
+            )
+        # The origin sits on one face; the cube extends away from it
+        hx, hy = heading
+        xs = range(1, side + 1) if hx > 0 else range(-side, 0) if hx < 0 else range(-(side // 2), side - side // 2)
+        ys = range(1, side + 1) if hy > 0 else range(-side, 0) if hy < 0 else range(-(side // 2), side - side // 2)
+        return frozenset((x, y) for x in xs for y in ys)
+
+    if heading is None:
+        return frozenset()
+
+    norm = math.hypot(*heading)
+    ux, uy = heading[0] / norm, heading[1] / norm
+    reach = int(math.ceil(size))
+
+    if shape == "cone":
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                if (dx, dy) == (0, 0) or dx * dx + dy * dy > size * size:
+                    continue
+                cos_offset = (dx * ux + dy * uy) / math.hypot(dx, dy)
+                if cos_offset >= math.cos(CONE_HALF_ANGLE) - 1e-9:
+                    cells.add((dx, dy))
+        return frozenset(cells)
+
+    if shape == "line":
+        half = max(width_ft, 5) / 10
+        for dx in range(-reach - 1, reach + 2):
+            for dy in range(-reach - 1, reach + 2):
+                along = dx * ux + dy * uy
+                across = abs(dx * uy - dy * ux)
+                if 0 < along <= size + 1e-9 and across <= half + 1e-9:
+                    cells.add((dx, dy))
+        return frozenset(cells)
+
+    return frozenset()
+
+
+def template_mask(
+    shape: Any,
+    size_ft: int,
+    direction: Optional[Cell] = None,
+    width_ft: int = 5,
+) -> FrozenSet[Cell]:
+    """
+    Cached cell offsets covered by an area template.
+
+    Args:
+        shape: "sphere", "cylinder", "cube", "cone" or "line" (or an enum of them)
+        size_ft: Radius (sphere, cylinder), side (cube) or length (cone, line)
+        direction: Aim as a (dx, dy) vector; required for cones and lines
+        width_ft: Line width
+
+    Returns:
+        Offsets from the point of origin. The origin itself is excluded
+        from cones and lines (the caster stands there).
+    """
+    name = shape_name(shape)
+    heading = _heading(direction)
+    if name not in DIRECTED_SHAPES and name != "cube":
+        heading = None
+    return _mask(name, int(size_ft), heading, int(width_ft) if name == "line" else 5)
+
+
+def template_cells(
+    shape: Any,
+    size_ft: int,
+    origin: Cell,
+    toward: Optional[Cell] = None,
+    width_ft: int = 5,
+) -> List[Cell]:
+    """
+    Grid cells covered by a template placed at ``origin``.
+
+    Args:
+        shape: Area shape
+        size_ft: Template size in feet
+        origin: Point of origin (centre for spheres, the caster for cones and lines)
+        toward: Cell the template is aimed at (cones, lines, directed cubes)
+        width_ft: Line width
+
+    Returns:
+        Covered cells
+    """
+    ox, oy = origin
+    direction = (toward[0] - ox, toward[1] - oy) if toward else None
+    return [(ox + dx, oy + dy) for dx, dy in template_mask(shape, size_ft, direction, width_ft)]
+
+
+def best_compass_heading(
+    shape: Any,
+    size_ft: int,
+    origin: Cell,
+    occupied: Iterable[Cell],
+    width_ft: int = 5,
+) -> Cell:
+    """Compass point to aim an area at so it covers the most occupied cells."""
+    ox, oy = origin
+    offsets = [(x - ox, y - oy) for x, y in occupied]
+    best, best_count = COMPASS[0], -1
+    for heading in COMPASS:
+        mask = template_mask(shape, size_ft, heading, width_ft)
+        count = sum(1 for offset in offsets if offset in mask)
+        if count > best_count:
+            best, best_count = heading, count
+    return ox + best[0], oy + best[1]
+
+
+def get_template_cache_stats() -> dict:
+    """Hit/miss counters for the template mask cache."""
+    info = _mask.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
@@ -1,11 +1,15 @@
 """
 D&D Combat Engine - Cache Service
-In-memory caching with optional Redis support.
+In-memory LRU/TTL caching with an optional on-disk SQLite tier.
 """
 import asyncio
 import logging
-from typing import Any, Optional, Callable, TypeVar, Dict
-from datetime import datetime, timedelta
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Callable, TypeVar, Dict, List, Tuple
 from functools import wraps
 import hashlib
 import json
@@ -18,13 +22,323 @@ T = TypeVar('T')
 class CacheEntry:
     """A single cache entry with expiration."""
 
-    def __init__(self, value: Any, ttl: int):
+    __slots__ = ("value", "created_at", "expires_at", "size", "hit_count")
+
+    def __init__(self, value: Any, ttl: float, size: int = 0, created_at: Optional[float] = None):
         self.value = value
-        self.created_at = datetime.utcnow()
-        self.expires_at = self.created_at + timedelta(seconds=ttl)
+        self.created_at = created_at if created_at is not None else time.time()
+        self.expires_at = self.created_at + ttl
+        self.size = size
+        self.hit_count = 0
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) > self.expires_at
+
+
+class SQLiteCacheStore:
+    """
+    On-disk tier for LRUCache.
+
+    Values are stored as JSON with their absolute expiry so warmed
+    entries survive restarts and deploys. Writes go through; reads only
+    happen on an in-memory miss.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+        self.prune_expired()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        """Return (value, created_at, expires_at) for a live key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, expires_at FROM cache_entries"
+                " WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key: str, value: Any, created_at: float, expires_at: float) -> None:
+        """Write an entry (replacing any previous value)."""
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            # Only JSON values are persisted; the memory tier still has it
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, created_at, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, payload, created_at, expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove every entry whose key starts with prefix."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def prune_expired(self) -> int:
+        """Remove expired entries; returns how many were removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def count(self) -> int:
+        """Number of stored entries (including not-yet-pruned expired ones)."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class LRUCache:
+    """
+    Synchronous LRU cache with TTL, an optional byte bound and disk tier.
+
+    Backed by an OrderedDict kept in recency order, so lookups, inserts
+    and evictions are O(1). Keys of the form "namespace:rest" get
+    per-namespace hit/miss metrics.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl: float = 300,
+        max_bytes: Optional[int] = None,
+        store: Optional[SQLiteCacheStore] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of in-memory entries
+            default_ttl: Default time-to-live in seconds
+            max_bytes: Maximum estimated size of in-memory values (None = unbounded)
+            store: Optional on-disk tier consulted on memory misses
+        """
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.store = store
+        self.bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._namespace_stats: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not entry.is_expired()
+
+    def keys(self) -> List[str]:
+        """Snapshot of in-memory keys, least recently used first."""
+        return list(self._entries.keys())
+
+    def entries(self) -> List[Tuple[str, CacheEntry]]:
+        """Snapshot of in-memory (key, entry) pairs, least recently used first."""
+        return list(self._entries.items())
+
+    def _record(self, key: str, hit: bool) -> None:
+        namespace = key.split(":", 1)[0] if ":" in key else ""
+        stats = self._namespace_stats.get(namespace)
+        if stats is None:
+            stats = self._namespace_stats[namespace] = {"hits": 0, "misses": 0}
+        if hit:
+            self.hits += 1
+            stats["hits"] += 1
+        else:
+            self.misses += 1
+            stats["misses"] += 1
+
+    def _measure(self, value: Any) -> int:
+        """Estimated size of a value in bytes (only when byte-bounded)."""
+        if self.max_bytes is None:
+            return 0
+        if isinstance(value, str):
+            return len(value.encode())
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old.size
+        self._entries[key] = entry
+        self.bytes += entry.size
+
+        # Evict least recently used until within bounds (keep the new entry)
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_size
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value, refreshing its recency.
 
-    def is_expired(self) -> bool:
-        return datetime.utcnow() > self.expires_at
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found/expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.is_expired():
+                self._remove(key)
+            else:
+                self._entries.move_to_end(key)
+                entry.hit_count += 1
+                self._record(key, hit=True)
+                return entry.value
+
+        if self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                value, created_at, expires_at = stored
+                entry = CacheEntry(value, expires_at - created_at, self._measure(value), created_at)
+                entry.hit_count = 1
+                self._insert(key, entry)
+                self.disk_hits += 1
+                self._record(key, hit=True)
+                return value
+
+        self._record(key, hit=False)
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Set a value (most recently used).
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (uses default if not specified)
+        """
+        entry = CacheEntry(value, ttl or self.default_ttl, self._measure(value))
+        self._insert(key, entry)
+        if self.store is not None:
+            self.store.set(key, value, entry.created_at, entry.expires_at)
+
+    def delete(self, key: str) -> bool:
+        """Delete a key from every tier; True if it was in memory."""
+        existed = self._remove(key) is not None
+        if self.store is not None:
+            self.store.delete(key)
+        return existed
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with prefix; returns in-memory count."""
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        if self.store is not None:
+            self.store.delete_prefix(prefix)
+        return len(keys)
+
+    def clear(self) -> int:
+        """Clear every tier; returns the number of in-memory entries removed."""
+        count = len(self._entries)
+        self._entries.clear()
+        self.bytes = 0
+        if self.store is not None:
+            self.store.clear()
+        return count
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries; returns the number removed from memory."""
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if entry.is_expired(now)]
+        for key in expired:
+            self._remove(key)
+        if self.store is not None:
+            self.store.prune_expired()
+        return len(expired)
+
+    def reset_stats(self) -> None:
+        """Reset hit/miss counters."""
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._namespace_stats.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics, including per-namespace hit rates."""
+        def rate(hits: int, misses: int) -> float:
+            total = hits + misses
+            return round(hits / total * 100, 1) if total else 0.0
+
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": rate(self.hits, self.misses),
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "persistent": self.store is not None,
+            "by_namespace": {
+                namespace: {**stats, "hit_rate": rate(stats["hits"], stats["misses"])}
+                for namespace, stats in self._namespace_stats.items()
+            },
+        }
 
 
 class CacheService:
@@ -32,31 +346,49 @@ class CacheService:
     In-memory cache service with TTL support.
 
     Features:
-    - Key-value storage with TTL
+    - Key-value storage with TTL and O(1) LRU eviction (see LRUCache)
+    - Optional byte bound and on-disk SQLite tier
     - Pattern-based invalidation
     - Cache statistics
     - Decorator for easy caching
     """
 
-    def __init__(self, default_ttl: int = 300, max_size: int = 1000):
+    def __init__(
+        self,
+        default_ttl: int = 300,
+        max_size: int = 1000,
+        max_bytes: Optional[int] = None,
+        db_path: Optional[str] = None,
+    ):
         """
         Initialize cache service.
 
         Args:
             default_ttl: Default time-to-live in seconds (5 minutes)
             max_size: Maximum number of cache entries
+            max_bytes: Maximum estimated size of cached values (None = unbounded)
+            db_path: SQLite file for a persistent tier (None = memory only)
         """
-        self._cache: Dict[str, CacheEntry] = {}
+        self._cache = LRUCache(
+            max_size=max_size,
+            default_ttl=default_ttl,
+            max_bytes=max_bytes,
+            store=SQLiteCacheStore(db_path) if db_path else None,
+        )
         self.default_ttl = default_ttl
         self.max_size = max_size
 
-        # Statistics
-        self.hits = 0
-        self.misses = 0
-
         # Cleanup task
         self._cleanup_task = None
 
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
     async def start(self):
         """Start the cache cleanup background task."""
         if self._cleanup_task is None:
@@ -82,28 +414,9 @@ class CacheService:
 
     def _cleanup_expired(self):
         """Remove expired entries."""
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if entry.is_expired()
-        ]
-        for key in expired_keys:
-            del self._cache[key]
-
-        if expired_keys:
-            logger.debug(f"[Cache] Cleaned up {len(expired_keys)} expired entries")
-
-    def _enforce_max_size(self):
-        """Remove oldest entries if cache exceeds max size."""
-        if len(self._cache) > self.max_size:
-            # Sort by creation time and remove oldest
-            sorted_keys = sorted(
-                self._cache.keys(),
-                key=lambda k: self._cache[k].created_at
-            )
-            to_remove = sorted_keys[:len(self._cache) - self.max_size]
-            for key in to_remove:
-                del self._cache[key]
-            logger.debug(f"[Cache] Evicted {len(to_remove)} entries due to size limit")
+        removed = self._cache.cleanup_expired()
+        if removed:
+            logger.debug(f"[Cache] Cleaned up {removed} expired entries")
 
     # ==================== Core Operations ====================
 
@@ -117,19 +430,7 @@ class CacheService:
         Returns:
             Cached value or None if not found/expired
         """
-        entry = self._cache.get(key)
-
-        if entry is None:
-            self.misses += 1
-            return None
-
-        if entry.is_expired():
-            del self._cache[key]
-            self.misses += 1
-            return None
-
-        self.hits += 1
-        return entry.value
+        return self._cache.get(key)
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
@@ -140,9 +441,7 @@ class CacheService:
             value: Value to cache
             ttl: Time-to-live in seconds (uses default if not specified)
         """
-        ttl = ttl or self.default_ttl
-        self._cache[key] = CacheEntry(value, ttl)
-        self._enforce_max_size()
+        self._cache.set(key, value, ttl or self.default_ttl)
 
     async def delete(self, key: str) -> bool:
         """
@@ -154,17 +453,11 @@ class CacheService:
         Returns:
             True if key existed, False otherwise
         """
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        return self._cache.delete(key)
 
     async def exists(self, key: str) -> bool:
         """Check if a key exists and is not expired."""
-        entry = self._cache.get(key)
-        if entry is None or entry.is_expired():
-            return False
-        return True
+        return key in self._cache
 
     async def invalidate(self, pattern: str) -> int:
         """
@@ -177,21 +470,14 @@ class CacheService:
             Number of keys invalidated
         """
         if pattern.endswith('*'):
-            prefix = pattern[:-1]
-            keys_to_delete = [
-                key for key in self._cache.keys()
-                if key.startswith(prefix)
-            ]
+            count = self._cache.delete_prefix(pattern[:-1])
         else:
-            keys_to_delete = [pattern] if pattern in self._cache else []
-
-        for key in keys_to_delete:
-            del self._cache[key]
+            count = 1 if self._cache.delete(pattern) else 0
 
-        if keys_to_delete:
-            logger.debug(f"[Cache] Invalidated {len(keys_to_delete)} keys matching '{pattern}'")
+        if count:
+            logger.debug(f"[Cache] Invalidated {count} keys matching '{pattern}'")
 
-        return len(keys_to_delete)
+        return count
 
     async def clear(self) -> None:
         """Clear all cache entries."""
@@ -248,22 +534,16 @@ class CacheService:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        total_requests = self.hits + self.misses
-        hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
-
+        stats = self._cache.get_stats()
         return {
-            'entries': len(self._cache),
-            'max_size': self.max_size,
-            'hits': self.hits,
-            'misses': self.misses,
-            'hit_rate': f'{hit_rate:.1f}%',
+            **stats,
+            'hit_rate': f"{stats['hit_rate']:.1f}%",
             'default_ttl': self.default_ttl
         }
 
     def reset_stats(self):
         """Reset cache statistics."""
-        self.hits = 0
-        self.misses = 0
+        self._cache.reset_stats()
 
 
 # ==================== Decorator ====================
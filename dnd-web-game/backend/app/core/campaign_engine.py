@@ -45,6 +45,8 @@ from app.core.combat_storage import active_combats, active_grids, reactions_mana
 from app.services.ai_dm import get_ai_dm
 from app.core.progression import calculate_encounter_xp, can_level_up, get_xp_for_cr
 from app.core.loot_system import get_loot_generator
+from app.core.monster_catalog import get_monster_catalog
+from app.core.rules_catalog import get_rules_catalog
 
 
 class CampaignAction(str, Enum):
@@ -997,6 +999,7 @@ class CampaignEngine:
                     },
                     "weapons": [],
                     "actions": template.get("actions", []),
+                    "monster_id": template.get("monster_id"),
                 }
                 enemies.append(enemy_dict)
 
@@ -1044,19 +1047,25 @@ class CampaignEngine:
         return enemies
 
     def _load_enemy_template(self, template_id: str) -> Optional[Dict[str, Any]]:
-        """Load enemy template from data files."""
+        """
+        Load an enemy template.
+
+        Campaign-specific templates in data/enemies win; any other ID is
+        taken from the 2024 monster catalog.
+        """
         if template_id in self._enemy_cache:
             return self._enemy_cache[template_id]
 
-        enemies_path = Path(__file__).parent.parent / "data" / "enemies" / f"{template_id}.json"
-        try:
-            with open(enemies_path) as f:
-                data = json.load(f)
-            self._enemy_cache[template_id] = data
-            return data
-        except Exception as e:
-            print(f"[CampaignEngine] Failed to load enemy template {template_id}: {e}")
-            return None
+        data = get_rules_catalog().get(f"enemies/{template_id}.json")
+        if data is None:
+            monster = get_monster_catalog().get(template_id)
+            if monster is None:
+                print(f"[CampaignEngine] Unknown enemy template {template_id}")
+                return None
+            data = dict(monster.as_enemy_template(), monster_id=monster.id)
+
+        self._enemy_cache[template_id] = data
+        return data
 
     def _end_combat(
         self,
@@ -4,13 +4,12 @@ Combat Engine.
 Core state machine for managing combat encounters.
 Handles combat phases, actions, and turn resolution.
 """
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import List, Optional, Dict, Any, Callable
-from pathlib import Path
+from typing import List, Optional, Dict, Any, Callable, Deque, Set
 import json
 import uuid
-import random
 
 from app.core.initiative import (
     InitiativeTracker,
@@ -18,7 +17,7 @@ from app.core.initiative import (
     CombatantType,
     create_initiative_tracker,
 )
-from app.core.dice import roll_d20, roll_damage
+from app.core.dice import D20Result, DiceRoller, roll_d20, roll_damage, roll_die
 from app.core.rules_engine import (
     resolve_attack,
     apply_damage,
@@ -38,6 +37,11 @@ from app.core.movement import (
     CombatGrid,
     check_opportunity_attack_triggers,
 )
+from app.core.aoe_templates import best_compass_heading
+from app.core.spatial_index import PositionIndex, to_cell
+from app.core.stat_blocks import StatBlocks
+from app.core.rules_catalog import get_rules_catalog, on_catalog_reload
+from app.core.threat_map import get_threat_map
 from app.core.ammunition import (
     AmmunitionTracker,
     check_ammunition_for_attack,
@@ -70,12 +74,10 @@ def load_weapon_data(weapon_id: str) -> Optional[Dict[str, Any]]:
     if weapon_id in _weapon_cache:
         return _weapon_cache[weapon_id]
 
-    # Load weapons file if cache is empty
+    # Index the weapons file if cache is empty
     if not _weapon_cache:
-        weapons_path = Path(__file__).parent.parent / "data" / "weapons" / "weapons.json"
+        data = get_rules_catalog().get("weapons/weapons.json")
         try:
-            with open(weapons_path) as f:
-                data = json.load(f)
             # Index all weapons by ID
             for category in data.get("weapons", {}).values():
                 for weapon in category:
@@ -87,6 +89,10 @@ def load_weapon_data(weapon_id: str) -> Optional[Dict[str, Any]]:
     return _weapon_cache.get(weapon_id)
 
 
+# Re-index when the rules data is hot-reloaded
+on_catalog_reload(_weapon_cache.clear)
+
+
 class CombatPhase(Enum):
     """Current phase of combat."""
     NOT_IN_COMBAT = auto()
@@ -228,6 +234,111 @@ class CombatEvent:
     combatant_id: Optional[str]
     description: str
     data: Dict[str, Any] = field(default_factory=dict)
+    sequence: int = 0  # 1-based position in the combat's full event history
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the event."""
+        return {
+            "type": self.event_type,
+            "round": self.round_number,
+            "combatant_id": self.combatant_id,
+            "description": self.description,
+            "data": self.data,
+            "sequence": self.sequence,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CombatEvent":
+        """Deserialize an event."""
+        return cls(
+            event_type=data["type"],
+            round_number=data["round"],
+            combatant_id=data.get("combatant_id"),
+            description=data["description"],
+            data=data.get("data", {}),
+            sequence=data.get("sequence", 0),
+        )
+
+
+# Events kept in memory per combat; older events live only in the journal
+EVENT_LOG_CAPACITY = 200
+
+
+def _new_event_log() -> Deque[CombatEvent]:
+    return deque(maxlen=EVENT_LOG_CAPACITY)
+
+
+@dataclass
+class CombatStateDelta:
+    """
+    Changes to a combat since it was last persisted.
+
+    Only changed sections are set; None means "unchanged". Combatant stats
+    are tracked per combatant so one goblin taking damage does not rewrite
+    every stat block.
+    """
+    phase: Optional[str] = None
+    round_number: Optional[int] = None
+    current_turn_index: Optional[int] = None
+    current_turn_changed: bool = False
+    current_turn: Optional[Dict[str, Any]] = None
+    positions: Optional[Dict[str, Any]] = None
+    initiative_order: Optional[List[Dict[str, Any]]] = None
+    combatant_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    removed_combatants: List[str] = field(default_factory=list)
+
+    # Sections to mark clean once this delta is written: the STATE_SECTIONS
+    # names, "positions" and "stats:<combatant_id>"
+    sections: Set[str] = field(default_factory=set)
+
+    def is_empty(self) -> bool:
+        """Check if there is nothing to write."""
+        return not self.sections
+
+    @property
+    def has_stats_changes(self) -> bool:
+        """Check if any combatant stat block changed."""
+        return bool(self.combatant_stats or self.removed_combatants)
+
+    def merge(self, newer: "CombatStateDelta") -> "CombatStateDelta":
+        """Fold a newer delta into this one (newer values win)."""
+        merged = CombatStateDelta(
+            phase=newer.phase if newer.phase is not None else self.phase,
+            round_number=newer.round_number if newer.round_number is not None else self.round_number,
+            current_turn_index=(
+                newer.current_turn_index
+                if newer.current_turn_index is not None
+                else self.current_turn_index
+            ),
+            current_turn_changed=self.current_turn_changed or newer.current_turn_changed,
+            current_turn=newer.current_turn if newer.current_turn_changed else self.current_turn,
+            positions=newer.positions if newer.positions is not None else self.positions,
+            initiative_order=(
+                newer.initiative_order
+                if newer.initiative_order is not None
+                else self.initiative_order
+            ),
+            combatant_stats={
+                cid: stats for cid, stats in self.combatant_stats.items()
+                if cid not in newer.removed_combatants
+            },
+            removed_combatants=[
+                cid for cid in self.removed_combatants
+                if cid not in newer.combatant_stats
+            ],
+            sections=self.sections | newer.sections,
+        )
+        merged.combatant_stats.update(newer.combatant_stats)
+        merged.removed_combatants.extend(
+            cid for cid in newer.removed_combatants if cid not in merged.removed_combatants
+        )
+        return merged
+
+
+# Scalar and small sections of a persisted combat state. Mutation points
+# mark them with CombatState.mark_dirty(); positions and stat blocks track
+# their own writes (PositionIndex.dirty, StatBlocks.dirty).
+STATE_SECTIONS = ("phase", "round", "turn_index", "current_turn", "initiative_order")
 
 
 @dataclass
@@ -241,16 +352,25 @@ class CombatState:
     phase: CombatPhase = CombatPhase.NOT_IN_COMBAT
     initiative_tracker: InitiativeTracker = field(default_factory=InitiativeTracker)
     current_turn: Optional[TurnState] = None
-    event_log: List[CombatEvent] = field(default_factory=list)
+    # Most recent events only (ring buffer); see get_unjournaled_events()
+    event_log: Deque[CombatEvent] = field(default_factory=_new_event_log)
+
+    # Total events ever added, and how many of those the journal has stored
+    event_sequence: int = 0
+    journaled_sequence: int = 0
 
-    # Grid positions (combatant_id -> (x, y))
-    positions: Dict[str, tuple] = field(default_factory=dict)
+    # Seedable dice stream; batched rolls (initiative, AoE saves,
+    # multiattack) draw from it so a combat can be replayed from its seed
+    dice: DiceRoller = field(default_factory=DiceRoller)
+
+    # Grid positions (combatant_id -> (x, y)); indexed by cell and bucket
+    positions: Dict[str, tuple] = field(default_factory=PositionIndex)
 
     # Combat grid for terrain, elevation, and cover
     grid: Optional[CombatGrid] = None
 
-    # Combatant details cache (for quick lookup)
-    combatant_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Combatant details cache (for quick lookup); tracks which blocks changed
+    combatant_stats: Dict[str, Dict[str, Any]] = field(default_factory=StatBlocks)
 
     # Monster ability recharge tracking: {monster_id: {ability_id: is_available}}
     monster_ability_recharge: Dict[str, Dict[str, bool]] = field(default_factory=dict)
@@ -265,6 +385,62 @@ class CombatState:
     # Resets at the start of each combatant's turn
     reactions_used_this_round: Dict[str, bool] = field(default_factory=dict)
 
+    # Dirty tracking: STATE_SECTIONS changed since the last persisted write
+    dirty_sections: Set[str] = field(default_factory=lambda: set(STATE_SECTIONS))
+
+    # Set once a delta has been written (the first write also stores a snapshot)
+    persisted: bool = False
+
+    # Last AI BattlefieldSnapshot (not serialized; rebuilt on demand)
+    battlefield_snapshot: Optional[Any] = field(default=None, repr=False, compare=False)
+
+    # Per-faction ThreatMap (not serialized; see get_threat_map)
+    threat_map: Optional[Any] = field(default=None, repr=False, compare=False)
+
+    # AI CombatCoordinator with its standing plan (see get_coordinator);
+    # CombatEngine.from_dict rehydrates a saved one
+    coordinator: Optional[Any] = field(default=None, repr=False, compare=False)
+
+    # SurfaceManager for fire, grease, fog, ... (not serialized); ticked
+    # once per round by end_turn
+    surface_manager: Optional[Any] = field(default=None, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Positions and stats assigned wholesale (start_combat, storage
+        # reloads) are wrapped so the spatial index and dirty tracking
+        # always mirror them
+        if name == "positions" and not isinstance(value, PositionIndex):
+            value = PositionIndex(value or {})
+        elif name == "combatant_stats" and not isinstance(value, StatBlocks):
+            value = StatBlocks(value or {})
+        super().__setattr__(name, value)
+        if name in ("phase", "current_turn") and "dirty_sections" in self.__dict__:
+            self.dirty_sections.add(name)
+
+    def mark_dirty(self, *sections: str) -> None:
+        """Mark STATE_SECTIONS as changed so the next delta writes them."""
+        self.dirty_sections.update(sections)
+
+    def mark_stats_dirty(self, combatant_id: str) -> None:
+        """Mark a stat block changed after editing a nested value in place."""
+        self.combatant_stats.mark_dirty(combatant_id)
+
+    def mark_persisted(self, delta: CombatStateDelta) -> None:
+        """Record that a delta has been written so it is not sent again."""
+        self.dirty_sections.difference_update(delta.sections)
+        if "positions" in delta.sections:
+            self.positions.mark_clean()
+        self.combatant_stats.mark_clean(
+            key[len("stats:"):] for key in delta.sections if key.startswith("stats:")
+        )
+        self.persisted = True
+
+    def mark_all_dirty(self) -> None:
+        """Mark every section changed so the next delta is a full write."""
+        self.dirty_sections.update(STATE_SECTIONS)
+        self.positions.dirty = True
+        self.combatant_stats.mark_dirty()
+
     def add_event(
         self,
         event_type: str,
@@ -273,16 +449,31 @@ class CombatState:
         data: Optional[Dict[str, Any]] = None
     ) -> CombatEvent:
         """Add an event to the combat log."""
+        self.event_sequence += 1
         event = CombatEvent(
             event_type=event_type,
             round_number=self.initiative_tracker.current_round,
             combatant_id=combatant_id,
             description=description,
-            data=data or {}
+            data=data or {},
+            sequence=self.event_sequence,
         )
         self.event_log.append(event)
         return event
 
+    def get_unjournaled_events(self) -> List[CombatEvent]:
+        """
+        Get events added since the last journal write.
+
+        Events that fell out of the ring buffer before being journaled are
+        lost; journal at least once per request to avoid that.
+        """
+        return [e for e in self.event_log if e.sequence > self.journaled_sequence]
+
+    def mark_journaled(self, sequence: int) -> None:
+        """Record that events up to ``sequence`` were written to the journal."""
+        self.journaled_sequence = max(self.journaled_sequence, sequence)
+
 
 class CombatEngine:
     """
@@ -295,14 +486,17 @@ class CombatEngine:
     - State transitions
     """
 
-    def __init__(self, combat_state: Optional[CombatState] = None):
+    def __init__(self, combat_state: Optional[CombatState] = None, dice_seed: Optional[int] = None):
         """
         Initialize the combat engine.
 
         Args:
             combat_state: Existing state to resume, or None to create new
+            dice_seed: Seed for the combat's dice stream (random if omitted)
         """
         self.state = combat_state or CombatState()
+        if dice_seed is not None:
+            self.state.dice = DiceRoller(seed=dice_seed)
 
     # =========================================================================
     # COMBAT LIFECYCLE
@@ -336,6 +530,7 @@ class CombatEngine:
 
         # Create initiative tracker with combatants
         self.state.initiative_tracker = create_initiative_tracker(players, enemies)
+        self.state.mark_dirty("round", "turn_index", "initiative_order")
 
         # Store positions
         if positions:
@@ -362,7 +557,7 @@ class CombatEngine:
         )
 
         # Roll initiative for everyone
-        results = self.state.initiative_tracker.roll_all_initiative()
+        results = self.state.initiative_tracker.roll_all_initiative(self.state.dice)
 
         # Initialize legendary action pools for legendary creatures
         self._initialize_legendary_actions()
@@ -408,7 +603,7 @@ class CombatEngine:
             "result": result,
             "reason": reason,
             "rounds": self.state.initiative_tracker.current_round,
-            "events": len(self.state.event_log)
+            "events": self.state.event_sequence
         }
 
     def _cache_combatant_stats(
@@ -608,6 +803,9 @@ class CombatEngine:
             "lay_on_hands_pool": lay_on_hands_pool,
             # Creature type for Divine Smite bonus
             "creature_type": combatant_data.get("creature_type", "humanoid"),
+            # Monster catalog ID and stat block actions (monster abilities, AI)
+            "monster_id": combatant_data.get("monster_id"),
+            "actions": combatant_data.get("actions", []),
             # Full spellcasting data for caster classes
             "spellcasting": spellcasting,
             # Equipment for weapon display and actions
@@ -694,8 +892,6 @@ class CombatEngine:
             monster_id: The monster's combatant ID
             stats: Monster's stat block
         """
-        import random
-
         # Initialize recharge tracking for this monster if not exists
         if monster_id not in self.state.monster_ability_recharge:
             self.state.monster_ability_recharge[monster_id] = {}
@@ -717,7 +913,7 @@ class CombatEngine:
 
                 # If ability is on cooldown (False), try to recharge it
                 if ability_id in recharge_state and not recharge_state[ability_id]:
-                    roll = random.randint(1, 6)
+                    roll = roll_die(6)
                     if roll >= min_roll:
                         recharge_state[ability_id] = True
                         # Get monster name for the event
@@ -1195,9 +1391,9 @@ class CombatEngine:
         has_war_caster = "war_caster" in [f.lower().replace(" ", "_") for f in feats] or "war caster" in [f.lower() for f in feats]
 
         # Roll the save
-        roll1 = random.randint(1, 20)
+        roll1 = roll_die(20)
         if has_war_caster:
-            roll2 = random.randint(1, 20)
+            roll2 = roll_die(20)
             roll = max(roll1, roll2)
             roll_desc = f"with advantage ({roll1}, {roll2})"
         else:
@@ -1270,7 +1466,11 @@ class CombatEngine:
             )
 
         # Advance to next combatant
+        round_before = self.state.initiative_tracker.current_round
         next_combatant = self.state.initiative_tracker.advance_turn()
+        self.state.mark_dirty("round", "turn_index", "current_turn", "initiative_order")
+        if self.state.initiative_tracker.current_round != round_before:
+            self._tick_surfaces()
 
         # Check if combat is over
         if self.state.initiative_tracker.is_combat_over():
@@ -1283,6 +1483,27 @@ class CombatEngine:
 
         return next_combatant
 
+    def _tick_surfaces(self) -> None:
+        """Apply a new round's surface effects and decay surface durations."""
+        manager = self.state.surface_manager
+        if not manager:
+            return
+
+        for effect in manager.tick_round(self.state.positions, self.state.combatant_stats):
+            combatant_id = effect["combatant_id"]
+            if effect.get("damage", 0) > 0:
+                self._apply_damage_to_target(combatant_id, effect["damage"], effect.get("damage_type") or "")
+            combatant = self.state.initiative_tracker.get_combatant(combatant_id)
+            if effect.get("condition") and combatant and effect["condition"] not in combatant.conditions:
+                combatant.conditions.append(effect["condition"])
+                self.state.mark_dirty("initiative_order")
+            self.state.add_event(
+                "surface_effect",
+                f"{effect['surface_type']} affects {combatant.name if combatant else combatant_id}",
+                combatant_id=combatant_id,
+                data=effect,
+            )
+
     def get_current_combatant(self) -> Optional[Combatant]:
         """Get the combatant whose turn it is."""
         return self.state.initiative_tracker.get_current_combatant()
@@ -1381,6 +1602,8 @@ class CombatEngine:
             )
 
         result = handler(target_id, **kwargs)
+        # Handlers spend the turn's budget and apply conditions
+        self.state.mark_dirty("current_turn", "initiative_order")
 
         # For non-attack actions, mark action as taken
         # Attack actions manage their own action_taken via use_attack()
@@ -1462,6 +1685,7 @@ class CombatEngine:
             )
 
         result = handler(target_id, **kwargs)
+        self.state.mark_dirty("current_turn", "initiative_order")
 
         if result.success:
             self.state.current_turn.bonus_action_taken = True
@@ -2476,6 +2700,7 @@ class CombatEngine:
         self.state.current_turn.action_taken = False  # Reset action availability
         self.state.current_turn.attacks_made = 0      # Reset attack counter
         self.state.current_turn.action_surge_used = True
+        self.state.mark_dirty("current_turn")
         self.state.combatant_stats[combatant.id]["action_surge_uses"] -= 1
 
         desc = f"{combatant.name} uses Action Surge! An additional action is available!"
@@ -2594,6 +2819,7 @@ class CombatEngine:
 
         # D&D 2024: Divine Smite is now a spell that costs a bonus action
         self.state.current_turn.bonus_action_taken = True
+        self.state.mark_dirty("current_turn")
 
         target_name = target.name if target else "target"
         # Get damage type from smite result (2024: force, 2014: radiant)
@@ -2720,8 +2946,7 @@ class CombatEngine:
             save_bonus += target_prof
 
         # Roll the save
-        import random
-        roll = random.randint(1, 20)
+        roll = roll_die(20)
         total = roll + save_bonus
         save_success = total >= ki_save_dc
 
@@ -2774,6 +2999,7 @@ class CombatEngine:
             "source_id": combatant.id,
             "ends_on": "end_of_source_next_turn",
         }
+        self.state.mark_stats_dirty(target_id)
 
         desc = (
             f"{combatant.name} uses Stunning Strike on {target.name}! "
@@ -3433,6 +3659,7 @@ class CombatEngine:
                             if "vex_targets" not in self.state.combatant_stats.get(attacker.id, {}):
                                 self.state.combatant_stats[attacker.id]["vex_targets"] = []
                             self.state.combatant_stats[attacker.id]["vex_targets"].append(target.id)
+                            self.state.mark_stats_dirty(attacker.id)
 
                         # Log mastery event
                         self.state.add_event(
@@ -3561,6 +3788,9 @@ class CombatEngine:
         stats = self.state.combatant_stats.get(combatant.id, {})
         # Use effective speed (includes encumbrance penalties)
         speed = self._get_effective_speed(combatant.id, stats)
+        # Credit the extra movement against what this turn has used
+        if self.state.current_turn and self.state.current_turn.combatant_id == combatant.id:
+            self.state.current_turn.movement_used -= speed
 
         self.state.add_event(
             "dash",
@@ -3829,8 +4059,8 @@ class CombatEngine:
         target_escape_mod = max(target_athletics, target_acrobatics)
 
         # Roll contested checks
-        attacker_roll = random.randint(1, 20) + attacker_athletics
-        target_roll = random.randint(1, 20) + target_escape_mod
+        attacker_roll = roll_die(20) + attacker_athletics
+        target_roll = roll_die(20) + target_escape_mod
 
         if attacker_roll > target_roll:
             # Grapple succeeds
@@ -3842,6 +4072,7 @@ class CombatEngine:
                 attacker_stats["grappling"] = []
             if target_id not in attacker_stats["grappling"]:
                 attacker_stats["grappling"].append(target_id)
+                self.state.mark_stats_dirty(combatant.id)
             target_stats["grappled_by"] = combatant.id
 
             desc = f"{combatant.name} grapples {target.name}! (Athletics {attacker_roll} vs {target_roll})"
@@ -3968,8 +4199,8 @@ class CombatEngine:
         target_acrobatics = target_stats.get("acrobatics", target_stats.get("dex_mod", 0))
         target_resist_mod = max(target_athletics, target_acrobatics)
 
-        attacker_roll = random.randint(1, 20) + attacker_athletics
-        target_roll = random.randint(1, 20) + target_resist_mod
+        attacker_roll = roll_die(20) + attacker_athletics
+        target_roll = roll_die(20) + target_resist_mod
 
         if attacker_roll > target_roll:
             if shove_type == "prone":
@@ -4161,8 +4392,8 @@ class CombatEngine:
 
         grappler_athletics = grappler_stats.get("athletics", grappler_stats.get("str_mod", 0))
 
-        escapee_roll = random.randint(1, 20) + escapee_mod
-        grappler_roll = random.randint(1, 20) + grappler_athletics
+        escapee_roll = roll_die(20) + escapee_mod
+        grappler_roll = roll_die(20) + grappler_athletics
 
         if escapee_roll > grappler_roll:
             # Escape succeeds
@@ -4172,6 +4403,7 @@ class CombatEngine:
             # Remove from grappler's grappling list
             if "grappling" in grappler_stats and combatant.id in grappler_stats["grappling"]:
                 grappler_stats["grappling"].remove(combatant.id)
+                self.state.mark_stats_dirty(grappler.id)
 
             desc = f"{combatant.name} escapes {grappler.name}'s grapple! ({escapee_roll} vs {grappler_roll})"
 
@@ -4377,15 +4609,16 @@ class CombatEngine:
         else:
             # Generic AOE save ability
             if ability.save_dc and ability.damage_dice:
-                from app.core.dice import roll_dice
-                damage_roll = roll_dice(ability.damage_dice)
+                damage_roll = self.state.dice.roll_damage(ability.damage_dice).total
                 save_type = ability.save_type or "dex"
 
-                for t_id in targets:
-                    t_stats = self.state.combatant_stats.get(t_id, {})
-                    save_mod = t_stats.get(f"{save_type}_save", 0)
-                    save_roll = random.randint(1, 20) + save_mod
+                # Every target's save in one batch
+                saves = self.state.dice.roll_d20_batch([
+                    self.state.combatant_stats.get(t_id, {}).get(f"{save_type}_save", 0)
+                    for t_id in targets
+                ])
 
+                for t_id, save_roll in zip(targets, saves.totals):
                     if save_roll >= ability.save_dc:
                         damage = damage_roll // 2 if ability.half_on_save else 0
                     else:
@@ -4490,6 +4723,7 @@ class CombatEngine:
         hits = 0
         misses = 0
 
+        pattern_attacks = []
         for attack_name in multiattack.multiattack_pattern or []:
             attack_name_lower = attack_name.lower()
 
@@ -4499,10 +4733,20 @@ class CombatEngine:
                 # Generic attack - use first available
                 attack = next(iter(attack_map.values()), None)
 
+            if attack:
+                pattern_attacks.append(attack)
+
+        # Roll every attack in the pattern in one batch
+        attack_rolls = self.state.dice.roll_d20_batch(
+            [attack.attack_bonus or 0 for attack in pattern_attacks]
+        )
+
+        for index, attack in enumerate(pattern_attacks):
             if attack:
                 # Execute the attack
                 attack_result = self._execute_single_monster_attack(
-                    combatant, stats, attack, target_id
+                    combatant, stats, attack, target_id,
+                    attack_roll=attack_rolls.result(index),
                 )
                 attacks_made.append(attack_result)
 
@@ -4546,7 +4790,8 @@ class CombatEngine:
         combatant,
         stats: Dict[str, Any],
         attack,
-        target_id: str
+        target_id: str,
+        attack_roll: Optional[D20Result] = None
     ) -> Dict[str, Any]:
         """
         Execute a single attack from a monster's action.
@@ -4556,12 +4801,12 @@ class CombatEngine:
             stats: Combatant stats
             attack: Parsed MonsterAbility for the attack
             target_id: Target of the attack
+            attack_roll: Pre-rolled attack (from a multiattack batch)
 
         Returns:
             Dict with attack result {hit, damage, critical, attack_roll, etc.}
         """
-        from app.core.dice import roll_dice, roll_d20
-
+        dice = self.state.dice
         target = self.state.initiative_tracker.get_combatant(target_id)
         target_stats = self.state.combatant_stats.get(target_id, {})
 
@@ -4569,10 +4814,10 @@ class CombatEngine:
             return {"hit": False, "damage": 0, "reason": "Invalid target"}
 
         # Roll attack
-        attack_bonus = attack.attack_bonus or 0
-        attack_roll = roll_d20(modifier=attack_bonus)
-        is_crit = attack_roll.natural_roll == 20
-        is_miss = attack_roll.natural_roll == 1
+        if attack_roll is None:
+            attack_roll = dice.roll_d20(modifier=attack.attack_bonus or 0)
+        is_crit = attack_roll.natural_20
+        is_miss = attack_roll.natural_1
 
         # Get target AC
         target_ac = target_stats.get("armor_class", target.armor_class if hasattr(target, "armor_class") else 10)
@@ -4586,17 +4831,11 @@ class CombatEngine:
             hit = True
 
             # Roll damage
-            if attack.damage_dice:
-                damage = roll_dice(attack.damage_dice)
-                if is_crit:
-                    damage += roll_dice(attack.damage_dice)  # Double dice on crit
-
-            # Extra damage (like acid on dragon bite)
-            if attack.extra_damage_dice:
-                extra = roll_dice(attack.extra_damage_dice)
-                if is_crit:
-                    extra += roll_dice(attack.extra_damage_dice)
-                damage += extra
+            # Double dice on crit
+            damage_dice = [d for d in (attack.damage_dice, attack.extra_damage_dice) if d]
+            if damage_dice:
+                # Base and extra damage (like acid on dragon bite) in one batch
+                damage = sum(dice.roll_damage_batch(damage_dice, critical=is_crit))
 
             # Apply damage to target
             self._apply_damage_to_target(target_id, damage, attack.damage_type or "untyped")
@@ -4660,6 +4899,7 @@ class CombatEngine:
 
         if hasattr(target, "current_hp"):
             target.current_hp = new_hp
+        self.state.mark_dirty("initiative_order")
 
     def _get_targets_in_ability_area(
         self,
@@ -4680,6 +4920,9 @@ class CombatEngine:
         """
         from app.core.monster_abilities import AreaShape
 
+        area_shapes = (
+            AreaShape.SPHERE, AreaShape.CYLINDER, AreaShape.CUBE, AreaShape.CONE, AreaShape.LINE
+        )
         targets = []
         attacker_pos = self.state.positions.get(attacker_id, (0, 0))
 
@@ -4688,44 +4931,43 @@ class CombatEngine:
         if not attacker:
             return []
 
-        for combatant in self.state.initiative_tracker.get_active_combatants():
-            if combatant.id == attacker_id:
-                continue
+        def is_enemy(combatant: Optional[Combatant]) -> bool:
             # Monsters target players, players target monsters
-            if combatant.combatant_type == attacker.combatant_type:
-                continue
-
-            target_pos = self.state.positions.get(combatant.id, (0, 0))
-
-            # Calculate distance
-            if isinstance(attacker_pos, dict):
-                ax, ay = attacker_pos.get("x", 0), attacker_pos.get("y", 0)
-            else:
-                ax, ay = attacker_pos
+            return (
+                combatant is not None
+                and combatant.is_active
+                and combatant.combatant_type != attacker.combatant_type
+            )
+
+        if ability.area_shape in area_shapes:
+            default_size = 60 if ability.area_shape == AreaShape.LINE else 30
+            size_ft = ability.area_size or default_size
+            width_ft = ability.area_width or 5
+            origin = to_cell(attacker_pos)
+            positions = self.state.positions
+
+            # Cones and lines are aimed at the primary target, or wherever
+            # they catch the most enemies
+            toward = positions.cell_of(primary_target_id) if primary_target_id else None
+            if toward is None and ability.area_shape in (AreaShape.CONE, AreaShape.LINE):
+                enemy_cells = [
+                    positions.cell_of(c.id)
+                    for c in self.state.initiative_tracker.get_active_combatants()
+                    if is_enemy(c) and positions.cell_of(c.id) is not None
+                ]
+                toward = best_compass_heading(
+                    ability.area_shape, size_ft, origin, enemy_cells, width_ft
+                )
+            if ability.area_shape not in (AreaShape.CONE, AreaShape.LINE):
+                toward = None
 
-            if isinstance(target_pos, dict):
-                tx, ty = target_pos.get("x", 0), target_pos.get("y", 0)
-            else:
-                tx, ty = target_pos
-
-            distance = ((tx - ax) ** 2 + (ty - ay) ** 2) ** 0.5 * 5  # Grid squares to feet
-
-            # Check if in area
-            if ability.area_shape == AreaShape.SPHERE:
-                if distance <= (ability.area_size or 30):
-                    targets.append(combatant.id)
-            elif ability.area_shape == AreaShape.CONE:
-                # Simplified: targets in front within range
-                if distance <= (ability.area_size or 30):
-                    targets.append(combatant.id)
-            elif ability.area_shape == AreaShape.LINE:
-                # Simplified: targets in a line within range
-                if distance <= (ability.area_size or 60):
-                    targets.append(combatant.id)
-            else:
-                # Single target or unknown - just use primary target
-                if combatant.id == primary_target_id:
-                    targets.append(combatant.id)
+            for cid in positions.in_template(ability.area_shape, size_ft, origin, toward, width_ft):
+                if cid != attacker_id and is_enemy(self.state.initiative_tracker.get_combatant(cid)):
+                    targets.append(cid)
+        elif primary_target_id:
+            # Single target or unknown - just use primary target
+            if is_enemy(self.state.initiative_tracker.get_combatant(primary_target_id)):
+                targets.append(primary_target_id)
 
         # If no targets found but primary target specified, use that
         if not targets and primary_target_id:
@@ -4917,11 +5159,16 @@ class CombatEngine:
         if not mover:
             return results
 
-        # Get all enemy combatants (opposite type from mover)
+        # Enemies (opposite type from mover) whose reach the move leaves,
+        # read off the threat map
         enemy_ids = []
         enemy_data = {}
-        for c in self.state.initiative_tracker.combatants:
-            if c.id != mover_id and c.is_active and c.combatant_type != mover.combatant_type:
+        leaving = get_threat_map(self.state).leaving_reach(
+            to_cell(from_pos), to_cell(to_pos), mover.combatant_type.value
+        )
+        for cid in leaving:
+            c = self.state.initiative_tracker.get_combatant(cid)
+            if c and c.is_active and c.combatant_type != mover.combatant_type:
                 enemy_ids.append(c.id)
                 # Build enemy data for opportunity attack check
                 stats = self.state.combatant_stats.get(c.id, {})
@@ -4938,18 +5185,15 @@ class CombatEngine:
         # We need to set combatant positions on the grid
         if self.state.grid:
             grid = self.state.grid
-            # Update grid with current positions
-            for cid, pos in self.state.positions.items():
-                cell = grid.get_cell(pos[0], pos[1])
-                if cell:
-                    cell.occupied_by = cid
         else:
             # Create a minimal grid if none exists
             grid = CombatGrid(width=20, height=20)
-            for cid, pos in self.state.positions.items():
-                cell = grid.get_cell(pos[0], pos[1])
-                if cell:
-                    cell.occupied_by = cid
+        # Update grid with the candidates' current positions
+        for cid in enemy_ids:
+            x, y = self.state.positions.cell_of(cid)
+            cell = grid.get_cell(x, y)
+            if cell:
+                cell.occupied_by = cid
 
         # Check which enemies can make opportunity attacks
         triggering_enemies = check_opportunity_attack_triggers(
@@ -5175,8 +5419,9 @@ class CombatEngine:
             combatant_id, current_pos, (new_x, new_y), conditions
         )
 
-        # Update position
+        # Update position; the move (and any opportunity attack) spent movement
         self.state.positions[combatant_id] = (new_x, new_y)
+        self.state.mark_dirty("current_turn")
 
         self.state.add_event(
             "move",
@@ -5280,31 +5525,83 @@ class CombatEngine:
                 if self.get_current_combatant()
                 else None
             ),
-            "current_turn": (
-                {
-                    "combatant_id": self.state.current_turn.combatant_id,
-                    "movement_used": self.state.current_turn.movement_used,
-                    "action_taken": self.state.current_turn.action_taken,
-                    "bonus_action_taken": self.state.current_turn.bonus_action_taken,
-                    "phase": self.state.current_turn.current_phase.name
-                }
-                if self.state.current_turn
-                else None
-            ),
+            "current_turn": self._get_current_turn_summary(),
             "positions": positions_dict,
             "combatants": combatants,
             "combatant_stats": self.state.combatant_stats,
-            "event_count": len(self.state.event_log),
+            "event_count": self.state.event_sequence,
             "is_combat_over": tracker.is_combat_over(),
             "combat_result": tracker.get_combat_result()
         }
 
+    def _get_current_turn_summary(self) -> Optional[Dict[str, Any]]:
+        """Current turn fields as exposed in combat state payloads."""
+        turn = self.state.current_turn
+        if not turn:
+            return None
+        return {
+            "combatant_id": turn.combatant_id,
+            "movement_used": turn.movement_used,
+            "action_taken": turn.action_taken,
+            "bonus_action_taken": turn.bonus_action_taken,
+            "phase": turn.current_phase.name
+        }
+
+    def collect_state_delta(self) -> CombatStateDelta:
+        """
+        Collect the persisted sections that changed since mark_persisted.
+
+        Only sections marked dirty are serialized: STATE_SECTIONS are marked
+        by the mutation points (CombatState.mark_dirty), positions and stat
+        blocks by their own mappings. The initiative order mirrors hp and
+        conditions, so it is rewritten whenever a stat block changed.
+
+        Returns:
+            CombatStateDelta holding only the changed sections
+        """
+        state = self.state
+        tracker = state.initiative_tracker
+        dirty = state.dirty_sections
+        stats_dirty = state.combatant_stats.dirty
+        delta = CombatStateDelta()
+
+        if "phase" in dirty:
+            delta.phase = state.phase.name
+        if "round" in dirty:
+            delta.round_number = tracker.current_round
+        if "turn_index" in dirty:
+            delta.current_turn_index = tracker.current_turn_index
+        if "current_turn" in dirty:
+            delta.current_turn_changed = True
+            delta.current_turn = self._get_current_turn_summary()
+        if "initiative_order" in dirty or stats_dirty:
+            delta.initiative_order = tracker.get_initiative_order()
+            dirty = dirty | {"initiative_order"}
+        delta.sections.update(dirty)
+
+        if state.positions.dirty:
+            delta.positions = {
+                cid: {"x": pos[0], "y": pos[1]} if isinstance(pos, (list, tuple)) and len(pos) >= 2 else pos
+                for cid, pos in state.positions.items()
+            }
+            delta.sections.add("positions")
+
+        for cid in stats_dirty:
+            stats = state.combatant_stats.get(cid)
+            if stats is None:
+                delta.removed_combatants.append(cid)
+            else:
+                delta.combatant_stats[cid] = stats
+            delta.sections.add(f"stats:{cid}")
+
+        return delta
+
     def get_combatant_at_position(self, x: int, y: int) -> Optional[Combatant]:
         """Get the combatant at a specific grid position."""
-        for cid, pos in self.state.positions.items():
-            if pos == (x, y):
-                return self.state.initiative_tracker.get_combatant(cid)
-        return None
+        cid = self.state.positions.occupant_at(x, y)
+        if cid is None:
+            return None
+        return self.state.initiative_tracker.get_combatant(cid)
 
     def get_valid_targets(self, attacker_id: str, range_ft: int = 5) -> List[str]:
         """
@@ -5328,10 +5625,11 @@ class CombatEngine:
         valid_targets = []
         range_squares = range_ft // 5
 
-        for cid, pos in self.state.positions.items():
-            if cid == attacker_id:
-                continue
-
+        # Only combatants in the buckets around the attacker are visited
+        in_range = self.state.positions.within(
+            to_cell(attacker_pos), range_squares, exclude=(attacker_id,)
+        )
+        for cid in in_range:
             target = self.state.initiative_tracker.get_combatant(cid)
             if not target or not target.is_active:
                 continue
@@ -5340,29 +5638,16 @@ class CombatEngine:
             if target.combatant_type == attacker.combatant_type:
                 continue
 
-            # Check distance
-            dx = abs(pos[0] - attacker_pos[0])
-            dy = abs(pos[1] - attacker_pos[1])
-            distance = max(dx, dy)
-
-            if distance <= range_squares:
-                valid_targets.append(cid)
+            valid_targets.append(cid)
 
         return valid_targets
 
     def get_recent_events(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get the most recent combat events."""
-        events = self.state.event_log[-count:]
-        return [
-            {
-                "type": e.event_type,
-                "round": e.round_number,
-                "combatant_id": e.combatant_id,
-                "description": e.description,
-                "data": e.data
-            }
-            for e in events
-        ]
+        if count <= 0:
+            return []
+        events = list(self.state.event_log)[-count:]
+        return [e.to_dict() for e in events]
 
     # =========================================================================
     # SERIALIZATION
@@ -5382,23 +5667,34 @@ class CombatEngine:
                         "action_taken": self.state.current_turn.action_taken,
                         "bonus_action_taken": self.state.current_turn.bonus_action_taken,
                         "reaction_used": self.state.current_turn.reaction_used,
-                        "current_phase": self.state.current_turn.current_phase.name
+                        "current_phase": self.state.current_turn.current_phase.name,
+                        "attacks_made": self.state.current_turn.attacks_made,
+                        "max_attacks": self.state.current_turn.max_attacks,
+                        "can_offhand_attack": self.state.current_turn.can_offhand_attack,
+                        "main_hand_weapon": self.state.current_turn.main_hand_weapon,
+                        "sneak_attack_used": self.state.current_turn.sneak_attack_used,
+                        "reckless_attack_active": self.state.current_turn.reckless_attack_active,
+                        "action_surge_used": self.state.current_turn.action_surge_used,
                     }
                     if self.state.current_turn
                     else None
                 ),
                 "positions": self.state.positions,
+                "grid": self.state.grid.to_dict() if self.state.grid else None,
                 "combatant_stats": self.state.combatant_stats,
-                "event_log": [
-                    {
-                        "type": e.event_type,
-                        "round": e.round_number,
-                        "combatant_id": e.combatant_id,
-                        "description": e.description,
-                        "data": e.data
-                    }
-                    for e in self.state.event_log
-                ]
+                "monster_ability_recharge": self.state.monster_ability_recharge,
+                "legendary_actions_remaining": self.state.legendary_actions_remaining,
+                "frightful_presence_immune": self.state.frightful_presence_immune,
+                "reactions_used_this_round": self.state.reactions_used_this_round,
+                "event_log": [e.to_dict() for e in self.state.event_log],
+                "event_sequence": self.state.event_sequence,
+                "journaled_sequence": self.state.journaled_sequence,
+                "dice": self.state.dice.to_dict(),
+                "coordinator": (
+                    self.state.coordinator.to_dict()
+                    if self.state.coordinator is not None
+                    else None
+                ),
             }
         }
 
@@ -5413,8 +5709,22 @@ class CombatEngine:
             initiative_tracker=InitiativeTracker.from_dict(
                 state_data.get("initiative_tracker", {})
             ),
-            positions=state_data.get("positions", {}),
-            combatant_stats=state_data.get("combatant_stats", {})
+            # JSON round-trips turn position tuples into lists
+            positions={
+                cid: tuple(pos) if isinstance(pos, list) else pos
+                for cid, pos in state_data.get("positions", {}).items()
+            },
+            grid=(
+                CombatGrid.from_dict(state_data["grid"])
+                if state_data.get("grid")
+                else None
+            ),
+            combatant_stats=state_data.get("combatant_stats", {}),
+            monster_ability_recharge=state_data.get("monster_ability_recharge", {}),
+            legendary_actions_remaining=state_data.get("legendary_actions_remaining", {}),
+            frightful_presence_immune=state_data.get("frightful_presence_immune", {}),
+            reactions_used_this_round=state_data.get("reactions_used_this_round", {}),
+            dice=DiceRoller.from_dict(state_data.get("dice")),
         )
 
         # Restore turn state
@@ -5426,17 +5736,29 @@ class CombatEngine:
                 action_taken=turn_data.get("action_taken", False),
                 bonus_action_taken=turn_data.get("bonus_action_taken", False),
                 reaction_used=turn_data.get("reaction_used", False),
-                current_phase=TurnPhase[turn_data.get("current_phase", "START_OF_TURN")]
+                current_phase=TurnPhase[turn_data.get("current_phase", "START_OF_TURN")],
+                attacks_made=turn_data.get("attacks_made", 0),
+                max_attacks=turn_data.get("max_attacks", 1),
+                can_offhand_attack=turn_data.get("can_offhand_attack", False),
+                main_hand_weapon=turn_data.get("main_hand_weapon"),
+                sneak_attack_used=turn_data.get("sneak_attack_used", False),
+                reckless_attack_active=turn_data.get("reckless_attack_active", False),
+                action_surge_used=turn_data.get("action_surge_used", False),
             )
 
         # Restore event log
-        for event_data in state_data.get("event_log", []):
-            state.event_log.append(CombatEvent(
-                event_type=event_data["type"],
-                round_number=event_data["round"],
-                combatant_id=event_data.get("combatant_id"),
-                description=event_data["description"],
-                data=event_data.get("data", {})
-            ))
-
-        return cls(combat_state=state)
+        for index, event_data in enumerate(state_data.get("event_log", [])):
+            event = CombatEvent.from_dict(event_data)
+            event.sequence = event.sequence or index + 1  # Pre-journal snapshots
+            state.event_log.append(event)
+        state.event_sequence = state_data.get(
+            "event_sequence",
+            state.event_log[-1].sequence if state.event_log else 0
+        )
+        state.journaled_sequence = state_data.get("journaled_sequence", 0)
+
+        engine = cls(combat_state=state)
+        if state_data.get("coordinator"):
+            from app.core.ai.coordination import CombatCoordinator
+            state.coordinator = CombatCoordinator.from_dict(engine, state_data["coordinator"])
+        return engine
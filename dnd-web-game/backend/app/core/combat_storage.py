@@ -1,57 +1,814 @@
 """
 Shared storage for active combat sessions.
 
-This module provides centralized storage dictionaries for combat state,
-preventing circular imports between campaign_engine.py and combat.py routes.
+This module provides centralized storage for combat state, preventing
+circular imports between campaign_engine.py and combat.py routes.
+
+Combat sessions live in a pluggable CombatSessionStore:
+- InMemoryCombatSessionStore keeps every combat in this process (default)
+- SQLiteCombatSessionStore keeps serialized snapshots in a SQLite file that
+  every worker on the host can reach, and lazily rehydrates them through
+  CombatEngine.from_dict when a request lands on a different worker
+
+The module-level `active_combats`, `active_grids` and `reactions_managers`
+mappings are dict-compatible views over the configured store, so routes keep
+using `active_combats.get(combat_id)` regardless of backend.
 
 Also provides persistence functions to save/load combat state from database.
 """
-from typing import Dict, Any, Optional, List
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager
+from enum import Enum
+from functools import wraps
+from typing import Dict, Any, Optional, List, Iterator, Tuple, Callable, AsyncIterator
+
+from app.core.errors import CombatBusyError, CombatLockLostError
+
+
+# Kinds of per-combat objects held by a store
+SESSION_KINDS = ("engine", "grid", "reactions")
+
+
+def _session_codec(kind: str) -> Tuple[Callable[[Any], Dict[str, Any]], Callable[[Dict[str, Any]], Any]]:
+    """Get the (serialize, deserialize) pair for a session object kind."""
+    # Imported lazily: combat_engine imports modules that import this one
+    if kind == "engine":
+        from app.core.combat_engine import CombatEngine
+        return (lambda obj: obj.to_dict()), CombatEngine.from_dict
+    if kind == "grid":
+        from app.core.movement import CombatGrid
+        return (lambda obj: obj.to_dict()), CombatGrid.from_dict
+    if kind == "reactions":
+        from app.core.reactions import ReactionsManager
+        return (lambda obj: obj.to_dict()), ReactionsManager.from_dict
+    raise ValueError(f"Unknown combat session kind: {kind}")
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the non-JSON types that show up in combatant stats."""
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+# =============================================================================
+# STORE INTERFACE
+# =============================================================================
+
+class CombatSessionStore(ABC):
+    """
+    Storage backend for active combat sessions.
+
+    Each combat owns up to one object per kind ("engine", "grid",
+    "reactions"). Routes mutate the returned objects in place and call
+    flush() once the request is done so other workers see the change.
+    """
+
+    @abstractmethod
+    def load(self, combat_id: str, kind: str) -> Optional[Any]:
+        """Get the live object of a kind for a combat, or None."""
+
+    @abstractmethod
+    def save(self, combat_id: str, kind: str, obj: Any) -> None:
+        """Store (or replace) the object of a kind for a combat."""
+
+    @abstractmethod
+    def remove(self, combat_id: str, kind: str) -> bool:
+        """Remove the object of a kind. Returns True if it existed."""
+
+    @abstractmethod
+    def combat_ids(self, kind: str) -> List[str]:
+        """List combat IDs that hold an object of the given kind."""
+
+    def flush(self, combat_id: str) -> None:
+        """Write back in-place mutations of a combat's objects."""
+
+    @abstractmethod
+    def lock(self, combat_id: str) -> Any:
+        """Async context manager serializing requests for one combat."""
+
+
+class InMemoryCombatSessionStore(CombatSessionStore):
+    """Keeps combat sessions in plain dicts owned by this process."""
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict[str, Any]] = {kind: {} for kind in SESSION_KINDS}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def load(self, combat_id: str, kind: str) -> Optional[Any]:
+        return self._sessions[kind].get(combat_id)
+
+    def save(self, combat_id: str, kind: str, obj: Any) -> None:
+        self._sessions[kind][combat_id] = obj
+
+    def remove(self, combat_id: str, kind: str) -> bool:
+        existed = self._sessions[kind].pop(combat_id, None) is not None
+        if not any(combat_id in objs for objs in self._sessions.values()):
+            self._locks.pop(combat_id, None)
+        return existed
+
+    def combat_ids(self, kind: str) -> List[str]:
+        return list(self._sessions[kind].keys())
+
+    @asynccontextmanager
+    async def lock(self, combat_id: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(combat_id, asyncio.Lock())
+        async with lock:
+            yield
+
+
+class SQLiteCombatSessionStore(CombatSessionStore):
+    """
+    Shares combat sessions between worker processes through a SQLite file.
+
+    Every save bumps a per-object version. Loads compare the stored version
+    with the locally cached one and only rehydrate when another worker has
+    written a newer snapshot, so a request that stays on one worker pays a
+    single indexed lookup. Per-combat locks are lease rows, which expire so a
+    crashed worker cannot wedge a combat forever. A held lease is renewed in
+    the background and checked again before flush(), so a long locked
+    section never writes over a combat another worker has since taken.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lock_lease_seconds: float = 30.0,
+        lock_timeout_seconds: float = 10.0,
+        lock_poll_seconds: float = 0.02,
+    ):
+        """
+        Initialize the shared store.
+
+        Args:
+            path: SQLite database file shared by all workers
+            lock_lease_seconds: How long a held lock stays valid
+            lock_timeout_seconds: How long to wait for a busy combat
+            lock_poll_seconds: Delay between lock acquisition attempts
+        """
+        self.path = path
+        self.lock_lease_seconds = lock_lease_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.lock_poll_seconds = lock_poll_seconds
+
+        # (combat_id, kind) -> (version, live object)
+        self._cache: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        self._local_locks: Dict[str, asyncio.Lock] = {}
+        # combat_id -> owner token of the lease this process holds
+        self._lease_owners: Dict[str, str] = {}
+        self._conn_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS combat_sessions ("
+            " combat_id TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (combat_id, kind))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS combat_session_locks ("
+            " combat_id TEXT PRIMARY KEY,"
+            " owner TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        with self._conn_lock:
+            return self._conn.execute(sql, params)
+
+    def load(self, combat_id: str, kind: str) -> Optional[Any]:
+        row = self._execute(
+            "SELECT version FROM combat_sessions WHERE combat_id = ? AND kind = ?",
+            (combat_id, kind),
+        ).fetchone()
+        if row is None:
+            self._cache.pop((combat_id, kind), None)
+            return None
+
+        cached = self._cache.get((combat_id, kind))
+        if cached and cached[0] == row[0]:
+            return cached[1]
+
+        # Another worker wrote a newer snapshot (or we never saw this combat)
+        payload_row = self._execute(
+            "SELECT version, payload FROM combat_sessions WHERE combat_id = ? AND kind = ?",
+            (combat_id, kind),
+        ).fetchone()
+        if payload_row is None:
+            return None
+        _, deserialize = _session_codec(kind)
+        obj = deserialize(json.loads(payload_row[1]))
+        self._cache[(combat_id, kind)] = (payload_row[0], obj)
+        return obj
+
+    def save(self, combat_id: str, kind: str, obj: Any) -> None:
+        serialize, _ = _session_codec(kind)
+        payload = json.dumps(serialize(obj), default=_json_default)
+        with self._conn_lock:
+            self._conn.execute(
+                "INSERT INTO combat_sessions (combat_id, kind, version, payload, updated_at)"
+                " VALUES (?, ?, 1, ?, ?)"
+                " ON CONFLICT(combat_id, kind) DO UPDATE SET"
+                " version = version + 1, payload = excluded.payload,"
+                " updated_at = excluded.updated_at",
+                (combat_id, kind, payload, time.time()),
+            )
+            version = self._conn.execute(
+                "SELECT version FROM combat_sessions WHERE combat_id = ? AND kind = ?",
+                (combat_id, kind),
+            ).fetchone()[0]
+        self._cache[(combat_id, kind)] = (version, obj)
+
+    def remove(self, combat_id: str, kind: str) -> bool:
+        self._cache.pop((combat_id, kind), None)
+        cursor = self._execute(
+            "DELETE FROM combat_sessions WHERE combat_id = ? AND kind = ?",
+            (combat_id, kind),
+        )
+        return cursor.rowcount > 0
+
+    def combat_ids(self, kind: str) -> List[str]:
+        rows = self._execute(
+            "SELECT combat_id FROM combat_sessions WHERE kind = ?", (kind,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def flush(self, combat_id: str) -> None:
+        owner = self._lease_owners.get(combat_id)
+        if owner is not None and not self._renew(combat_id, owner):
+            # The lease expired and another worker may have written since
+            raise CombatLockLostError(combat_id)
+        for kind in SESSION_KINDS:
+            cached = self._cache.get((combat_id, kind))
+            if cached is not None:
+                self.save(combat_id, kind, cached[1])
+
+    def _try_acquire(self, combat_id: str, owner: str) -> bool:
+        now = time.time()
+        with self._conn_lock:
+            self._conn.execute(
+                "DELETE FROM combat_session_locks WHERE combat_id = ? AND expires_at < ?",
+                (combat_id, now),
+            )
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO combat_session_locks (combat_id, owner, expires_at)"
+                " VALUES (?, ?, ?)",
+                (combat_id, owner, now + self.lock_lease_seconds),
+            )
+            return cursor.rowcount == 1
+
+    def _renew(self, combat_id: str, owner: str) -> bool:
+        """Extend a held lease; False if it expired and was taken over."""
+        cursor = self._execute(
+            "UPDATE combat_session_locks SET expires_at = ? WHERE combat_id = ? AND owner = ?",
+            (time.time() + self.lock_lease_seconds, combat_id, owner),
+        )
+        return cursor.rowcount == 1
+
+    async def _keep_lease(self, combat_id: str, owner: str) -> None:
+        """Renew a lease every third of its length while the lock is held."""
+        while True:
+            await asyncio.sleep(self.lock_lease_seconds / 3)
+            if not self._renew(combat_id, owner):
+                return
+
+    @asynccontextmanager
+    async def lock(self, combat_id: str) -> AsyncIterator[None]:
+        # Serialize coroutines in this process first so they don't poll SQLite
+        local = self._local_locks.setdefault(combat_id, asyncio.Lock())
+        async with local:
+            owner = uuid.uuid4().hex
+            deadline = time.monotonic() + self.lock_timeout_seconds
+            while not self._try_acquire(combat_id, owner):
+                if time.monotonic() >= deadline:
+                    raise CombatBusyError(combat_id)
+                await asyncio.sleep(self.lock_poll_seconds)
+            self._lease_owners[combat_id] = owner
+            heartbeat = asyncio.create_task(self._keep_lease(combat_id, owner))
+            try:
+                yield
+            finally:
+                heartbeat.cancel()
+                self._lease_owners.pop(combat_id, None)
+                self._execute(
+                    "DELETE FROM combat_session_locks WHERE combat_id = ? AND owner = ?",
+                    (combat_id, owner),
+                )
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        self._conn.close()
+
+
+# =============================================================================
+# STORE SELECTION
+# =============================================================================
+
+_store: Optional[CombatSessionStore] = None
+
+
+def create_combat_store(url: str) -> CombatSessionStore:
+    """
+    Create a combat session store from a URL.
+
+    Args:
+        url: "memory://" for in-process storage, or "sqlite:///path/to/file.db"
+             for storage shared by all workers on the host
+
+    Returns:
+        A CombatSessionStore instance
+    """
+    if not url or url.startswith("memory"):
+        return InMemoryCombatSessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteCombatSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported COMBAT_STORE_URL: {url}")
+
+
+def get_combat_store() -> CombatSessionStore:
+    """Get the configured combat session store, creating it on first use."""
+    global _store
+    if _store is None:
+        from app.config import get_settings
+        _store = create_combat_store(get_settings().COMBAT_STORE_URL)
+    return _store
+
+
+def set_combat_store(store: CombatSessionStore) -> None:
+    """Replace the combat session store (used at startup and in tests)."""
+    global _store
+    _store = store
+
+
+class _CombatSessionView(MutableMapping):
+    """Dict-compatible view of one kind of object in the current store."""
+
+    def __init__(self, kind: str):
+        self._kind = kind
+
+    def __getitem__(self, combat_id: str) -> Any:
+        obj = get_combat_store().load(combat_id, self._kind)
+        if obj is None:
+            raise KeyError(combat_id)
+        return obj
+
+    def __setitem__(self, combat_id: str, obj: Any) -> None:
+        get_combat_store().save(combat_id, self._kind, obj)
+
+    def __delitem__(self, combat_id: str) -> None:
+        if not get_combat_store().remove(combat_id, self._kind):
+            raise KeyError(combat_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(get_combat_store().combat_ids(self._kind))
+
+    def __len__(self) -> int:
+        return len(get_combat_store().combat_ids(self._kind))
+
+
+# Active combat sessions, keyed by combat_id (str)
+active_combats: MutableMapping = _CombatSessionView("engine")  # combat_id -> CombatEngine
+active_grids: MutableMapping = _CombatSessionView("grid")  # combat_id -> CombatGrid
+reactions_managers: MutableMapping = _CombatSessionView("reactions")  # combat_id -> ReactionsManager
+
+
+async def _restore_combat_session(combat_id: str, repo: Any) -> bool:
+    """Recover a combat from the database and register it in the store."""
+    engine = await recover_combat_engine(combat_id, repo)
+    if engine is None:
+        return False
+
+    from app.core.movement import CombatGrid
+    from app.core.reactions import ReactionsManager
+
+    reactions = ReactionsManager()
+    for combatant in engine.state.initiative_tracker.combatants:
+        reactions.register_combatant(combatant.id)
+
+    active_combats[combat_id] = engine
+    active_grids[combat_id] = engine.state.grid or CombatGrid()
+    reactions_managers[combat_id] = reactions
+    return True
+
+
+@asynccontextmanager
+async def combat_session(combat_id: str, repo: Any = None) -> AsyncIterator[None]:
+    """
+    Hold the per-combat lock and flush the session on exit.
+
+    If a repository is given and the combat is missing from the store,
+    it is first recovered from the database journal. Used by
+    with_combat_session, and directly by work that outlives a handler
+    (e.g. streamed enemy turns).
+    """
+    store = get_combat_store()
+    async with store.lock(combat_id):
+        try:
+            if repo is not None and store.load(combat_id, "engine") is None:
+                await _restore_combat_session(combat_id, repo)
+            yield
+        finally:
+            store.flush(combat_id)
+
+
+def with_combat_session(handler: Callable) -> Callable:
+    """
+    Decorator for route handlers that mutate a combat.
 
+    Holds the per-combat lock for the whole request and flushes the session
+    afterwards so other workers rehydrate the new state. The combat ID is
+    taken from a `combat_id` argument or from `request.combat_id`. When the
+    handler receives a `combat_repo` and the combat is missing from the
+    store, it is first recovered from the database journal.
 
-# In-memory storage for active combat sessions
-# Keys are combat_id (str), values are the corresponding objects
-active_combats: Dict[str, Any] = {}  # combat_id -> CombatEngine
-active_grids: Dict[str, Any] = {}     # combat_id -> CombatGrid
-reactions_managers: Dict[str, Any] = {}  # combat_id -> ReactionsManager
+    Usage:
+        @router.post("/{combat_id}/end-turn")
+        @with_combat_session
+        async def end_turn(combat_id: str, ...):
+            ...
+    """
+    @wraps(handler)
+    async def wrapper(*args, **kwargs):
+        combat_id = _handler_combat_id(kwargs)
+        if not combat_id:
+            return await handler(*args, **kwargs)
+
+        async with combat_session(combat_id, kwargs.get("combat_repo")):
+            return await handler(*args, **kwargs)
+
+    return wrapper
+
+
+def with_combat_lock(handler: Callable) -> Callable:
+    """
+    Decorator for read-only route handlers.
+
+    Holds the per-combat lock while the handler reads the engine, so it
+    never sees a round that an executor thread is still resolving. Unlike
+    with_combat_session, nothing is flushed afterwards.
+    """
+    @wraps(handler)
+    async def wrapper(*args, **kwargs):
+        combat_id = _handler_combat_id(kwargs)
+        if not combat_id:
+            return await handler(*args, **kwargs)
+
+        async with get_combat_store().lock(combat_id):
+            return await handler(*args, **kwargs)
+
+    return wrapper
+
+
+def _handler_combat_id(kwargs: Dict[str, Any]) -> Optional[str]:
+    """Combat ID from a `combat_id` argument or from `request.combat_id`."""
+    return kwargs.get("combat_id") or getattr(kwargs.get("request"), "combat_id", None)
+
+
+# =============================================================================
+# DATABASE PERSISTENCE
+# =============================================================================
+
+class CombatWriteBehindBuffer:
+    """
+    Coalesces combat state deltas and writes them in batches.
+
+    Opt-in via COMBAT_WRITE_BEHIND_SECONDS. Deltas for the same combat are
+    merged in memory, then flushed together in one commit either on the
+    timer or when a turn ends. Failed writes are re-queued.
+    """
+
+    def __init__(self, flush_interval: float = 2.0):
+        """
+        Initialize the buffer.
+
+        Args:
+            flush_interval: Seconds between background flushes
+        """
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Any] = {}  # combat_id -> CombatStateDelta
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add(self, combat_id: str, delta: Any) -> None:
+        """Queue a delta, merging it with any pending delta for the combat."""
+        pending = self._pending.get(combat_id)
+        self._pending[combat_id] = pending.merge(delta) if pending else delta
+
+    def has_pending(self, combat_id: str) -> bool:
+        """Check if a combat has unwritten changes."""
+        return combat_id in self._pending
+
+    def _requeue(self, combat_id: str, delta: Any) -> None:
+        newer = self._pending.get(combat_id)
+        self._pending[combat_id] = delta.merge(newer) if newer else delta
+
+    async def flush_combat(self, combat_id: str, repo: Any) -> bool:
+        """
+        Write one combat's pending delta through the given repository.
+
+        Args:
+            combat_id: The combat session ID
+            repo: CombatStateRepository bound to the caller's session
+
+        Returns:
+            True if nothing was pending or the write succeeded
+        """
+        delta = self._pending.pop(combat_id, None)
+        if delta is None:
+            return True
+        try:
+            return await repo.apply_delta(combat_id, delta)
+        except Exception:
+            self._requeue(combat_id, delta)
+            raise
+
+    async def flush_all(self) -> int:
+        """
+        Write every pending delta in a single transaction.
+
+        Returns:
+            Number of combats written
+        """
+        if not self._pending:
+            return 0
+
+        from app.database.engine import get_session_context
+        from app.database.repositories import CombatStateRepository
+
+        batch, self._pending = self._pending, {}
+        try:
+            async with get_session_context() as session:
+                repo = CombatStateRepository(session)
+                for combat_id, delta in batch.items():
+                    await repo.apply_delta(combat_id, delta)
+        except Exception:
+            for combat_id, delta in batch.items():
+                self._requeue(combat_id, delta)
+            raise
+        return len(batch)
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the background task and write anything still pending."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_all()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_all()
+            except Exception as e:
+                print(f"[CombatStorage] Write-behind flush failed: {e}")
+
+
+_write_behind: Optional[CombatWriteBehindBuffer] = None
+_write_behind_configured = False
+
+
+def get_write_behind_buffer() -> Optional[CombatWriteBehindBuffer]:
+    """Get the write-behind buffer, or None when writes go straight through."""
+    global _write_behind, _write_behind_configured
+    if not _write_behind_configured:
+        from app.config import get_settings
+        interval = get_settings().COMBAT_WRITE_BEHIND_SECONDS
+        _write_behind = CombatWriteBehindBuffer(interval) if interval > 0 else None
+        _write_behind_configured = True
+    return _write_behind
+
+
+def set_write_behind_buffer(buffer: Optional[CombatWriteBehindBuffer]) -> None:
+    """Enable (or with None, disable) write-behind persistence."""
+    global _write_behind, _write_behind_configured
+    _write_behind = buffer
+    _write_behind_configured = True
 
 
 async def persist_combat_state(
     combat_id: str,
     engine: Any,
     repo: Any,
+    end_of_turn: bool = False,
 ) -> bool:
     """
-    Persist current combat state to database.
+    Persist the changes to a combat state since the last write.
+
+    Only sections reported by CombatEngine.collect_state_delta() are
+    written. With write-behind enabled the delta is queued instead and
+    flushed on the timer, or immediately when end_of_turn is set.
+
+    New engine events are always appended to the combat journal, and a
+    full engine snapshot is stored on the first write and at end of turn
+    so recover_combat_engine() can rebuild the combat after a restart.
 
     Args:
         combat_id: The combat session ID
         engine: The CombatEngine instance
         repo: CombatStateRepository instance
+        end_of_turn: Flush any buffered writes for this combat now
 
     Returns:
         True if persistence succeeded, False otherwise
     """
     try:
-        state = engine.get_combat_state()
-
-        await repo.update_full_state(
-            combat_id,
-            phase=state.get("phase", "combat_active"),
-            round_number=state.get("round", 1),
-            current_turn_index=state.get("current_turn_index", 0),
-            combatant_stats=state.get("combatant_stats", {}),
-            current_turn=state.get("current_turn"),
-            positions=state.get("positions", {}),
-            initiative_order=state.get("initiative_order", []),
-            active_effects=state.get("active_effects", []),
-        )
+        first_write = not engine.state.persisted
+        delta = engine.collect_state_delta()
+        buffer = get_write_behind_buffer()
+        await journal_combat_events(combat_id, engine, repo)
+
+        if buffer is not None:
+            if not delta.is_empty():
+                buffer.add(combat_id, delta)
+                engine.state.mark_persisted(delta)
+            if end_of_turn:
+                if not await buffer.flush_combat(combat_id, repo):
+                    return False
+        elif not delta.is_empty():
+            if await repo.apply_delta(combat_id, delta):
+                engine.state.mark_persisted(delta)
+
+        if end_of_turn or first_write:
+            await save_combat_snapshot(combat_id, engine, repo)
         return True
     except Exception as e:
         print(f"[CombatStorage] Failed to persist combat state: {e}")
         return False
 
 
+async def journal_combat_events(combat_id: str, engine: Any, repo: Any) -> int:
+    """
+    Append events added since the last call to the combat_logs journal.
+
+    Events are written in one batch per request. Repositories without
+    journal support are skipped.
+
+    Args:
+        combat_id: The combat session ID
+        engine: The CombatEngine instance
+        repo: CombatStateRepository instance
+
+    Returns:
+        Number of events journaled
+    """
+    events = engine.state.get_unjournaled_events()
+    if not events or not hasattr(repo, "get_log_repository"):
+        return 0
+    # Event data can hold dice results and other non-JSON objects
+    written = await repo.get_log_repository().create_many(
+        combat_id, [json.loads(json.dumps(event.to_dict(), default=_json_default)) for event in events]
+    )
+    engine.state.mark_journaled(events[-1].sequence)
+    return written
+
+
+async def save_combat_snapshot(combat_id: str, engine: Any, repo: Any) -> bool:
+    """
+    Store a full engine snapshot covering every event journaled so far.
+
+    Args:
+        combat_id: The combat session ID
+        engine: The CombatEngine instance
+        repo: CombatStateRepository instance
+
+    Returns:
+        True if the snapshot was stored
+    """
+    if not hasattr(repo, "save_snapshot"):
+        return False
+    snapshot = json.loads(json.dumps(engine.to_dict(), default=_json_default))
+    return await repo.save_snapshot(combat_id, snapshot, engine.state.journaled_sequence)
+
+
+def _restore_initiative_tracker(
+    tracker: Any,
+    initiative_order: Optional[List[Dict[str, Any]]],
+    combatant_stats: Dict[str, Dict[str, Any]],
+) -> None:
+    """
+    Bring the snapshot's initiative tracker up to the persisted columns.
+
+    The persisted initiative order supplies turn order, hp, conditions and
+    whether each combatant is still active; current hp in the stat blocks
+    wins where both are present.
+    """
+    by_id = {combatant.id: combatant for combatant in tracker.combatants}
+    if initiative_order:
+        ordered = []
+        for entry in initiative_order:
+            combatant = by_id.get(entry.get("id"))
+            if combatant is None:
+                continue
+            combatant.initiative_roll = entry.get("initiative", combatant.initiative_roll)
+            combatant.has_acted = entry.get("has_acted", combatant.has_acted)
+            combatant.is_active = entry.get("is_active", combatant.is_active)
+            combatant.current_hp = entry.get("current_hp", combatant.current_hp)
+            combatant.max_hp = entry.get("max_hp", combatant.max_hp)
+            combatant.conditions = list(entry.get("conditions", combatant.conditions))
+            ordered.append(combatant)
+        ordered.extend(c for c in tracker.combatants if c not in ordered)
+        tracker.combatants = ordered
+
+    for cid, stats in combatant_stats.items():
+        combatant = by_id.get(cid)
+        if combatant is not None and "current_hp" in stats:
+            combatant.current_hp = stats["current_hp"]
+
+
+async def recover_combat_engine(combat_id: str, repo: Any) -> Optional[Any]:
+    """
+    Rebuild a combat engine from the database after a crash or restart.
+
+    Starts from the last snapshot, appends the journal tail written after it
+    (re-applying moves), then overlays the per-request state columns, which
+    are newer than the snapshot whenever write-through persistence is used.
+    The initiative tracker is restored from the persisted initiative order
+    and stat blocks so hp and active flags match the database.
+
+    Args:
+        combat_id: The combat session ID
+        repo: CombatStateRepository instance
+
+    Returns:
+        Recovered CombatEngine, or None if the combat has no snapshot or
+        has already ended
+    """
+    from app.core.combat_engine import CombatEngine, CombatEvent, CombatPhase, TurnPhase
+
+    try:
+        row = await repo.get_by_id(combat_id)
+        if not row or not row.is_active or not row.snapshot:
+            return None
+
+        engine = CombatEngine.from_dict(row.snapshot)
+        state = engine.state
+
+        # Replay the journal tail
+        tail = await repo.get_log_repository().get_after_sequence(combat_id, row.snapshot_sequence)
+        for log in tail:
+            state.event_log.append(CombatEvent(
+                event_type=log.event_type,
+                round_number=log.round_number,
+                combatant_id=log.actor_id,
+                description=log.description,
+                data=log.data or {},
+                sequence=log.sequence,
+            ))
+            if log.event_type == "move" and log.actor_id and log.data.get("to"):
+                state.positions[log.actor_id] = tuple(log.data["to"])
+        if tail:
+            state.event_sequence = max(state.event_sequence, tail[-1].sequence)
+        state.journaled_sequence = state.event_sequence
+
+        # Overlay the latest persisted columns
+        if row.positions:
+            state.positions = {
+                cid: (pos["x"], pos["y"]) if isinstance(pos, dict) else tuple(pos)
+                for cid, pos in row.positions.items()
+            }
+        if row.combatant_stats:
+            state.combatant_stats = dict(row.combatant_stats)
+        _restore_initiative_tracker(state.initiative_tracker, row.initiative_order, state.combatant_stats)
+        state.phase = CombatPhase[row.phase] if row.phase in CombatPhase.__members__ else state.phase
+        state.initiative_tracker.current_round = row.round_number
+        state.initiative_tracker.current_turn_index = row.current_turn_index
+
+        turn = row.current_turn
+        if turn and state.current_turn and state.current_turn.combatant_id == turn.get("combatant_id"):
+            state.current_turn.movement_used = turn.get("movement_used", 0)
+            state.current_turn.action_taken = turn.get("action_taken", False)
+            state.current_turn.bonus_action_taken = turn.get("bonus_action_taken", False)
+            state.current_turn.current_phase = TurnPhase[turn.get("phase", "START_OF_TURN")]
+
+        # The recovered engine matches the database
+        state.mark_persisted(engine.collect_state_delta())
+        return engine
+    except Exception as e:
+        print(f"[CombatStorage] Failed to recover combat {combat_id}: {e}")
+        return None
+
+
 async def create_combat_state(
     combat_id: str,
     session_id: Optional[str],
@@ -79,7 +836,7 @@ async def create_combat_state(
         )
 
         # Create with specific ID
-        combat_state = await repo.create(data)
+        combat_state = await repo.create(data, combat_id=combat_id)
         return combat_state
     except Exception as e:
         print(f"[CombatStorage] Failed to create combat state: {e}")
@@ -105,6 +862,9 @@ async def end_combat_state(
         True if update succeeded, False otherwise
     """
     try:
+        buffer = get_write_behind_buffer()
+        if buffer is not None:
+            await buffer.flush_combat(combat_id, repo)
         await repo.end_combat(combat_id, result=result, xp_awarded=xp_awarded)
         return True
     except Exception as e:
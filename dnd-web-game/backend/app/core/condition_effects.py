@@ -10,8 +10,8 @@ Loads condition data from conditions.json and provides methods to:
 """
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple
-from pathlib import Path
-import json
+
+from app.core.rules_catalog import get_rules_catalog, on_catalog_reload
 
 
 # =============================================================================
@@ -48,11 +48,8 @@ def load_conditions() -> Dict[str, ConditionData]:
     if _condition_cache:
         return _condition_cache
 
-    conditions_path = Path(__file__).parent.parent / "data" / "conditions.json"
+    data = get_rules_catalog().get("conditions.json")
     try:
-        with open(conditions_path, encoding="utf-8") as f:
-            data = json.load(f)
-
         for condition_data in data.get("conditions", []):
             cond = ConditionData(
                 id=condition_data["id"],
@@ -71,6 +68,10 @@ def load_conditions() -> Dict[str, ConditionData]:
     return _condition_cache
 
 
+# Reload when the rules data is hot-reloaded
+on_catalog_reload(_condition_cache.clear)
+
+
 def _init_default_conditions():
     """Initialize default conditions if JSON fails to load."""
     global _condition_cache
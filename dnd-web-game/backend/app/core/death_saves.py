@@ -17,7 +17,8 @@ Also handles:
 from dataclasses import dataclass
 from typing import Dict, Any, Optional, Tuple
 from enum import Enum
-import random
+
+from app.core.dice import active_rng, roll_die
 
 
 class DeathSaveOutcome(str, Enum):
@@ -95,7 +96,7 @@ class DeathSaveResult:
 
 def roll_d20() -> int:
     """Roll a d20."""
-    return random.randint(1, 20)
+    return roll_die(20)
 
 
 def roll_death_save(
@@ -229,7 +230,7 @@ def _get_revive_message() -> str:
         "By sheer force of will, they return!",
         "Death's grip loosens as they awaken!",
     ]
-    return random.choice(messages)
+    return active_rng().choice(messages)
 
 
 def take_damage_while_dying(
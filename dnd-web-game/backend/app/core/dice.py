@@ -4,13 +4,23 @@ Dice rolling system for D&D 5e mechanics.
 Handles all dice operations including:
 - Standard dice (d4, d6, d8, d10, d12, d20, d100)
 - Advantage and disadvantage on d20 rolls
-- Damage dice notation parsing (2d6+3, 1d8+1d6, etc.)
+- Damage dice notation parsing (2d6+3, 1d8+1d6, etc.), compiled and cached
 - Critical hit detection (natural 20) and fumbles (natural 1)
+- Batched rolls from seedable per-combat streams (DiceRoller)
+- Context-local RNGs for module-level rolls (dice_rng), so replays such as
+  simulations never reseed the process-wide random module
 """
 import random
 import re
-from dataclasses import dataclass
-from typing import List, Tuple
+from array import array
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# RNG for module-level rolls in the current context; None = the random module
+_active_rng: ContextVar[Optional[random.Random]] = ContextVar("dice_rng", default=None)
 
 
 @dataclass
@@ -44,11 +54,32 @@ class DamageResult:
     is_critical: bool = False  # If true, dice were doubled
 
 
+def active_rng() -> Any:
+    """The RNG module-level rolls draw from: a dice_rng() context's, else the random module."""
+    rng = _active_rng.get()
+    return random if rng is None else rng
+
+
+@contextmanager
+def dice_rng(rng: random.Random) -> Iterator[random.Random]:
+    """
+    Draw every module-level roll in this context (thread or task) from rng.
+
+    Args:
+        rng: Private generator, e.g. random.Random(seed) for a replayable run
+    """
+    token = _active_rng.set(rng)
+    try:
+        yield rng
+    finally:
+        _active_rng.reset(token)
+
+
 def roll_die(sides: int) -> int:
     """Roll a single die with the given number of sides."""
     if sides < 1:
         raise ValueError(f"Invalid die: d{sides}")
-    return random.randint(1, sides)
+    return active_rng().randint(1, sides)
 
 
 def roll_d20(modifier: int = 0, advantage: bool = False, disadvantage: bool = False) -> D20Result:
@@ -96,16 +127,100 @@ def roll_d20(modifier: int = 0, advantage: bool = False, disadvantage: bool = Fa
     )
 
 
-def parse_dice_notation(notation: str) -> List[Tuple[int, int, int]]:
+# Distinct notations kept compiled; the game uses a few hundred at most
+DICE_EXPRESSION_CACHE_SIZE = 1024
+
+_DICE_TERM = re.compile(r'^([+-]?)(\d*)d(\d+)$')
+_NOTATION_SPLIT = re.compile(r'(?=[+-])')
+
+
+@dataclass(frozen=True)
+class DiceExpression:
     """
-    Parse dice notation into components.
+    Parsed dice notation with its statistics precomputed.
+
+    Instances are interned by compile_dice_notation(), so estimators can
+    read mean/min/max without re-parsing the string.
+    """
+    notation: str
+    components: Tuple[Tuple[int, int, int], ...]  # (count, sides, modifier)
+    multiplier: int = 1
+
+    @cached_property
+    def minimum(self) -> int:
+        """Lowest possible total (before the 1-damage floor)."""
+        total = 0
+        for count, sides, flat_mod in self.components:
+            total += (count if count >= 0 else count * sides) if sides else 0
+            total += flat_mod
+        return total * self.multiplier
+
+    @cached_property
+    def maximum(self) -> int:
+        """Highest possible total."""
+        total = 0
+        for count, sides, flat_mod in self.components:
+            total += (count * sides if count >= 0 else count) if sides else 0
+            total += flat_mod
+        return total * self.multiplier
+
+    @cached_property
+    def mean(self) -> float:
+        """Expected total."""
+        total = 0.0
+        for count, sides, flat_mod in self.components:
+            total += count * (sides + 1) / 2 if sides else 0
+            total += flat_mod
+        return total * self.multiplier
+
+    @cached_property
+    def variance(self) -> float:
+        """Variance of the total (dice are independent)."""
+        per_die = sum(abs(count) * (sides * sides - 1) / 12 for count, sides, _ in self.components if sides)
+        return per_die * self.multiplier * self.multiplier
+
+    @cached_property
+    def dice_count(self) -> int:
+        """Number of dice rolled."""
+        return sum(abs(count) for count, sides, _ in self.components if sides)
+
+    @cached_property
+    def critical(self) -> "DiceExpression":
+        """The same expression with every die doubled (critical hit)."""
+        return DiceExpression(
+            notation=f"{self.notation} (crit)",
+            components=tuple(
+                (count * 2, sides, flat_mod) if sides else (count, sides, flat_mod)
+                for count, sides, flat_mod in self.components
+            ),
+            multiplier=self.multiplier,
+        )
+
+    def roll(self, rng: Optional[random.Random] = None) -> int:
+        """Roll the expression once (no minimum applied)."""
+        randint = (rng or active_rng()).randint
+        total = 0
+        for count, sides, flat_mod in self.components:
+            if sides:
+                rolled = sum(randint(1, sides) for _ in range(abs(count)))
+                total += rolled if count >= 0 else -rolled
+            total += flat_mod
+        return total * self.multiplier
+
+
+@lru_cache(maxsize=DICE_EXPRESSION_CACHE_SIZE)
+def compile_dice_notation(notation: str) -> DiceExpression:
+    """
+    Parse dice notation once and intern the result.
+
+    Accepts everything parse_dice_notation() does, plus a trailing
+    multiplier used by treasure tables ("3d6x100").
 
     Args:
-        notation: Dice notation like "2d6+3", "1d8+1d6", "3d4-1"
+        notation: Dice notation like "2d6+3", "1d8+1d6", "4d6x10"
 
     Returns:
-        List of (count, sides, modifier) tuples.
-        For "2d6+3+1d4", returns [(2, 6, 3), (1, 4, 0)]
+        Shared DiceExpression for the notation
 
     Raises:
         ValueError: If notation is invalid
@@ -113,20 +228,25 @@ def parse_dice_notation(notation: str) -> List[Tuple[int, int, int]]:
     if not notation:
         raise ValueError("Empty dice notation")
 
-    notation = notation.lower().replace(" ", "")
-    components = []
-
-    # Split by + or - while keeping the sign
-    parts = re.split(r'(?=[+-])', notation)
+    normalized = notation.lower().replace(" ", "")
+    multiplier = 1
+    if "x" in normalized:
+        normalized, _, factor = normalized.partition("x")
+        try:
+            multiplier = int(factor)
+        except ValueError:
+            raise ValueError(f"Invalid dice notation: {notation}")
 
+    components = []
     current_modifier = 0
 
-    for part in parts:
+    # Split by + or - while keeping the sign
+    for part in _NOTATION_SPLIT.split(normalized):
         if not part:
             continue
 
         # Check if it's a dice expression (contains 'd')
-        dice_match = re.match(r'^([+-]?)(\d*)d(\d+)$', part)
+        dice_match = _DICE_TERM.match(part)
         if dice_match:
             sign = -1 if dice_match.group(1) == '-' else 1
             count = int(dice_match.group(2)) if dice_match.group(2) else 1
@@ -147,7 +267,27 @@ def parse_dice_notation(notation: str) -> List[Tuple[int, int, int]]:
         # Just a flat number, no dice
         components.append((0, 0, current_modifier))
 
-    return components
+    return DiceExpression(notation=notation, components=tuple(components), multiplier=multiplier)
+
+
+def parse_dice_notation(notation: str) -> List[Tuple[int, int, int]]:
+    """
+    Parse dice notation into components.
+
+    Args:
+        notation: Dice notation like "2d6+3", "1d8+1d6", "3d4-1"
+
+    Returns:
+        List of (count, sides, modifier) tuples.
+        For "2d6+3+1d4", returns [(2, 6, 3), (1, 4, 0)]
+
+    Raises:
+        ValueError: If notation is invalid
+    """
+    expression = compile_dice_notation(notation)
+    if expression.multiplier != 1:
+        raise ValueError(f"Invalid dice notation: {notation}")
+    return list(expression.components)
 
 
 def roll_damage(notation: str, modifier: int = 0, critical: bool = False) -> DamageResult:
@@ -203,6 +343,19 @@ def roll_damage(notation: str, modifier: int = 0, critical: bool = False) -> Dam
     )
 
 
+def roll_dice(notation: str) -> int:
+    """
+    Roll dice notation and return just the total.
+
+    Args:
+        notation: Dice notation like "2d6", "1d8+2"
+
+    Returns:
+        Total rolled (minimum 1, as with roll_damage)
+    """
+    return roll_damage(notation).total
+
+
 def roll_initiative(dexterity_modifier: int = 0) -> int:
     """
     Roll initiative (d20 + DEX modifier).
@@ -284,3 +437,219 @@ def roll_d12(count: int = 1) -> List[int]:
 def roll_d100() -> int:
     """Roll percentile dice (d100)."""
     return roll_die(100)
+
+
+# =============================================================================
+# BATCHED ROLLS
+# =============================================================================
+
+
+def _per_row(value: Union[bool, Sequence[bool]], count: int) -> Sequence[bool]:
+    """Expand a flag to one value per row."""
+    if isinstance(value, bool):
+        return [value] * count
+    if len(value) != count:
+        raise ValueError(f"Expected {count} flags, got {len(value)}")
+    return value
+
+
+@dataclass
+class D20Batch:
+    """
+    Results of rolling many d20s at once, one row per roll.
+
+    naturals and totals are compact int arrays; use result(i) to get a
+    D20Result for code that expects one.
+    """
+    naturals: array  # d20 kept per row (after advantage/disadvantage)
+    totals: array
+    modifiers: List[int]
+    rolls: List[Tuple[int, ...]]  # All dice rolled per row
+    advantage: List[bool]
+    disadvantage: List[bool]
+
+    def __len__(self) -> int:
+        return len(self.naturals)
+
+    def result(self, index: int) -> D20Result:
+        """Get one row as a D20Result."""
+        natural = self.naturals[index]
+        return D20Result(
+            rolls=list(self.rolls[index]),
+            modifier=self.modifiers[index],
+            total=self.totals[index],
+            advantage=self.advantage[index],
+            disadvantage=self.disadvantage[index],
+            natural_20=(natural == 20),
+            natural_1=(natural == 1)
+        )
+
+
+@dataclass
+class DiceRoller:
+    """
+    Seedable dice stream for one combat.
+
+    One random.Random seeded once per roller; every die is a single
+    random() draw, so a roller is persisted as two integers (seed, draws)
+    and a restored combat fast-forwards to the exact same point in the
+    sequence. Replaying a combat from its seed reproduces every roll made
+    through the roller.
+    """
+    seed: int = field(default_factory=lambda: active_rng().getrandbits(63))
+    draws: int = 0
+    _rng: random.Random = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        draw = self._rng.random
+        for _ in range(self.draws):
+            draw()
+
+    def _faces(self, sides: int, count: int) -> List[int]:
+        """Roll count dice with the given number of sides."""
+        self.draws += count
+        draw = self._rng.random
+        return [int(draw() * sides) + 1 for _ in range(count)]
+
+    def roll_d20_batch(
+        self,
+        modifiers: Sequence[int],
+        advantage: Union[bool, Sequence[bool]] = False,
+        disadvantage: Union[bool, Sequence[bool]] = False
+    ) -> D20Batch:
+        """
+        Roll one d20 per modifier in a single draw.
+
+        Args:
+            modifiers: Modifier for each row
+            advantage: One flag for all rows, or one per row
+            disadvantage: One flag for all rows, or one per row
+
+        Returns:
+            D20Batch with a row per modifier
+        """
+        count = len(modifiers)
+        advantage = _per_row(advantage, count)
+        disadvantage = _per_row(disadvantage, count)
+        # Advantage and disadvantage cancel each other out
+        adv_rows = [a and not d for a, d in zip(advantage, disadvantage)]
+        dis_rows = [d and not a for a, d in zip(advantage, disadvantage)]
+
+        dice = self._faces(20, count + sum(adv_rows) + sum(dis_rows))
+
+        naturals = array("i", [0]) * count
+        totals = array("i", [0]) * count
+        rolls: List[Tuple[int, ...]] = []
+        position = 0
+        for row in range(count):
+            if adv_rows[row] or dis_rows[row]:
+                pair = (dice[position], dice[position + 1])
+                position += 2
+                natural = max(pair) if adv_rows[row] else min(pair)
+                rolls.append(pair)
+            else:
+                natural = dice[position]
+                position += 1
+                rolls.append((natural,))
+            naturals[row] = natural
+            totals[row] = natural + modifiers[row]
+
+        return D20Batch(
+            naturals=naturals,
+            totals=totals,
+            modifiers=list(modifiers),
+            rolls=rolls,
+            advantage=adv_rows,
+            disadvantage=dis_rows,
+        )
+
+    def roll_d20(
+        self,
+        modifier: int = 0,
+        advantage: bool = False,
+        disadvantage: bool = False
+    ) -> D20Result:
+        """Roll a single d20 from the stream (see roll_d20)."""
+        if advantage and disadvantage:
+            advantage = disadvantage = False
+        rolls = self._faces(20, 2 if advantage or disadvantage else 1)
+        natural = max(rolls) if advantage else min(rolls)
+        return D20Result(
+            rolls=rolls,
+            modifier=modifier,
+            total=natural + modifier,
+            advantage=advantage,
+            disadvantage=disadvantage,
+            natural_20=(natural == 20),
+            natural_1=(natural == 1)
+        )
+
+    def roll_damage_batch(
+        self,
+        notations: Sequence[str],
+        critical: Union[bool, Sequence[bool]] = False
+    ) -> array:
+        """
+        Roll many damage expressions in a single draw per die size.
+
+        Args:
+            notations: Dice notation for each row
+            critical: One flag for all rows, or one per row (doubles dice)
+
+        Returns:
+            Int array of totals, one per notation (minimum 1 each)
+        """
+        critical = _per_row(critical, len(notations))
+        parsed = [parse_dice_notation(notation) for notation in notations]
+
+        # Count every die needed per size, then draw each size once
+        needed: Dict[int, int] = {}
+        for components, crit in zip(parsed, critical):
+            for count, sides, _ in components:
+                if sides:
+                    needed[sides] = needed.get(sides, 0) + abs(count) * (2 if crit else 1)
+        pools = {sides: iter(self._faces(sides, amount)) for sides, amount in sorted(needed.items())}
+
+        totals = array("i", [0]) * len(notations)
+        for row, (components, crit) in enumerate(zip(parsed, critical)):
+            total = 0
+            for count, sides, flat_mod in components:
+                if sides:
+                    pool = pools[sides]
+                    rolled = sum(next(pool) for _ in range(abs(count) * (2 if crit else 1)))
+                    total += rolled if count >= 0 else -rolled
+                total += flat_mod
+            totals[row] = max(1, total)
+        return totals
+
+    def roll_damage(self, notation: str, modifier: int = 0, critical: bool = False) -> DamageResult:
+        """Roll damage from the stream (see roll_damage)."""
+        all_rolls = []
+        total = modifier
+        for count, sides, flat_mod in parse_dice_notation(notation):
+            if sides:
+                sign = 1 if count >= 0 else -1
+                for roll in self._faces(sides, abs(count) * (2 if critical else 1)):
+                    all_rolls.append(roll * sign)
+                    total += roll * sign
+            total += flat_mod
+
+        return DamageResult(
+            rolls=all_rolls,
+            modifier=modifier,
+            total=max(1, total),
+            dice_notation=notation,
+            is_critical=critical
+        )
+
+    def to_dict(self) -> Dict[str, int]:
+        """Serialize the stream position."""
+        return {"seed": self.seed, "draws": self.draws}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, int]]) -> "DiceRoller":
+        """Restore a stream, or start a fresh one if there is none."""
+        if not data:
+            return cls()
+        return cls(seed=data["seed"], draws=data.get("draws", 0))
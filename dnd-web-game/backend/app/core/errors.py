@@ -253,6 +253,32 @@ class CombatNotActiveError(CombatError):
         )
 
 
+class CombatBusyError(CombatError):
+    """Raised when another request holds the combat session lock too long."""
+
+    def __init__(self, combat_id: str):
+        super().__init__(
+            code=ErrorCode.CONFLICT,
+            message="Combat is busy processing another request",
+            details={"combat_id": combat_id},
+            recovery_hint="Retry the action in a moment"
+        )
+        self.http_status = 409
+
+
+class CombatLockLostError(CombatError):
+    """Raised when a request's combat session lock expired before it was written back."""
+
+    def __init__(self, combat_id: str):
+        super().__init__(
+            code=ErrorCode.CONFLICT,
+            message="Combat changed while this request was running; its changes were not saved",
+            details={"combat_id": combat_id},
+            recovery_hint="Reload the combat and retry the action"
+        )
+        self.http_status = 409
+
+
 # =============================================================================
 # Campaign Errors
 # =============================================================================
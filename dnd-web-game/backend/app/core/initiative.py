@@ -6,10 +6,10 @@ Supports initiative rolls, tiebreakers, and turn management.
 """
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 
-from app.core.dice import roll_d20
+from app.core.dice import DiceRoller, roll_d20
 
 
 class CombatantType(Enum):
@@ -193,6 +193,21 @@ class InitiativeTracker:
     current_turn_index: int = 0
     combat_started: bool = False
 
+    # id -> Combatant lookup for get_combatant. Keyed to the identity and
+    # length of ``combatants`` so a list that is replaced or edited directly
+    # is simply re-indexed on the next lookup.
+    _by_id: Dict[str, Combatant] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed_list: Tuple[int, int] = field(default=(0, -1), init=False, repr=False, compare=False)
+
+    def _combatant_index(self) -> Dict[str, Combatant]:
+        """The id -> Combatant map, rebuilt if the list changed under it."""
+        key = (id(self.combatants), len(self.combatants))
+        if key != self._indexed_list:
+            # First occurrence wins, matching the old linear scan
+            self._by_id = {c.id: c for c in reversed(self.combatants)}
+            self._indexed_list = key
+        return self._by_id
+
     def add_combatant(
         self,
         name: str,
@@ -248,7 +263,10 @@ class InitiativeTracker:
             weapons=weapons or [],
             spellcasting=spellcasting,
         )
+        index = self._combatant_index()
         self.combatants.append(combatant)
+        index.setdefault(combatant.id, combatant)
+        self._indexed_list = (id(self.combatants), len(self.combatants))
         return combatant
 
     def remove_combatant(self, combatant_id: str) -> bool:
@@ -292,31 +310,36 @@ class InitiativeTracker:
 
     def get_combatant(self, combatant_id: str) -> Optional[Combatant]:
         """Get a combatant by ID."""
-        for combatant in self.combatants:
-            if combatant.id == combatant_id:
-                return combatant
-        return None
+        combatant = self._combatant_index().get(combatant_id)
+        if combatant is not None and combatant.id != combatant_id:
+            # A combatant was renamed in place; re-index and look again
+            self._indexed_list = (0, -1)
+            combatant = self._combatant_index().get(combatant_id)
+        return combatant
 
-    def roll_all_initiative(self) -> List[InitiativeResult]:
+    def roll_all_initiative(self, dice: Optional[DiceRoller] = None) -> List[InitiativeResult]:
         """
         Roll initiative for all combatants and sort by result.
 
+        Args:
+            dice: Combat dice stream; every combatant is rolled in one batch
+
         Returns:
             List of InitiativeResult for each combatant
         """
         results = []
+        dice = dice or DiceRoller()
+        batch = dice.roll_d20_batch([c.dexterity_modifier for c in self.combatants])
 
-        for combatant in self.combatants:
-            # Roll for each combatant
-            roll_result = roll_d20(modifier=combatant.dexterity_modifier)
-            combatant.initiative_roll = roll_result.total
+        for combatant, natural, total in zip(self.combatants, batch.naturals, batch.totals):
+            combatant.initiative_roll = total
 
             results.append(InitiativeResult(
                 combatant_id=combatant.id,
                 combatant_name=combatant.name,
-                roll=roll_result.base_roll,
+                roll=natural,
                 modifier=combatant.dexterity_modifier,
-                total=roll_result.total,
+                total=total,
             ))
 
         # Sort combatants by initiative (highest first)
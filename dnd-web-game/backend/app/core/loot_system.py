@@ -11,9 +11,9 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any, Tuple
 from enum import Enum
 import random
-import re
-import json
-from pathlib import Path
+
+from app.core.dice import compile_dice_notation
+from app.core.rules_catalog import get_rules_catalog
 
 
 class TreasureType(Enum):
@@ -133,45 +133,20 @@ class LootGenerator:
         self._load_data()
 
     def _load_data(self) -> None:
-        """Load all treasure table data from JSON files."""
-        data_path = Path(__file__).parent.parent / "data" / "loot_tables"
-
-        # Load treasure tables
-        treasure_file = data_path / "treasure_by_cr.json"
-        if treasure_file.exists():
-            with open(treasure_file, 'r') as f:
-                self._treasure_tables = json.load(f)
-
-        # Load gems data
-        gems_file = data_path / "gems.json"
-        if gems_file.exists():
-            with open(gems_file, 'r') as f:
-                self._gems_data = json.load(f)
-
-        # Load art objects data
-        art_file = data_path / "art_objects.json"
-        if art_file.exists():
-            with open(art_file, 'r') as f:
-                self._art_data = json.load(f)
+        """Load all treasure table data from the rules catalog."""
+        catalog = get_rules_catalog()
+
+        self._treasure_tables = catalog.get("loot_tables/treasure_by_cr.json", {})
+        self._gems_data = catalog.get("loot_tables/gems.json", {})
+        self._art_data = catalog.get("loot_tables/art_objects.json", {})
 
         # Load magic items from existing data
-        magic_path = Path(__file__).parent.parent / "data" / "rules" / "2024" / "magic_items"
-        if magic_path.exists():
-            for item_file in magic_path.glob("*.json"):
-                try:
-                    with open(item_file, 'r') as f:
-                        items = json.load(f)
-                        if isinstance(items, list):
-                            for item in items:
-                                if "id" in item:
-                                    self._magic_items_cache[item["id"]] = item
-                        elif isinstance(items, dict) and "items" in items:
-                            for item in items["items"]:
-                                if "id" in item:
-                                    self._magic_items_cache[item["id"]] = item
-                except Exception as e:
-                    import logging
-                    logging.warning(f"Failed to load magic items from {item_file}: {e}")
+        for _, items in catalog.directory("rules/2024/magic_items"):
+            if isinstance(items, dict):
+                items = items.get("items", [])
+            for item in items:
+                if "id" in item:
+                    self._magic_items_cache[item["id"]] = item
 
     def _roll_dice(self, dice_str: str) -> int:
         """
@@ -186,26 +161,8 @@ class LootGenerator:
         if not dice_str:
             return 0
 
-        dice_str = dice_str.lower().strip()
-        multiplier = 1
-
-        # Handle multipliers (e.g., "3d6x100")
-        if 'x' in dice_str:
-            parts = dice_str.split('x')
-            dice_str = parts[0]
-            multiplier = int(parts[1])
-
-        # Parse dice notation
-        match = re.match(r'(\d+)d(\d+)', dice_str)
-        if match:
-            num_dice = int(match.group(1))
-            die_size = int(match.group(2))
-            total = sum(random.randint(1, die_size) for _ in range(num_dice))
-            return total * multiplier
-
-        # Handle flat numbers
         try:
-            return int(dice_str) * multiplier
+            return max(0, compile_dice_notation(dice_str.strip()).roll())
         except ValueError:
             return 0
 
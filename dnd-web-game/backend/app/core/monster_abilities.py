@@ -678,8 +678,11 @@ def get_monster_abilities(monster_stats: Dict[str, Any]) -> List[MonsterAbility]
         ability = parse_monster_action(action, monster_id)
         abilities.append(ability)
 
-    # Parse legendary actions
-    for leg_action in monster_stats.get("legendary_actions", []):
+    # Parse legendary actions (a list, or {"actions_per_turn", "actions"})
+    legendary = monster_stats.get("legendary_actions") or []
+    if isinstance(legendary, dict):
+        legendary = legendary.get("actions", [])
+    for leg_action in legendary:
         ability = parse_legendary_action(leg_action, monster_id)
         abilities.append(ability)
 
@@ -0,0 +1,306 @@
+"""
+Monster Catalog.
+
+In-memory index of every 2024 stat block under data/rules/2024/monsters,
+built once from the rules catalog and shared by encounter generation,
+campaign spawning, the AI and the Foundry export.
+
+Each monster is a MonsterEntry with its normalized challenge rating,
+creature type, size and tags, plus its actions pre-parsed into
+MonsterAbility objects. Queries by CR range, type, size, tag or
+environment are set intersections over prebuilt indexes; nothing here
+touches disk after the first build, and the catalog is rebuilt when the
+rules data is hot-reloaded.
+
+Stat blocks and abilities are shared between callers - copy before
+changing them.
+"""
+import bisect
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from app.core.monster_abilities import MonsterAbility, get_monster_abilities
+from app.core.rules_catalog import get_rules_catalog, on_catalog_reload
+
+MONSTERS_DIR = "rules/2024/monsters"
+
+# Speed modes that become movement tags
+MOVEMENT_TAGS = {"fly": "flying", "swim": "swimming", "burrow": "burrowing", "climb": "climbing"}
+
+ABILITY_NAMES = {
+    "STR": "strength", "DEX": "dexterity", "CON": "constitution",
+    "INT": "intelligence", "WIS": "wisdom", "CHA": "charisma",
+}
+
+
+def parse_cr(value: Any) -> float:
+    """Challenge rating as a float ("1/4" -> 0.25); unknown is 0."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value or "0").strip()
+    if "/" in text:
+        numerator, _, denominator = text.partition("/")
+        try:
+            return float(numerator) / float(denominator)
+        except (ValueError, ZeroDivisionError):
+            return 0.0
+    try:
+        return float(text)
+    except ValueError:
+        return 0.0
+
+
+def _creature_type(raw: str) -> Tuple[str, Optional[str]]:
+    """Split "Fiend (demon)" into ("fiend", "demon")."""
+    base, _, rest = (raw or "").partition("(")
+    subtype = rest.rstrip(")").strip().lower() or None
+    return base.strip().lower(), subtype
+
+
+def _tags(stat_block: Dict[str, Any], subtype: Optional[str]) -> FrozenSet[str]:
+    tags = set()
+    if subtype and subtype != "any species":
+        tags.add(subtype)
+    if stat_block.get("is_swarm") or "swarm" in str(stat_block.get("subtype") or "").lower():
+        tags.add("swarm")
+    if stat_block.get("legendary_actions"):
+        tags.add("legendary")
+    traits = stat_block.get("traits") or []
+    if stat_block.get("spellcasting") or any(
+        "spellcasting" in str(t.get("name", "")).lower() for t in traits if isinstance(t, dict)
+    ):
+        tags.add("spellcaster")
+    speed = stat_block.get("speed")
+    if isinstance(speed, dict):
+        tags.update(tag for mode, tag in MOVEMENT_TAGS.items() if speed.get(mode))
+    return frozenset(tags)
+
+
+@dataclass
+class MonsterEntry:
+    """One indexed stat block."""
+    id: str
+    name: str
+    cr: float
+    xp: int
+    creature_type: str
+    size: str
+    tags: FrozenSet[str]
+    source_file: str
+    stat_block: Dict[str, Any]
+    abilities: Tuple[MonsterAbility, ...] = ()
+
+    @classmethod
+    def from_stat_block(
+        cls,
+        stat_block: Dict[str, Any],
+        source_file: str,
+        default_type: str = "",
+    ) -> "MonsterEntry":
+        creature_type, subtype = _creature_type(stat_block.get("type") or default_type)
+        return cls(
+            id=stat_block["id"],
+            name=stat_block.get("name", stat_block["id"]),
+            cr=parse_cr(stat_block.get("challenge_rating")),
+            xp=int(stat_block.get("xp") or 0),
+            creature_type=creature_type,
+            size=str(stat_block.get("size") or "medium").lower(),
+            tags=_tags(stat_block, subtype),
+            source_file=source_file,
+            stat_block=stat_block,
+            abilities=tuple(get_monster_abilities(stat_block)),
+        )
+
+    def as_enemy_template(self) -> Dict[str, Any]:
+        """
+        The stat block in the flat enemy-template shape used by campaigns
+        (data/enemies/*.json): full ability names, walking speed, numeric CR.
+        """
+        block = self.stat_block
+        speed = block.get("speed", 30)
+        scores = block.get("ability_scores") or {}
+        return dict(
+            block,
+            abilities={name: scores.get(key, 10) for key, name in ABILITY_NAMES.items()},
+            hit_points_average=block.get("hit_points", 10),
+            speed=speed.get("walk", 30) if isinstance(speed, dict) else speed,
+            challenge_rating=self.cr,
+        )
+
+
+class MonsterCatalog:
+    """
+    Monsters indexed by id, CR, creature type, size, tag and environment.
+
+    Args:
+        entries: Monsters in load order
+        environments: Environment (terrain) -> monster IDs found there
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[MonsterEntry],
+        environments: Optional[Dict[str, Iterable[str]]] = None,
+    ):
+        self._by_id: Dict[str, MonsterEntry] = {}
+        for entry in entries:
+            self._by_id.setdefault(entry.id, entry)
+
+        # Sorted (cr, name, id) for CR range queries and stable result order
+        self._by_cr: List[Tuple[float, str, str]] = sorted(
+            (e.cr, e.name, e.id) for e in self._by_id.values()
+        )
+        self._rank = {monster_id: i for i, (_, _, monster_id) in enumerate(self._by_cr)}
+
+        self._by_type: Dict[str, Set[str]] = {}
+        self._by_size: Dict[str, Set[str]] = {}
+        self._by_tag: Dict[str, Set[str]] = {}
+        for entry in self._by_id.values():
+            self._by_type.setdefault(entry.creature_type, set()).add(entry.id)
+            self._by_size.setdefault(entry.size, set()).add(entry.id)
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(entry.id)
+
+        self._by_environment: Dict[str, Set[str]] = {
+            str(getattr(env, "value", env)).lower(): {mid for mid in ids if mid in self._by_id}
+            for env, ids in (environments or {}).items()
+        }
+
+    @classmethod
+    def from_rules_catalog(
+        cls,
+        environments: Optional[Dict[str, Iterable[str]]] = None,
+    ) -> "MonsterCatalog":
+        """Build from the monster files in the shared rules catalog."""
+        entries = []
+        for path, data in get_rules_catalog().directory(MONSTERS_DIR):
+            if not isinstance(data, dict):
+                continue
+            # Files list stat blocks under "monsters" or "creatures"
+            blocks = data.get("monsters", data.get("creatures", []))
+            default_type = data.get("creature_type") or (data.get("metadata") or {}).get("creature_type", "")
+            source_file = path.rpartition("/")[2].rsplit(".", 1)[0]
+            for block in blocks:
+                if isinstance(block, dict) and block.get("id"):
+                    entries.append(MonsterEntry.from_stat_block(block, source_file, default_type))
+        return cls(entries, environments)
+
+    def __contains__(self, monster_id: str) -> bool:
+        return monster_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, monster_id: str) -> Optional[MonsterEntry]:
+        """Look a monster up by ID."""
+        return self._by_id.get(monster_id)
+
+    def all(self) -> List[MonsterEntry]:
+        """Every monster, in load order (file by file)."""
+        return list(self._by_id.values())
+
+    def types(self) -> List[str]:
+        return sorted(self._by_type)
+
+    def tags(self) -> List[str]:
+        return sorted(self._by_tag)
+
+    def environments(self) -> List[str]:
+        return sorted(self._by_environment)
+
+    def in_cr_range(self, cr_min: float = 0, cr_max: float = 30) -> List[str]:
+        """IDs with cr_min <= CR <= cr_max, lowest CR first."""
+        lo = bisect.bisect_left(self._by_cr, (cr_min,))
+        hi = bisect.bisect_right(self._by_cr, (cr_max, chr(0x10FFFF)))
+        return [monster_id for _, _, monster_id in self._by_cr[lo:hi]]
+
+    def query(
+        self,
+        cr_min: Optional[float] = None,
+        cr_max: Optional[float] = None,
+        creature_type: Optional[str] = None,
+        size: Optional[str] = None,
+        tag: Optional[str] = None,
+        environment: Optional[str] = None,
+    ) -> List[MonsterEntry]:
+        """
+        Monsters matching every given filter.
+
+        Args:
+            cr_min, cr_max: Inclusive challenge rating bounds
+            creature_type: e.g. "undead", "fiend"
+            size: e.g. "large"
+            tag: e.g. "legendary", "flying", "demon"
+            environment: Terrain name from the encounter tables, e.g. "forest"
+
+        Returns:
+            Matching entries, lowest CR first
+        """
+        candidates: List[Set[str]] = []
+        for index, key in (
+            (self._by_type, creature_type),
+            (self._by_size, size),
+            (self._by_tag, tag),
+            (self._by_environment, environment),
+        ):
+            if key is not None:
+                candidates.append(index.get(str(key).lower(), set()))
+
+        if cr_min is not None or cr_max is not None:
+            candidates.append(set(self.in_cr_range(
+                cr_min if cr_min is not None else 0,
+                cr_max if cr_max is not None else float("inf"),
+            )))
+
+        if candidates:
+            candidates.sort(key=len)
+            found = set(candidates[0]).intersection(*candidates[1:])
+        else:
+            found = self._by_id.keys()
+        return [self._by_id[mid] for mid in sorted(found, key=self._rank.__getitem__)]
+
+
+# =============================================================================
+# SINGLETON
+# =============================================================================
+
+_monster_catalog: Optional[MonsterCatalog] = None
+
+
+def get_monster_catalog() -> MonsterCatalog:
+    """Get the shared monster catalog, building it on first use."""
+    global _monster_catalog
+    if _monster_catalog is None:
+        from app.core.random_encounters import ENCOUNTER_TABLES
+
+        environments: Dict[str, Set[str]] = {}
+        for terrain, table in ENCOUNTER_TABLES.items():
+            ids = environments.setdefault(terrain.value, set())
+            for entry in table:
+                ids.update(spec.get("template") for spec in entry.enemies)
+        _monster_catalog = MonsterCatalog.from_rules_catalog(environments)
+    return _monster_catalog
+
+
+def get_combatant_abilities(stats: Dict[str, Any]) -> Tuple[MonsterAbility, ...]:
+    """
+    A combatant's monster abilities.
+
+    Stat blocks that name a catalog monster (monster_id) share the abilities
+    parsed when the catalog was built; any other stat block is parsed from
+    its own actions.
+    """
+    entry = get_monster_catalog().get(stats.get("monster_id") or "")
+    if entry is not None:
+        return entry.abilities
+    return tuple(get_monster_abilities(stats))
+
+
+def reset_monster_catalog() -> None:
+    """Drop the catalog so the next call rebuilds it."""
+    global _monster_catalog
+    _monster_catalog = None
+
+
+# Rebuild when the rules data is hot-reloaded
+on_catalog_reload(reset_monster_catalog)
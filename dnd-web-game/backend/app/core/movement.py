@@ -2,11 +2,14 @@
 Movement System.
 
 Handles grid-based movement, pathfinding, and terrain for tactical combat.
-Uses A* pathfinding for movement validation and path calculation.
+Paths and reachability are answered from cached per-origin distance fields
+(Dijkstra flood fills) that are invalidated when terrain or occupancy changes.
 """
+from array import array
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional, Dict, Set, Tuple, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Set, Tuple, Any, FrozenSet
 import heapq
 
 
@@ -43,6 +46,14 @@ class GridCell:
     hazard_damage: str = ""  # Damage dice if hazard (e.g., "1d6")
     hazard_type: str = ""  # Damage type (e.g., "fire", "acid")
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        # Cells owned by a grid keep its flat arrays up to date
+        if name in _INDEXED_CELL_FIELDS:
+            grid = self.__dict__.get("_grid")
+            if grid is not None:
+                grid._sync_cell(self)
+
     @property
     def is_passable(self) -> bool:
         """Check if this cell can be entered."""
@@ -119,23 +130,243 @@ class GridCell:
         return base_cost
 
 
+# GridCell fields mirrored into CombatGrid's flat arrays
+_INDEXED_CELL_FIELDS = frozenset({"terrain", "occupied_by", "elevation", "cover_value"})
+
+# Movement cost stored for impassable cells in CombatGrid.movement_costs
+BLOCKED_COST = -1
+
+# DistanceField cost of cells the mover cannot reach
+UNREACHED = 1 << 30
+
+# Distance fields kept per grid before the oldest is evicted
+DISTANCE_FIELD_CACHE_SIZE = 64
+
+# Sight lines kept per grid before the cache is reset
+SIGHT_LINE_CACHE_SIZE = 4096
+
+# Obscurement levels, weakest first
+OBSCUREMENT_LEVELS = (None, "lightly", "heavily")
+
+_CARDINAL_OFFSETS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+_DIAGONAL_OFFSETS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+@lru_cache(maxsize=32)
+def _neighbor_table(
+    width: int,
+    height: int,
+    include_diagonals: bool
+) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Precompute in-bounds neighbor indices for every cell of a grid size.
+
+    Neighbors are listed cardinals first, then diagonals, matching
+    CombatGrid.get_adjacent_cells. Tables are shared by all grids with the
+    same dimensions.
+    """
+    offsets = _CARDINAL_OFFSETS + (_DIAGONAL_OFFSETS if include_diagonals else ())
+    table = []
+    for y in range(height):
+        for x in range(width):
+            table.append(tuple(
+                (y + dy) * width + (x + dx)
+                for dx, dy in offsets
+                if 0 <= x + dx < width and 0 <= y + dy < height
+            ))
+    return tuple(table)
+
+
 @dataclass
 class CombatGrid:
     """
     The tactical combat grid.
 
     Standard D&D uses 5-foot squares on an 8x8 or larger grid.
+
+    Cells are GridCell objects keyed by (x, y). Their terrain, movement
+    cost, elevation, cover and occupant are mirrored into flat arrays
+    indexed by ``y * width + x`` (see to_index), which pathfinding reads
+    instead of hashing position tuples. Assigning to a cell's fields keeps
+    the arrays in sync and bumps ``version``, which invalidates the cached
+    distance fields (see get_distance_field).
     """
     width: int = 8
     height: int = 8
     cells: Dict[Tuple[int, int], GridCell] = field(default_factory=dict)
 
+    # Flat per-cell arrays, indexed by y * width + x
+    terrains: List[TerrainType] = field(init=False, repr=False, compare=False)
+    movement_costs: array = field(init=False, repr=False, compare=False)  # BLOCKED_COST if impassable
+    elevations: array = field(init=False, repr=False, compare=False)
+    cover_values: array = field(init=False, repr=False, compare=False)
+    occupants: List[Optional[str]] = field(init=False, repr=False, compare=False)
+    neighbors: Tuple[Tuple[int, ...], ...] = field(init=False, repr=False, compare=False)
+    version: int = field(init=False, default=0, repr=False, compare=False)
+    # Bumped only by terrain, cover and obscurement changes
+    sight_version: int = field(init=False, default=0, repr=False, compare=False)
+
     def __post_init__(self):
-        """Initialize all cells if not already done."""
+        """Initialize all cells if not already done and build the arrays."""
         if not self.cells:
             for x in range(self.width):
                 for y in range(self.height):
                     self.cells[(x, y)] = GridCell(x=x, y=y)
+        self._build_index()
+
+    def _build_index(self) -> None:
+        size = self.width * self.height
+        self.terrains = [TerrainType.NORMAL] * size
+        self.movement_costs = array("i", [5]) * size
+        self.elevations = array("i", [0]) * size
+        self.cover_values = array("i", [0]) * size
+        self.occupants = [None] * size
+        self.obscurement: List[Optional[str]] = [None] * size  # Fed by SurfaceManager
+        self.surface_difficult = bytearray(size)  # Fed by SurfaceManager (ice, webs, ...)
+        self.neighbors = _neighbor_table(self.width, self.height, True)
+        self._occupant_cells: Dict[str, int] = {}
+        self._distance_fields: Dict[Tuple[int, FrozenSet[str], bool], "DistanceField"] = {}
+        self._sight_lines: Dict[Tuple[int, int, int, int], "SightLine"] = {}
+        self._sight_lines_version = 0
+        for cell in self.cells.values():
+            if self.is_valid_position(cell.x, cell.y):
+                object.__setattr__(cell, "_grid", self)
+                self._sync_cell(cell)
+
+    def _sync_cell(self, cell: GridCell) -> None:
+        """Copy a cell's indexed fields into the flat arrays."""
+        self.version += 1
+        index = cell.y * self.width + cell.x
+        if self.terrains[index] != cell.terrain or self.cover_values[index] != cell.cover_value:
+            self.sight_version += 1
+        self.terrains[index] = cell.terrain
+        self.movement_costs[index] = self._movement_cost_at(index, cell)
+        self.elevations[index] = cell.elevation
+        self.cover_values[index] = cell.cover_value
+
+        previous = self.occupants[index]
+        if previous != cell.occupied_by:
+            if previous and self._occupant_cells.get(previous) == index:
+                del self._occupant_cells[previous]
+            if cell.occupied_by:
+                self._occupant_cells[cell.occupied_by] = index
+            self.occupants[index] = cell.occupied_by
+
+    def _movement_cost_at(self, index: int, cell: Optional[GridCell]) -> int:
+        """Cost to enter a cell from its terrain and any difficult surface on it."""
+        if cell is not None and cell.terrain == TerrainType.IMPASSABLE:
+            return BLOCKED_COST
+        cost = cell.movement_cost if cell is not None else 5
+        if self.surface_difficult[index]:
+            cost = max(cost, 10)  # Difficult terrain does not stack
+        return cost
+
+    def set_surface_difficulty(self, x: int, y: int, difficult: bool) -> bool:
+        """
+        Mark a cell as difficult terrain because of a surface on it.
+
+        Called by SurfaceManager; updates the movement-cost array that
+        pathfinding reads and drops cached distance fields if it changed.
+        """
+        if not self.is_valid_position(x, y):
+            return False
+        index = y * self.width + x
+        if bool(self.surface_difficult[index]) != difficult:
+            self.surface_difficult[index] = difficult
+            cost = self._movement_cost_at(index, self.cells.get((x, y)))
+            if self.movement_costs[index] != cost:
+                self.movement_costs[index] = cost
+                self.version += 1
+        return True
+
+    def get_distance_field(
+        self,
+        x: int,
+        y: int,
+        ally_ids: Optional[Set[str]] = None,
+        ignore_occupants: bool = False,
+        occupants: Optional[Dict[Tuple[int, int], str]] = None
+    ) -> "DistanceField":
+        """
+        Get the cached distance field from a position.
+
+        Fields are keyed by origin, ally set and occupant handling, and are
+        dropped whenever terrain or occupancy changes.
+
+        Args:
+            x, y: Origin position (must be on the grid)
+            ally_ids: Combatants the mover may pass through
+            ignore_occupants: If True, path through occupied squares
+            occupants: Position -> combatant ID to use instead of the grid's
+                own occupant cells (e.g. built from live combat positions)
+
+        Returns:
+            DistanceField from the origin
+        """
+        allies = frozenset() if ignore_occupants or not ally_ids else frozenset(ally_ids)
+        occupant_cells = None
+        if occupants is not None and not ignore_occupants:
+            occupant_cells = frozenset(
+                (py * self.width + px, cid)
+                for (px, py), cid in occupants.items()
+                if self.is_valid_position(px, py)
+            )
+        key = (y * self.width + x, allies, ignore_occupants, occupant_cells)
+
+        cached = self._distance_fields.get(key)
+        if cached is not None and cached.version == self.version:
+            return cached
+
+        if cached is None and len(self._distance_fields) >= DISTANCE_FIELD_CACHE_SIZE:
+            del self._distance_fields[next(iter(self._distance_fields))]
+        distance_field = compute_distance_field(
+            self, x, y, allies, ignore_occupants,
+            occupant_cells=dict(occupant_cells) if occupant_cells is not None else None
+        )
+        self._distance_fields[key] = distance_field
+        return distance_field
+
+    def set_obscurement(self, x: int, y: int, level: Optional[str]) -> bool:
+        """
+        Set how obscured a cell is ("lightly", "heavily" or None).
+
+        Called by SurfaceManager when fog, smoke and similar surfaces change.
+        """
+        if not self.is_valid_position(x, y):
+            return False
+        index = y * self.width + x
+        if self.obscurement[index] != level:
+            self.obscurement[index] = level
+            self.sight_version += 1
+        return True
+
+    def get_sight_line(self, x1: int, y1: int, x2: int, y2: int) -> "SightLine":
+        """
+        Get the cached sight line between two positions.
+
+        The cache is dropped whenever terrain, cover or obscurement changes;
+        occupancy changes keep it.
+        """
+        if self._sight_lines_version != self.sight_version:
+            self._sight_lines.clear()
+            self._sight_lines_version = self.sight_version
+
+        key = (x1, y1, x2, y2)
+        line = self._sight_lines.get(key)
+        if line is None:
+            if len(self._sight_lines) >= SIGHT_LINE_CACHE_SIZE:
+                self._sight_lines.clear()
+            line = trace_sight_line(self, x1, y1, x2, y2)
+            self._sight_lines[key] = line
+        return line
+
+    def to_index(self, x: int, y: int) -> int:
+        """Get the flat array index of a position (no bounds check)."""
+        return y * self.width + x
+
+    def from_index(self, index: int) -> Tuple[int, int]:
+        """Get the (x, y) position of a flat array index."""
+        return index % self.width, index // self.width
 
     def get_cell(self, x: int, y: int) -> Optional[GridCell]:
         """Get a cell by coordinates."""
@@ -149,8 +380,8 @@ class CombatGrid:
         """Check if a position can be moved into."""
         if not self.is_valid_position(x, y):
             return False
-        cell = self.get_cell(x, y)
-        return cell is not None and cell.is_passable
+        index = y * self.width + x
+        return self.movement_costs[index] != BLOCKED_COST and self.occupants[index] is None
 
     def set_terrain(self, x: int, y: int, terrain: TerrainType) -> bool:
         """Set the terrain type for a cell."""
@@ -170,15 +401,23 @@ class CombatGrid:
 
     def get_occupant(self, x: int, y: int) -> Optional[str]:
         """Get the ID of the combatant occupying a cell."""
-        cell = self.get_cell(x, y)
-        return cell.occupied_by if cell else None
+        if not self.is_valid_position(x, y):
+            return None
+        return self.occupants[y * self.width + x]
 
     def find_combatant(self, combatant_id: str) -> Optional[Tuple[int, int]]:
         """Find the position of a combatant on the grid."""
-        for pos, cell in self.cells.items():
-            if cell.occupied_by == combatant_id:
-                return pos
-        return None
+        index = self._occupant_cells.get(combatant_id)
+        if index is None or self.occupants[index] != combatant_id:
+            # Same ID placed in several cells and one of them was cleared
+            index = next(
+                (i for i, occupant in enumerate(self.occupants) if occupant == combatant_id),
+                None
+            )
+            if index is None:
+                return None
+            self._occupant_cells[combatant_id] = index
+        return index % self.width, index // self.width
 
     def get_adjacent_cells(
         self,
@@ -187,21 +426,19 @@ class CombatGrid:
         include_diagonals: bool = True
     ) -> List[Tuple[int, int]]:
         """Get all adjacent cell positions."""
-        adjacent = []
+        if self.is_valid_position(x, y):
+            width = self.width
+            table = self.neighbors if include_diagonals else _neighbor_table(
+                self.width, self.height, False
+            )
+            return [(i % width, i // width) for i in table[y * width + x]]
 
-        # Cardinal directions
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+        adjacent = []
+        offsets = _CARDINAL_OFFSETS + (_DIAGONAL_OFFSETS if include_diagonals else ())
+        for dx, dy in offsets:
             nx, ny = x + dx, y + dy
             if self.is_valid_position(nx, ny):
                 adjacent.append((nx, ny))
-
-        # Diagonal directions
-        if include_diagonals:
-            for dx, dy in [(1, 1), (1, -1), (-1, 1), (-1, -1)]:
-                nx, ny = x + dx, y + dy
-                if self.is_valid_position(nx, ny):
-                    adjacent.append((nx, ny))
-
         return adjacent
 
     def get_cells_in_radius(
@@ -235,7 +472,10 @@ class CombatGrid:
                     "terrain": cell.terrain.value,
                     "occupied_by": cell.occupied_by,
                     "elevation": cell.elevation,
-                    "cover_value": cell.cover_value
+                    "cover_value": cell.cover_value,
+                    "is_hazard": cell.is_hazard,
+                    "hazard_damage": cell.hazard_damage,
+                    "hazard_type": cell.hazard_type,
                 }
                 for (x, y), cell in self.cells.items()
             }
@@ -254,6 +494,9 @@ class CombatGrid:
                 cell.occupied_by = cell_data.get("occupied_by")
                 cell.elevation = cell_data.get("elevation", 0)
                 cell.cover_value = cell_data.get("cover_value", 0)
+                cell.is_hazard = cell_data.get("is_hazard", False)
+                cell.hazard_damage = cell_data.get("hazard_damage", "")
+                cell.hazard_type = cell_data.get("hazard_type", "")
 
         return grid
 
@@ -298,6 +541,141 @@ class MovementResult:
     opportunity_attacks_from: List[str] = field(default_factory=list)
 
 
+@dataclass
+class DistanceField:
+    """
+    Movement costs from one origin to every reachable cell.
+
+    Built with a single Dijkstra flood fill under the same rules as
+    find_path (impassable terrain and enemies block, allies can be passed
+    through), then reused for any number of path and reachability queries
+    until the grid changes.
+    """
+    origin: Tuple[int, int]
+    width: int
+    version: int  # CombatGrid.version the field was computed at
+    costs: List[int] = field(default_factory=list)  # Per cell index, UNREACHED if unreachable
+    parents: List[int] = field(default_factory=list)  # Per cell index, -1 at the origin
+    occupied: FrozenSet[int] = frozenset()  # Cells that can't be ended on
+
+    def cost_to(self, x: int, y: int) -> Optional[int]:
+        """Get the movement cost to a position, or None if unreachable."""
+        index = y * self.width + x
+        if not 0 <= x < self.width or not 0 <= index < len(self.costs):
+            return None
+        cost = self.costs[index]
+        return None if cost == UNREACHED else cost
+
+    def path_to(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """Get the cheapest path from the origin to a position (empty if unreachable)."""
+        if self.cost_to(x, y) is None:
+            return []
+        path = []
+        index = y * self.width + x
+        while index != -1:
+            path.append((index % self.width, index // self.width))
+            index = self.parents[index]
+        path.reverse()
+        return path
+
+    def cost_to_adjacent(self, x: int, y: int) -> Optional[int]:
+        """Get the cheapest cost to end a move next to a position."""
+        best = None
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                nx, ny = x + dx, y + dy
+                if (nx, ny) != self.origin and (
+                    not 0 <= nx < self.width or ny * self.width + nx in self.occupied
+                ):
+                    continue
+                cost = self.cost_to(nx, ny)
+                if cost is not None and (best is None or cost < best):
+                    best = cost
+        return best
+
+    def reachable(self, movement: int) -> List[Tuple[int, int, int]]:
+        """Get (x, y, cost) for unoccupied cells within the given movement."""
+        origin = self.origin[1] * self.width + self.origin[0]
+        return [
+            (index % self.width, index // self.width, cost)
+            for index, cost in enumerate(self.costs)
+            if cost <= movement and index != origin and index not in self.occupied
+        ]
+
+
+def compute_distance_field(
+    grid: CombatGrid,
+    origin_x: int,
+    origin_y: int,
+    ally_ids: FrozenSet[str] = frozenset(),
+    ignore_occupants: bool = False,
+    occupant_cells: Optional[Dict[int, str]] = None
+) -> DistanceField:
+    """
+    Flood fill movement costs from a position.
+
+    Prefer CombatGrid.get_distance_field, which caches the result.
+
+    Args:
+        grid: The combat grid
+        origin_x, origin_y: Starting position
+        ally_ids: Combatants the mover may pass through
+        ignore_occupants: If True, path through occupied squares
+        occupant_cells: Cell index -> combatant ID overriding grid.occupants
+
+    Returns:
+        DistanceField from the origin
+    """
+    width = grid.width
+    movement_costs = grid.movement_costs
+    occupants = grid.occupants
+    if occupant_cells is not None:
+        occupants = [None] * len(movement_costs)
+        for index, combatant_id in occupant_cells.items():
+            occupants[index] = combatant_id
+    neighbors = grid.neighbors
+
+    origin = origin_y * width + origin_x
+    costs = [UNREACHED] * len(movement_costs)
+    parents = [-1] * len(movement_costs)
+    costs[origin] = 0
+    queue = [(0, origin)]
+
+    while queue:
+        cost, index = heapq.heappop(queue)
+        if cost > costs[index]:
+            continue
+
+        for neighbor in neighbors[index]:
+            move_cost = movement_costs[neighbor]
+            if move_cost == BLOCKED_COST:
+                continue
+
+            # D&D rules: Can pass through allies, but not enemies
+            occupant_id = occupants[neighbor]
+            if occupant_id and not ignore_occupants and occupant_id not in ally_ids:
+                continue
+
+            new_cost = cost + move_cost
+            if costs[neighbor] <= new_cost:
+                continue
+
+            costs[neighbor] = new_cost
+            parents[neighbor] = index
+            heapq.heappush(queue, (new_cost, neighbor))
+
+    return DistanceField(
+        origin=(origin_x, origin_y),
+        width=width,
+        version=grid.version,
+        costs=costs,
+        parents=parents,
+        occupied=frozenset(i for i, occupant in enumerate(occupants) if occupant),
+    )
+
+
 def calculate_distance(
     x1: int,
     y1: int,
@@ -345,10 +723,14 @@ def find_path(
     max_movement: int = 30,
     ignore_occupants: bool = False,
     mover_id: Optional[str] = None,
-    ally_ids: Optional[Set[str]] = None
+    ally_ids: Optional[Set[str]] = None,
+    occupants: Optional[Dict[Tuple[int, int], str]] = None
 ) -> MovementResult:
     """
-    Find a path between two points using A*.
+    Find a path between two points.
+
+    Paths come from the grid's cached distance field for the start
+    position, so repeated queries from one origin cost a single flood fill.
 
     Args:
         grid: The combat grid
@@ -358,6 +740,8 @@ def find_path(
         ignore_occupants: If True, path through occupied squares
         mover_id: ID of the moving combatant (for ally detection)
         ally_ids: Set of ally combatant IDs (can pass through but not end on)
+        occupants: Position -> combatant ID to use instead of the grid's
+            occupant cells (see CombatGrid.get_distance_field)
 
     Returns:
         MovementResult with the path if successful
@@ -393,8 +777,11 @@ def find_path(
         )
 
     # D&D rules: Can't end turn on any occupied cell (ally or enemy)
-    if end_cell and end_cell.occupied_by and not ignore_occupants:
-        occupant_id = end_cell.occupied_by
+    if occupants is not None:
+        occupant_id = occupants.get((end_x, end_y))
+    else:
+        occupant_id = end_cell.occupied_by if end_cell else None
+    if occupant_id and not ignore_occupants:
         # Even allies block the destination (can pass through, not end on)
         return MovementResult(
             success=False,
@@ -413,114 +800,45 @@ def find_path(
             description="Already at destination"
         )
 
-    # A* pathfinding
-    start_node = PathNode(x=start_x, y=start_y)
-    start_node.h_cost = heuristic(start_x, start_y, end_x, end_y)
-
-    open_set: List[PathNode] = [start_node]
-    closed_set: Set[Tuple[int, int]] = set()
-    node_map: Dict[Tuple[int, int], PathNode] = {(start_x, start_y): start_node}
-
-    while open_set:
-        # Get node with lowest f_cost
-        current = heapq.heappop(open_set)
-        current_pos = (current.x, current.y)
-
-        if current_pos in closed_set:
-            continue
-
-        closed_set.add(current_pos)
-
-        # Found the goal
-        if current.x == end_x and current.y == end_y:
-            # Reconstruct path
-            path = []
-            node = current
-            while node:
-                path.append((node.x, node.y))
-                node = node.parent
-            path.reverse()
-
-            # Check if path is within movement range
-            if current.g_cost > max_movement:
-                # Find the furthest point we can reach
-                trimmed_path = []
-                cost = 0
-                for i, (px, py) in enumerate(path):
-                    if i == 0:
-                        trimmed_path.append((px, py))
-                        continue
-                    cell = grid.get_cell(px, py)
-                    move_cost = cell.movement_cost if cell else 5
-                    if cost + move_cost <= max_movement:
-                        cost += move_cost
-                        trimmed_path.append((px, py))
-                    else:
-                        break
-
-                return MovementResult(
-                    success=True,
-                    path=trimmed_path,
-                    total_cost=cost,
-                    description=f"Path found but limited to {cost}ft of movement"
-                )
-
-            return MovementResult(
-                success=True,
-                path=path,
-                total_cost=current.g_cost,
-                description=f"Path found: {current.g_cost}ft"
-            )
+    # Answer from the shared distance field for this origin
+    distance_field = grid.get_distance_field(start_x, start_y, ally_ids, ignore_occupants, occupants)
+    total_cost = distance_field.cost_to(end_x, end_y)
 
-        # Explore neighbors
-        for nx, ny in grid.get_adjacent_cells(current.x, current.y):
-            if (nx, ny) in closed_set:
-                continue
-
-            cell = grid.get_cell(nx, ny)
-            if not cell:
-                continue
-
-            # Check passability
-            if cell.terrain == TerrainType.IMPASSABLE:
-                continue
-
-            if cell.occupied_by and not ignore_occupants:
-                occupant_id = cell.occupied_by
-                # D&D rules: Can pass through allies, but not enemies
-                if occupant_id not in ally_ids:
-                    # It's an enemy - can't pass through
-                    continue
-                # It's an ally - can pass through but can't end here
-                # (the destination check above handles the "can't end" part)
-
-            # Calculate movement cost
-            move_cost = cell.movement_cost
-            # Add extra cost for diagonal movement if using alternating rule
-            new_g_cost = current.g_cost + move_cost
-
-            neighbor_pos = (nx, ny)
-            existing = node_map.get(neighbor_pos)
-
-            if existing and new_g_cost >= existing.g_cost:
-                continue
+    if total_cost is None:
+        return MovementResult(
+            success=False,
+            path=[],
+            total_cost=0,
+            description="No path found"
+        )
 
-            neighbor = PathNode(
-                x=nx,
-                y=ny,
-                g_cost=new_g_cost,
-                h_cost=heuristic(nx, ny, end_x, end_y),
-                parent=current
-            )
+    path = distance_field.path_to(end_x, end_y)
+
+    # Check if path is within movement range
+    if total_cost > max_movement:
+        # Find the furthest point we can reach; the field's prefix costs
+        # include surface difficulty, like the cost that chose the path
+        trimmed_path = [path[0]]
+        cost = 0
+        for px, py in path[1:]:
+            step_cost = distance_field.cost_to(px, py)
+            if step_cost is None or step_cost > max_movement:
+                break
+            cost = step_cost
+            trimmed_path.append((px, py))
 
-            node_map[neighbor_pos] = neighbor
-            heapq.heappush(open_set, neighbor)
+        return MovementResult(
+            success=True,
+            path=trimmed_path,
+            total_cost=cost,
+            description=f"Path found but limited to {cost}ft of movement"
+        )
 
     return MovementResult(
-        success=False,
-        path=[],
-        total_cost=0,
-        description="No path found"
+        success=True,
+        path=path,
+        total_cost=total_cost,
+        description=f"Path found: {total_cost}ft"
     )
 
 
@@ -531,7 +849,8 @@ def get_reachable_cells(
     movement: int,
     include_occupied: bool = False,
     mover_id: Optional[str] = None,
-    ally_ids: Optional[Set[str]] = None
+    ally_ids: Optional[Set[str]] = None,
+    occupants: Optional[Dict[Tuple[int, int], str]] = None
 ) -> List[Tuple[int, int, int]]:
     """
     Get all cells reachable with the given movement.
@@ -543,6 +862,8 @@ def get_reachable_cells(
         include_occupied: Include cells that are occupied
         mover_id: ID of the moving combatant
         ally_ids: Set of ally IDs (can pass through but not end on)
+        occupants: Position -> combatant ID to use instead of the grid's
+            occupant cells (see CombatGrid.get_distance_field)
 
     Returns:
         List of (x, y, cost) tuples for reachable cells (valid destinations only)
@@ -550,54 +871,11 @@ def get_reachable_cells(
     if ally_ids is None:
         ally_ids = set()
 
-    reachable = []
-    visited: Dict[Tuple[int, int], int] = {(start_x, start_y): 0}
-    queue = [(0, start_x, start_y)]
-    # Track cells we can pass through but not end on
-    passable_but_blocked: Set[Tuple[int, int]] = set()
-
-    while queue:
-        cost, x, y = heapq.heappop(queue)
-
-        if cost > movement:
-            continue
-
-        for nx, ny in grid.get_adjacent_cells(x, y):
-            cell = grid.get_cell(nx, ny)
-            if not cell:
-                continue
-
-            if cell.terrain == TerrainType.IMPASSABLE:
-                continue
-
-            # Handle occupied cells
-            if cell.occupied_by and not include_occupied:
-                occupant_id = cell.occupied_by
-                # D&D rules: Can pass through allies, block on enemies
-                if occupant_id in ally_ids:
-                    # Ally: can pass through but not end here
-                    passable_but_blocked.add((nx, ny))
-                else:
-                    # Enemy: can't pass through at all
-                    continue
-
-            move_cost = cell.movement_cost
-            new_cost = cost + move_cost
-
-            if new_cost > movement:
-                continue
-
-            if (nx, ny) in visited and visited[(nx, ny)] <= new_cost:
-                continue
-
-            visited[(nx, ny)] = new_cost
-            heapq.heappush(queue, (new_cost, nx, ny))
-
-            # Only add to reachable if it's a valid destination (not occupied)
-            if (nx, ny) not in passable_but_blocked and not cell.occupied_by:
-                reachable.append((nx, ny, new_cost))
+    if not grid.is_valid_position(start_x, start_y):
+        return []
 
-    return reachable
+    distance_field = grid.get_distance_field(start_x, start_y, ally_ids, include_occupied, occupants)
+    return distance_field.reachable(movement)
 
 
 def get_threatened_squares(
@@ -756,17 +1034,27 @@ def check_polearm_master_triggers(
     return polearm_attackers
 
 
-def get_line_of_sight(
+@dataclass(frozen=True)
+class SightLine:
+    """What one position can see of another."""
+    has_line_of_sight: bool
+    cells: Tuple[Tuple[int, int], ...]  # Bresenham line, both ends included
+    cover: int  # Cover bonus to AC (0, 2 or 5)
+    obscured: Optional[str] = None  # Heaviest obscurement along the line
+
+
+def trace_sight_line(
     grid: CombatGrid,
     x1: int,
     y1: int,
     x2: int,
     y2: int
-) -> Tuple[bool, List[Tuple[int, int]]]:
+) -> SightLine:
     """
-    Check line of sight between two points.
+    Trace the line between two points.
 
-    Uses Bresenham's line algorithm to trace the line.
+    Uses Bresenham's line algorithm. Prefer CombatGrid.get_sight_line,
+    which caches the result.
 
     Args:
         grid: The combat grid
@@ -774,10 +1062,17 @@ def get_line_of_sight(
         x2, y2: End position
 
     Returns:
-        Tuple of (has_line_of_sight, cells_in_path)
+        SightLine between the points
     """
     cells = []
     has_los = True
+    max_cover = 0
+    obscured_level = 0
+
+    width = grid.width
+    terrains = grid.terrains
+    cover_values = grid.cover_values
+    obscurement = grid.obscurement
 
     dx = abs(x2 - x1)
     dy = abs(y2 - y1)
@@ -790,11 +1085,16 @@ def get_line_of_sight(
     while True:
         cells.append((x, y))
 
-        cell = grid.get_cell(x, y)
-        if cell and cell.terrain == TerrainType.IMPASSABLE:
-            # Skip the starting cell
-            if (x, y) != (x1, y1):
+        # Skip the starting cell
+        if (x != x1 or y != y1) and grid.is_valid_position(x, y):
+            index = y * width + x
+            if terrains[index] == TerrainType.IMPASSABLE:
                 has_los = False
+            if (x != x2 or y != y2) and cover_values[index] > max_cover:
+                max_cover = cover_values[index]
+            level = OBSCUREMENT_LEVELS.index(obscurement[index])
+            if level > obscured_level:
+                obscured_level = level
 
         if x == x2 and y == y2:
             break
@@ -809,7 +1109,34 @@ def get_line_of_sight(
             err += dx
             y += sy
 
-    return has_los, cells
+    return SightLine(
+        has_line_of_sight=has_los,
+        cells=tuple(cells),
+        cover=max_cover if has_los else 5,  # No line of sight = full cover
+        obscured=OBSCUREMENT_LEVELS[obscured_level],
+    )
+
+
+def get_line_of_sight(
+    grid: CombatGrid,
+    x1: int,
+    y1: int,
+    x2: int,
+    y2: int
+) -> Tuple[bool, List[Tuple[int, int]]]:
+    """
+    Check line of sight between two points.
+
+    Args:
+        grid: The combat grid
+        x1, y1: Start position
+        x2, y2: End position
+
+    Returns:
+        Tuple of (has_line_of_sight, cells_in_path)
+    """
+    line = grid.get_sight_line(x1, y1, x2, y2)
+    return line.has_line_of_sight, list(line.cells)
 
 
 def get_cover_between(
@@ -830,25 +1157,34 @@ def get_cover_between(
     Returns:
         Cover bonus to AC (0, 2, or 5)
     """
-    has_los, cells = get_line_of_sight(
-        grid, attacker_x, attacker_y, target_x, target_y
-    )
+    return grid.get_sight_line(attacker_x, attacker_y, target_x, target_y).cover
 
-    if not has_los:
-        return 5  # Full cover
 
-    max_cover = 0
-    for x, y in cells:
-        if (x, y) == (attacker_x, attacker_y):
-            continue
-        if (x, y) == (target_x, target_y):
-            continue
+def get_visibility_from(
+    grid: CombatGrid,
+    origin_x: int,
+    origin_y: int,
+    positions: Dict[str, Any]
+) -> Dict[str, SightLine]:
+    """
+    Get sight lines from one position to many combatants in one pass.
 
-        cell = grid.get_cell(x, y)
-        if cell and cell.cover_value > max_cover:
-            max_cover = cell.cover_value
+    Args:
+        grid: The combat grid
+        origin_x, origin_y: Viewer position
+        positions: Combatant ID -> position as (x, y) or {"x": .., "y": ..}
 
-    return max_cover
+    Returns:
+        Combatant ID -> SightLine for every combatant with a position
+    """
+    visibility = {}
+    for combatant_id, pos in positions.items():
+        if isinstance(pos, dict):
+            pos = (pos.get("x", 0), pos.get("y", 0))
+        if not pos:
+            continue
+        visibility[combatant_id] = grid.get_sight_line(origin_x, origin_y, pos[0], pos[1])
+    return visibility
 
 
 def create_grid_with_obstacles(
@@ -8,9 +8,10 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, Any, List, Optional, Tuple
 import random
-import re
 import logging
 
+from app.core.dice import compile_dice_notation
+
 logger = logging.getLogger(__name__)
 
 
@@ -509,18 +510,13 @@ def parse_dice_notation(notation: str) -> int:
     if notation.isdigit():
         return int(notation)
 
-    # Dice notation: XdY+Z or XdY-Z or XdY
-    match = re.match(r'(\d+)d(\d+)([+-]\d+)?', notation)
-    if not match:
+    try:
+        expression = compile_dice_notation(notation)
+    except ValueError:
         logger.warning(f"Invalid dice notation: {notation}, defaulting to 1")
         return 1
 
-    num_dice = int(match.group(1))
-    die_size = int(match.group(2))
-    modifier = int(match.group(3)) if match.group(3) else 0
-
-    total = sum(random.randint(1, die_size) for _ in range(num_dice))
-    return max(1, total + modifier)
+    return max(1, expression.roll())
 
 
 # =============================================================================
@@ -678,8 +674,14 @@ class RandomEncounterGenerator:
         return enemies, total_xp
 
     def _get_template_cr(self, template: str) -> float:
-        """Get CR for an enemy template."""
-        # Simplified CR lookup - would use actual enemy data
+        """Get CR for an enemy template from the monster catalog."""
+        from app.core.monster_catalog import get_monster_catalog
+
+        monster = get_monster_catalog().get(template.lower())
+        if monster is not None:
+            return monster.cr
+
+        # Templates without a 2024 stat block yet
         cr_map = {
             "goblin": 0.25,
             "goblin_boss": 1,
@@ -162,6 +162,32 @@ class ReactionsManager:
         if state:
             state.readied_action = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize reaction states."""
+        return {
+            "reaction_states": {
+                cid: {
+                    "reaction_available": state.reaction_available,
+                    "readied_action": state.readied_action,
+                    "reaction_used_this_round": state.reaction_used_this_round,
+                }
+                for cid, state in self.reaction_states.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReactionsManager":
+        """Deserialize reaction states."""
+        manager = cls()
+        for cid, state_data in data.get("reaction_states", {}).items():
+            manager.reaction_states[cid] = ReactionState(
+                combatant_id=cid,
+                reaction_available=state_data.get("reaction_available", True),
+                readied_action=state_data.get("readied_action"),
+                reaction_used_this_round=state_data.get("reaction_used_this_round", False),
+            )
+        return manager
+
 
 # =============================================================================
 # REACTION IMPLEMENTATIONS
@@ -0,0 +1,308 @@
+"""
+D&D Rules Catalog.
+
+Every rules JSON file under app/data, parsed once per process and shared by
+all registries (spells, classes, subclasses, conditions, weapons, loot,
+monsters, equipment).
+
+The parsed files can be compiled into a single pickle bundle together with
+a content hash of the sources and a stat stamp. The bundle is opt-in: set
+RULES_BUNDLE_PATH to an absolute path, or to a bare file name which is kept
+in the package cache directory (backend/.cache), never the working
+directory. At startup the bundle is loaded as-is when the stamp still
+matches the data directory, so workers skip JSON parsing entirely;
+otherwise the catalog is recompiled and the bundle rewritten. Bundles that
+other users could have written are ignored, since unpickling runs code.
+Files that fail to parse are reported and left out, as the per-module
+loaders did before.
+
+With RULES_HOT_RELOAD on, the stamp is rechecked every
+RULES_RELOAD_INTERVAL_SECONDS; when the content hash changes, the catalog is
+swapped and every registry callback from on_catalog_reload() runs so
+derived indexes are rebuilt on next use.
+
+Build the bundle ahead of time (e.g. in a Docker image) with:
+
+    python -m app.core.rules_catalog [--check] [--output PATH]
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+
+logger = logging.getLogger("dnd_engine.rules")
+
+DATA_ROOT = Path(__file__).parent.parent / "data"
+CACHE_DIR = Path(__file__).parent.parent.parent / ".cache"
+
+# Bumped whenever the bundle layout changes; older bundles are rebuilt
+BUNDLE_FORMAT = 1
+
+
+def source_stamp(root: Path = DATA_ROOT) -> str:
+    """Cheap fingerprint of the data directory (paths, sizes, mtimes)."""
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.json")):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(root).as_posix()}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+class RulesCatalog:
+    """
+    Parsed rules data keyed by path relative to app/data.
+
+    Data is shared, not copied: callers that modify what they read must
+    copy it first.
+    """
+
+    def __init__(
+        self,
+        files: Dict[str, Any],
+        content_hash: str,
+        stamp: str = "",
+        errors: Optional[List[str]] = None,
+    ):
+        self.files = files
+        self.content_hash = content_hash
+        self.stamp = stamp
+        self.errors = errors or []
+        # directory -> files directly inside it, sorted
+        self._dirs: Dict[str, List[str]] = {}
+        for path in sorted(files):
+            directory = path.rpartition("/")[0]
+            self._dirs.setdefault(directory, []).append(path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.files
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __reduce__(self):
+        return self.__class__, (self.files, self.content_hash, self.stamp, self.errors)
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """Parsed contents of one file (e.g. "weapons/weapons.json")."""
+        return self.files.get(path, default)
+
+    def directory(self, path: str) -> List[Tuple[str, Any]]:
+        """(path, contents) of every file directly inside a directory, by name."""
+        return [(name, self.files[name]) for name in self._dirs.get(path.strip("/"), [])]
+
+    # ------------------------------------------------------------------
+    # Building and bundling
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def compile(cls, root: Path = DATA_ROOT) -> "RulesCatalog":
+        """
+        Parse and validate every JSON file under a data directory.
+
+        Args:
+            root: Data directory
+
+        Returns:
+            RulesCatalog; files that are not valid JSON objects/arrays are
+            listed in ``errors`` and left out
+        """
+        stamp = source_stamp(root)
+        digest = hashlib.sha256()
+        files: Dict[str, Any] = {}
+        errors: List[str] = []
+
+        for path in sorted(root.rglob("*.json")):
+            name = path.relative_to(root).as_posix()
+            raw = path.read_bytes()
+            digest.update(name.encode() + b"\0" + raw + b"\0")
+            try:
+                data = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                errors.append(f"{name}: {e}")
+                continue
+            if not isinstance(data, (dict, list)):
+                errors.append(f"{name}: top level must be an object or array")
+                continue
+            files[name] = data
+
+        for error in errors:
+            logger.warning("Rules data error in %s", error)
+        return cls(files, digest.hexdigest(), stamp, errors)
+
+    def save(self, path: str) -> None:
+        """Write the catalog as a bundle (atomically)."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"format": BUNDLE_FORMAT, "catalog": self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RulesCatalog"]:
+        """Read a bundle, or None if it is missing, unreadable or outdated."""
+        try:
+            with open(path, "rb") as f:
+                if not _trusted(os.fstat(f.fileno())):
+                    logger.warning("Ignoring rules bundle %s: writable by other users", path)
+                    return None
+                bundle = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(bundle, dict) or bundle.get("format") != BUNDLE_FORMAT:
+            return None
+        catalog = bundle.get("catalog")
+        return catalog if isinstance(catalog, cls) else None
+
+
+# =============================================================================
+# PROCESS-WIDE CATALOG
+# =============================================================================
+
+_catalog: Optional[RulesCatalog] = None
+_catalog_source = ""
+_last_check = 0.0
+_lock = threading.RLock()
+_reload_callbacks: List[Callable[[], None]] = []
+
+
+def _trusted(stat: os.stat_result) -> bool:
+    """A bundle is only unpickled if this user owns it and nobody else can write it."""
+    if stat.st_mode & 0o022:
+        return False
+    return not hasattr(os, "getuid") or stat.st_uid == os.getuid()
+
+
+def resolve_bundle_path(value: str) -> str:
+    """Absolute paths are used as-is; anything else lives in CACHE_DIR."""
+    if not value:
+        return ""
+    path = Path(value).expanduser()
+    if not path.is_absolute():
+        path = CACHE_DIR / path.name
+    return str(path)
+
+
+def _bundle_path() -> str:
+    return resolve_bundle_path(get_settings().RULES_BUNDLE_PATH)
+
+
+def _open_catalog(root: Path, force: bool = False) -> Tuple[RulesCatalog, str]:
+    """Load the bundle if it is current, otherwise compile (and rewrite it)."""
+    bundle_path = _bundle_path()
+    if bundle_path and not force:
+        catalog = RulesCatalog.load(bundle_path)
+        if catalog is not None and catalog.stamp == source_stamp(root):
+            return catalog, "bundle"
+
+    catalog = RulesCatalog.compile(root)
+    if bundle_path:
+        try:
+            catalog.save(bundle_path)
+        except OSError as e:
+            logger.warning("Could not write rules bundle %s: %s", bundle_path, e)
+    return catalog, "compiled"
+
+
+def on_catalog_reload(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback that drops data derived from the catalog."""
+    if callback not in _reload_callbacks:
+        _reload_callbacks.append(callback)
+    return callback
+
+
+def get_rules_catalog() -> RulesCatalog:
+    """
+    Get the process-wide rules catalog, loading it on first use.
+
+    With hot reload enabled, also picks up changed data files (at most
+    once per reload interval).
+    """
+    global _catalog, _catalog_source, _last_check
+    if _catalog is None:
+        with _lock:
+            if _catalog is None:
+                _catalog, _catalog_source = _open_catalog(DATA_ROOT)
+                _last_check = time.monotonic()
+        return _catalog
+
+    settings = get_settings()
+    if settings.RULES_HOT_RELOAD and time.monotonic() - _last_check >= settings.RULES_RELOAD_INTERVAL_SECONDS:
+        reload_rules_catalog()
+    return _catalog
+
+
+def reload_rules_catalog(force: bool = False) -> bool:
+    """
+    Reload the catalog if the data files changed.
+
+    Args:
+        force: Recompile from JSON even if the stamp is unchanged
+
+    Returns:
+        True if the content changed and registries were reset
+    """
+    global _catalog, _catalog_source, _last_check
+    with _lock:
+        _last_check = time.monotonic()
+        if _catalog is not None and not force and _catalog.stamp == source_stamp(DATA_ROOT):
+            return False
+
+        previous = _catalog
+        _catalog, _catalog_source = _open_catalog(DATA_ROOT, force)
+        changed = previous is not None and previous.content_hash != _catalog.content_hash
+        callbacks = list(_reload_callbacks) if changed else []
+
+    if changed:
+        logger.info("Rules data changed (%s), reloading registries", _catalog.content_hash[:12])
+    for callback in callbacks:
+        callback()
+    return changed
+
+
+def get_catalog_info() -> Dict[str, Any]:
+    """Summary of the loaded catalog."""
+    catalog = get_rules_catalog()
+    return {
+        "content_hash": catalog.content_hash,
+        "files": len(catalog),
+        "errors": list(catalog.errors),
+        "source": _catalog_source,
+        "bundle_path": _bundle_path(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compile the rules bundle. Returns a process exit code."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile app/data into a rules bundle")
+    parser.add_argument(
+        "--output",
+        default=_bundle_path() or str(CACHE_DIR / "rules_catalog.pickle"),
+        help="Bundle path (default: RULES_BUNDLE_PATH, else .cache/rules_catalog.pickle)",
+    )
+    parser.add_argument("--check", action="store_true", help="Fail if any data file is invalid")
+    args = parser.parse_args(argv)
+
+    catalog = RulesCatalog.compile(DATA_ROOT)
+    for error in catalog.errors:
+        print(f"ERROR {error}", file=sys.stderr)
+    if args.check and catalog.errors:
+        return 1
+    output = resolve_bundle_path(args.output)
+    if output:
+        catalog.save(output)
+    print(f"{len(catalog)} files, content hash {catalog.content_hash[:12]} -> {output or '(not written)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
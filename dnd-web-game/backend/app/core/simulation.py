@@ -0,0 +1,356 @@
+"""
+D&D Combat Engine - Headless Combat Simulation
+Runs full AI-vs-AI combats without the API for encounter balancing.
+
+Both sides take their turns through take_ai_turn, the same code that runs
+enemy turns in play, and every attack, move and opportunity attack is
+resolved by the CombatEngine, so outcomes follow the real rules. Batches
+of seeded simulations run across a multiprocessing pool and are
+summarized as win rate, rounds-to-kill and damage-taken distributions.
+
+Usage:
+    report = run_simulations(party, monsters, n=1000, seed=1)
+    report.win_rate, report.rounds["p50"], report.throughput
+"""
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.ai import take_ai_turn
+from app.core.combat_engine import CombatEngine, CombatPhase
+from app.core.dice import dice_rng
+from app.core.movement import CombatGrid
+
+logger = logging.getLogger(__name__)
+
+# Safety valve: combats still running after this many rounds are a draw
+DEFAULT_MAX_ROUNDS = 30
+
+# Planner search budget per decision, in nodes (deterministic, unlike time)
+PLANNER_MAX_NODES = 2000
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of one simulated combat."""
+    seed: int
+    outcome: str  # "victory" (party wins), "defeat" or "draw"
+    rounds: int
+    damage_taken: Dict[str, int] = field(default_factory=dict)  # combatant -> HP lost
+    kill_rounds: Dict[str, int] = field(default_factory=dict)  # combatant -> round dropped
+    turns: int = 0
+    duration_ms: float = 0.0
+
+    def party_damage_taken(self, party_ids: List[str]) -> int:
+        """Total HP the party lost."""
+        return sum(self.damage_taken.get(cid, 0) for cid in party_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API response."""
+        return asdict(self)
+
+
+@dataclass
+class EncounterReport:
+    """Aggregate outcome of a batch of simulations."""
+    simulations: int
+    victories: int
+    defeats: int
+    draws: int
+    rounds: Dict[str, float]  # Rounds until combat ended (distribution)
+    party_damage_taken: Dict[str, float]  # Total party HP lost (distribution)
+    damage_taken: Dict[str, Dict[str, float]]  # Per combatant (distribution)
+    kill_rounds: Dict[str, Dict[str, float]]  # Per enemy, over runs it dropped in
+    party_deaths: float  # Mean party members dropped per combat
+    wall_time_s: float
+    processes: int
+
+    @property
+    def win_rate(self) -> float:
+        """Fraction of combats the party won."""
+        return self.victories / self.simulations if self.simulations else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Simulated combats per second of wall time."""
+        return self.simulations / self.wall_time_s if self.wall_time_s > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for API response."""
+        data = asdict(self)
+        data["win_rate"] = round(self.win_rate, 4)
+        data["throughput"] = round(self.throughput, 1)
+        return data
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    """Mean, percentiles and range of a sample."""
+    if not values:
+        return {"mean": 0.0, "p10": 0.0, "p50": 0.0, "p90": 0.0, "min": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def percentile(q: float) -> float:
+        return float(ordered[min(len(ordered) - 1, int(q * len(ordered)))])
+
+    return {
+        "mean": round(statistics.fmean(ordered), 3),
+        "p10": percentile(0.10),
+        "p50": percentile(0.50),
+        "p90": percentile(0.90),
+        "min": float(ordered[0]),
+        "max": float(ordered[-1]),
+    }
+
+
+class CombatSimulator:
+    """
+    Runs one encounter headlessly, AI on both sides.
+
+    The encounter is described with the same player/enemy dicts that
+    CombatEngine.start_combat takes, so it can be built from a party and
+    a generated encounter (e.g. RandomEncounterGenerator output).
+    """
+
+    def __init__(
+        self,
+        players: List[Dict[str, Any]],
+        enemies: List[Dict[str, Any]],
+        positions: Optional[Dict[str, Tuple[int, int]]] = None,
+        grid_width: int = 12,
+        grid_height: int = 12,
+        max_rounds: int = DEFAULT_MAX_ROUNDS,
+    ):
+        """
+        Initialize simulator.
+
+        Args:
+            players: Player data dicts (as for start_combat)
+            enemies: Enemy data dicts (as for start_combat)
+            positions: Starting positions (default: facing lines)
+            grid_width: Battle map width in squares
+            grid_height: Battle map height in squares
+            max_rounds: Rounds before a combat is called a draw
+        """
+        self.players = players
+        self.enemies = enemies
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.max_rounds = max_rounds
+        self.positions = dict(positions) if positions else self._default_positions()
+
+    @property
+    def party_ids(self) -> List[str]:
+        return [p["id"] for p in self.players]
+
+    def _default_positions(self) -> Dict[str, Tuple[int, int]]:
+        """Party along the left edge, enemies along the right."""
+        positions = {}
+        for i, player in enumerate(self.players):
+            positions[player["id"]] = (i // self.grid_height, i % self.grid_height)
+        for i, enemy in enumerate(self.enemies):
+            positions[enemy["id"]] = (self.grid_width - 1 - i // self.grid_height, i % self.grid_height)
+        return positions
+
+    def run(self, seed: int) -> SimulationResult:
+        """
+        Fight the encounter to the end.
+
+        Args:
+            seed: Seed for the dice and any AI tie-breaking. Rolls come from
+                a private random.Random, never the process-wide generator
+
+        Returns:
+            SimulationResult for this run
+        """
+        with dice_rng(random.Random(seed)):
+            return self._fight(seed)
+
+    def _fight(self, seed: int) -> SimulationResult:
+        start = time.perf_counter()
+        engine = CombatEngine(dice_seed=seed)
+        engine.start_combat(
+            self.players, self.enemies,
+            positions=self.positions,
+            grid_width=self.grid_width,
+            grid_height=self.grid_height,
+        )
+        grid = engine.state.grid
+        for cid, (x, y) in engine.state.positions.items():
+            grid.set_occupant(x, y, cid)
+
+        all_stats = engine.state.combatant_stats
+        starting_hp = {cid: stats.get("current_hp", 0) for cid, stats in all_stats.items()}
+        tracker = engine.state.initiative_tracker
+        kill_rounds: Dict[str, int] = {}
+        turns = 0
+        last_round = tracker.current_round
+
+        while engine.state.phase == CombatPhase.COMBAT_ACTIVE and tracker.current_round <= self.max_rounds:
+            current = engine.get_current_combatant()
+            if current is None:
+                break
+            round_number = last_round = tracker.current_round
+            if current.is_active:
+                self.take_turn(engine, grid, current.id)
+                turns += 1
+            for c in tracker.combatants:
+                if not c.is_active and c.id not in kill_rounds:
+                    kill_rounds[c.id] = round_number
+                    self._clear_occupant(engine, grid, c.id)
+            engine.end_turn()
+
+        if engine.state.phase == CombatPhase.COMBAT_ENDED:
+            outcome = "victory" if tracker.get_combat_result() == "victory" else "defeat"
+        else:
+            outcome = "draw"
+
+        return SimulationResult(
+            seed=seed,
+            outcome=outcome,
+            rounds=last_round,
+            damage_taken={
+                cid: max(0, hp - all_stats[cid].get("current_hp", 0))
+                for cid, hp in starting_hp.items()
+            },
+            kill_rounds=kill_rounds,
+            turns=turns,
+            duration_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    # ==================== Turn resolution ====================
+
+    def take_turn(self, engine: CombatEngine, grid: CombatGrid, combatant_id: str) -> str:
+        """
+        Let the combatant's AI choose and carry out its turn.
+
+        Turns run through take_ai_turn, as enemy turns in play do. Planned
+        turns search by node count rather than wall-clock time so a seed
+        always replays the same combat.
+
+        Returns:
+            The action type carried out ("none" if nothing)
+        """
+        _, outcome = take_ai_turn(engine, grid, combatant_id, max_nodes=PLANNER_MAX_NODES)
+        return outcome.action_type if outcome is not None else "none"
+
+    @staticmethod
+    def _clear_occupant(engine: CombatEngine, grid: CombatGrid, combatant_id: str) -> None:
+        """Fallen combatants no longer block movement."""
+        pos = engine.state.positions.get(combatant_id)
+        if pos:
+            cell = grid.get_cell(pos[0], pos[1])
+            if cell and cell.occupied_by == combatant_id:
+                grid.set_occupant(pos[0], pos[1], None)
+
+
+# ==================== Batch runner ====================
+
+# Set per worker process by the pool initializer
+_worker_simulator: Optional[CombatSimulator] = None
+
+
+def _init_worker(simulator: CombatSimulator) -> None:
+    global _worker_simulator
+    _worker_simulator = simulator
+    # Per-combat debug logging dominates run time in batches
+    logging.disable(logging.INFO)
+
+
+def _run_in_worker(seed: int) -> SimulationResult:
+    return _worker_simulator.run(seed)
+
+
+def summarize(
+    results: List[SimulationResult],
+    simulator: CombatSimulator,
+    wall_time_s: float = 0.0,
+    processes: int = 1,
+) -> EncounterReport:
+    """
+    Aggregate simulation results into an encounter report.
+
+    Args:
+        results: Results of individual runs
+        simulator: The simulator that produced them
+        wall_time_s: Wall time the batch took
+        processes: Worker processes used
+
+    Returns:
+        EncounterReport
+    """
+    party_ids = simulator.party_ids
+    enemy_ids = [e["id"] for e in simulator.enemies]
+    combatant_ids = party_ids + enemy_ids
+
+    return EncounterReport(
+        simulations=len(results),
+        victories=sum(r.outcome == "victory" for r in results),
+        defeats=sum(r.outcome == "defeat" for r in results),
+        draws=sum(r.outcome == "draw" for r in results),
+        rounds=_distribution([r.rounds for r in results]),
+        party_damage_taken=_distribution([r.party_damage_taken(party_ids) for r in results]),
+        damage_taken={
+            cid: _distribution([r.damage_taken.get(cid, 0) for r in results])
+            for cid in combatant_ids
+        },
+        kill_rounds={
+            cid: _distribution([r.kill_rounds[cid] for r in results if cid in r.kill_rounds])
+            for cid in enemy_ids
+        },
+        party_deaths=statistics.fmean(
+            sum(cid in r.kill_rounds for cid in party_ids) for r in results
+        ) if results else 0.0,
+        wall_time_s=round(wall_time_s, 4),
+        processes=processes,
+    )
+
+
+def run_simulations(
+    players: List[Dict[str, Any]],
+    enemies: List[Dict[str, Any]],
+    n: int = 100,
+    seed: int = 0,
+    processes: Optional[int] = None,
+    **simulator_options,
+) -> EncounterReport:
+    """
+    Run n seeded simulations of an encounter across a process pool.
+
+    Run i uses seed + i, so a batch is reproducible and can be split
+    across machines by seed range.
+
+    Args:
+        players: Player data dicts
+        enemies: Enemy data dicts
+        n: Number of combats to simulate
+        seed: First seed
+        processes: Worker processes (default: CPU count; 1 runs inline)
+        **simulator_options: Passed to CombatSimulator
+
+    Returns:
+        EncounterReport for the batch
+    """
+    simulator = CombatSimulator(players, enemies, **simulator_options)
+    seeds = range(seed, seed + n)
+    processes = max(1, min(processes or os.cpu_count() or 1, n))
+
+    start = time.perf_counter()
+    if processes == 1:
+        results = [simulator.run(s) for s in seeds]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(simulator,)) as pool:
+            chunksize = max(1, n // (processes * 4))
+            results = pool.map(_run_in_worker, seeds, chunksize=chunksize)
+    wall_time = time.perf_counter() - start
+
+    report = summarize(results, simulator, wall_time, processes)
+    logger.info(
+        "Simulated %d combats in %.2fs (%.0f/s): win rate %.1f%%",
+        n, wall_time, report.throughput, report.win_rate * 100,
+    )
+    return report
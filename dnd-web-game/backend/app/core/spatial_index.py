@@ -0,0 +1,259 @@
+"""
+Spatial Index for Combatant Positions.
+
+``PositionIndex`` is the ``CombatState.positions`` mapping (combatant_id ->
+(x, y)). Every write keeps two lookups in sync with it:
+
+- a cell -> occupants map, so "who is standing here?" is a dict lookup
+- a uniform bucket grid (BUCKET_SIZE x BUCKET_SIZE squares per bucket), so
+  radius and rectangle queries only visit the buckets that overlap the
+  query instead of every token on the map
+
+Area templates (cones, lines, ...) are intersected with the cell map; see
+app.core.aoe_templates for how their masks are rasterized.
+
+Because the index lives inside the mapping itself, every writer - the
+engine's move_combatant, forced movement, routes that assign positions
+directly, combat storage reloads - keeps it current without extra calls.
+Query results come back in the mapping's own iteration order, so callers
+that used to scan ``positions`` see the same ordering. All distances are
+in grid squares.
+
+The same write paths set ``dirty``, which tells persistence that the
+positions changed since they were last written (see mark_clean).
+"""
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.aoe_templates import Cell, template_cells
+
+
+# Squares per bucket side. Battle maps are tens of squares across and most
+# queries are a few squares wide, so a handful of buckets covers a query.
+BUCKET_SIZE = 4
+
+
+def to_cell(pos: Any) -> Optional[Cell]:
+    """Normalize a stored position ((x, y), [x, y] or {"x", "y"}) to a cell."""
+    if not pos:
+        return None
+    if isinstance(pos, dict):
+        return int(pos.get("x", 0)), int(pos.get("y", 0))
+    try:
+        return int(pos[0]), int(pos[1])
+    except (TypeError, IndexError, ValueError):
+        return None
+
+
+def _bucket(cell: Cell) -> Cell:
+    return cell[0] // BUCKET_SIZE, cell[1] // BUCKET_SIZE
+
+
+class PositionIndex(dict):
+    """
+    Combatant positions that index themselves by cell and by bucket.
+
+    Behaves exactly like the plain dict it replaces; values are stored as
+    given so serialization is unchanged.
+    """
+
+    __slots__ = ("_cells", "_buckets", "_indexed", "_order", "_next_order", "dirty")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._cells: Dict[Cell, List[str]] = {}
+        self._buckets: Dict[Cell, Set[str]] = {}
+        self._indexed: Dict[str, Cell] = {}
+        # Insertion ordinal per key, mirroring dict iteration order
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        # A new index has never been written
+        self.dirty = True
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _unindex(self, combatant_id: str) -> None:
+        cell = self._indexed.pop(combatant_id, None)
+        if cell is None:
+            return
+        occupants = self._cells.get(cell)
+        if occupants is not None:
+            occupants.remove(combatant_id)
+            if not occupants:
+                del self._cells[cell]
+        bucket = self._buckets.get(_bucket(cell))
+        if bucket is not None:
+            bucket.discard(combatant_id)
+            if not bucket:
+                del self._buckets[_bucket(cell)]
+
+    def _index(self, combatant_id: str, pos: Any) -> None:
+        cell = to_cell(pos)
+        if cell is None:
+            return
+        self._indexed[combatant_id] = cell
+        self._cells.setdefault(cell, []).append(combatant_id)
+        self._buckets.setdefault(_bucket(cell), set()).add(combatant_id)
+
+    def __setitem__(self, combatant_id: str, pos: Any) -> None:
+        self._unindex(combatant_id)
+        if combatant_id not in self._order:
+            self._order[combatant_id] = self._next_order
+            self._next_order += 1
+        super().__setitem__(combatant_id, pos)
+        self._index(combatant_id, pos)
+        self.dirty = True
+
+    def __delitem__(self, combatant_id: str) -> None:
+        super().__delitem__(combatant_id)
+        self._unindex(combatant_id)
+        del self._order[combatant_id]
+        self.dirty = True
+
+    def pop(self, combatant_id: str, *default):
+        if combatant_id in self:
+            self._unindex(combatant_id)
+            del self._order[combatant_id]
+            self.dirty = True
+        return super().pop(combatant_id, *default)
+
+    def popitem(self):
+        combatant_id, pos = super().popitem()
+        self._unindex(combatant_id)
+        del self._order[combatant_id]
+        self.dirty = True
+        return combatant_id, pos
+
+    def setdefault(self, combatant_id: str, default: Any = None):
+        if combatant_id not in self:
+            self[combatant_id] = default
+        return self[combatant_id]
+
+    def update(self, *args, **kwargs) -> None:
+        for combatant_id, pos in dict(*args, **kwargs).items():
+            self[combatant_id] = pos
+
+    def clear(self) -> None:
+        super().clear()
+        self._cells.clear()
+        self._buckets.clear()
+        self._indexed.clear()
+        self._order.clear()
+        self.dirty = True
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def mark_clean(self) -> None:
+        """Record that the current positions have been written."""
+        self.dirty = False
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def cell_of(self, combatant_id: str) -> Optional[Cell]:
+        """Normalized cell of a combatant, or None if unpositioned."""
+        return self._indexed.get(combatant_id)
+
+    def occupants_at(self, x: int, y: int) -> List[str]:
+        """Combatant IDs standing in a cell, in placement order."""
+        return list(self._cells.get((x, y), ()))
+
+    def occupant_at(self, x: int, y: int) -> Optional[str]:
+        """First combatant placed in a cell, if any."""
+        occupants = self._cells.get((x, y))
+        return occupants[0] if occupants else None
+
+    def _candidates(self, min_x: int, min_y: int, max_x: int, max_y: int) -> Iterator[Tuple[str, Cell]]:
+        """Indexed combatants whose bucket overlaps a rectangle of cells."""
+        bx0, by0 = _bucket((min_x, min_y))
+        bx1, by1 = _bucket((max_x, max_y))
+        bucket_count = (bx1 - bx0 + 1) * (by1 - by0 + 1)
+        if bucket_count >= len(self._buckets):
+            # Query covers most of the map; walking occupied buckets is cheaper
+            for (bx, by), ids in self._buckets.items():
+                if bx0 <= bx <= bx1 and by0 <= by <= by1:
+                    for combatant_id in ids:
+                        yield combatant_id, self._indexed[combatant_id]
+            return
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                for combatant_id in self._buckets.get((bx, by), ()):
+                    yield combatant_id, self._indexed[combatant_id]
+
+    def _in_order(self, found: List[str]) -> List[str]:
+        found.sort(key=self._order.__getitem__)
+        return found
+
+    def in_rect(self, min_x: int, min_y: int, max_x: int, max_y: int) -> List[str]:
+        """Combatants inside an inclusive rectangle of cells."""
+        return self._in_order([
+            combatant_id
+            for combatant_id, (x, y) in self._candidates(min_x, min_y, max_x, max_y)
+            if min_x <= x <= max_x and min_y <= y <= max_y
+        ])
+
+    def within(
+        self,
+        center: Cell,
+        radius: float,
+        euclidean: bool = False,
+        exclude: Iterable[str] = ()
+    ) -> List[str]:
+        """
+        Combatants within a radius of a cell.
+
+        Args:
+            center: Query cell
+            radius: Radius in squares
+            euclidean: Straight-line distance instead of grid (Chebyshev) distance
+            exclude: IDs to leave out (usually the querying combatant)
+
+        Returns:
+            Matching combatant IDs
+        """
+        cx, cy = center
+        reach = int(math.floor(radius))
+        skip = set(exclude)
+        found = []
+        for combatant_id, (x, y) in self._candidates(cx - reach, cy - reach, cx + reach, cy + reach):
+            if combatant_id in skip:
+                continue
+            dx, dy = x - cx, y - cy
+            if euclidean:
+                if dx * dx + dy * dy <= radius * radius:
+                    found.append(combatant_id)
+            elif max(abs(dx), abs(dy)) <= radius:
+                found.append(combatant_id)
+        return self._in_order(found)
+
+    def in_cells(self, cells: Iterable[Cell]) -> List[str]:
+        """
+        Combatants standing in any of the given cells.
+
+        Walks whichever side is smaller: the cells, or the occupied cells.
+        """
+        cells = cells if isinstance(cells, (set, frozenset)) else set(cells)
+        if len(cells) <= len(self._cells):
+            found = [cid for cell in cells for cid in self._cells.get(cell, ())]
+        else:
+            found = [cid for cell, ids in self._cells.items() if cell in cells for cid in ids]
+        return self._in_order(found)
+
+    def in_template(
+        self,
+        shape: Any,
+        size_ft: int,
+        origin: Cell,
+        toward: Optional[Cell] = None,
+        width_ft: int = 5,
+    ) -> List[str]:
+        """Combatants inside an area template (see app.core.aoe_templates)."""
+        return self.in_cells(template_cells(shape, size_ft, origin, toward, width_ft))
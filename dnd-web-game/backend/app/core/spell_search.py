@@ -0,0 +1,273 @@
+"""
+Spell Search Index.
+
+Backs the spell picker and ``GET /api/spells/``, which fire on every
+keystroke. Built once per SpellRegistry, which reads its rules data from the
+shared catalog.
+
+Each spell gets an ordinal (its position in registry order), and every
+filter is an int bitset over ordinals:
+
+- facets: level, school, class, ritual and concentration map each value to
+  the bitset of spells that have it, so combining filters is a chain of
+  ``&``
+- text: an inverted index maps each name/description token to a bitset, per
+  field. Query terms match whole tokens or token prefixes (found by bisecting
+  the sorted vocabulary), or, when neither hits, tokens one edit away
+  (symmetric-delete lookup). Every term must match.
+
+Results without a text query keep registry order (level, then file order)
+and are paged by walking set bits, so only the requested page is
+materialized. Text results are ranked: name hits outweigh description hits,
+exact tokens outweigh prefixes, prefixes outweigh typos, and a name that
+starts with the query comes first. Only the spells matching every filter are
+scored.
+"""
+import bisect
+import heapq
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.models.spells import Spell
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Terms shorter than this are not fuzzy-matched (too many near misses)
+MIN_FUZZY_LENGTH = 4
+
+# Points per matched term, by field and match kind
+NAME_EXACT, NAME_PREFIX, NAME_FUZZY = 10.0, 6.0, 3.0
+DESC_EXACT, DESC_PREFIX, DESC_FUZZY = 2.0, 1.0, 0.5
+MATCH_POINTS = {
+    "exact": (NAME_EXACT, DESC_EXACT),
+    "prefix": (NAME_PREFIX, DESC_PREFIX),
+    "fuzzy": (NAME_FUZZY, DESC_FUZZY),
+}
+# Bonus when the spell name itself starts with the whole query
+NAME_STARTS_WITH = 20.0
+
+# Distinct query terms whose matches are kept
+TERM_CACHE_SIZE = 2048
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens ("Melf's Acid Arrow" -> melf, s, acid, arrow)."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Set bit positions of a bitset, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _deletes(token: str) -> Set[str]:
+    """Every string one deletion away from a token."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class SpellSearchIndex:
+    """
+    Inverted text index plus facet bitsets over a fixed list of spells.
+
+    Args:
+        spells: Spells in the order unranked results should come back
+    """
+
+    def __init__(self, spells: Iterable[Spell]):
+        self.spells: List[Spell] = list(spells)
+        self.all_mask = (1 << len(self.spells)) - 1
+
+        self._level: Dict[int, int] = {}
+        self._school: Dict[str, int] = {}
+        self._class: Dict[str, int] = {}
+        self._ritual = 0
+        self._concentration = 0
+
+        self._name_tokens: Dict[str, int] = {}
+        self._desc_tokens: Dict[str, int] = {}
+        self._names: List[str] = []
+
+        for ordinal, spell in enumerate(self.spells):
+            bit = 1 << ordinal
+            self._level[spell.level] = self._level.get(spell.level, 0) | bit
+            school = spell.school.lower()
+            self._school[school] = self._school.get(school, 0) | bit
+            for class_name in spell.classes:
+                key = class_name.lower()
+                self._class[key] = self._class.get(key, 0) | bit
+            if spell.ritual:
+                self._ritual |= bit
+            if spell.concentration:
+                self._concentration |= bit
+
+            self._names.append(spell.name.lower())
+            for token in set(tokenize(spell.name)):
+                self._name_tokens[token] = self._name_tokens.get(token, 0) | bit
+            for token in set(tokenize(spell.description)):
+                self._desc_tokens[token] = self._desc_tokens.get(token, 0) | bit
+
+        self._vocabulary: List[str] = sorted(self._name_tokens.keys() | self._desc_tokens.keys())
+        self._delete_index: Dict[str, Set[str]] = {}
+        self._term_cache: Dict[str, Tuple[Tuple[float, int], ...]] = {}
+        for token in self._vocabulary:
+            if len(token) >= MIN_FUZZY_LENGTH - 1:
+                for variant in _deletes(token):
+                    self._delete_index.setdefault(variant, set()).add(token)
+
+    def __len__(self) -> int:
+        return len(self.spells)
+
+    # ------------------------------------------------------------------
+    # Facets
+    # ------------------------------------------------------------------
+
+    def filter_mask(
+        self,
+        level: Optional[int] = None,
+        school: Optional[str] = None,
+        class_name: Optional[str] = None,
+        ritual: Optional[bool] = None,
+        concentration: Optional[bool] = None,
+    ) -> int:
+        """Bitset of spells passing every given facet filter."""
+        mask = self.all_mask
+        if level is not None:
+            mask &= self._level.get(level, 0)
+        if school:
+            mask &= self._school.get(school.lower(), 0)
+        if class_name:
+            mask &= self._class.get(class_name.lower(), 0)
+        if ritual is not None:
+            mask &= self._ritual if ritual else ~self._ritual
+        if concentration is not None:
+            mask &= self._concentration if concentration else ~self._concentration
+        return mask & self.all_mask
+
+    # ------------------------------------------------------------------
+    # Text
+    # ------------------------------------------------------------------
+
+    def _expand(self, term: str) -> List[Tuple[str, str]]:
+        """Vocabulary tokens a query term matches, as (token, kind)."""
+        matches = []
+        vocabulary = self._vocabulary
+        i = bisect.bisect_left(vocabulary, term)
+        while i < len(vocabulary) and vocabulary[i].startswith(term):
+            matches.append((vocabulary[i], "exact" if vocabulary[i] == term else "prefix"))
+            i += 1
+        if matches or len(term) < MIN_FUZZY_LENGTH:
+            return matches
+
+        # One edit away: shared deletions cover insert, delete and substitute
+        candidates = set(self._delete_index.get(term, ()))
+        for variant in _deletes(term):
+            candidates.update(self._delete_index.get(variant, ()))
+            if variant in self._name_tokens or variant in self._desc_tokens:
+                candidates.add(variant)
+        return [(token, "fuzzy") for token in sorted(candidates)]
+
+    def _term_masks(self, term: str) -> Tuple[Tuple[float, int], ...]:
+        """
+        (points, bitset) for one query term, best points first.
+
+        Matching tokens are unioned per field and match kind, so scoring
+        walks at most six bitsets however many tokens a prefix covers.
+        Cached per term; the vocabulary never changes.
+        """
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        unions: Dict[float, int] = {}
+        for token, kind in self._expand(term):
+            name_points, desc_points = MATCH_POINTS[kind]
+            unions[name_points] = unions.get(name_points, 0) | self._name_tokens.get(token, 0)
+            unions[desc_points] = unions.get(desc_points, 0) | self._desc_tokens.get(token, 0)
+        masks = tuple(sorted(((p, m) for p, m in unions.items() if m), reverse=True))
+
+        if len(self._term_cache) >= TERM_CACHE_SIZE:
+            self._term_cache.clear()
+        self._term_cache[term] = masks
+        return masks
+
+    def _term_scores(self, term: str, mask: int) -> Dict[int, float]:
+        """Best score per spell (within mask) for one query term."""
+        scores: Dict[int, float] = {}
+        for points, term_mask in self._term_masks(term):
+            for ordinal in iter_bits(term_mask & mask):
+                scores.setdefault(ordinal, points)
+        return scores
+
+    def text_scores(self, query: str, mask: int) -> Dict[int, float]:
+        """Score every spell in mask that matches all query terms."""
+        terms = tokenize(query)
+        if not terms:
+            return {ordinal: 0.0 for ordinal in iter_bits(mask)}
+
+        # Each term only scores the spells that matched the earlier ones
+        totals: Optional[Dict[int, float]] = None
+        for term in terms:
+            scores = self._term_scores(term, mask)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {o: s + scores[o] for o, s in totals.items() if o in scores}
+            if not totals:
+                return {}
+            mask = 0
+            for ordinal in totals:
+                mask |= 1 << ordinal
+
+        prefix = query.strip().lower()
+        for ordinal in totals:
+            if self._names[ordinal].startswith(prefix):
+                totals[ordinal] += NAME_STARTS_WITH
+        return totals
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        level: Optional[int] = None,
+        school: Optional[str] = None,
+        class_name: Optional[str] = None,
+        ritual: Optional[bool] = None,
+        concentration: Optional[bool] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[int, List[Spell]]:
+        """
+        Filter, rank and page spells.
+
+        Returns:
+            (total matches, spells in the requested page)
+        """
+        mask = self.filter_mask(level, school, class_name, ritual, concentration)
+
+        if not query or not query.strip():
+            total = mask.bit_count()
+            end = total if limit is None else offset + limit
+            page = []
+            for rank, ordinal in enumerate(iter_bits(mask)):
+                if rank >= end:
+                    break
+                if rank >= offset:
+                    page.append(self.spells[ordinal])
+            return total, page
+
+        scores = self.text_scores(query, mask)
+        total = len(scores)
+        # Highest score first; registry order breaks ties
+        order = lambda ordinal: (-scores[ordinal], ordinal)
+        if limit is None:
+            ranked = sorted(scores, key=order)[offset:]
+        else:
+            ranked = heapq.nsmallest(offset + limit, scores, key=order)[offset:]
+        return total, [self.spells[ordinal] for ordinal in ranked]
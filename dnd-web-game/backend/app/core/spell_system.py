@@ -3,17 +3,19 @@ D&D 5e 2024 Spell System - Core Logic.
 
 Handles spell loading, casting, slot management, and effect resolution.
 """
-import json
 import re
-from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 
 from app.models.spells import (
     Spell, SpellComponents, SpellSchool, SpellTargetType, SpellEffectType,
     CharacterSpellcasting, SpellcastingType, SpellCastResult, DamageType
 )
-from app.core.dice import roll_d20, D20Result
+from app.core.aoe_templates import template_cells
+from app.core.dice import DiceRoller, roll_d20, D20Result
 from app.core.rules_engine import roll_damage
+from app.core.rules_catalog import get_rules_catalog, on_catalog_reload
+from app.core.spatial_index import to_cell
+from app.core.spell_search import SpellSearchIndex
 
 
 class SpellRegistry:
@@ -29,6 +31,7 @@ class SpellRegistry:
         self._spells_by_level: Dict[int, List[Spell]] = {i: [] for i in range(10)}
         self._spells_by_class: Dict[str, List[Spell]] = {}
         self._spells_by_school: Dict[str, List[Spell]] = {}
+        self._search_index: Optional[SpellSearchIndex] = None
         self._loaded = False
 
     @classmethod
@@ -45,12 +48,11 @@ class SpellRegistry:
         cls._instance = None
 
     def _load_all_spells(self):
-        """Load spells from all JSON files."""
+        """Load spells from all spell level files."""
         if self._loaded:
             return
 
-        # Get the spells directory
-        base_path = Path(__file__).parent.parent / "data" / "rules" / "2024" / "spells"
+        catalog = get_rules_catalog()
 
         # Load each spell level file
         spell_files = [
@@ -67,19 +69,16 @@ class SpellRegistry:
         ]
 
         for filename in spell_files:
-            filepath = base_path / filename
-            if filepath.exists():
-                self._load_spell_file(filepath)
+            data = catalog.get(f"rules/2024/spells/{filename}")
+            if data is not None:
+                self._load_spell_file(filename, data)
 
         self._loaded = True
 
-    def _load_spell_file(self, filepath: Path):
-        """Load spells from a single JSON file."""
+    def _load_spell_file(self, filename: str, data: Dict):
+        """Load spells from a single spell level file."""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            level = data.get("level", 0)
+            level = data.get("level", data.get("spell_level", 0))
             spells_data = data.get("spells", [])
 
             for spell_data in spells_data:
@@ -87,7 +86,7 @@ class SpellRegistry:
                 self._index_spell(spell)
 
         except Exception as e:
-            print(f"[SpellRegistry] Error loading {filepath}: {e}")
+            print(f"[SpellRegistry] Error loading {filename}: {e}")
 
     def _parse_spell(self, data: Dict, level: int) -> Spell:
         """Parse a spell from JSON data into a Spell model."""
@@ -281,6 +280,12 @@ class SpellRegistry:
         """Get all spells of a specific school."""
         return self._spells_by_school.get(school.lower(), [])
 
+    def get_search_index(self) -> SpellSearchIndex:
+        """Get the search index, building it on first use."""
+        if self._search_index is None:
+            self._search_index = SpellSearchIndex(self._spells.values())
+        return self._search_index
+
     def search_spells(
         self,
         query: Optional[str] = None,
@@ -290,31 +295,41 @@ class SpellRegistry:
         ritual: Optional[bool] = None,
         concentration: Optional[bool] = None,
     ) -> List[Spell]:
-        """Search spells with multiple filters."""
-        results = list(self._spells.values())
-
-        if level is not None:
-            results = [s for s in results if s.level == level]
-
-        if school:
-            results = [s for s in results if s.school.lower() == school.lower()]
-
-        if class_name:
-            results = [s for s in results if class_name.lower() in [c.lower() for c in s.classes]]
+        """Search spells with multiple filters; text matches are ranked."""
+        _, results = self.search_spells_page(query, level, school, class_name, ritual, concentration)
+        return results
 
-        if ritual is not None:
-            results = [s for s in results if s.ritual == ritual]
+    def search_spells_page(
+        self,
+        query: Optional[str] = None,
+        level: Optional[int] = None,
+        school: Optional[str] = None,
+        class_name: Optional[str] = None,
+        ritual: Optional[bool] = None,
+        concentration: Optional[bool] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[int, List[Spell]]:
+        """
+        Search spells and return one page.
 
-        if concentration is not None:
-            results = [s for s in results if s.concentration == concentration]
+        Returns:
+            (total matches, spells from offset up to limit)
+        """
+        return self.get_search_index().search(
+            query=query,
+            level=level,
+            school=school,
+            class_name=class_name,
+            ritual=ritual,
+            concentration=concentration,
+            limit=limit,
+            offset=offset,
+        )
 
-        if query:
-            query_lower = query.lower()
-            results = [s for s in results if
-                      query_lower in s.name.lower() or
-                      query_lower in s.description.lower()]
 
-        return results
+# Re-index when the rules data is hot-reloaded
+on_catalog_reload(SpellRegistry.reset)
 
 
 class SpellCaster:
@@ -833,12 +848,19 @@ class SpellEffectResolver:
         targets: List[Dict],
         caster_level: int = 1,
         slot_level: Optional[int] = None,
+        dice: Optional[DiceRoller] = None,
+        origin: Optional[Tuple[int, int]] = None,
+        toward: Optional[Tuple[int, int]] = None,
     ) -> Dict[str, Any]:
         """
         Resolve an area effect spell (Fireball, Lightning Bolt, etc.).
 
         Each target in the area makes a saving throw. Damage is rolled once
         and applied to all targets (half on successful save for most spells).
+        All saves are rolled in one batch.
+
+        When the template's placement is given, targets whose "position"
+        falls outside the rasterized area are dropped.
 
         Args:
             spell: The spell being cast
@@ -846,17 +868,31 @@ class SpellEffectResolver:
             targets: List of targets in the area
             caster_level: Caster's level
             slot_level: Slot level used (for upcasting)
+            dice: Combat dice stream (a fresh one if omitted)
+            origin: Template point of origin (centre, or the caster for cones/lines)
+            toward: Cell a cone or line is aimed at
 
         Returns:
             Dict with area effect results
         """
+        if origin is not None and spell.area_size:
+            area = set(template_cells(spell.target_type, spell.area_size, origin, toward))
+            in_area = []
+            for target in targets:
+                cell = to_cell(target.get("position"))
+                # Targets without a position were chosen by the caller; keep them
+                if cell is None or cell in area:
+                    in_area.append(target)
+            targets = in_area
+
         # Calculate damage dice once for the whole area
         damage_dice = SpellEffectResolver._calculate_spell_damage(
             spell, caster_level, slot_level
         )
 
         # Roll damage once (same damage for all targets)
-        base_damage_result = roll_damage(damage_dice)
+        dice = dice or DiceRoller()
+        base_damage_result = dice.roll_damage(damage_dice)
         base_damage = base_damage_result.total
 
         result = {
@@ -871,14 +907,17 @@ class SpellEffectResolver:
             "saves_failed": 0,
         }
 
-        for target in targets:
-            target_id = target.get("id", "unknown")
-            # Use helper to get save mod from various possible field names
-            save_mod = _get_target_save_modifier(target, spell.save_type) if spell.save_type else 0
+        # Use helper to get save mod from various possible field names
+        save_mods = [
+            _get_target_save_modifier(target, spell.save_type) if spell.save_type else 0
+            for target in targets
+        ]
+        saves = dice.roll_d20_batch(save_mods)
 
-            # Roll save for each target
-            save_roll = roll_d20()
-            save_total = save_roll.total + save_mod
+        for index, target in enumerate(targets):
+            target_id = target.get("id", "unknown")
+            save_natural = saves.naturals[index]
+            save_total = saves.totals[index]
             saved = save_total >= spell_save_dc
 
             # Calculate damage based on save
@@ -891,7 +930,7 @@ class SpellEffectResolver:
 
             result["targets"][target_id] = {
                 "name": target.get("name", "Unknown"),
-                "save_roll": save_roll.total,
+                "save_roll": save_natural,
                 "save_total": save_total,
                 "saved": saved,
                 "damage": target_damage,
@@ -1177,7 +1216,9 @@ def cast_spell(
         spell_id: ID of spell to cast
         slot_level: Slot level to use (None for cantrips)
         targets: List of target dictionaries
-        combat_state: Optional combat state for round tracking
+        combat_state: Optional combat state for round tracking ("round_number"),
+            the combat's DiceRoller ("dice") and area placement ("area_origin",
+            "area_toward")
 
     Returns:
         SpellCastResult with all casting information
@@ -1276,7 +1317,10 @@ def cast_spell(
                 result.save_dc,
                 targets,
                 caster_level,
-                cast_level
+                cast_level,
+                dice=combat_state.get("dice") if combat_state else None,
+                origin=combat_state.get("area_origin") if combat_state else None,
+                toward=combat_state.get("area_toward") if combat_state else None,
             )
 
             for target_id, target_result in area_result["targets"].items():
@@ -1291,7 +1335,7 @@ def cast_spell(
             result.description = (
                 f"{result.caster_name} casts {spell.name}! "
                 f"({area_result['base_damage']} base damage) "
-                f"{area_result['saves_failed']}/{len(targets)} fail their saves for "
+                f"{area_result['saves_failed']}/{len(area_result['targets'])} fail their saves for "
                 f"{area_result['total_damage']} total damage!"
             )
 
@@ -0,0 +1,89 @@
+"""
+Startup Profile.
+
+Records where a worker's cold start goes: the import of each router module
+(counting only the modules it pulled in for the first time), each subsystem
+preloaded in the lifespan hook, the warmup pass, and the other lifespan
+steps. The app factory in app.main fills it in and /api/admin/startup
+reports it. Workers forked by app.server inherit the master's entries.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StartupProfile:
+    """Timings of one process's startup steps, in the order they ran."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.ready_seconds: Optional[float] = None
+        self.steps: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, name: str, seconds: float, **extra: Any) -> None:
+        """Add one timed step (kind is "import", "preload", "warmup" or "lifespan")."""
+        with self._lock:
+            self.steps.append({"kind": kind, "name": name, "ms": round(seconds * 1000, 3), **extra})
+
+    @contextmanager
+    def timed(self, kind: str, name: str) -> Iterator[None]:
+        """Time the body as one step; failures are recorded with the error."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(kind, name, time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+            raise
+        self.record(kind, name, time.perf_counter() - start)
+
+    def import_module(self, module_name: str) -> ModuleType:
+        """Import a module and record how long it took and what it pulled in."""
+        before = len(sys.modules)
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.record(
+            "import", module_name, time.perf_counter() - start,
+            new_modules=len(sys.modules) - before,
+        )
+        return module
+
+    def mark_ready(self) -> None:
+        """Note the moment the app starts serving."""
+        self.ready_seconds = time.perf_counter() - self._started
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The profile as plain data, slowest steps of each kind first."""
+        with self._lock:
+            steps = list(self.steps)
+        by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        for step in steps:
+            by_kind.setdefault(step["kind"], []).append(step)
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "ready_ms": round(self.ready_seconds * 1000, 3) if self.ready_seconds is not None else None,
+            "modules_loaded": len(sys.modules),
+            "total_ms": {kind: round(sum(s["ms"] for s in items), 3) for kind, items in by_kind.items()},
+            "steps": {
+                kind: sorted(items, key=lambda s: s["ms"], reverse=True)
+                for kind, items in by_kind.items()
+            },
+        }
+
+
+_profile: Optional[StartupProfile] = None
+
+
+def get_startup_profile() -> StartupProfile:
+    """Get the process-wide startup profile."""
+    global _profile
+    if _profile is None:
+        _profile = StartupProfile()
+    return _profile
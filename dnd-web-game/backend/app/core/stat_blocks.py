@@ -0,0 +1,145 @@
+"""
+Change-Tracked Combatant Stat Blocks.
+
+``StatBlocks`` is the ``CombatState.combatant_stats`` mapping (combatant_id
+-> stat block). Every stat block it holds is a ``StatBlock``: a plain dict
+that adds its combatant to the owner's ``dirty`` set whenever one of its
+keys is written. Persistence (CombatEngine.collect_state_delta) only
+serializes the dirty blocks, so nothing is hashed or compared per request.
+
+Only top-level writes are seen. Code that edits a nested value in place -
+appending to ``stats["grappling"]``, changing ``stats["spellcasting"]`` -
+calls ``StatBlocks.mark_dirty`` for that combatant.
+
+A block inserted into the mapping is copied into a ``StatBlock``; keep
+using the stored block (``combatant_stats[cid]``) rather than the dict it
+was built from.
+"""
+from typing import Any, Dict, Optional, Set
+
+
+class StatBlock(dict):
+    """One combatant's stats; top-level writes mark the combatant dirty."""
+
+    __slots__ = ("_dirty", "_combatant_id")
+
+    def __init__(self, data: Dict[str, Any], dirty: Set[str], combatant_id: str):
+        super().__init__(data)
+        self._dirty = dirty
+        self._combatant_id = combatant_id
+
+    def __reduce__(self):
+        # Copies are plain dicts; StatBlocks re-wraps them on insertion
+        return dict, (dict(self),)
+
+    def _touch(self) -> None:
+        self._dirty.add(self._combatant_id)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._touch()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._touch()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key: str, *default):
+        if key in self:
+            self._touch()
+        return super().pop(key, *default)
+
+    def popitem(self):
+        self._touch()
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Any = None):
+        # The returned value is usually mutated in place
+        self._touch()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs) -> None:
+        super().update(*args, **kwargs)
+        self._touch()
+
+    def clear(self) -> None:
+        super().clear()
+        self._touch()
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+class StatBlocks(dict):
+    """
+    Combatant stat blocks with per-combatant dirty tracking.
+
+    ``dirty`` holds the IDs of combatants whose block was written, added or
+    removed since the last ``mark_clean``. A new mapping starts with every
+    block dirty.
+    """
+
+    __slots__ = ("dirty",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.dirty: Set[str] = set()
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def _wrap(self, combatant_id: str, block: Any) -> Any:
+        if isinstance(block, StatBlock) and block._dirty is self.dirty:
+            return block
+        if isinstance(block, dict):
+            return StatBlock(block, self.dirty, combatant_id)
+        return block
+
+    def __setitem__(self, combatant_id: str, block: Any) -> None:
+        super().__setitem__(combatant_id, self._wrap(combatant_id, block))
+        self.dirty.add(combatant_id)
+
+    def __delitem__(self, combatant_id: str) -> None:
+        super().__delitem__(combatant_id)
+        self.dirty.add(combatant_id)
+
+    def pop(self, combatant_id: str, *default):
+        if combatant_id in self:
+            self.dirty.add(combatant_id)
+        return super().pop(combatant_id, *default)
+
+    def popitem(self):
+        combatant_id, block = super().popitem()
+        self.dirty.add(combatant_id)
+        return combatant_id, block
+
+    def setdefault(self, combatant_id: str, default: Any = None):
+        if combatant_id not in self:
+            self[combatant_id] = default
+        return self[combatant_id]
+
+    def update(self, *args, **kwargs) -> None:
+        for combatant_id, block in dict(*args, **kwargs).items():
+            self[combatant_id] = block
+
+    def clear(self) -> None:
+        self.dirty.update(self)
+        super().clear()
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def mark_dirty(self, combatant_id: Optional[str] = None) -> None:
+        """Mark one combatant's block (or, with None, every block) as changed."""
+        if combatant_id is None:
+            self.dirty.update(self)
+        else:
+            self.dirty.add(combatant_id)
+
+    def mark_clean(self, combatant_ids) -> None:
+        """Forget changes to blocks that have been written."""
+        self.dirty.difference_update(combatant_ids)
@@ -11,10 +11,9 @@ Loads subclass data from JSON and provides implementations for:
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Callable, Tuple
 from enum import Enum
-import json
-from pathlib import Path
 
 from app.core.dice import roll_damage, roll_d20
+from app.core.rules_catalog import get_rules_catalog, on_catalog_reload
 
 
 class SubclassResourceType(Enum):
@@ -393,23 +392,24 @@ class SubclassRegistry:
             cls._instance._load_subclasses()
         return cls._instance
 
+    @classmethod
+    def reset(cls):
+        """Reset the singleton (useful for testing)."""
+        cls._instance = None
+        cls._data = {}
+
     def _load_subclasses(self) -> None:
-        """Load all subclass data from class JSON files."""
-        data_path = Path(__file__).parent.parent / "data" / "rules" / "2024" / "classes"
-
-        for class_file in data_path.glob("*.json"):
-            try:
-                with open(class_file, encoding="utf-8") as f:
-                    class_data = json.load(f)
-                    class_id = class_data.get("id")
-                    if class_id and "subclasses" in class_data:
-                        self._data[class_id] = {}
-                        for subclass in class_data["subclasses"]:
-                            subclass_id = subclass.get("id")
-                            if subclass_id:
-                                self._data[class_id][subclass_id] = subclass
-            except (json.JSONDecodeError, IOError):
+        """Load all subclass data from the class files in the rules catalog."""
+        for _, class_data in get_rules_catalog().directory("rules/2024/classes"):
+            if not isinstance(class_data, dict):
                 continue
+            class_id = class_data.get("id")
+            if class_id and "subclasses" in class_data:
+                self._data[class_id] = {}
+                for subclass in class_data["subclasses"]:
+                    subclass_id = subclass.get("id")
+                    if subclass_id:
+                        self._data[class_id][subclass_id] = subclass
 
     def get_subclass(self, class_id: str, subclass_id: str) -> Optional[Dict[str, Any]]:
         """Get subclass data by class and subclass ID."""
@@ -478,6 +478,10 @@ class SubclassRegistry:
         return any(f.get("id") == feature_id for f in features)
 
 
+# Re-index when the rules data is hot-reloaded
+on_catalog_reload(SubclassRegistry.reset)
+
+
 def get_subclass_registry() -> SubclassRegistry:
     """Get the singleton subclass registry."""
     return SubclassRegistry()
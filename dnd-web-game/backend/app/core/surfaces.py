@@ -3,10 +3,12 @@ D&D Combat Engine - Surface Effects System
 BG3-style environmental surfaces: fire, water, ice, grease, poison, acid, etc.
 """
 
+from collections import deque
 from enum import Enum
-from typing import Dict, Any, List, Optional, Tuple, Set
+from typing import Deque, Dict, Any, List, Optional, Tuple, Set, FrozenSet
 from dataclasses import dataclass, field
-from app.core.dice import roll_dice
+from app.core.aoe_templates import DIRECTED_SHAPES, template_cells
+from app.core.dice import roll_damage, roll_die
 
 
 class SurfaceType(str, Enum):
@@ -216,9 +218,25 @@ SURFACE_INTERACTIONS: Dict[Tuple[str, str], Dict[str, Any]] = {
     ("acid", "web"): {"result": None, "removes": ["web"], "description": "Acid dissolves webs"},
 }
 
+# Surfaces that catch fire from a neighbouring ignition
+FLAMMABLE_TYPES = frozenset(t for t, e in SURFACE_EFFECTS.items() if e.get("flammable"))
+
+# Surfaces that make their cell difficult terrain
+DIFFICULT_TYPES = frozenset(t for t, e in SURFACE_EFFECTS.items() if e.get("difficult_terrain"))
+
 
 class SurfaceManager:
-    """Manages surfaces on the combat grid."""
+    """
+    Manages surfaces on the combat grid.
+
+    ``surfaces`` holds the Surface objects per cell. Every change to a cell
+    goes through _sync_cell, which keeps the derived indexes current:
+
+    - ``cells_by_type``: the cells covered by each surface type
+    - the timed cells (surfaces that expire), the only ones a round tick visits
+    - the difficult cells, pushed into the grid's movement-cost array
+    - obscurement, pushed into the grid's sight-line cache
+    """
 
     def __init__(self, grid: Any = None):
         """
@@ -229,6 +247,12 @@ class SurfaceManager:
         """
         self.grid = grid
         self.surfaces: Dict[Tuple[int, int], List[Surface]] = {}
+        self.cells_by_type: Dict[SurfaceType, Set[Tuple[int, int]]] = {t: set() for t in SurfaceType}
+        self._cell_types: Dict[Tuple[int, int], FrozenSet[SurfaceType]] = {}
+        self._timed_cells: Set[Tuple[int, int]] = set()
+        self._difficult_cells: Set[Tuple[int, int]] = set()
+        # Cells still to spread fire from while an ignition is in progress
+        self._spread_frontier: Optional[Deque[Tuple[int, int]]] = None
 
     def add_surface(
         self,
@@ -295,6 +319,7 @@ class SurfaceManager:
             else:
                 self.surfaces[pos].append(surface)
 
+        self._sync_cell(pos)
         return {
             "success": True,
             "position": pos,
@@ -320,6 +345,7 @@ class SurfaceManager:
 
         if surface_type is None:
             del self.surfaces[pos]
+            self._sync_cell(pos)
             return True
 
         initial_count = len(self.surfaces[pos])
@@ -328,6 +354,7 @@ class SurfaceManager:
         if not self.surfaces[pos]:
             del self.surfaces[pos]
 
+        self._sync_cell(pos)
         return len(self.surfaces.get(pos, [])) < initial_count
 
     def get_surfaces_at(self, x: int, y: int) -> List[Surface]:
@@ -392,29 +419,48 @@ class SurfaceManager:
 
                 # Spread fire if indicated
                 if interaction.get("spreads"):
+                    self._sync_cell(pos)
                     self._spread_surface(pos, result_surface_type)
             except ValueError:
                 pass  # Invalid surface type
 
+        self._sync_cell(pos)
+
     def _spread_surface(self, pos: Tuple[int, int], surface_type: SurfaceType, radius: int = 1):
-        """Spread a surface to adjacent cells that have flammable surfaces."""
-        x, y = pos
-        for dx in range(-radius, radius + 1):
-            for dy in range(-radius, radius + 1):
-                if dx == 0 and dy == 0:
-                    continue
-
-                new_pos = (x + dx, y + dy)
-                if new_pos in self.surfaces:
-                    for surface in self.surfaces[new_pos][:]:
-                        effects = SURFACE_EFFECTS.get(surface.surface_type, {})
-                        if effects.get("flammable") and surface_type == SurfaceType.FIRE:
-                            # Ignite flammable surface
-                            self.add_surface(
-                                new_pos[0], new_pos[1],
-                                SurfaceType.FIRE,
-                                duration_rounds=3
-                            )
+        """
+        Spread a surface to adjacent cells that have flammable surfaces.
+
+        Ignitions are processed breadth-first from a frontier of burning
+        cells: each newly ignited cell joins the frontier instead of
+        recursing, so a large oil slick burns in one pass.
+        """
+        if surface_type != SurfaceType.FIRE:
+            return
+        if self._spread_frontier is not None:
+            # Already spreading; the running pass will get to this cell
+            self._spread_frontier.append(pos)
+            return
+
+        self._spread_frontier = frontier = deque([pos])
+        try:
+            while frontier:
+                x, y = frontier.popleft()
+                for dx in range(-radius, radius + 1):
+                    for dy in range(-radius, radius + 1):
+                        new_pos = (x + dx, y + dy)
+                        if new_pos == (x, y) or not self._is_flammable(new_pos):
+                            continue
+                        # Ignite flammable surface (its interaction queues the cell)
+                        self.add_surface(
+                            new_pos[0], new_pos[1],
+                            SurfaceType.FIRE,
+                            duration_rounds=3
+                        )
+        finally:
+            self._spread_frontier = None
+
+    def _is_flammable(self, pos: Tuple[int, int]) -> bool:
+        return bool(self._cell_types.get(pos, frozenset()) & FLAMMABLE_TYPES)
 
     def apply_damage_effect(
         self,
@@ -521,7 +567,7 @@ class SurfaceManager:
 
         # Apply damage if surface deals damage
         if surface.damage_dice:
-            damage = roll_dice(surface.damage_dice)
+            damage = roll_damage(surface.damage_dice).total
             # Apply intensity multiplier
             damage = int(damage * surface.intensity)
             result["damage"] = damage
@@ -535,7 +581,7 @@ class SurfaceManager:
                 ability_mod = combatant_stats.get(f"{surface.save_type}_mod", 0)
                 save_mod = ability_mod
 
-            save_roll = roll_dice("1d20") + save_mod
+            save_roll = roll_die(20) + save_mod
             result["save_roll"] = save_roll
             result["save_dc"] = surface.dc
             result["save_made"] = save_roll >= surface.dc
@@ -554,11 +600,44 @@ class SurfaceManager:
 
     def is_difficult_terrain(self, x: int, y: int) -> bool:
         """Check if surfaces at position create difficult terrain."""
-        for surface in self.get_surfaces_at(x, y):
-            effects = SURFACE_EFFECTS.get(surface.surface_type, {})
-            if effects.get("difficult_terrain"):
-                return True
-        return False
+        return (x, y) in self._difficult_cells
+
+    def _sync_cell(self, pos: Tuple[int, int]) -> None:
+        """Refresh the derived indexes and the grid for one changed cell."""
+        surfaces = self.surfaces.get(pos)
+        if surfaces is not None and not surfaces:
+            del self.surfaces[pos]
+            surfaces = None
+
+        types = frozenset(s.surface_type for s in surfaces) if surfaces else frozenset()
+        previous = self._cell_types.pop(pos, frozenset())
+        for surface_type in previous - types:
+            self.cells_by_type[surface_type].discard(pos)
+        for surface_type in types - previous:
+            self.cells_by_type[surface_type].add(pos)
+        if types:
+            self._cell_types[pos] = types
+
+        if surfaces and any(s.duration_rounds != -1 for s in surfaces):
+            self._timed_cells.add(pos)
+        else:
+            self._timed_cells.discard(pos)
+
+        difficult = bool(types & DIFFICULT_TYPES)
+        if difficult:
+            self._difficult_cells.add(pos)
+        else:
+            self._difficult_cells.discard(pos)
+
+        if self.grid is not None:
+            if hasattr(self.grid, "set_obscurement"):
+                self.grid.set_obscurement(pos[0], pos[1], self.is_obscured(*pos))
+            if hasattr(self.grid, "set_surface_difficulty"):
+                self.grid.set_surface_difficulty(pos[0], pos[1], difficult)
+
+    def cells_of_type(self, surface_type: SurfaceType) -> Set[Tuple[int, int]]:
+        """Cells currently covered by a surface type (do not modify)."""
+        return self.cells_by_type[surface_type]
 
     def is_obscured(self, x: int, y: int) -> Optional[str]:
         """Check if surfaces at position create obscurement."""
@@ -569,11 +648,20 @@ class SurfaceManager:
                 return obscured  # "lightly" or "heavily"
         return None
 
-    def advance_round(self):
-        """Process surfaces at the end of a round (decay durations)."""
+    def advance_round(self) -> List[Tuple[int, int]]:
+        """
+        Process surfaces at the end of a round (decay durations).
+
+        Only cells holding a timed surface are visited.
+
+        Returns:
+            Cells whose surfaces changed or expired
+        """
         positions_to_clear = []
+        positions_changed = []
 
-        for pos, surfaces in self.surfaces.items():
+        for pos in list(self._timed_cells):
+            surfaces = self.surfaces.get(pos, [])
             remaining = []
             for surface in surfaces:
                 if surface.duration_rounds > 0:
@@ -584,12 +672,54 @@ class SurfaceManager:
                     remaining.append(surface)  # Permanent surface
 
             if remaining:
+                if len(remaining) != len(surfaces):
+                    positions_changed.append(pos)
                 self.surfaces[pos] = remaining
             else:
                 positions_to_clear.append(pos)
 
         for pos in positions_to_clear:
-            del self.surfaces[pos]
+            self.surfaces.pop(pos, None)
+        changed = positions_changed + positions_to_clear
+        for pos in changed:
+            self._sync_cell(pos)
+        return changed
+
+    def tick_round(
+        self,
+        positions: Dict[str, Any],
+        combatant_stats: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a whole round of surface effects in one batch.
+
+        Every combatant standing on a surface takes its start-of-turn
+        effects, then surface durations decay.
+
+        Args:
+            positions: Combatant ID -> position (the combat's positions map)
+            combatant_stats: Combatant ID -> stats for saves
+
+        Returns:
+            All triggered effects, each tagged with its combatant_id
+        """
+        if hasattr(positions, "in_cells"):
+            # Spatial index: intersect occupied cells with surface cells
+            standing = [(cid, positions.cell_of(cid)) for cid in positions.in_cells(self.surfaces.keys())]
+        else:
+            standing = []
+            for cid, pos in positions.items():
+                if isinstance(pos, dict):
+                    pos = (pos.get("x", 0), pos.get("y", 0))
+                if pos and tuple(pos) in self.surfaces:
+                    standing.append((cid, tuple(pos)))
+
+        effects = []
+        for cid, (x, y) in standing:
+            effects.extend(self.process_turn_start(cid, x, y, combatant_stats.get(cid, {})))
+
+        self.advance_round()
+        return effects
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize surface manager to dictionary."""
@@ -607,6 +737,7 @@ class SurfaceManager:
         for pos_str, surface_list in data.get("surfaces", {}).items():
             x, y = map(int, pos_str.split(","))
             manager.surfaces[(x, y)] = [Surface.from_dict(s) for s in surface_list]
+            manager._sync_cell((x, y))
         return manager
 
 
@@ -615,7 +746,9 @@ SPELL_SURFACES: Dict[str, Dict[str, Any]] = {
     "grease": {
         "surface_type": SurfaceType.GREASE,
         "duration_rounds": 10,  # 1 minute
-        "radius": 2
+        "radius": 2,
+        "shape": "cube",
+        "size_ft": 10
     },
     "create_bonfire": {
         "surface_type": SurfaceType.FIRE,
@@ -625,7 +758,9 @@ SPELL_SURFACES: Dict[str, Dict[str, Any]] = {
     "web": {
         "surface_type": SurfaceType.WEB,
         "duration_rounds": 60,  # 1 hour
-        "radius": 4
+        "radius": 4,
+        "shape": "cube",
+        "size_ft": 20
     },
     "fog_cloud": {
         "surface_type": SurfaceType.STEAM,
@@ -646,7 +781,9 @@ SPELL_SURFACES: Dict[str, Dict[str, Any]] = {
     "burning_hands": {
         "surface_type": SurfaceType.FIRE,
         "duration_rounds": 1,
-        "radius": 0
+        "radius": 0,
+        "shape": "cone",  # From the caster toward the aim point
+        "size_ft": 15
     },
     "fireball": {
         "surface_type": SurfaceType.FIRE,
@@ -672,17 +809,22 @@ def create_surface_from_spell(
     y: int,
     surface_manager: SurfaceManager,
     caster_id: str = None,
-    spell_dc: int = None
+    spell_dc: int = None,
+    toward: Optional[Tuple[int, int]] = None
 ) -> Dict[str, Any]:
     """
     Create surfaces from a spell cast.
 
+    The covered cells come from the spell's area template ("shape" and
+    "size_ft", or a sphere of "radius" squares).
+
     Args:
         spell_id: ID of the spell
-        x, y: Center position
+        x, y: Center position (the caster for cones and lines)
         surface_manager: The surface manager
         caster_id: ID of the caster
         spell_dc: Spell save DC
+        toward: Aim point for cones and lines; without it only (x, y) is covered
 
     Returns:
         Result dictionary
@@ -695,22 +837,27 @@ def create_surface_from_spell(
     duration = spell_data["duration_rounds"]
     radius = spell_data.get("radius", 0)
 
+    shape = spell_data.get("shape", "sphere")
+    size_ft = spell_data.get("size_ft", radius * 5)
+
+    if shape in DIRECTED_SHAPES and toward is None:
+        cells = [(x, y)]
+    else:
+        cells = template_cells(shape, size_ft, (x, y), toward)
+
     results = []
 
     # Create surfaces in area
-    for dx in range(-radius, radius + 1):
-        for dy in range(-radius, radius + 1):
-            # Check if within circular radius
-            if dx * dx + dy * dy <= radius * radius:
-                result = surface_manager.add_surface(
-                    x + dx, y + dy,
-                    surface_type,
-                    duration_rounds=duration,
-                    dc=spell_dc,
-                    creator_id=caster_id,
-                    spell_id=spell_id
-                )
-                results.append(result)
+    for cell_x, cell_y in cells:
+        result = surface_manager.add_surface(
+            cell_x, cell_y,
+            surface_type,
+            duration_rounds=duration,
+            dc=spell_dc,
+            creator_id=caster_id,
+            spell_id=spell_id
+        )
+        results.append(result)
 
     return {
         "success": True,
@@ -718,6 +865,7 @@ def create_surface_from_spell(
         "surface_type": surface_type.value,
         "center": (x, y),
         "radius": radius,
+        "shape": shape,
         "cells_affected": len(results),
         "results": results
     }
@@ -0,0 +1,240 @@
+"""
+Threat Maps.
+
+Per-faction heatmap of the cells each side threatens: for every cell, the
+creatures that could make an opportunity attack against something leaving
+it. Factions are combatant types ("player", "enemy", "npc"); a creature is
+threatened by every faction other than its own, matching how the combat
+engine decides who is an enemy.
+
+The map lives on the combat state and is synced incrementally: each
+threatening creature is a ThreatSource (cell, reach, Sentinel/Polearm
+Master), and only sources whose signature changed since the last sync -
+it moved, died, or was incapacitated - have their cells re-stamped. Queries
+(how many enemies threaten this cell, who do I provoke by stepping from A
+to B) are dictionary lookups.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set
+
+from app.core.condition_effects import is_incapacitated
+from app.core.spatial_index import Cell, to_cell
+
+if TYPE_CHECKING:
+    from app.core.combat_engine import CombatState
+
+
+@dataclass(frozen=True)
+class ThreatSource:
+    """One creature's threat area."""
+    combatant_id: str
+    faction: str
+    cell: Cell
+    reach: int = 1  # Squares
+    sentinel: bool = False
+    polearm_master: bool = False
+
+    def covers(self, cell: Cell) -> bool:
+        """Whether a cell is within this creature's reach."""
+        return max(abs(cell[0] - self.cell[0]), abs(cell[1] - self.cell[1])) <= self.reach
+
+    @classmethod
+    def from_stats(
+        cls,
+        combatant_id: str,
+        faction: str,
+        cell: Cell,
+        stats: Dict,
+    ) -> "ThreatSource":
+        feats = stats.get("feats") or []
+        return cls(
+            combatant_id=combatant_id,
+            faction=faction,
+            cell=cell,
+            reach=max(1, stats.get("reach", 5) // 5),
+            sentinel="sentinel" in feats or bool(stats.get("sentinel", False)),
+            polearm_master="polearm_master" in feats or bool(stats.get("polearm_master", False)),
+        )
+
+
+class ThreatMap:
+    """
+    Cells threatened by each faction, with the creatures threatening them.
+
+    Args:
+        width, height: Grid bounds to clip threat areas to (unbounded if None)
+    """
+
+    def __init__(self, width: Optional[int] = None, height: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.sources: Dict[str, ThreatSource] = {}
+        # faction -> cell -> IDs of that faction's creatures threatening the cell
+        self._threats: Dict[str, Dict[Cell, Set[str]]] = {}
+        # Bumped whenever any source changes
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _area(self, source: ThreatSource) -> Iterator[Cell]:
+        x, y = source.cell
+        for cx in range(x - source.reach, x + source.reach + 1):
+            if self.width is not None and not 0 <= cx < self.width:
+                continue
+            for cy in range(y - source.reach, y + source.reach + 1):
+                if self.height is not None and not 0 <= cy < self.height:
+                    continue
+                yield cx, cy
+
+    def remove(self, combatant_id: str) -> bool:
+        """Stop tracking a creature's threat. Returns True if it was tracked."""
+        source = self.sources.pop(combatant_id, None)
+        if source is None:
+            return False
+        cells = self._threats.get(source.faction, {})
+        for cell in self._area(source):
+            ids = cells.get(cell)
+            if ids is not None:
+                ids.discard(combatant_id)
+                if not ids:
+                    del cells[cell]
+        self.version += 1
+        return True
+
+    def update(self, source: ThreatSource) -> bool:
+        """Add or replace a creature's threat. Returns True if anything changed."""
+        if self.sources.get(source.combatant_id) == source:
+            return False
+        self.remove(source.combatant_id)
+        self.sources[source.combatant_id] = source
+        cells = self._threats.setdefault(source.faction, {})
+        for cell in self._area(source):
+            cells.setdefault(cell, set()).add(source.combatant_id)
+        self.version += 1
+        return True
+
+    def sync(self, state: "CombatState") -> int:
+        """
+        Bring the map up to date with a combat state.
+
+        Creatures that are inactive, unpositioned or incapacitated (no
+        reactions) threaten nothing.
+
+        Returns:
+            Number of creatures whose threat changed
+        """
+        changed = 0
+        seen = set()
+        for combatant in state.initiative_tracker.combatants:
+            seen.add(combatant.id)
+            cell = to_cell(state.positions.get(combatant.id))
+            stats = state.combatant_stats.get(combatant.id, {})
+            conditions = stats.get("conditions", getattr(combatant, "conditions", []))
+            if not combatant.is_active or cell is None or is_incapacitated(conditions)[0]:
+                changed += self.remove(combatant.id)
+                continue
+            source = ThreatSource.from_stats(
+                combatant.id, combatant.combatant_type.value, cell, stats
+            )
+            changed += self.update(source)
+
+        for combatant_id in [cid for cid in self.sources if cid not in seen]:
+            changed += self.remove(combatant_id)
+        return changed
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def threateners(self, cell: Cell, against: Optional[str]) -> List[str]:
+        """IDs of creatures hostile to faction ``against`` that threaten a cell."""
+        found = []
+        for faction, cells in self._threats.items():
+            if faction != against:
+                found.extend(cells.get(cell, ()))
+        return sorted(found)
+
+    def threat_count(self, cell: Cell, against: Optional[str]) -> int:
+        """How many creatures hostile to faction ``against`` threaten a cell."""
+        return sum(
+            len(cells.get(cell, ()))
+            for faction, cells in self._threats.items()
+            if faction != against
+        )
+
+    def heatmap(self, against: Optional[str]) -> Dict[Cell, int]:
+        """Threat count for every cell threatened by factions hostile to ``against``."""
+        counts: Dict[Cell, int] = {}
+        for faction, cells in self._threats.items():
+            if faction == against:
+                continue
+            for cell, ids in cells.items():
+                counts[cell] = counts.get(cell, 0) + len(ids)
+        return counts
+
+    def threatened_cells(self, combatant_id: str) -> List[Cell]:
+        """Cells inside one creature's reach."""
+        source = self.sources.get(combatant_id)
+        return list(self._area(source)) if source else []
+
+    def leaving_reach(
+        self,
+        from_pos: Cell,
+        to_pos: Cell,
+        mover_faction: Optional[str],
+        disengaged: bool = False,
+    ) -> List[str]:
+        """
+        Creatures whose reach a move from ``from_pos`` to ``to_pos`` leaves.
+
+        Args:
+            from_pos: Square the mover leaves
+            to_pos: Square the mover enters
+            mover_faction: The mover's faction (its allies are ignored)
+            disengaged: Only Sentinel creatures still react
+
+        Returns:
+            IDs of creatures that may make an opportunity attack
+        """
+        return [
+            cid for cid in self.threateners(from_pos, mover_faction)
+            if not self.sources[cid].covers(to_pos)
+            and (not disengaged or self.sources[cid].sentinel)
+        ]
+
+    def entering_reach(
+        self,
+        from_pos: Cell,
+        to_pos: Cell,
+        mover_faction: Optional[str],
+    ) -> List[str]:
+        """Polearm Masters whose reach a move from ``from_pos`` to ``to_pos`` enters."""
+        return [
+            cid for cid in self.threateners(to_pos, mover_faction)
+            if self.sources[cid].polearm_master and not self.sources[cid].covers(from_pos)
+        ]
+
+
+def get_faction(state: "CombatState", combatant_id: str) -> Optional[str]:
+    """Faction (combatant type value) of a combatant, if known."""
+    combatant = state.initiative_tracker.get_combatant(combatant_id)
+    return combatant.combatant_type.value if combatant else None
+
+
+def get_threat_map(state: "CombatState") -> ThreatMap:
+    """
+    Get the combat's threat map, synced to the current board.
+
+    Created on first use and sized to the combat grid; later calls only
+    re-stamp creatures that moved, died or changed condition.
+    """
+    grid = getattr(state, "grid", None)
+    bounds = (getattr(grid, "width", None), getattr(grid, "height", None))
+    threat_map = getattr(state, "threat_map", None)
+    if not isinstance(threat_map, ThreatMap) or (threat_map.width, threat_map.height) != bounds:
+        threat_map = ThreatMap(*bounds)
+        state.threat_map = threat_map
+    threat_map.sync(state)
+    return threat_map
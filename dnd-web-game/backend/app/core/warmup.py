@@ -0,0 +1,96 @@
+"""
+Warmup Pass.
+
+Runs the request hot paths once with throwaway data so their lazy state
+exists before the first real request. That state covers registries and
+search indexes, distance-field and AoE caches, AI behaviour objects and
+first-call imports.
+
+The prefork server (app.server) runs this in the master before forking, so
+every worker inherits a warm, shared copy. Each step is timed into the
+startup profile. A failing step is logged and skipped; warmup never stops
+the server from starting.
+"""
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.startup_profile import StartupProfile, get_startup_profile
+
+logger = logging.getLogger("dnd_engine.warmup")
+
+# Spell picker traffic: typed prefixes, a typo and facet-only filters
+SPELL_QUERIES = ["f", "fi", "fire", "firebal", "cure wounds", "heal", "shield", "misile"]
+
+PARTY = [
+    {"id": "p1", "name": "Fighter", "hp": 30, "ac": 16, "attack_bonus": 5, "damage_dice": "1d8+3"},
+    {"id": "p2", "name": "Ranger", "hp": 24, "ac": 14, "attack_bonus": 5, "damage_dice": "1d8+3"},
+]
+ENEMIES = [
+    {"id": f"g{i}", "name": "Goblin", "hp": 7, "ac": 13, "attack_bonus": 4, "damage_dice": "1d6+2"}
+    for i in range(3)
+]
+
+
+def _warm_spell_search() -> None:
+    from app.core.spell_system import SpellRegistry
+
+    registry = SpellRegistry.get_instance()
+    for query in SPELL_QUERIES:
+        registry.search_spells_page(query, limit=50)
+    registry.search_spells_page(level=1, class_name="wizard", limit=50)
+    registry.search_spells_page(concentration=True, ritual=False, limit=50)
+
+
+def _warm_pathfinding() -> None:
+    from app.core.movement import create_grid_with_obstacles, find_path, get_reachable_cells
+
+    walls = [(10, y) for y in range(2, 18)]
+    grid = create_grid_with_obstacles(20, 20, obstacles=walls, difficult_terrain=[(5, 5), (5, 6)])
+    find_path(grid, 0, 0, 19, 19, max_movement=200)
+    find_path(grid, 0, 10, 15, 10, max_movement=60)
+    get_reachable_cells(grid, 3, 3, 30)
+
+
+def _warm_ai_turns() -> None:
+    from app.core.simulation import CombatSimulator
+
+    CombatSimulator(PARTY, ENEMIES, max_rounds=5).run(seed=0)
+
+
+def _warm_encounters() -> None:
+    from app.core.monster_catalog import get_monster_catalog
+    from app.core.random_encounters import RandomEncounterGenerator
+
+    get_monster_catalog().query(cr_max=2, environment="forest")
+    RandomEncounterGenerator()._get_template_cr("goblin")
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("spell_search", _warm_spell_search),
+    ("pathfinding", _warm_pathfinding),
+    ("ai_turns", _warm_ai_turns),
+    ("encounters", _warm_encounters),
+]
+
+
+def run_warmup(profile: Optional[StartupProfile] = None) -> Dict[str, bool]:
+    """
+    Run every warmup step.
+
+    Args:
+        profile: Where to record step timings (default: the process profile)
+
+    Returns:
+        Step name -> whether it completed
+    """
+    profile = profile or get_startup_profile()
+    results: Dict[str, bool] = {}
+    for name, step in WARMUP_STEPS:
+        try:
+            with profile.timed("warmup", name):
+                step()
+            results[name] = True
+        except Exception as e:
+            logger.warning("Warmup step %s failed: %s", name, e)
+            results[name] = False
+    return results
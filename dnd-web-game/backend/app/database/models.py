@@ -261,6 +261,7 @@ class CombatLog(SQLModel, table=True):
     id: str = Field(default_factory=generate_uuid, primary_key=True)
     combat_state_id: str = Field(index=True)
     session_id: Optional[str] = Field(default=None, index=True)
+    sequence: int = Field(default=0, index=True)  # Engine event sequence number
 
     # Event info
     round_number: int = Field(default=1)
@@ -315,6 +316,11 @@ class CombatState(SQLModel, table=True):
     # Active effects (buffs, debuffs, concentration)
     active_effects: List[Dict[str, Any]] = Field(default_factory=list, sa_column=Column(JSON))
 
+    # Engine snapshot taken at end of turn; journal events after
+    # snapshot_sequence are replayed on top of it during recovery
+    snapshot: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    snapshot_sequence: int = Field(default=0)
+
     # Combat result
     result: Optional[str] = None  # victory, defeat, fled, none
     xp_awarded: int = Field(default=0)
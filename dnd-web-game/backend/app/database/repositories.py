@@ -239,12 +239,18 @@ class CombatStateRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create(self, data: CombatStateCreate) -> CombatState:
-        """Create a new combat state."""
+    async def create(
+        self,
+        data: CombatStateCreate,
+        combat_id: Optional[str] = None,
+    ) -> CombatState:
+        """Create a new combat state, optionally with a caller-chosen ID."""
         combat_state = CombatState(
             session_id=data.session_id,
             combatants=data.combatants,
         )
+        if combat_id:
+            combat_state.id = combat_id
         self.session.add(combat_state)
         await self.session.flush()
         return combat_state
@@ -304,6 +310,79 @@ class CombatStateRepository:
             active_effects=active_effects,
         )
 
+    async def apply_delta(self, combat_id: str, delta: Any) -> bool:
+        """
+        Write only the changed sections of a combat state.
+
+        Scalar and small JSON columns are written with a single UPDATE that
+        leaves combatant_stats untouched. Changed stat blocks are merged into
+        the stored combatant_stats column, which is only loaded when at
+        least one combatant actually changed.
+
+        Args:
+            combat_id: The combat state ID
+            delta: CombatStateDelta from CombatEngine.collect_state_delta()
+
+        Returns:
+            True if the combat state row exists and was updated
+        """
+        values: Dict[str, Any] = {}
+        if delta.phase is not None:
+            values["phase"] = delta.phase
+        if delta.round_number is not None:
+            values["round_number"] = delta.round_number
+        if delta.current_turn_index is not None:
+            values["current_turn_index"] = delta.current_turn_index
+        if delta.current_turn_changed:
+            values["current_turn"] = delta.current_turn
+        if delta.positions is not None:
+            values["positions"] = delta.positions
+        if delta.initiative_order is not None:
+            values["initiative_order"] = delta.initiative_order
+
+        if delta.has_stats_changes:
+            combat_state = await self.get_by_id(combat_id)
+            if not combat_state:
+                return False
+            # Assign a new dict so SQLAlchemy sees the JSON column change
+            stats = dict(combat_state.combatant_stats or {})
+            stats.update(delta.combatant_stats)
+            for removed_id in delta.removed_combatants:
+                stats.pop(removed_id, None)
+            combat_state.combatant_stats = stats
+            for key, value in values.items():
+                setattr(combat_state, key, value)
+            await self.session.flush()
+            return True
+
+        if not values:
+            return True
+
+        result = await self.session.execute(
+            update(CombatState)
+            .where(CombatState.id == combat_id)
+            .values(**values)
+        )
+        return result.rowcount > 0
+
+    async def save_snapshot(
+        self,
+        combat_id: str,
+        snapshot: Dict[str, Any],
+        sequence: int,
+    ) -> bool:
+        """Store an engine snapshot covering events up to ``sequence``."""
+        result = await self.session.execute(
+            update(CombatState)
+            .where(CombatState.id == combat_id)
+            .values(snapshot=snapshot, snapshot_sequence=sequence)
+        )
+        return result.rowcount > 0
+
+    def get_log_repository(self) -> "CombatLogRepository":
+        """Get a combat log repository sharing this repository's session."""
+        return CombatLogRepository(self.session)
+
     async def end_combat(
         self,
         combat_id: str,
@@ -363,6 +442,56 @@ class CombatLogRepository:
         await self.session.flush()
         return log
 
+    async def create_many(
+        self,
+        combat_state_id: str,
+        events: List[Dict[str, Any]],
+        session_id: Optional[str] = None,
+    ) -> int:
+        """
+        Append a batch of engine events to the journal in one flush.
+
+        Args:
+            combat_state_id: The combat state ID
+            events: Serialized CombatEvent dicts (CombatEvent.to_dict())
+            session_id: Optional game session ID
+
+        Returns:
+            Number of log entries written
+        """
+        logs = [
+            CombatLog(
+                combat_state_id=combat_state_id,
+                session_id=session_id,
+                sequence=event["sequence"],
+                event_type=event["type"],
+                description=event.get("description", ""),
+                round_number=event.get("round", 1),
+                actor_id=event.get("combatant_id"),
+                data=event.get("data") or {},
+            )
+            for event in events
+        ]
+        if not logs:
+            return 0
+        self.session.add_all(logs)
+        await self.session.flush()
+        return len(logs)
+
+    async def get_after_sequence(
+        self,
+        combat_state_id: str,
+        sequence: int,
+    ) -> List[CombatLog]:
+        """Get journaled events newer than ``sequence``, oldest first."""
+        result = await self.session.execute(
+            select(CombatLog)
+            .where(CombatLog.combat_state_id == combat_state_id)
+            .where(CombatLog.sequence > sequence)
+            .order_by(CombatLog.sequence.asc())
+        )
+        return list(result.scalars().all())
+
     async def get_for_combat(
         self,
         combat_state_id: str,
@@ -5,8 +5,8 @@ Converts our monster JSON format to Foundry VTT dnd5e system Actor format.
 """
 
 from typing import Dict, List, Any, Optional
-from pathlib import Path
-import json
+
+from app.core.monster_catalog import get_monster_catalog
 
 from .utils import (
     generate_foundry_id,
@@ -26,36 +26,12 @@ from .utils import (
 class MonsterExporter:
     """Converts our monster JSON to Foundry VTT dnd5e Actor format."""
 
-    def __init__(self):
-        """Initialize the exporter."""
-        self._data_path = self._get_data_path()
-
-    def _get_data_path(self) -> Path:
-        """Get the path to the monster data directory."""
-        current_dir = Path(__file__).parent
-        return current_dir.parent / "data" / "rules" / "2024" / "monsters"
-
     def load_all_monsters(self) -> List[Dict]:
-        """Load all monsters from JSON files."""
-        monsters = []
-
-        if not self._data_path.exists():
-            print(f"Monster data path not found: {self._data_path}")
-            return monsters
-
-        for filepath in self._data_path.glob("*.json"):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Each file has a "monsters" array
-                    if "monsters" in data:
-                        for monster in data["monsters"]:
-                            monster["_source_file"] = filepath.stem
-                            monsters.append(monster)
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                print(f"Error loading {filepath}: {e}")
-
-        return monsters
+        """Load all monsters from the monster catalog."""
+        return [
+            dict(monster.stat_block, _source_file=monster.source_file)
+            for monster in get_monster_catalog().all()
+        ]
 
     def export(self, our_monster: Dict) -> Dict:
         """
@@ -341,8 +317,11 @@ class MonsterExporter:
         for action in monster.get("actions", []):
             items.append(self._action_to_item(action, monster.get("id", "unknown")))
 
-        # Convert legendary actions if present
-        for legendary in monster.get("legendary_actions", []):
+        # Convert legendary actions if present (a list, or {"actions_per_turn", "actions"})
+        legendary_actions = monster.get("legendary_actions") or []
+        if isinstance(legendary_actions, dict):
+            legendary_actions = legendary_actions.get("actions", [])
+        for legendary in legendary_actions:
             items.append(self._legendary_to_item(legendary, monster.get("id", "unknown")))
 
         # Convert reactions if present
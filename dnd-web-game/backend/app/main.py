@@ -1,11 +1,11 @@
 """FastAPI application entry point."""
 from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from app.config import get_settings
+from app.core.startup_profile import get_startup_profile
 from app.middleware.error_handler import setup_error_handlers
-import traceback
 
 # ============================================================================
 # IMPORTANT: If you see this banner, the server has been restarted!
@@ -19,75 +19,154 @@ print("  [OK] Structured error handling enabled", flush=True)
 print("="*70 + "\n", flush=True)
 
 settings = get_settings()
+profile = get_startup_profile()
+
+
+# Routers: name -> (module under app.api.routes, mount prefix, tags).
+# Modules are imported only when their router is mounted.
+ROUTERS: Dict[str, Tuple[str, str, List[str]]] = {
+    "auth": ("auth", "/api/auth", ["auth"]),
+    "combat": ("combat", "/api/combat", ["combat"]),
+    "character": ("character", "/api/character", ["character"]),
+    "campaign": ("campaign", "/api/campaign", ["campaign"]),
+    "campaign_generator": ("campaign_generator", "/api/campaign-generator", ["campaign-generator"]),
+    "spells": ("spells", "/api/spells", ["spells"]),
+    "equipment": ("equipment", "/api", ["equipment"]),
+    "character_creation": ("character_creation", "/api/creation", ["character-creation"]),
+    "loot": ("loot", "/api", ["loot"]),
+    "class_features": ("class_features", "/api/class-features", ["class-features"]),
+    "skill_checks": ("skill_checks", "/api/skill-check", ["skill-checks"]),
+    "progression": ("progression", "/api/progression", ["progression"]),
+    "dm": ("dm", "/api/dm", ["dm"]),
+    "shop": ("shop", "/api", ["shop"]),
+    "map_generation": ("map_generation", "/api", ["map_generation"]),
+    "social": ("social", "/api/social", ["social"]),
+    "random_encounters": ("random_encounters", "/api/encounters", ["encounters"]),
+    "export": ("export", "/api", ["export"]),
+    "multiplayer": ("multiplayer", "/api/multiplayer", ["multiplayer"]),
+    "campaign_editor": ("campaign_editor", "", ["campaign-editor"]),
+    "admin": ("admin", "/api/admin", ["admin"]),
+}
+
+
+def _preload_spells():
+    from app.core.spell_system import SpellRegistry
+    SpellRegistry.get_instance().get_search_index()
+
+
+def _preload_rules():
+    from app.core.rules_catalog import get_rules_catalog
+    get_rules_catalog()
+
+
+def _preload_rules_loader():
+    from app.services.rules_loader import get_rules_loader
+    get_rules_loader()
+
+
+def _preload_monsters():
+    from app.core.monster_catalog import get_monster_catalog
+    get_monster_catalog()
+
+
+def _preload_weapons():
+    from app.core.combat_engine import load_weapon_data
+    load_weapon_data("longsword")  # indexes the whole weapons file
+
+
+def _preload_conditions():
+    from app.core.condition_effects import load_conditions
+    load_conditions()
+
+
+def _preload_loot():
+    from app.core.loot_system import get_loot_generator
+    get_loot_generator()
+
+
+def _preload_subclasses():
+    from app.core.subclass_registry import get_subclass_registry
+    get_subclass_registry()
+
+
+def _preload_ai_dm():
+    from app.services.ai_dm import get_ai_dm
+    get_ai_dm()
+
+
+# Subsystems that can be loaded in the lifespan hook (STARTUP_PRELOAD)
+# instead of on the first request that needs them
+PRELOADERS: Dict[str, Callable[[], None]] = {
+    "rules": _preload_rules,
+    "rules_loader": _preload_rules_loader,
+    "spells": _preload_spells,
+    "monsters": _preload_monsters,
+    "weapons": _preload_weapons,
+    "conditions": _preload_conditions,
+    "loot": _preload_loot,
+    "subclasses": _preload_subclasses,
+    "ai_dm": _preload_ai_dm,
+}
+
+# Read-only rules data the prefork server (app.server) loads before forking
+SHARED_PRELOAD = ["rules", "rules_loader", "spells", "monsters", "weapons", "conditions", "loot", "subclasses"]
+
+
+def _parse_names(value: str, known: Dict[str, Any], setting: str) -> List[str]:
+    """Split a comma-separated setting; "all" means every known name."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if names == ["all"]:
+        return list(known)
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"{setting}: unknown {unknown}, expected some of {sorted(known)}")
+    return names
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events - startup and shutdown."""
     # Startup: Initialize database
-    from app.database.engine import init_db
-    await init_db()
+    with profile.timed("lifespan", "database"):
+        from app.database.engine import init_db
+        await init_db()
     print("[Startup] Database initialized")
 
+    # Start buffered combat persistence if enabled
+    from app.core.combat_storage import get_write_behind_buffer
+    write_behind = get_write_behind_buffer()
+    if write_behind:
+        await write_behind.start()
+        print("[Startup] Combat write-behind enabled")
+
+    # Load requested subsystems before taking traffic
+    for name in app.state.preload:
+        try:
+            with profile.timed("preload", name):
+                PRELOADERS[name]()
+            print(f"[Startup] Preloaded {name}")
+        except Exception as e:
+            print(f"[Startup] Failed to preload {name}: {e}")
+
+    profile.mark_ready()
+
     yield  # Application runs here
 
+    # Shutdown: Flush buffered combat writes
+    if write_behind:
+        await write_behind.stop()
+
     # Shutdown: Close database connections
     from app.database.engine import close_db
     await close_db()
     print("[Shutdown] Database connections closed")
 
 
-app = FastAPI(
-    title="D&D Combat Engine",
-    description="A BG3-inspired tactical D&D web game with AI Dungeon Master",
-    version="0.1.0",
-    lifespan=lifespan,
-)
-
-
-# Middleware to log ALL requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    print(f"[REQUEST] {request.method} {request.url.path}", flush=True)
-    try:
-        response = await call_next(request)
-        print(f"[RESPONSE] {request.method} {request.url.path} -> {response.status_code}", flush=True)
-        return response
-    except Exception as e:
-        print(f"[REQUEST ERROR] {request.method} {request.url.path} -> {type(e).__name__}: {e}", flush=True)
-        raise
-
-# CORS middleware for frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        settings.FRONTEND_URL,
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:5500",  # Live Server
-        "http://127.0.0.1:5500",
-        "http://localhost:8080",  # Python http.server
-        "http://127.0.0.1:8080",
-        "http://localhost:5173",  # Vite / Python http.server
-        "http://127.0.0.1:5173",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-# Setup structured error handlers (replaces the old global exception handler)
-setup_error_handlers(app, debug=settings.DEBUG)
-
-
-@app.get("/")
 async def root():
     """Health check endpoint."""
     return {"status": "online", "game": "D&D Combat Engine", "version": "0.1.0"}
 
 
-@app.get("/health")
 async def health_check():
     """Detailed health check."""
     print("[HEALTH] Health check endpoint called!", flush=True)
@@ -98,35 +177,96 @@ async def health_check():
     }
 
 
-@app.get("/api/health")
 async def api_health_check():
     """Health check at /api/health for frontend compatibility."""
     print("[API_HEALTH] /api/health endpoint called!", flush=True)
     return await health_check()
 
 
-# Routes
-from app.api.routes import combat, character, campaign, spells, equipment, character_creation, loot, class_features, skill_checks, progression, dm, shop, map_generation, social, random_encounters, export, campaign_generator, multiplayer, auth, campaign_editor
-app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
-app.include_router(combat.router, prefix="/api/combat", tags=["combat"])
-app.include_router(character.router, prefix="/api/character", tags=["character"])
-app.include_router(campaign.router, prefix="/api/campaign", tags=["campaign"])
-app.include_router(campaign_generator.router, prefix="/api/campaign-generator", tags=["campaign-generator"])
-app.include_router(spells.router, prefix="/api/spells", tags=["spells"])
-app.include_router(equipment.router, prefix="/api", tags=["equipment"])
-app.include_router(character_creation.router, prefix="/api/creation", tags=["character-creation"])
-app.include_router(loot.router, prefix="/api", tags=["loot"])
-app.include_router(class_features.router, prefix="/api/class-features", tags=["class-features"])
-app.include_router(skill_checks.router, prefix="/api/skill-check", tags=["skill-checks"])
-app.include_router(progression.router, prefix="/api/progression", tags=["progression"])
-app.include_router(dm.router, prefix="/api/dm", tags=["dm"])
-app.include_router(shop.router, prefix="/api", tags=["shop"])
-app.include_router(map_generation.router, prefix="/api", tags=["map_generation"])
-app.include_router(social.router, prefix="/api/social", tags=["social"])
-app.include_router(random_encounters.router, prefix="/api/encounters", tags=["encounters"])
-app.include_router(export.router, prefix="/api", tags=["export"])
-app.include_router(multiplayer.router, prefix="/api/multiplayer", tags=["multiplayer"])
-app.include_router(campaign_editor.router, tags=["campaign-editor"])
+# Middleware to log ALL requests
+async def log_requests(request: Request, call_next):
+    print(f"[REQUEST] {request.method} {request.url.path}", flush=True)
+    try:
+        response = await call_next(request)
+        print(f"[RESPONSE] {request.method} {request.url.path} -> {response.status_code}", flush=True)
+        return response
+    except Exception as e:
+        print(f"[REQUEST ERROR] {request.method} {request.url.path} -> {type(e).__name__}: {e}", flush=True)
+        raise
+
+
+def create_app(
+    routers: Optional[Iterable[str]] = None,
+    preload: Optional[Iterable[str]] = None,
+) -> FastAPI:
+    """
+    Build the application.
+
+    Args:
+        routers: Names from ROUTERS to mount (default: APP_ROUTERS, or all).
+            Only the selected route modules are imported, so a minimal app
+            (e.g. ["spells"] in a test) skips the rest of the engine.
+        preload: Names from PRELOADERS to load in the lifespan hook
+            (default: STARTUP_PRELOAD)
+
+    Returns:
+        FastAPI application
+    """
+    if routers is None:
+        routers = _parse_names(settings.APP_ROUTERS, ROUTERS, "APP_ROUTERS") or list(ROUTERS)
+    else:
+        routers = _parse_names(",".join(routers), ROUTERS, "routers")
+    if preload is None:
+        preload = _parse_names(settings.STARTUP_PRELOAD, PRELOADERS, "STARTUP_PRELOAD")
+    else:
+        preload = _parse_names(",".join(preload), PRELOADERS, "preload")
+
+    app = FastAPI(
+        title="D&D Combat Engine",
+        description="A BG3-inspired tactical D&D web game with AI Dungeon Master",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
+    app.state.preload = preload
+
+    app.middleware("http")(log_requests)
+
+    # CORS middleware for frontend
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            settings.FRONTEND_URL,
+            "http://localhost:3000",
+            "http://127.0.0.1:3000",
+            "http://localhost:5500",  # Live Server
+            "http://127.0.0.1:5500",
+            "http://localhost:8080",  # Python http.server
+            "http://127.0.0.1:8080",
+            "http://localhost:5173",  # Vite / Python http.server
+            "http://127.0.0.1:5173",
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Setup structured error handlers (replaces the old global exception handler)
+    setup_error_handlers(app, debug=settings.DEBUG)
+
+    app.get("/")(root)
+    app.get("/health")(health_check)
+    app.get("/api/health")(api_health_check)
+
+    # Routes
+    for name in routers:
+        module_name, prefix, tags = ROUTERS[name]
+        module = profile.import_module(f"app.api.routes.{module_name}")
+        app.include_router(module.router, prefix=prefix, tags=tags)
+
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
@@ -1,13 +1,16 @@
 """Middleware package for the D&D Combat Engine."""
 
 from app.middleware.error_handler import ErrorHandlerMiddleware, setup_error_handlers
-from app.middleware.auth import (
-    get_current_user,
-    get_current_user_optional,
-    require_auth,
-    optional_auth,
-    authenticate_websocket,
-)
+
+# Auth helpers pull in the database layer and JWT backends; they are loaded
+# on first access so that importing the error handler stays cheap.
+_AUTH_EXPORTS = {
+    "get_current_user",
+    "get_current_user_optional",
+    "require_auth",
+    "optional_auth",
+    "authenticate_websocket",
+}
 
 __all__ = [
     "ErrorHandlerMiddleware",
@@ -18,3 +21,10 @@ __all__ = [
     "optional_auth",
     "authenticate_websocket",
 ]
+
+
+def __getattr__(name: str):
+    if name in _AUTH_EXPORTS:
+        from app.middleware import auth
+        return getattr(auth, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -199,6 +199,8 @@ class SpellTargetInfo(BaseModel):
     distance: int
     is_ally: bool
     is_self: bool = False
+    cover: int = 0  # Cover bonus between caster and target
+    obscured: Optional[str] = None  # "lightly" or "heavily"
 
 
 class SpellCastResult(BaseModel):
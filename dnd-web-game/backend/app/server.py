@@ -0,0 +1,198 @@
+"""
+Prefork Server.
+
+Multi-worker entry point:
+
+    python -m app.server [--workers N] [--host HOST] [--port PORT] [--no-warmup]
+
+The master process binds the listening socket and builds the app. It then
+loads the read-only rules data (app.main.SHARED_PRELOAD: rules catalog,
+rules loader, spells and their search index, monsters, weapons, conditions,
+loot tables, subclasses) and runs the warmup pass (app.core.warmup). Next it
+calls gc.freeze() on everything allocated so far, so the collector in the
+workers never writes to those objects and their memory pages stay shared
+copy-on-write. Finally it forks the workers.
+
+Each worker serves the inherited socket with uvicorn and runs the normal
+lifespan hook (database, write-behind buffer). The master restarts workers
+that die, and on SIGTERM/SIGINT stops them gracefully. With one worker, or
+where fork is unavailable, the same preparation runs and the app is served
+in-process.
+
+The AI DM client is not created in the master, since HTTP connection pools
+do not survive a fork; each worker creates its own on first use. Combats
+live in COMBAT_STORE_URL, so more than one worker needs a shared store
+(e.g. sqlite:///./combat_sessions.db); with the default memory:// store
+the server refuses to start more than one worker.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from app.config import get_settings
+
+logger = logging.getLogger("dnd_engine.server")
+
+# A worker that dies sooner than this after starting is restarted after a
+# pause, so a crash at startup does not become a fork loop
+MIN_WORKER_LIFETIME_SECONDS = 1.0
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by every worker."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def prepare_master(warmup: bool = True):
+    """
+    Build the app and load everything workers should share.
+
+    Args:
+        warmup: Also exercise the hot paths (app.core.warmup)
+
+    Returns:
+        The ASGI app
+    """
+    from app.core.startup_profile import get_startup_profile
+    from app.core.warmup import run_warmup
+    from app.main import PRELOADERS, SHARED_PRELOAD, app
+
+    profile = get_startup_profile()
+    for name in SHARED_PRELOAD:
+        with profile.timed("preload", name):
+            PRELOADERS[name]()
+    if warmup:
+        run_warmup(profile)
+
+    # Everything so far is long-lived; keep the collector's hands off it
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+class PreforkServer:
+    """
+    Forks uvicorn workers that share one listening socket.
+
+    Args:
+        app: ASGI app, already prepared in this (master) process
+        sock: Listening socket from bind_socket
+        workers: Number of worker processes
+        log_level: uvicorn log level
+    """
+
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str = "info"):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+
+    def serve(self) -> None:
+        """Serve requests in the current process until stopped."""
+        config = uvicorn.Config(self.app, log_level=self.log_level, lifespan="on")
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def spawn(self) -> int:
+        """Fork one worker; returns its pid in the master."""
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                self.serve()
+            except BaseException:
+                logger.exception("Worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def stop(self, signum: int = signal.SIGTERM, frame=None) -> None:
+        """Ask every worker to finish in-flight requests and exit."""
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        """Start the workers and supervise them until stopped."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"[Server] Master {os.getpid()} started {self.workers} workers", flush=True)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+
+            code = os.waitstatus_to_exitcode(status)
+            print(f"[Server] Worker {pid} exited ({code}), restarting", flush=True)
+            if time.monotonic() - started < MIN_WORKER_LIFETIME_SECONDS:
+                time.sleep(MIN_WORKER_LIFETIME_SECONDS)
+            if not self.stopping:
+                self.spawn()
+
+        self.sock.close()
+        print("[Server] All workers stopped", flush=True)
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the server. Returns a process exit code."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the API with preforked workers")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", default=settings.WARMUP)
+    parser.add_argument("--log-level", default="debug" if settings.DEBUG else "info")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and settings.COMBAT_STORE_URL.startswith("memory://"):
+        # Each worker would hold its own combats and answer for the others
+        print(
+            f"[Server] ERROR: --workers {args.workers} needs a shared COMBAT_STORE_URL "
+            "(e.g. sqlite:///./combat_sessions.db); memory:// only supports one worker",
+            file=sys.stderr, flush=True,
+        )
+        return 2
+
+    sock = bind_socket(args.host, args.port)
+    app = prepare_master(warmup=args.warmup)
+    server = PreforkServer(app, sock, args.workers, log_level=args.log_level)
+
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        server.serve()
+        return 0
+    return server.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,6 @@ Services package for D&D Combat Engine.
 Provides character import and parsing services.
 """
 
-from .pdf_parser import DnDBeyondPDFParser
 from .json_parser import DnDBeyondJSONParser, parse_json_file, parse_json_string
 from .character_service import (
     to_combatant_data,
@@ -22,3 +21,11 @@ __all__ = [
     'validate_character',
     'create_demo_combatant',
 ]
+
+
+def __getattr__(name: str):
+    # pdfplumber is slow to import; load the PDF parser on first use
+    if name == "DnDBeyondPDFParser":
+        from .pdf_parser import DnDBeyondPDFParser
+        return DnDBeyondPDFParser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
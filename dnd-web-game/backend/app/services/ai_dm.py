@@ -10,9 +10,9 @@ Uses Claude API to generate:
 Supports AI/Human hybrid mode where human DM can override at any time.
 Includes caching, rate limiting, fallbacks, and personality customization.
 """
-from typing import Optional, Dict, Any, List
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Optional, Dict, Any, List
 from enum import Enum
-import asyncio
 import logging
 
 from app.config import get_settings
@@ -25,6 +25,7 @@ from app.services.ai_dm_fallbacks import (
     get_encounter_suggestion_fallback,
 )
 from app.services.ai_dm_rate_limiter import AIDMRateLimiter
+from app.services.ai_dm_stream import Flight, SingleFlight
 from app.services.ai_dm_personalities import (
     DMPersonality,
     PERSONALITY_PRESETS,
@@ -42,6 +43,16 @@ class DMMode(str, Enum):
     HYBRID = "hybrid"  # AI generates, human approves
 
 
+@dataclass
+class NarrationRequest:
+    """Everything needed to generate one narration (or fall back)."""
+    prompt: str
+    max_tokens: int
+    scenario_type: str
+    cache_context: Dict[str, Any]
+    fallback: Callable[[], str]
+
+
 class AIDMService:
     """
     AI Dungeon Master powered by Claude.
@@ -64,19 +75,29 @@ class AIDMService:
         self._human_override_active = False
 
         # Initialize new components
-        self._cache = AIDMCache(max_size=100, ttl_minutes=30)
+        self._cache = AIDMCache(
+            max_size=500,
+            ttl_minutes=settings.AI_DM_CACHE_TTL_MINUTES,
+            max_bytes=1024 * 1024,
+            db_path=settings.AI_DM_CACHE_PATH or None,
+        )
         self._rate_limiter = AIDMRateLimiter(
             requests_per_minute=20,
             requests_per_hour=200,
             daily_cost_cap_usd=5.0,
         )
         self._personality = PERSONALITY_PRESETS.get("classic", DMPersonality())
+        self._flights = SingleFlight()
 
-        # Initialize client if API key is available
+        # Initialize client if API key is available. The async client keeps
+        # one pooled HTTP connection and streams tokens as they arrive.
         if self._api_key:
             try:
                 import anthropic
-                self._client = anthropic.Anthropic(api_key=self._api_key)
+                self._client = anthropic.AsyncAnthropic(
+                    api_key=self._api_key,
+                    base_url=settings.ANTHROPIC_BASE_URL or None,
+                )
                 logger.info("AI DM service initialized with Claude API")
             except ImportError:
                 logger.warning("anthropic package not installed - AI DM disabled")
@@ -132,28 +153,7 @@ class AIDMService:
         """
         if self._human_override_active:
             return None
-
-        encounter_type = encounter.get("type", "exploration")
-
-        # Try AI generation if client available
-        if self._client:
-            cache_context = {
-                "type": encounter_type,
-                "story": encounter.get("story", {}),
-            }
-            prompt = self._build_scene_prompt(encounter, party, world_state)
-            result = await self._call_claude(
-                prompt,
-                max_tokens=500,
-                scenario_type="scene",
-                cache_context=cache_context,
-            )
-            if result:
-                return result
-
-        # Fall back to pre-written templates
-        logger.debug(f"Using fallback for scene description: {encounter_type}")
-        return get_scene_fallback(encounter_type)
+        return await self._generate(self._scene_request(encounter, party, world_state))
 
     async def generate_npc_dialogue(
         self,
@@ -180,27 +180,9 @@ class AIDMService:
         """
         if self._human_override_active:
             return None
-
-        # Try AI generation if client available
-        if self._client:
-            cache_context = {
-                "npc_type": npc_type,
-                "personality": npc_personality[:50],
-                "situation": context[:50],
-            }
-            prompt = self._build_npc_prompt(npc_name, npc_personality, context, player_input)
-            result = await self._call_claude(
-                prompt,
-                max_tokens=300,
-                scenario_type="npc",
-                cache_context=cache_context,
-            )
-            if result:
-                return result
-
-        # Fall back to pre-written templates
-        logger.debug(f"Using fallback for NPC dialogue: {npc_name}")
-        return get_npc_dialogue_fallback(disposition=disposition, npc_type=npc_type)
+        return await self._generate(self._npc_request(
+            npc_name, npc_personality, context, player_input, disposition, npc_type
+        ))
 
     async def generate_combat_narration(
         self,
@@ -221,44 +203,7 @@ class AIDMService:
         """
         if self._human_override_active:
             return None
-
-        actor_name = combatant.get("name", "The combatant")
-        target_name = target.get("name", "the enemy") if target else "the enemy"
-        hit = action_result.get("hit", False)
-        is_kill = (target.get("current_hp", 1) <= 0) if target else False
-        is_critical = action_result.get("critical", False)
-        is_healing = action_result.get("action_type", "") == "heal"
-        is_spell = action_result.get("is_spell", False)
-
-        # Try AI generation if client available
-        if self._client:
-            cache_context = {
-                "action_type": action_result.get("action_type", "attack"),
-                "hit": hit,
-                "current_hp": target.get("current_hp", 1) if target else 1,
-                "damage_type": action_result.get("damage_type", ""),
-            }
-            prompt = self._build_combat_narration_prompt(action_result, combatant, target)
-            result = await self._call_claude(
-                prompt,
-                max_tokens=150,
-                scenario_type="combat",
-                cache_context=cache_context,
-            )
-            if result:
-                return result
-
-        # Fall back to pre-written templates
-        logger.debug(f"Using fallback for combat narration: {actor_name} vs {target_name}")
-        return get_combat_fallback(
-            actor_name=actor_name,
-            target_name=target_name,
-            hit=hit,
-            is_kill=is_kill,
-            is_critical=is_critical,
-            is_healing=is_healing,
-            is_spell=is_spell,
-        )
+        return await self._generate(self._combat_request(action_result, combatant, target))
 
     async def suggest_dynamic_encounter(
         self,
@@ -320,19 +265,170 @@ class AIDMService:
         """
         if self._human_override_active:
             return None
+        return await self._generate(self._skill_check_request(
+            character_name, skill, dc, roll, success, context
+        ))
 
-        margin = roll - dc
-        is_critical = roll == 20 or roll == 1
+    async def stream_narrative(
+        self,
+        context_type: str,
+        data: Dict[str, Any],
+    ) -> AsyncIterator[str]:
+        """
+        Stream narrative text as it is generated.
 
-        # Try AI generation if client available
+        Accepts the same context types and data as the generic
+        /dm/generate endpoint. Yields the fallback text as a single chunk
+        when the AI is unavailable, and nothing under human override.
+
+        Args:
+            context_type: 'scene', 'npc', 'combat' or 'skill_check'
+            data: Context data for the narrative type
+
+        Raises:
+            ValueError: If context_type is unknown
+        """
+        request = self._narrative_request(context_type, data)
+        if self._human_override_active:
+            return
+
+        streamed = False
         if self._client:
-            cache_context = {
-                "skill": skill.lower(),
-                "success": success,
-                "roll": roll,
-                "dc": dc,
-            }
-            prompt = f"""Describe the result of this skill check in 1-2 vivid sentences:
+            async for chunk in self._stream_claude(
+                request.prompt,
+                max_tokens=request.max_tokens,
+                scenario_type=request.scenario_type,
+                cache_context=request.cache_context,
+            ):
+                streamed = True
+                yield chunk
+
+        if not streamed:
+            logger.debug(f"Using fallback for streamed {request.scenario_type}")
+            yield request.fallback()
+
+    # =========================================================================
+    # NARRATION REQUESTS
+    # =========================================================================
+
+    def _narrative_request(self, context_type: str, data: Dict[str, Any]) -> NarrationRequest:
+        """Build a narration request from generic /dm/generate style data."""
+        if context_type == "scene":
+            return self._scene_request(
+                data.get("encounter", {}),
+                data.get("party", []),
+                data.get("world_state", {}),
+            )
+        if context_type == "npc":
+            return self._npc_request(
+                data.get("npc_name", "Unknown"),
+                data.get("npc_personality", "neutral"),
+                data.get("context", ""),
+                data.get("player_input", ""),
+            )
+        if context_type == "combat":
+            return self._combat_request(
+                data.get("action_result", {}),
+                data.get("combatant", {}),
+                data.get("target"),
+            )
+        if context_type == "skill_check":
+            return self._skill_check_request(
+                data.get("character_name", "Unknown"),
+                data.get("skill", "Athletics"),
+                data.get("dc", 10),
+                data.get("roll", 10),
+                data.get("success", True),
+                data.get("context", ""),
+            )
+        raise ValueError(f"Unknown context type: {context_type}")
+
+    def _scene_request(
+        self,
+        encounter: Dict[str, Any],
+        party: List[Dict[str, Any]],
+        world_state: Dict[str, Any],
+    ) -> NarrationRequest:
+        """Prompt, cache key context and fallback for a scene description."""
+        encounter_type = encounter.get("type", "exploration")
+        return NarrationRequest(
+            prompt=self._build_scene_prompt(encounter, party, world_state),
+            max_tokens=500,
+            scenario_type="scene",
+            cache_context={
+                "type": encounter_type,
+                "story": encounter.get("story", {}),
+            },
+            fallback=lambda: get_scene_fallback(encounter_type),
+        )
+
+    def _npc_request(
+        self,
+        npc_name: str,
+        npc_personality: str,
+        context: str,
+        player_input: str,
+        disposition: str = "neutral",
+        npc_type: str = "",
+    ) -> NarrationRequest:
+        """Prompt, cache key context and fallback for NPC dialogue."""
+        return NarrationRequest(
+            prompt=self._build_npc_prompt(npc_name, npc_personality, context, player_input),
+            max_tokens=300,
+            scenario_type="npc",
+            cache_context={
+                "npc_type": npc_type,
+                "personality": npc_personality[:50],
+                "situation": context[:50],
+            },
+            fallback=lambda: get_npc_dialogue_fallback(disposition=disposition, npc_type=npc_type),
+        )
+
+    def _combat_request(
+        self,
+        action_result: Dict[str, Any],
+        combatant: Dict[str, Any],
+        target: Optional[Dict[str, Any]],
+    ) -> NarrationRequest:
+        """Prompt, cache key context and fallback for combat narration."""
+        actor_name = combatant.get("name", "The combatant")
+        target_name = target.get("name", "the enemy") if target else "the enemy"
+        hit = action_result.get("hit", False)
+        is_kill = (target.get("current_hp", 1) <= 0) if target else False
+
+        return NarrationRequest(
+            prompt=self._build_combat_narration_prompt(action_result, combatant, target),
+            max_tokens=150,
+            scenario_type="combat",
+            cache_context={
+                "action_type": action_result.get("action_type", "attack"),
+                "hit": hit,
+                "current_hp": target.get("current_hp", 1) if target else 1,
+                "damage_type": action_result.get("damage_type", ""),
+            },
+            fallback=lambda: get_combat_fallback(
+                actor_name=actor_name,
+                target_name=target_name,
+                hit=hit,
+                is_kill=is_kill,
+                is_critical=action_result.get("critical", False),
+                is_healing=action_result.get("action_type", "") == "heal",
+                is_spell=action_result.get("is_spell", False),
+            ),
+        )
+
+    def _skill_check_request(
+        self,
+        character_name: str,
+        skill: str,
+        dc: int,
+        roll: int,
+        success: bool,
+        context: str,
+    ) -> NarrationRequest:
+        """Prompt, cache key context and fallback for a skill check result."""
+        margin = roll - dc
+        prompt = f"""Describe the result of this skill check in 1-2 vivid sentences:
 
 Character: {character_name}
 Skill: {skill}
@@ -341,23 +437,44 @@ Result: {"SUCCESS" if success else "FAILURE"} ({"exceeded" if success else "miss
 
 Write an engaging, in-world description. Don't mention dice or numbers."""
 
+        return NarrationRequest(
+            prompt=prompt,
+            max_tokens=100,
+            scenario_type="skill_check",
+            cache_context={
+                "skill": skill.lower(),
+                "success": success,
+                "roll": roll,
+                "dc": dc,
+            },
+            fallback=lambda: get_skill_check_fallback(
+                character_name=character_name,
+                skill=skill,
+                success=success,
+                is_critical=roll == 20 or roll == 1,
+            ),
+        )
+
+    async def _generate(self, request: NarrationRequest) -> str:
+        """Generate a narration with the AI, falling back to templates."""
+        # Try AI generation if client available
+        if self._client:
             result = await self._call_claude(
-                prompt,
-                max_tokens=100,
-                scenario_type="skill_check",
-                cache_context=cache_context,
+                request.prompt,
+                max_tokens=request.max_tokens,
+                scenario_type=request.scenario_type,
+                cache_context=request.cache_context,
             )
             if result:
                 return result
 
         # Fall back to pre-written templates
-        logger.debug(f"Using fallback for skill check: {skill} by {character_name}")
-        return get_skill_check_fallback(
-            character_name=character_name,
-            skill=skill,
-            success=success,
-            is_critical=is_critical,
-        )
+        logger.debug(f"Using fallback for {request.scenario_type}")
+        return request.fallback()
+
+    # =========================================================================
+    # CLAUDE API
+    # =========================================================================
 
     async def _call_claude(
         self,
@@ -369,6 +486,8 @@ Write an engaging, in-world description. Don't mention dice or numbers."""
         """
         Make API call to Claude with caching and rate limiting.
 
+        Identical in-flight requests (same cache key) share one upstream call.
+
         Args:
             prompt: The prompt to send
             max_tokens: Maximum tokens for response
@@ -388,6 +507,58 @@ Write an engaging, in-world description. Don't mention dice or numbers."""
                 logger.debug(f"Cache hit for {scenario_type}")
                 return cached
 
+        flight = self._join_flight(prompt, max_tokens, scenario_type, cache_context)
+        if flight is None:
+            return None
+        return await flight.result() or None
+
+    async def _stream_claude(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        scenario_type: str = "general",
+        cache_context: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a Claude response chunk by chunk (see _call_claude).
+
+        A cached response is yielded as a single chunk.
+        """
+        if not self._client:
+            return
+
+        if cache_context:
+            cached = self._cache.get(scenario_type, cache_context)
+            if cached:
+                logger.debug(f"Cache hit for {scenario_type}")
+                yield cached
+                return
+
+        flight = self._join_flight(prompt, max_tokens, scenario_type, cache_context)
+        if flight is None:
+            return
+        async for chunk in flight.follow():
+            yield chunk
+
+    def _join_flight(
+        self,
+        prompt: str,
+        max_tokens: int,
+        scenario_type: str,
+        cache_context: Optional[Dict[str, Any]],
+    ) -> Optional[Flight]:
+        """
+        Join the in-flight generation for this cache key, or start one.
+
+        Returns:
+            The shared Flight, or None if rate limited
+        """
+        key = self._cache.key_for(scenario_type, cache_context) if cache_context else None
+        flight = self._flights.get(key)
+        if flight is not None:
+            logger.debug(f"Joined in-flight {scenario_type} generation")
+            return flight
+
         # Check rate limits
         allowed, reason, is_soft = self._rate_limiter.can_make_request()
         if not allowed:
@@ -399,35 +570,31 @@ Write an engaging, in-world description. Don't mention dice or numbers."""
         # Adjust max_tokens based on personality verbosity
         adjusted_tokens = self._personality.get_max_tokens(max_tokens)
 
-        try:
-            # Use sync client in async context via thread pool
-            loop = asyncio.get_event_loop()
-            message = await loop.run_in_executor(
-                None,
-                lambda: self._client.messages.create(
+        async def produce(flight: Flight) -> None:
+            try:
+                async with self._client.messages.stream(
                     model=self._model,
                     max_tokens=adjusted_tokens,
                     system=self._get_system_prompt(),
-                    messages=[{"role": "user", "content": prompt}]
-                )
-            )
-            response_text = message.content[0].text
+                    messages=[{"role": "user", "content": prompt}],
+                ) as stream:
+                    async for text in stream.text_stream:
+                        await flight.publish(text)
+                    message = await stream.get_final_message()
+            except Exception:
+                self._rate_limiter.record_request(success=False)
+                raise
 
             # Record usage
-            input_tokens = len(prompt) // 4  # Rough estimate
-            output_tokens = len(response_text) // 4
-            self._rate_limiter.record_request(input_tokens, output_tokens)
+            self._rate_limiter.record_request(
+                message.usage.input_tokens, message.usage.output_tokens
+            )
 
             # Cache the response if context provided
-            if cache_context:
-                self._cache.set(scenario_type, cache_context, response_text)
+            if cache_context and flight.text:
+                self._cache.set(scenario_type, cache_context, flight.text)
 
-            return response_text
-
-        except Exception as e:
-            logger.error(f"Claude API error: {e}")
-            self._rate_limiter.record_request(success=False)
-            return None
+        return self._flights.start(key, produce)
 
     def _get_system_prompt(self) -> str:
         """Get system prompt for AI DM with personality customization."""
@@ -514,9 +681,9 @@ Your role is to create immersive, engaging narratives while:
         Get cache statistics.
 
         Returns:
-            Dictionary with cache stats
+            Dictionary with cache stats, including in-flight coalescing
         """
-        return self._cache.get_stats()
+        return {**self._cache.get_stats(), **self._flights.get_stats()}
 
     def set_rate_limits(
         self,
@@ -2,40 +2,19 @@
 Response caching for AI DM with TTL and scenario-based keys.
 
 Caches AI-generated narrative responses to reduce API calls and costs.
-Uses content hashing to find similar scenarios.
+Uses content hashing to find similar scenarios. Built on the shared
+LRUCache, with an optional SQLite tier for persistence across restarts.
 """
-from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 import hashlib
 import json
 import logging
+import time
 
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class CacheEntry:
-    """Cached AI response with metadata."""
-    response: str
-    created_at: datetime
-    scenario_type: str  # scene, combat, skill_check, npc
-    context_hash: str
-    hit_count: int = 0
-
-    def is_expired(self, ttl: timedelta) -> bool:
-        """Check if this entry has expired."""
-        return datetime.utcnow() - self.created_at > ttl
+from app.core.cache import LRUCache, SQLiteCacheStore
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Serialize to dictionary."""
-        return {
-            "response": self.response,
-            "created_at": self.created_at.isoformat(),
-            "scenario_type": self.scenario_type,
-            "context_hash": self.context_hash,
-            "hit_count": self.hit_count,
-        }
+logger = logging.getLogger(__name__)
 
 
 class AIDMCache:
@@ -48,25 +27,40 @@ class AIDMCache:
     Features:
     - TTL-based expiration (default 30 minutes)
     - Scenario-specific key generation
-    - LRU eviction when max size reached
-    - Hit count tracking for analytics
+    - O(1) LRU eviction by entry count and total response bytes
+    - Optional SQLite tier so warmed responses survive restarts
+    - Hit count and per-scenario hit-rate tracking for analytics
     """
 
-    def __init__(self, max_size: int = 100, ttl_minutes: int = 30):
+    def __init__(
+        self,
+        max_size: int = 100,
+        ttl_minutes: int = 30,
+        max_bytes: Optional[int] = None,
+        db_path: Optional[str] = None,
+    ):
         """
         Initialize the cache.
 
         Args:
-            max_size: Maximum number of entries to cache
+            max_size: Maximum number of in-memory entries
             ttl_minutes: Time-to-live in minutes for cache entries
+            max_bytes: Maximum total size of in-memory responses (None = unbounded)
+            db_path: SQLite file for the persistent tier (None = memory only)
         """
-        self._cache: Dict[str, CacheEntry] = {}
-        self._max_size = max_size
         self._ttl = timedelta(minutes=ttl_minutes)
-        self._hits = 0
-        self._misses = 0
+        self._cache = LRUCache(
+            max_size=max_size,
+            default_ttl=self._ttl.total_seconds(),
+            max_bytes=max_bytes,
+            store=SQLiteCacheStore(db_path) if db_path else None,
+        )
+        self._max_size = max_size
 
-        logger.info(f"AI DM Cache initialized: max_size={max_size}, ttl={ttl_minutes}min")
+        logger.info(
+            f"AI DM Cache initialized: max_size={max_size}, ttl={ttl_minutes}min, "
+            f"max_bytes={max_bytes}, persistent={db_path is not None}"
+        )
 
     def _generate_key(self, scenario_type: str, context: Dict[str, Any]) -> str:
         """
@@ -80,12 +74,25 @@ class AIDMCache:
             context: Full context dictionary
 
         Returns:
-            MD5 hash string as cache key
+            "<scenario_type>:<MD5 hash>" cache key
         """
         normalized = self._normalize_context(scenario_type, context)
         normalized["_type"] = scenario_type
         content = json.dumps(normalized, sort_keys=True)
-        return hashlib.md5(content.encode()).hexdigest()
+        return f"{scenario_type}:{hashlib.md5(content.encode()).hexdigest()}"
+
+    def key_for(self, scenario_type: str, context: Dict[str, Any]) -> str:
+        """
+        Public cache key for a scenario (used to coalesce identical requests).
+
+        Args:
+            scenario_type: Type of narrative
+            context: Scenario context
+
+        Returns:
+            Cache key string
+        """
+        return self._generate_key(scenario_type, context)
 
     def _normalize_context(self, scenario_type: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -154,25 +161,10 @@ class AIDMCache:
         Returns:
             Cached response string, or None if not found/expired
         """
-        key = self._generate_key(scenario_type, context)
-        entry = self._cache.get(key)
-
-        if entry is None:
-            self._misses += 1
-            return None
-
-        if entry.is_expired(self._ttl):
-            # Remove expired entry
-            del self._cache[key]
-            self._misses += 1
-            logger.debug(f"Cache entry expired: {scenario_type}")
-            return None
-
-        # Cache hit
-        entry.hit_count += 1
-        self._hits += 1
-        logger.debug(f"Cache hit for {scenario_type} (hits: {entry.hit_count})")
-        return entry.response
+        response = self._cache.get(self._generate_key(scenario_type, context))
+        if response is not None:
+            logger.debug(f"Cache hit for {scenario_type}")
+        return response
 
     def set(self, scenario_type: str, context: Dict[str, Any], response: str) -> None:
         """
@@ -186,37 +178,17 @@ class AIDMCache:
         if not response:
             return
 
-        # Evict oldest entries if at capacity
-        while len(self._cache) >= self._max_size:
-            self._evict_oldest()
-
-        key = self._generate_key(scenario_type, context)
-        self._cache[key] = CacheEntry(
-            response=response,
-            created_at=datetime.utcnow(),
-            scenario_type=scenario_type,
-            context_hash=key,
-        )
+        self._cache.set(self._generate_key(scenario_type, context), response)
         logger.debug(f"Cached {scenario_type} response (size: {len(self._cache)})")
 
-    def _evict_oldest(self) -> None:
-        """Remove the oldest cache entry (LRU)."""
-        if not self._cache:
-            return
-
-        oldest_key = min(self._cache, key=lambda k: self._cache[k].created_at)
-        evicted = self._cache.pop(oldest_key)
-        logger.debug(f"Evicted cache entry: {evicted.scenario_type} (age: {datetime.utcnow() - evicted.created_at})")
-
     def clear(self) -> int:
         """
-        Clear all cache entries.
+        Clear all cache entries (including the persistent tier).
 
         Returns:
             Number of entries cleared
         """
-        count = len(self._cache)
-        self._cache.clear()
+        count = self._cache.clear()
         logger.info(f"Cache cleared: {count} entries removed")
         return count
 
@@ -227,18 +199,10 @@ class AIDMCache:
         Returns:
             Number of entries removed
         """
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if entry.is_expired(self._ttl)
-        ]
-
-        for key in expired_keys:
-            del self._cache[key]
-
-        if expired_keys:
-            logger.debug(f"Cleaned up {len(expired_keys)} expired entries")
-
-        return len(expired_keys)
+        removed = self._cache.cleanup_expired()
+        if removed:
+            logger.debug(f"Cleaned up {removed} expired entries")
+        return removed
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -247,24 +211,30 @@ class AIDMCache:
         Returns:
             Dictionary with cache stats
         """
-        total_hits = sum(e.hit_count for e in self._cache.values())
+        stats = self._cache.get_stats()
+        entries = self._cache.entries()
 
         # Group by scenario type
         by_type: Dict[str, int] = {}
-        for entry in self._cache.values():
-            by_type[entry.scenario_type] = by_type.get(entry.scenario_type, 0) + 1
-
-        hit_rate = (self._hits / (self._hits + self._misses) * 100) if (self._hits + self._misses) > 0 else 0
+        for key, _ in entries:
+            scenario_type = key.split(":", 1)[0]
+            by_type[scenario_type] = by_type.get(scenario_type, 0) + 1
 
         return {
-            "size": len(self._cache),
+            "size": stats["entries"],
             "max_size": self._max_size,
+            "bytes": stats["bytes"],
+            "max_bytes": stats["max_bytes"],
             "ttl_minutes": self._ttl.total_seconds() / 60,
-            "hits": self._hits,
-            "misses": self._misses,
-            "hit_rate": round(hit_rate, 1),
-            "total_response_hits": total_hits,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hit_rate"],
+            "disk_hits": stats["disk_hits"],
+            "evictions": stats["evictions"],
+            "persistent": stats["persistent"],
+            "total_response_hits": sum(entry.hit_count for _, entry in entries),
             "by_scenario_type": by_type,
+            "scenario_metrics": stats["by_namespace"],
         }
 
     def get_cached_scenarios(self) -> List[Dict[str, Any]]:
@@ -274,13 +244,14 @@ class AIDMCache:
         Returns:
             List of cache entry summaries
         """
+        now = time.time()
         return [
             {
-                "scenario_type": entry.scenario_type,
-                "created_at": entry.created_at.isoformat(),
+                "scenario_type": key.split(":", 1)[0],
+                "created_at": datetime.utcfromtimestamp(entry.created_at).isoformat(),
                 "hit_count": entry.hit_count,
-                "age_seconds": (datetime.utcnow() - entry.created_at).total_seconds(),
-                "response_preview": entry.response[:100] + "..." if len(entry.response) > 100 else entry.response,
+                "age_seconds": now - entry.created_at,
+                "response_preview": entry.value[:100] + "..." if len(entry.value) > 100 else entry.value,
             }
-            for entry in self._cache.values()
+            for key, entry in self._cache.entries()
         ]
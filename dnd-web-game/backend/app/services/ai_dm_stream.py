@@ -0,0 +1,143 @@
+"""
+Streaming and request coalescing for AI DM generations.
+
+A generation runs once upstream as a Flight; every caller asking for the
+same cache key while it is in flight follows the same token stream instead
+of issuing its own API call (single-flight).
+"""
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """
+    One upstream generation shared by every caller with the same key.
+
+    Chunks are kept as they arrive so late followers replay the text
+    generated so far before waiting for more.
+    """
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.failed = False
+        self.followers = 0
+        self._changed = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def text(self) -> str:
+        """Text generated so far."""
+        return "".join(self.chunks)
+
+    async def publish(self, chunk: str) -> None:
+        """Append a generated chunk and wake followers."""
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, failed: bool = False) -> None:
+        """Mark the generation complete (or failed) and wake followers."""
+        async with self._changed:
+            self.done = True
+            self.failed = failed
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """
+        Yield every chunk of the generation, from the beginning.
+
+        Stops early (after whatever was already streamed) if the
+        upstream call fails.
+        """
+        self.followers += 1
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.chunks) > position or self.done)
+                new_chunks = self.chunks[position:]
+                finished = self.done
+            position += len(new_chunks)
+            for chunk in new_chunks:
+                yield chunk
+            if finished and position >= len(self.chunks):
+                return
+
+    async def result(self) -> Optional[str]:
+        """Wait for the full text, or None if the generation failed."""
+        text = "".join([chunk async for chunk in self.follow()])
+        return None if self.failed else text
+
+
+class SingleFlight:
+    """
+    Registry of in-flight generations keyed by cache key.
+
+    The upstream call runs in its own task, so a follower disconnecting
+    (e.g. a closed SSE stream) never cancels the generation for others.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._coalesced = 0
+
+    def get(self, key: Optional[str]) -> Optional[Flight]:
+        """Return the in-flight generation for a key, if any."""
+        if key is None:
+            return None
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._coalesced += 1
+        return flight
+
+    def start(
+        self,
+        key: Optional[str],
+        produce: Callable[[Flight], Awaitable[None]],
+    ) -> Flight:
+        """
+        Start a generation and register it under key (None = not shared).
+
+        Args:
+            key: Cache key to coalesce on, or None for a private flight
+            produce: Coroutine function that publishes chunks to the flight
+
+        Returns:
+            The new Flight
+        """
+        flight = Flight()
+        if key is not None:
+            self._flights[key] = flight
+
+        async def run() -> None:
+            try:
+                await produce(flight)
+                await flight.finish()
+            except Exception as e:
+                logger.error(f"AI DM generation failed: {e}")
+            finally:
+                # Failed or cancelled: wake followers instead of leaving them waiting
+                if not flight.done:
+                    await flight.finish(failed=True)
+                if key is not None and self._flights.get(key) is flight:
+                    del self._flights[key]
+
+        flight._task = asyncio.create_task(run())
+        return flight
+
+    def get_stats(self) -> Dict[str, int]:
+        """In-flight and coalesced request counts."""
+        return {
+            "in_flight": len(self._flights),
+            "coalesced_requests": self._coalesced,
+        }
+
+
+def format_sse(data: Dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
@@ -614,5 +614,9 @@ async def quick_generate_campaign(
     )
 
 
-# Default instance for imports
-campaign_generator = CampaignGeneratorService.get_instance()
+def __getattr__(name: str):
+    # ``campaign_generator`` used to be built at import; build it on first use
+    # instead so importing this module does not create the API client.
+    if name == "campaign_generator":
+        return get_campaign_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,15 @@
 """
 D&D 2024 Rules Data Loader.
 
-Singleton service that loads and caches all D&D 2024 rules data from JSON files.
-Provides access to species, classes, backgrounds, feats, and equipment data.
+Singleton service that indexes all D&D 2024 rules data from the shared
+rules catalog. Provides access to species, classes, backgrounds, feats, and
+equipment data.
 """
-import json
-import os
-from pathlib import Path
 from typing import Dict, List, Optional, Any
-from functools import lru_cache
+
+from app.core.rules_catalog import get_rules_catalog, on_catalog_reload
+
+RULES_DIR = "rules/2024"
 
 
 class RulesLoader:
@@ -56,40 +57,18 @@ class RulesLoader:
         cls._epic_boons = []
         cls._equipment = {}
 
-    def _get_data_path(self) -> Path:
-        """Get the path to the rules data directory."""
-        # Navigate from services to data/rules/2024
-        current_dir = Path(__file__).parent
-        return current_dir.parent / "data" / "rules" / "2024"
-
-    def _load_json_file(self, filepath: Path) -> Optional[Dict]:
-        """Load a single JSON file."""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            print(f"Error loading {filepath}: {e}")
-            return None
-
     def _load_directory(self, subdir: str) -> Dict[str, Dict]:
         """Load all JSON files from a subdirectory."""
         data = {}
-        dir_path = self._get_data_path() / subdir
-
-        if not dir_path.exists():
-            print(f"Directory not found: {dir_path}")
-            return data
-
-        for filepath in dir_path.glob("*.json"):
-            file_data = self._load_json_file(filepath)
-            if file_data and "id" in file_data:
+        for _, file_data in get_rules_catalog().directory(f"{RULES_DIR}/{subdir}"):
+            if isinstance(file_data, dict) and "id" in file_data:
                 data[file_data["id"]] = file_data
 
         return data
 
     def _load_all_data(self):
-        """Load all rules data from JSON files."""
-        data_path = self._get_data_path()
+        """Load all rules data from the shared rules catalog."""
+        catalog = get_rules_catalog()
 
         # Load species
         self._species = self._load_directory("species")
@@ -104,68 +83,58 @@ class RulesLoader:
         print(f"Loaded {len(self._backgrounds)} backgrounds")
 
         # Load feats
-        feats_path = data_path / "feats"
-
-        origin_feats_file = feats_path / "origin_feats.json"
-        if origin_feats_file.exists():
-            feats_data = self._load_json_file(origin_feats_file)
-            if feats_data and "feats" in feats_data:
-                self._origin_feats = feats_data["feats"]
-                print(f"Loaded {len(self._origin_feats)} origin feats")
-
-        general_feats_file = feats_path / "general_feats.json"
-        if general_feats_file.exists():
-            feats_data = self._load_json_file(general_feats_file)
-            if feats_data and "feats" in feats_data:
-                self._general_feats = feats_data["feats"]
-                print(f"Loaded {len(self._general_feats)} general feats")
-
-        epic_boons_file = feats_path / "epic_boons.json"
-        if epic_boons_file.exists():
-            boons_data = self._load_json_file(epic_boons_file)
-            if boons_data and "boons" in boons_data:
-                self._epic_boons = boons_data["boons"]
-                print(f"Loaded {len(self._epic_boons)} epic boons")
-
-        # Load equipment
-        equipment_path = data_path / "equipment"
-        if equipment_path.exists():
-            for filepath in equipment_path.glob("*.json"):
-                equip_data = self._load_json_file(filepath)
-                if equip_data:
-                    # Equipment files have different structures
-                    # Check for weapon categories (simple_melee_weapons, martial_melee_weapons, etc.)
-                    weapon_keys = [k for k in equip_data.keys() if 'weapon' in k.lower()]
-                    for key in weapon_keys:
-                        items = equip_data.get(key, [])
-                        if isinstance(items, list):
-                            for weapon in items:
-                                if isinstance(weapon, dict) and "id" in weapon:
-                                    weapon["item_type"] = "weapon"
-                                    self._equipment[weapon["id"]] = weapon
-
-                    # Check for armor categories
-                    armor_keys = [k for k in equip_data.keys() if 'armor' in k.lower()]
-                    for key in armor_keys:
-                        items = equip_data.get(key, [])
-                        if isinstance(items, list):
-                            for armor in items:
-                                if isinstance(armor, dict) and "id" in armor:
-                                    armor["item_type"] = "armor"
-                                    self._equipment[armor["id"]] = armor
-
-                    # Check for generic items/gear
-                    if "items" in equip_data:
-                        for item in equip_data["items"]:
-                            if isinstance(item, dict) and "id" in item:
-                                self._equipment[item["id"]] = item
-                    if "gear" in equip_data:
-                        for item in equip_data["gear"]:
-                            if isinstance(item, dict) and "id" in item:
-                                item["item_type"] = "gear"
-                                self._equipment[item["id"]] = item
-
-            print(f"Loaded {len(self._equipment)} equipment items")
+        feats_data = catalog.get(f"{RULES_DIR}/feats/origin_feats.json")
+        if feats_data and "feats" in feats_data:
+            self._origin_feats = feats_data["feats"]
+            print(f"Loaded {len(self._origin_feats)} origin feats")
+
+        feats_data = catalog.get(f"{RULES_DIR}/feats/general_feats.json")
+        if feats_data and "feats" in feats_data:
+            self._general_feats = feats_data["feats"]
+            print(f"Loaded {len(self._general_feats)} general feats")
+
+        boons_data = catalog.get(f"{RULES_DIR}/feats/epic_boons.json")
+        if boons_data and "boons" in boons_data:
+            self._epic_boons = boons_data["boons"]
+            print(f"Loaded {len(self._epic_boons)} epic boons")
+
+        # Load equipment (copied: item_type is added per item and the
+        # catalog's data is shared with other registries)
+        equipment = {}
+        for _, equip_data in catalog.directory(f"{RULES_DIR}/equipment"):
+            if not isinstance(equip_data, dict):
+                continue
+            # Equipment files have different structures
+            # Check for weapon categories (simple_melee_weapons, martial_melee_weapons, etc.)
+            weapon_keys = [k for k in equip_data.keys() if 'weapon' in k.lower()]
+            for key in weapon_keys:
+                items = equip_data.get(key, [])
+                if isinstance(items, list):
+                    for weapon in items:
+                        if isinstance(weapon, dict) and "id" in weapon:
+                            equipment[weapon["id"]] = dict(weapon, item_type="weapon")
+
+            # Check for armor categories
+            armor_keys = [k for k in equip_data.keys() if 'armor' in k.lower()]
+            for key in armor_keys:
+                items = equip_data.get(key, [])
+                if isinstance(items, list):
+                    for armor in items:
+                        if isinstance(armor, dict) and "id" in armor:
+                            equipment[armor["id"]] = dict(armor, item_type="armor")
+
+            # Check for generic items/gear
+            if "items" in equip_data:
+                for item in equip_data["items"]:
+                    if isinstance(item, dict) and "id" in item:
+                        equipment[item["id"]] = item
+            if "gear" in equip_data:
+                for item in equip_data["gear"]:
+                    if isinstance(item, dict) and "id" in item:
+                        equipment[item["id"]] = dict(item, item_type="gear")
+
+        self._equipment = equipment
+        print(f"Loaded {len(self._equipment)} equipment items")
 
     # ==================== Species ====================
 
@@ -371,6 +340,10 @@ class RulesLoader:
         return [15, 14, 13, 12, 10, 8]
 
 
+# Re-index when the rules data is hot-reloaded
+on_catalog_reload(RulesLoader.reset)
+
+
 # Convenience function to get the singleton
 def get_rules_loader() -> RulesLoader:
     """Get the RulesLoader singleton instance."""
@@ -13,6 +13,9 @@ import os
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Tests never write the rules bundle unless they point it somewhere themselves
+os.environ["RULES_BUNDLE_PATH"] = ""
+
 
 # ==================== Event Loop Fixture ====================
 
@@ -194,6 +197,29 @@ def combat_engine(combat_state):
     return CombatEngine(combat_state=combat_state)
 
 
+@pytest.fixture
+def start_combat_engine():
+    """
+    Factory for a seeded CombatEngine that has already started combat.
+
+    Players and enemies are (id, name, hp, ac) tuples; grid_size makes a
+    square grid of that size instead of the default one.
+    """
+    from app.core.combat_engine import CombatEngine
+
+    def _start(players, enemies, positions, seed: int = 0, grid_size: int = None):
+        engine = CombatEngine(dice_seed=seed)
+        grid = {"grid_width": grid_size, "grid_height": grid_size} if grid_size else {}
+        engine.start_combat(
+            [{"id": cid, "name": name, "hp": hp, "ac": ac} for cid, name, hp, ac in players],
+            [{"id": cid, "name": name, "hp": hp, "ac": ac} for cid, name, hp, ac in enemies],
+            positions=positions,
+            **grid,
+        )
+        return engine
+    return _start
+
+
 @pytest.fixture
 def active_combat(combat_engine, party, enemy_group):
     """Create an active combat with participants."""
@@ -388,6 +414,23 @@ def generate_combatants():
     return _generate
 
 
+# ==================== Database Fixtures ====================
+
+@pytest.fixture
+async def combat_repo():
+    """CombatStateRepository on a throwaway in-memory database."""
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlmodel import SQLModel
+    from app.database.repositories import CombatStateRepository
+
+    db_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with db_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        yield CombatStateRepository(session)
+    await db_engine.dispose()
+
+
 # ==================== Cleanup Fixtures ====================
 
 @pytest.fixture(autouse=True)
@@ -0,0 +1,264 @@
+"""Tests for AI DM streaming and request coalescing against a local fake LLM server."""
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import anthropic
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+
+from app.api.routes import dm as dm_routes
+from app.services.ai_dm import AIDMService
+from app.services.ai_dm_stream import SingleFlight
+
+
+FAKE_CHUNKS = ["The goblin ", "staggers back, ", "clutching its wound."]
+
+
+class FakeLLMServer:
+    """Minimal Messages API that streams a fixed reply, served on localhost."""
+
+    def __init__(self):
+        self.requests = 0
+        self.fail = False
+        self.app = FastAPI()
+        self.app.post("/v1/messages")(self._messages)
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._sock.getsockname()[1]}"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, log_level="error"))
+
+    async def _messages(self, request: Request):
+        self.requests += 1
+        if self.fail:
+            return JSONResponse(
+                {"type": "error", "error": {"type": "api_error", "message": "boom"}},
+                status_code=500,
+            )
+
+        async def events():
+            def event(name, data):
+                return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+            yield event("message_start", {"type": "message_start", "message": {
+                "id": "msg_fake", "type": "message", "role": "assistant", "model": "fake",
+                "content": [], "stop_reason": None, "stop_sequence": None,
+                "usage": {"input_tokens": 12, "output_tokens": 0},
+            }})
+            yield event("content_block_start", {
+                "type": "content_block_start", "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            })
+            for chunk in FAKE_CHUNKS:
+                # Slow enough that concurrent callers overlap
+                await asyncio.sleep(0.05)
+                yield event("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": chunk},
+                })
+            yield event("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield event("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": 9},
+            })
+            yield event("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._sock]}, daemon=True
+        )
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+@pytest.fixture(scope="module")
+def fake_llm():
+    with FakeLLMServer() as server:
+        yield server
+
+
+@pytest.fixture
+async def ai_dm(fake_llm):
+    fake_llm.requests = 0
+    fake_llm.fail = False
+    service = AIDMService()
+    client = anthropic.AsyncAnthropic(api_key="test-key", base_url=fake_llm.url, max_retries=0)
+    service._client = client
+    yield service
+    await client.close()
+
+
+COMBAT_CONTEXT = {"action_type": "attack", "hit": True, "current_hp": 3, "damage_type": "slashing"}
+
+
+class TestStreaming:
+    """Tests for token streaming from the async client."""
+
+    async def test_stream_yields_chunks_in_order(self, ai_dm):
+        """Chunks should arrive separately, in generation order."""
+        chunks = [c async for c in ai_dm._stream_claude("Narrate", scenario_type="combat",
+                                                         cache_context=COMBAT_CONTEXT)]
+        assert chunks == FAKE_CHUNKS
+
+    async def test_streamed_response_is_cached(self, ai_dm, fake_llm):
+        """A completed stream should be served from cache afterwards."""
+        [c async for c in ai_dm._stream_claude("Narrate", scenario_type="combat",
+                                                cache_context=COMBAT_CONTEXT)]
+        result = await ai_dm._call_claude("Narrate", scenario_type="combat", cache_context=COMBAT_CONTEXT)
+
+        assert result == "".join(FAKE_CHUNKS)
+        assert fake_llm.requests == 1
+
+    async def test_usage_recorded_from_final_message(self, ai_dm):
+        """Rate limiter should record the token usage the API reported."""
+        await ai_dm._call_claude("Narrate")
+        assert ai_dm.get_usage_stats()["tokens_used_total"] == 12 + 9
+
+    async def test_upstream_failure_returns_none(self, ai_dm, fake_llm):
+        """A failed generation should return None so callers fall back."""
+        fake_llm.fail = True
+        assert await ai_dm._call_claude("Narrate", scenario_type="combat", cache_context=COMBAT_CONTEXT) is None
+
+        narration = await ai_dm.generate_combat_narration(
+            {"action_type": "attack", "hit": True}, {"name": "Thorin"}, {"name": "Goblin", "current_hp": 3}
+        )
+        assert narration
+
+
+class TestSingleFlight:
+    """Tests for coalescing identical in-flight requests."""
+
+    async def test_identical_requests_share_one_call(self, ai_dm, fake_llm):
+        """Concurrent requests with the same cache key hit the API once."""
+        results = await asyncio.gather(*[
+            ai_dm._call_claude("Narrate", scenario_type="combat", cache_context=COMBAT_CONTEXT)
+            for _ in range(5)
+        ])
+
+        assert fake_llm.requests == 1
+        assert results == ["".join(FAKE_CHUNKS)] * 5
+        assert ai_dm.get_cache_stats()["coalesced_requests"] == 4
+
+    async def test_late_follower_replays_stream(self, ai_dm, fake_llm):
+        """A stream joining mid-generation still receives every chunk."""
+        first = ai_dm._stream_claude("Narrate", scenario_type="combat", cache_context=COMBAT_CONTEXT)
+        first_chunk = await first.__anext__()
+
+        late = [c async for c in ai_dm._stream_claude("Narrate", scenario_type="combat",
+                                                       cache_context=COMBAT_CONTEXT)]
+        rest = [c async for c in first]
+
+        assert [first_chunk] + rest == FAKE_CHUNKS
+        assert late == FAKE_CHUNKS
+        assert fake_llm.requests == 1
+
+    async def test_different_keys_are_not_coalesced(self, ai_dm, fake_llm):
+        """Requests with different cache keys each make their own call."""
+        other = {**COMBAT_CONTEXT, "hit": False}
+        await asyncio.gather(
+            ai_dm._call_claude("Narrate", scenario_type="combat", cache_context=COMBAT_CONTEXT),
+            ai_dm._call_claude("Narrate", scenario_type="combat", cache_context=other),
+        )
+        assert fake_llm.requests == 2
+
+    async def test_abandoned_stream_does_not_cancel_others(self, ai_dm, fake_llm):
+        """Closing one follower leaves the shared generation running."""
+        first = ai_dm._stream_claude("Narrate", scenario_type="combat", cache_context=COMBAT_CONTEXT)
+        await first.__anext__()
+        waiting = asyncio.create_task(
+            ai_dm._call_claude("Narrate", scenario_type="combat", cache_context=COMBAT_CONTEXT)
+        )
+        await asyncio.sleep(0)
+        await first.aclose()
+
+        assert await waiting == "".join(FAKE_CHUNKS)
+        assert fake_llm.requests == 1
+
+    async def test_cancelled_generation_releases_followers(self):
+        """Followers of a cancelled producer stop instead of hanging."""
+        started = asyncio.Event()
+
+        async def produce(flight):
+            await flight.publish("partial")
+            started.set()
+            await asyncio.Event().wait()
+
+        flights = SingleFlight()
+        flight = flights.start("key", produce)
+        await started.wait()
+        flight._task.cancel()
+
+        assert await asyncio.wait_for(flight.result(), timeout=1) is None
+        assert flights.get("key") is None
+
+
+class TestStreamEndpoint:
+    """Tests for the /dm/stream SSE endpoint."""
+
+    @pytest.fixture
+    def client(self, ai_dm, monkeypatch):
+        monkeypatch.setattr(dm_routes, "get_ai_dm", lambda: ai_dm)
+        app = FastAPI()
+        app.include_router(dm_routes.router, prefix="/api/dm")
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    @staticmethod
+    def parse_events(body: str):
+        events = []
+        for block in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    async def test_streams_chunks_then_done(self, client):
+        """The endpoint should emit a chunk event per token batch, then done."""
+        async with client:
+            response = await client.post("/api/dm/stream", json={
+                "context_type": "combat",
+                "context_data": {
+                    "action_result": {"action_type": "attack", "hit": True},
+                    "combatant": {"name": "Thorin"},
+                    "target": {"name": "Goblin", "current_hp": 3},
+                },
+            })
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = self.parse_events(response.text)
+        assert [data["text"] for name, data in events if name == "chunk"] == FAKE_CHUNKS
+        assert events[-1] == ("done", {
+            "generated": True, "context_type": "combat", "content": "".join(FAKE_CHUNKS),
+        })
+
+    async def test_fallback_streamed_when_ai_disabled(self, client, ai_dm):
+        """Without a client the fallback template is streamed as one chunk."""
+        ai_dm._client = None
+        async with client:
+            response = await client.post("/api/dm/stream", json={
+                "context_type": "scene", "context_data": {"encounter": {"type": "combat"}},
+            })
+
+        events = self.parse_events(response.text)
+        assert [name for name, _ in events] == ["chunk", "done"]
+        assert events[-1][1]["content"] == events[0][1]["text"]
+
+    async def test_unknown_context_type_rejected(self, client):
+        """Unknown context types should be a 400 before streaming starts."""
+        async with client:
+            response = await client.post("/api/dm/stream", json={"context_type": "poem"})
+        assert response.status_code == 400
@@ -0,0 +1,136 @@
+"""Tests for rasterized area of effect templates."""
+import pytest
+
+from app.core.aoe_templates import (
+    get_template_cache_stats,
+    template_cells,
+    template_mask,
+)
+from app.core.monster_abilities import AbilityType, AreaShape, MonsterAbility
+from app.core.spell_system import SpellEffectResolver
+from app.core.surfaces import SurfaceManager, create_surface_from_spell
+from app.models.spells import Spell, SpellComponents
+
+
+class TestTemplateMasks:
+    """Tests for the shapes themselves."""
+
+    def test_sphere(self):
+        mask = template_mask("sphere", 10)
+
+        assert (0, 0) in mask
+        assert (2, 0) in mask
+        assert (1, 1) in mask
+        assert (2, 1) not in mask
+        assert len(mask) == 13
+
+    def test_cone_widens_with_distance(self):
+        mask = template_mask(AreaShape.CONE, 15, (1, 0))
+
+        assert (0, 0) not in mask
+        assert (1, 0) in mask
+        assert {(2, -1), (2, 0), (2, 1)} <= mask
+        assert (1, 1) not in mask
+        assert all(dx > 0 for dx, _ in mask)
+
+    def test_line(self):
+        assert template_mask("line", 30, (1, 0)) == {(i, 0) for i in range(1, 7)}
+        assert template_mask("line", 15, (0, -1), width_ft=10) >= {(0, -1), (0, -3)}
+
+    def test_diagonal_line(self):
+        mask = template_mask("line", 15, (1, 1))
+
+        assert {(1, 1), (2, 2)} <= mask
+        assert (1, 0) not in mask
+
+    def test_cube(self):
+        assert template_mask("cube", 10) == {(-1, -1), (0, -1), (-1, 0), (0, 0)}
+        assert template_mask("cube", 10, (1, 0)) == {(1, -1), (2, -1), (1, 0), (2, 0)}
+
+    def test_aim_without_direction_is_empty(self):
+        assert template_mask("cone", 30) == frozenset()
+
+    def test_parallel_aims_share_a_mask(self):
+        template_mask("cone", 60, (2, 0))
+        before = get_template_cache_stats()["hits"]
+        template_mask("cone", 60, (5, 0))
+
+        assert get_template_cache_stats()["hits"] == before + 1
+
+    def test_cells_are_translated(self):
+        assert set(template_cells("line", 10, (5, 5), toward=(5, 9))) == {(5, 6), (5, 7)}
+
+
+@pytest.fixture
+def engine(start_combat_engine):
+    return start_combat_engine(
+        [("p1", "Thorin", 40, 16), ("p2", "Elara", 20, 12), ("p3", "Brom", 30, 14)],
+        [("dragon", "Young Dragon", 120, 18)],
+        {"dragon": (5, 5), "p1": (8, 5), "p2": (7, 4), "p3": (3, 5)},
+        seed=11,
+        grid_size=12,
+    )
+
+
+def _ability(shape, size):
+    return MonsterAbility(
+        id="breath", name="Breath", original_description="",
+        ability_type=AbilityType.BREATH_WEAPON, area_shape=shape, area_size=size,
+    )
+
+
+class TestAbilityArea:
+    """Monster abilities pick targets from their template."""
+
+    def test_cone_only_catches_targets_in_front(self, engine):
+        targets = engine._get_targets_in_ability_area("dragon", _ability(AreaShape.CONE, 30), "p1")
+
+        assert targets == ["p1", "p2"]
+
+    def test_line_follows_the_aim(self, engine):
+        targets = engine._get_targets_in_ability_area("dragon", _ability(AreaShape.LINE, 60), "p1")
+
+        assert targets == ["p1"]
+
+    def test_unaimed_cone_picks_the_fullest_heading(self, engine):
+        targets = engine._get_targets_in_ability_area("dragon", _ability(AreaShape.CONE, 30), None)
+
+        assert targets == ["p1", "p2"]
+
+    def test_sphere_is_centred_on_the_monster(self, engine):
+        targets = engine._get_targets_in_ability_area("dragon", _ability(AreaShape.SPHERE, 10), None)
+
+        assert targets == ["p3"]
+
+
+class TestSpellAreas:
+    """Spells and surfaces use the same templates."""
+
+    def test_area_spell_drops_targets_outside_template(self):
+        spell = Spell(
+            id="fireball", name="Fireball", level=3, school="evocation",
+            casting_time="1 action", range="150 feet", components=SpellComponents(),
+            duration="Instantaneous", description="", target_type="sphere",
+            damage_dice="8d6", save_type="dexterity", area_size=20,
+        )
+        targets = [
+            {"id": "near", "position": (2, 2)},
+            {"id": "far", "position": (9, 9)},
+            {"id": "unplaced"},
+        ]
+
+        result = SpellEffectResolver.resolve_area_spell(spell, 15, targets, origin=(0, 0))
+
+        assert set(result["targets"]) == {"near", "unplaced"}
+
+    def test_surface_follows_cone(self):
+        manager = SurfaceManager()
+        result = create_surface_from_spell("burning_hands", 0, 0, manager, toward=(3, 0))
+
+        assert result["shape"] == "cone"
+        assert result["cells_affected"] == len(template_mask("cone", 15, (1, 0)))
+
+    def test_surface_sphere_matches_radius(self):
+        result = create_surface_from_spell("fireball", 5, 5, SurfaceManager())
+
+        assert result["cells_affected"] == len(template_mask("sphere", 20))
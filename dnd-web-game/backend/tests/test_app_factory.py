@@ -0,0 +1,92 @@
+"""Tests for the app factory, startup preloading and the startup profile."""
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.core.startup_profile import StartupProfile
+from app.main import create_app
+
+
+def _paths(app):
+    return set(app.openapi()["paths"])
+
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestCreateApp:
+    """Only the selected routers are mounted."""
+
+    def test_minimal_app(self):
+        app = create_app(routers=["spells"], preload=[])
+
+        assert "/api/spells/" in _paths(app)
+        assert not any(path.startswith("/api/combat") for path in _paths(app))
+        assert "/health" in _paths(app)
+
+    def test_unknown_names_are_rejected(self):
+        with pytest.raises(ValueError, match="routers"):
+            create_app(routers=["spellz"])
+        with pytest.raises(ValueError, match="preload"):
+            create_app(routers=[], preload=["everything"])
+
+    def test_heavy_dependencies_are_not_imported(self):
+        code = "import sys, app.main; print(sorted({'anthropic', 'pdfplumber'} & set(sys.modules)))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+class TestAdminStartup:
+    """The startup profile is served to admins."""
+
+    @pytest.fixture
+    def settings(self, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+        monkeypatch.setattr(settings, "DEBUG", False)
+        return settings
+
+    async def test_requires_token_or_debug(self, settings, monkeypatch):
+        app = create_app(routers=["admin"], preload=[])
+        async with _client(app) as client:
+            assert (await client.get("/api/admin/startup")).status_code == 404
+
+            monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+            assert (await client.get("/api/admin/startup")).status_code == 403
+            response = await client.get("/api/admin/startup", headers={"X-Admin-Token": "s3cret"})
+            assert response.status_code == 200
+
+    async def test_reports_imports_and_preloads(self, settings, monkeypatch):
+        monkeypatch.setattr(settings, "DEBUG", True)
+        app = create_app(routers=["spells", "admin"], preload=["spells"])
+
+        async with app.router.lifespan_context(app):
+            async with _client(app) as client:
+                profile = (await client.get("/api/admin/startup")).json()
+
+        assert "app.api.routes.spells" in [step["name"] for step in profile["steps"]["import"]]
+        assert "spells" in [step["name"] for step in profile["steps"]["preload"]]
+        assert profile["ready_ms"] is not None
+
+
+class TestStartupProfile:
+    """Timed steps are grouped by kind, slowest first."""
+
+    def test_snapshot(self):
+        profile = StartupProfile()
+        profile.record("import", "fast", 0.001)
+        profile.record("import", "slow", 0.5)
+        with pytest.raises(RuntimeError):
+            with profile.timed("preload", "broken"):
+                raise RuntimeError("boom")
+
+        snapshot = profile.snapshot()
+
+        assert [s["name"] for s in snapshot["steps"]["import"]] == ["slow", "fast"]
+        assert snapshot["total_ms"]["import"] == 501.0
+        assert snapshot["steps"]["preload"][0]["error"] == "RuntimeError: boom"
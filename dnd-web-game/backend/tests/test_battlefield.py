@@ -0,0 +1,151 @@
+"""Tests for the AI battlefield snapshot."""
+import dataclasses
+
+import pytest
+
+from app.core.ai import (
+    BattlefieldSnapshot,
+    CombatCoordinator,
+    TargetEvaluator,
+    get_ai_for_combatant,
+    get_battlefield_snapshot,
+)
+from app.core.ai.execution import TurnOutcome, move_toward
+from app.core.combat_engine import TurnState
+from app.core.movement import CombatGrid
+
+
+@pytest.fixture
+def engine(start_combat_engine):
+    engine = start_combat_engine(
+        players=[("p1", "Thorin", 40, 16), ("p2", "Elara", 20, 12)],
+        enemies=[("e1", "Goblin", 7, 13), ("e2", "Goblin", 7, 13)],
+        positions={"p1": (1, 1), "p2": (2, 1), "e1": (5, 4), "e2": (9, 9)},
+        seed=3,
+    )
+    for enemy_id in ("e1", "e2"):
+        engine.state.combatant_stats[enemy_id]["ai_behavior"] = {"role": "melee_brute"}
+    return engine
+
+
+class TestSnapshot:
+    """Tests for building and reading a snapshot."""
+
+    def test_partitions_by_side(self, engine):
+        snapshot = get_battlefield_snapshot(engine)
+
+        assert {v.id for v in snapshot.enemies_of("e1")} == {"p1", "p2"}
+        assert [v.id for v in snapshot.allies_of("e1")] == ["e2"]
+        assert [v.id for v in snapshot.allies_of("p1")] == ["p2"]
+
+    def test_distance_matrices(self, engine):
+        snapshot = get_battlefield_snapshot(engine)
+
+        assert snapshot.distance("p1", "e1") == 7
+        assert snapshot.chebyshev_distance("p1", "e1") == 4
+        assert snapshot.distance("e1", "p1") == snapshot.distance("p1", "e1")
+        assert snapshot.distance("p1", "p1") == 0
+
+    def test_unpositioned_combatant(self, engine):
+        del engine.state.positions["e2"]
+        snapshot = get_battlefield_snapshot(engine)
+
+        assert snapshot.position("e2") is None
+        assert snapshot.distance("e1", "e2") is None
+        assert [v.id for v in snapshot.allies_of("e1", positioned=True)] == []
+
+    def test_nearby_allies_and_hp_ratio(self, engine):
+        engine.state.combatant_stats["p2"]["current_hp"] = 5
+        snapshot = get_battlefield_snapshot(engine)
+
+        assert snapshot.nearby_allies["p1"] == 1
+        assert snapshot.nearby_allies["e1"] == 0
+        assert snapshot.get("p2").hp_ratio == 0.25
+
+    def test_is_immutable(self, engine):
+        snapshot = get_battlefield_snapshot(engine)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.round_number = 5
+        with pytest.raises(TypeError):
+            snapshot.combatants["x"] = None
+
+
+class TestSnapshotReuse:
+    """One snapshot is shared until the battlefield changes."""
+
+    def test_reused_while_unchanged(self, engine):
+        assert get_battlefield_snapshot(engine) is get_battlefield_snapshot(engine)
+
+    def test_rebuilt_after_direct_move(self, engine):
+        before = get_battlefield_snapshot(engine)
+        engine.state.positions["e1"] = (2, 2)
+        after = get_battlefield_snapshot(engine)
+
+        assert after is not before
+        assert after.distance("p1", "e1") == 2
+
+    def test_rebuilt_after_damage(self, engine):
+        before = get_battlefield_snapshot(engine)
+        engine.state.combatant_stats["p1"]["current_hp"] = 10
+
+        assert get_battlefield_snapshot(engine) is not before
+
+    def test_ai_components_share_snapshot(self, engine):
+        ai = get_ai_for_combatant(engine, "e1")
+        coordinator = CombatCoordinator(engine)
+
+        assert ai.battlefield is coordinator.battlefield
+        assert ai.target_evaluator.battlefield is ai.battlefield
+        assert coordinator.get_target_evaluator("e2").battlefield is ai.battlefield
+
+
+class TestConsumers:
+    """AI components read positions and partitions from the snapshot."""
+
+    def test_behavior_enemies_and_distance(self, engine):
+        ai = get_ai_for_combatant(engine, "e1")
+
+        assert set(ai.get_enemies()) == {"p1", "p2"}
+        assert ai.get_allies() == ["e2"]
+        assert ai.get_distance_to("p2") == 6
+
+    def test_reach_ignores_stale_grid_occupants(self, engine):
+        grid = CombatGrid(width=10, height=10)
+        for y in range(10):
+            grid.set_occupant(3, y, "gone")
+        engine.state.grid = grid
+        ai = get_ai_for_combatant(engine, "e1")
+
+        assert ai.can_reach_with_movement("p1", 30)
+
+    def test_movement_agrees_with_reach(self, engine):
+        grid = CombatGrid(width=10, height=10)
+        for y in range(10):
+            grid.set_occupant(3, y, "gone")
+        engine.state.grid = grid
+        engine.state.current_turn = TurnState(combatant_id="e1")
+        outcome = TurnOutcome()
+
+        assert move_toward(engine, grid, "e1", (1, 1), 1, outcome)
+
+        x, y = outcome.new_position
+        assert max(abs(x - 1), abs(y - 1)) == 1
+        assert outcome.movement_path[-1] == (x, y)
+
+    def test_isolated_target_scoring(self, engine):
+        evaluator = TargetEvaluator(engine, "e1")
+        engine.state.positions["p2"] = (8, 8)
+
+        scores = {s.target_id: s for s in evaluator.evaluate_all_targets(["p1", "p2"])}
+
+        assert "Isolated target" in scores["p1"].reasons
+        assert "Isolated target" in scores["p2"].reasons
+
+    def test_pinned_evaluator_ignores_later_changes(self, engine):
+        snapshot = BattlefieldSnapshot.capture(engine)
+        evaluator = TargetEvaluator(engine, "e1", snapshot)
+        engine.state.positions["e1"] = (1, 2)
+
+        score = evaluator.evaluate_target("p1")
+        assert "Adjacent (melee range)" not in score.reasons
@@ -0,0 +1,196 @@
+"""Tests for the shared LRU/TTL cache layer and the AI DM response cache."""
+import time
+
+import pytest
+
+from app.core.cache import CacheService, LRUCache, SQLiteCacheStore
+from app.services.ai_dm_cache import AIDMCache
+
+
+class TestLRUCache:
+    """Tests for the in-memory LRU tier."""
+
+    def test_get_refreshes_recency(self):
+        """Reading a key should protect it from the next eviction."""
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_byte_bound_evicts_oldest(self):
+        """Entries beyond the byte budget are evicted least recent first."""
+        cache = LRUCache(max_size=100, max_bytes=10)
+        cache.set("a", "xxxx")
+        cache.set("b", "yyyy")
+        cache.set("c", "zzzz")
+
+        assert cache.bytes == 8
+        assert "a" not in cache
+        assert cache.get("c") == "zzzz"
+
+    def test_overwrite_adjusts_bytes(self):
+        """Replacing a value should not double count its size."""
+        cache = LRUCache(max_bytes=100)
+        cache.set("a", "xxxx")
+        cache.set("a", "xx")
+        assert cache.bytes == 2
+
+    def test_expired_entry_is_a_miss(self):
+        """Entries past their TTL are dropped on read."""
+        cache = LRUCache()
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_namespace_metrics(self):
+        """Hits and misses are tracked per key prefix."""
+        cache = LRUCache()
+        cache.set("combat:1", "x")
+        cache.get("combat:1")
+        cache.get("combat:2")
+        cache.get("scene:1")
+
+        stats = cache.get_stats()["by_namespace"]
+        assert stats["combat"] == {"hits": 1, "misses": 1, "hit_rate": 50.0}
+        assert stats["scene"]["misses"] == 1
+
+    def test_delete_prefix(self):
+        """Prefix deletion removes only matching keys."""
+        cache = LRUCache()
+        cache.set("reachable:c1:a", 1)
+        cache.set("reachable:c1:b", 2)
+        cache.set("reachable:c2:a", 3)
+        assert cache.delete_prefix("reachable:c1:") == 2
+        assert cache.keys() == ["reachable:c2:a"]
+
+
+class TestSQLiteTier:
+    """Tests for the persistent tier."""
+
+    def test_survives_new_instance(self, tmp_path):
+        """A fresh cache on the same file serves earlier entries."""
+        path = str(tmp_path / "cache.db")
+        LRUCache(store=SQLiteCacheStore(path)).set("combat:1", "The blade bites deep.")
+
+        restarted = LRUCache(store=SQLiteCacheStore(path))
+        assert restarted.get("combat:1") == "The blade bites deep."
+        assert restarted.disk_hits == 1
+        # Promoted into memory: the next read does not touch disk
+        restarted.get("combat:1")
+        assert restarted.disk_hits == 1
+
+    def test_evicted_entries_remain_on_disk(self, tmp_path):
+        """Memory eviction does not remove the persistent copy."""
+        cache = LRUCache(max_size=1, store=SQLiteCacheStore(str(tmp_path / "cache.db")))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        assert cache.disk_hits == 1
+
+    def test_expired_rows_not_served(self, tmp_path):
+        """Rows past their expiry are ignored and pruned."""
+        store = SQLiteCacheStore(str(tmp_path / "cache.db"))
+        store.set("a", 1, created_at=time.time() - 20, expires_at=time.time() - 10)
+        assert store.get("a") is None
+        assert store.prune_expired() == 1
+        assert store.count() == 0
+
+    def test_clear_and_delete_reach_disk(self, tmp_path):
+        """Deletes and clears apply to both tiers."""
+        store = SQLiteCacheStore(str(tmp_path / "cache.db"))
+        cache = LRUCache(store=store)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        assert store.get("a") is None
+        cache.clear()
+        assert store.count() == 0
+
+
+class TestCacheService:
+    """Tests for the async cache service on the shared layer."""
+
+    async def test_invalidate_pattern(self):
+        """Wildcard invalidation removes matching keys."""
+        cache = CacheService(max_size=10)
+        await cache.set("spell:fireball", {"level": 3})
+        await cache.set("spell:shield", {"level": 1})
+        await cache.set("session:1", {})
+
+        assert await cache.invalidate("spell:*") == 2
+        assert await cache.exists("session:1")
+        assert not await cache.exists("spell:shield")
+
+    async def test_max_size_keeps_recent(self):
+        """The service evicts least recently used entries."""
+        cache = CacheService(max_size=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert cache.get_stats()["entries"] == 2
+
+    async def test_stats(self):
+        """Stats keep their existing fields."""
+        cache = CacheService()
+        await cache.set("a", 1)
+        await cache.get("a")
+        await cache.get("b")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == "50.0%"
+        cache.reset_stats()
+        assert cache.hits == 0
+
+
+class TestAIDMCache:
+    """Tests for the AI DM response cache."""
+
+    COMBAT = {"action_type": "attack", "hit": True, "current_hp": 0, "damage_type": "fire"}
+
+    def test_similar_contexts_share_entry(self):
+        """Contexts that normalize the same share a cached response."""
+        cache = AIDMCache()
+        cache.set("combat", self.COMBAT, "Flames engulf the orc.")
+        assert cache.get("combat", {**self.COMBAT, "current_hp": -3}) == "Flames engulf the orc."
+
+    def test_scenario_metrics(self):
+        """Stats break hit rates down by scenario type."""
+        cache = AIDMCache()
+        cache.set("combat", self.COMBAT, "Flames engulf the orc.")
+        cache.get("combat", self.COMBAT)
+        cache.get("skill_check", {"skill": "stealth"})
+
+        stats = cache.get_stats()
+        assert stats["by_scenario_type"] == {"combat": 1}
+        assert stats["scenario_metrics"]["combat"]["hit_rate"] == 100.0
+        assert stats["scenario_metrics"]["skill_check"]["misses"] == 1
+        assert stats["total_response_hits"] == 1
+
+    def test_persistent_tier(self, tmp_path):
+        """Narration cached by one process is served after a restart."""
+        path = str(tmp_path / "ai_dm.db")
+        AIDMCache(db_path=path).set("combat", self.COMBAT, "Flames engulf the orc.")
+
+        restarted = AIDMCache(db_path=path)
+        assert restarted.get("combat", self.COMBAT) == "Flames engulf the orc."
+        assert restarted.get_stats()["disk_hits"] == 1
+
+    def test_cached_scenarios_listing(self):
+        """Debug listing reports scenario type and preview."""
+        cache = AIDMCache()
+        cache.set("combat", self.COMBAT, "x" * 150)
+        (entry,) = cache.get_cached_scenarios()
+        assert entry["scenario_type"] == "combat"
+        assert entry["response_preview"].endswith("...")
@@ -319,6 +319,8 @@ class TestOtherActions:
         assert result.success is True
         assert "dash" in result.description.lower()
         assert "additional_movement" in result.extra_data
+        turn = self.engine.state.current_turn
+        assert turn.can_move(2 * result.extra_data["additional_movement"], result.extra_data["additional_movement"])
 
     def test_disengage_action(self):
         """Disengage should apply condition."""
@@ -586,6 +588,33 @@ class TestSerialization:
         assert restored.state.initiative_tracker.current_round == original_round
         assert restored.state.id == original_id
 
+    def test_round_trip_preserves_dice_stream(self):
+        """A restored engine should keep rolling the same dice."""
+        engine = CombatEngine(dice_seed=1234)
+        engine.start_combat(
+            [{"id": "player-1", "name": "Player", "hp": 20}],
+            [{"id": "enemy-1", "name": "Enemy", "hp": 10}],
+        )
+
+        restored = CombatEngine.from_dict(engine.to_dict())
+
+        assert restored.state.dice.seed == 1234
+        assert restored.state.dice.roll_d20().total == engine.state.dice.roll_d20().total
+
+    def test_same_seed_same_initiative(self):
+        """Combats started with the same dice seed roll the same initiative."""
+        def start(seed):
+            engine = CombatEngine(dice_seed=seed)
+            return [
+                (r["combatant_id"], r["total"])
+                for r in engine.start_combat(
+                    [{"id": "p1", "name": "Player", "hp": 20, "dex_mod": 1}],
+                    [{"id": f"e{i}", "name": "Goblin", "hp": 7, "dex_mod": 2} for i in range(4)],
+                )
+            ]
+
+        assert start(5) == start(5)
+
 
 class TestEventLogging:
     """Test combat event logging."""
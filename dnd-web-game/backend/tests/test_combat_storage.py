@@ -0,0 +1,501 @@
+"""Tests for combat session storage and persistence."""
+import asyncio
+
+import pytest
+
+from app.core.combat_engine import CombatEngine, CombatStateDelta, ActionType, EVENT_LOG_CAPACITY
+from app.core.combat_storage import (
+    CombatWriteBehindBuffer,
+    InMemoryCombatSessionStore,
+    SQLiteCombatSessionStore,
+    active_combats,
+    active_grids,
+    create_combat_state,
+    create_combat_store,
+    get_combat_store,
+    persist_combat_state,
+    recover_combat_engine,
+    set_combat_store,
+    set_write_behind_buffer,
+    with_combat_session,
+)
+from app.core.errors import CombatBusyError, CombatLockLostError
+from app.core.movement import CombatGrid, TerrainType
+from app.core.reactions import ReactionsManager
+
+
+def _started_engine() -> CombatEngine:
+    engine = CombatEngine()
+    engine.start_combat(
+        [{"id": "player-1", "name": "Player", "hp": 20}],
+        [{"id": "enemy-1", "name": "Enemy", "hp": 10}],
+        positions={"player-1": (1, 1), "enemy-1": (5, 5)},
+    )
+    return engine
+
+
+@pytest.fixture
+def restore_store():
+    """Put the original store back after a test swaps it."""
+    original = get_combat_store()
+    yield
+    set_combat_store(original)
+
+
+class TestStoreSelection:
+    """Test building stores from configuration URLs."""
+
+    def test_memory_url(self):
+        assert isinstance(create_combat_store("memory://"), InMemoryCombatSessionStore)
+
+    def test_sqlite_url(self, tmp_path):
+        store = create_combat_store(f"sqlite:///{tmp_path / 'combats.db'}")
+        assert isinstance(store, SQLiteCombatSessionStore)
+        store.close()
+
+    def test_unknown_url_rejected(self):
+        with pytest.raises(ValueError):
+            create_combat_store("redis://localhost")
+
+
+class TestSessionViews:
+    """Test the dict-compatible module-level views."""
+
+    def test_views_behave_like_dicts(self, restore_store):
+        set_combat_store(InMemoryCombatSessionStore())
+        engine = _started_engine()
+
+        active_combats["combat-1"] = engine
+
+        assert "combat-1" in active_combats
+        assert active_combats.get("combat-1") is engine
+        assert active_combats.get("missing") is None
+        assert list(active_combats.items()) == [("combat-1", engine)]
+
+        del active_combats["combat-1"]
+        assert "combat-1" not in active_combats
+        with pytest.raises(KeyError):
+            del active_combats["combat-1"]
+
+
+class TestSharedStore:
+    """Test sharing combats between worker processes via SQLite."""
+
+    def test_second_worker_rehydrates_combat(self, tmp_path):
+        path = str(tmp_path / "combats.db")
+        worker_a = SQLiteCombatSessionStore(path)
+        worker_b = SQLiteCombatSessionStore(path)
+
+        engine = _started_engine()
+        grid = CombatGrid(width=6, height=6)
+        grid.set_terrain(2, 2, TerrainType.IMPASSABLE)
+        reactions = ReactionsManager()
+        reactions.register_combatant("player-1")
+        reactions.use_reaction("player-1")
+
+        worker_a.save("combat-1", "engine", engine)
+        worker_a.save("combat-1", "grid", grid)
+        worker_a.save("combat-1", "reactions", reactions)
+
+        restored = worker_b.load("combat-1", "engine")
+        assert restored is not engine
+        assert restored.state.id == engine.state.id
+        assert restored.state.positions == {"player-1": (1, 1), "enemy-1": (5, 5)}
+        assert worker_b.load("combat-1", "grid").get_cell(2, 2).terrain == TerrainType.IMPASSABLE
+        assert not worker_b.load("combat-1", "reactions").has_reaction_available("player-1")
+
+        worker_a.close()
+        worker_b.close()
+
+    def test_flush_publishes_in_place_mutations(self, tmp_path):
+        path = str(tmp_path / "combats.db")
+        worker_a = SQLiteCombatSessionStore(path)
+        worker_b = SQLiteCombatSessionStore(path)
+
+        worker_a.save("combat-1", "engine", _started_engine())
+        cached_b = worker_b.load("combat-1", "engine")
+
+        engine_a = worker_a.load("combat-1", "engine")
+        engine_a.take_action(ActionType.DODGE)
+        worker_a.flush("combat-1")
+
+        reloaded_b = worker_b.load("combat-1", "engine")
+        assert reloaded_b is not cached_b
+        assert reloaded_b.state.current_turn.action_taken is True
+
+        # Unchanged version is served from the local cache
+        assert worker_b.load("combat-1", "engine") is reloaded_b
+
+        worker_a.close()
+        worker_b.close()
+
+    def test_remove_is_visible_to_other_workers(self, tmp_path):
+        path = str(tmp_path / "combats.db")
+        worker_a = SQLiteCombatSessionStore(path)
+        worker_b = SQLiteCombatSessionStore(path)
+
+        worker_a.save("combat-1", "engine", _started_engine())
+        assert worker_b.combat_ids("engine") == ["combat-1"]
+
+        assert worker_a.remove("combat-1", "engine") is True
+        assert worker_b.load("combat-1", "engine") is None
+
+        worker_a.close()
+        worker_b.close()
+
+    async def test_lock_excludes_other_workers(self, tmp_path):
+        path = str(tmp_path / "combats.db")
+        worker_a = SQLiteCombatSessionStore(path)
+        worker_b = SQLiteCombatSessionStore(path, lock_timeout_seconds=0.05)
+
+        async with worker_a.lock("combat-1"):
+            with pytest.raises(CombatBusyError):
+                async with worker_b.lock("combat-1"):
+                    pass
+
+        # Released locks can be taken again
+        async with worker_b.lock("combat-1"):
+            pass
+
+        worker_a.close()
+        worker_b.close()
+
+    async def test_lease_is_renewed_while_held(self, tmp_path):
+        path = str(tmp_path / "combats.db")
+        worker_a = SQLiteCombatSessionStore(path, lock_lease_seconds=0.06)
+        worker_b = SQLiteCombatSessionStore(path, lock_timeout_seconds=0.05)
+
+        async with worker_a.lock("combat-1"):
+            # Held for several lease lengths without expiring
+            await asyncio.sleep(0.2)
+            with pytest.raises(CombatBusyError):
+                async with worker_b.lock("combat-1"):
+                    pass
+
+        worker_a.close()
+        worker_b.close()
+
+    async def test_flush_refuses_a_lost_lease(self, tmp_path):
+        path = str(tmp_path / "combats.db")
+        worker_a = SQLiteCombatSessionStore(path)
+        worker_b = SQLiteCombatSessionStore(path)
+        worker_a.save("combat-1", "engine", _started_engine())
+
+        async with worker_a.lock("combat-1"):
+            # Another worker took the combat over after the lease expired
+            worker_a._execute("UPDATE combat_session_locks SET owner = 'other'")
+            with pytest.raises(CombatLockLostError):
+                worker_a.flush("combat-1")
+
+        version = worker_b._execute("SELECT version FROM combat_sessions").fetchone()[0]
+        assert version == 1
+        worker_a.close()
+        worker_b.close()
+
+
+class TestWithCombatSession:
+    """Test the route decorator."""
+
+    async def test_requests_for_one_combat_are_serialized(self, restore_store):
+        set_combat_store(InMemoryCombatSessionStore())
+        order = []
+
+        @with_combat_session
+        async def handler(combat_id: str, label: str):
+            order.append(f"{label}-start")
+            await asyncio.sleep(0.01)
+            order.append(f"{label}-end")
+
+        await asyncio.gather(
+            handler(combat_id="combat-1", label="a"),
+            handler(combat_id="combat-1", label="b"),
+        )
+
+        assert order == ["a-start", "a-end", "b-start", "b-end"]
+
+    async def test_flushes_after_handler(self, tmp_path, restore_store):
+        path = str(tmp_path / "combats.db")
+        worker_a = SQLiteCombatSessionStore(path)
+        worker_b = SQLiteCombatSessionStore(path)
+        set_combat_store(worker_a)
+        active_combats["combat-1"] = _started_engine()
+
+        @with_combat_session
+        async def handler(combat_id: str):
+            active_combats[combat_id].take_action(ActionType.DODGE)
+
+        await handler(combat_id="combat-1")
+
+        assert worker_b.load("combat-1", "engine").state.current_turn.action_taken is True
+
+        worker_a.close()
+        worker_b.close()
+
+
+class _RecordingRepo:
+    """Stand-in CombatStateRepository that records applied deltas."""
+
+    def __init__(self):
+        self.deltas = []
+
+    async def apply_delta(self, combat_id, delta):
+        self.deltas.append((combat_id, delta))
+        return True
+
+
+@pytest.fixture
+def no_write_behind():
+    """Make sure writes go straight to the repository."""
+    set_write_behind_buffer(None)
+    yield
+    set_write_behind_buffer(None)
+
+
+class TestStateDelta:
+    """Test dirty tracking on the combat state."""
+
+    def test_first_delta_is_full_write(self):
+        engine = _started_engine()
+
+        delta = engine.collect_state_delta()
+
+        assert delta.phase == "COMBAT_ACTIVE"
+        assert delta.positions == {"player-1": {"x": 1, "y": 1}, "enemy-1": {"x": 5, "y": 5}}
+        assert set(delta.combatant_stats) == {"player-1", "enemy-1"}
+
+    def test_no_changes_after_persisting(self):
+        engine = _started_engine()
+        engine.state.mark_persisted(engine.collect_state_delta())
+
+        assert engine.collect_state_delta().is_empty()
+
+    def test_move_only_writes_positions_and_turn(self):
+        engine = _started_engine()
+        engine.state.mark_persisted(engine.collect_state_delta())
+        mover = engine.get_current_combatant().id
+        x, y = engine.state.positions[mover]
+
+        engine.move_combatant(mover, x, y + 1)
+        delta = engine.collect_state_delta()
+
+        assert delta.positions[mover] == {"x": x, "y": y + 1}
+        assert delta.current_turn_changed
+        assert not delta.has_stats_changes
+        assert delta.phase is None
+
+    def test_only_changed_combatant_stats_are_written(self):
+        engine = _started_engine()
+        engine.state.mark_persisted(engine.collect_state_delta())
+
+        engine.state.combatant_stats["enemy-1"]["current_hp"] = 3
+        delta = engine.collect_state_delta()
+
+        assert list(delta.combatant_stats) == ["enemy-1"]
+
+    def test_any_stat_key_write_is_persisted(self):
+        engine = _started_engine()
+        engine.state.mark_persisted(engine.collect_state_delta())
+
+        engine.state.combatant_stats["enemy-1"]["actions"] = [{"name": "Scimitar"}]
+        delta = engine.collect_state_delta()
+        engine.state.mark_persisted(delta)
+
+        assert delta.combatant_stats["enemy-1"]["actions"] == [{"name": "Scimitar"}]
+
+        engine.state.combatant_stats["enemy-1"]["actions"].append({"name": "Shortbow"})
+        engine.state.mark_stats_dirty("enemy-1")
+        assert list(engine.collect_state_delta().combatant_stats) == ["enemy-1"]
+
+    def test_damage_marks_target_and_initiative_order(self):
+        engine = _started_engine()
+        engine.state.mark_persisted(engine.collect_state_delta())
+
+        engine._apply_damage_to_target("enemy-1", 2, "slashing")
+        delta = engine.collect_state_delta()
+
+        assert list(delta.combatant_stats) == ["enemy-1"]
+        assert delta.initiative_order is not None
+        assert delta.positions is None
+
+    def test_end_turn_marks_turn_fields(self):
+        engine = _started_engine()
+        engine.state.mark_persisted(engine.collect_state_delta())
+
+        engine.end_turn()
+        delta = engine.collect_state_delta()
+
+        assert delta.current_turn_index is not None
+        assert delta.current_turn_changed
+        assert delta.positions is None
+        assert not delta.has_stats_changes
+
+    def test_removed_combatants_are_reported(self):
+        engine = _started_engine()
+        engine.state.mark_persisted(engine.collect_state_delta())
+
+        del engine.state.combatant_stats["enemy-1"]
+        delta = engine.collect_state_delta()
+        engine.state.mark_persisted(delta)
+
+        assert delta.removed_combatants == ["enemy-1"]
+        assert engine.collect_state_delta().is_empty()
+
+    def test_merge_keeps_newest_values(self):
+        older = CombatStateDelta(round_number=1, combatant_stats={"a": {"hp": 5}}, sections={"round", "stats:a"})
+        newer = CombatStateDelta(
+            round_number=2, combatant_stats={"b": {"hp": 3}}, removed_combatants=["a"],
+            sections={"round", "stats:b", "stats:a"},
+        )
+
+        merged = older.merge(newer)
+
+        assert merged.round_number == 2
+        assert merged.combatant_stats == {"b": {"hp": 3}}
+        assert merged.removed_combatants == ["a"]
+
+
+class TestPersistCombatState:
+    """Test delta persistence and write-behind."""
+
+    async def test_writes_only_changes(self, no_write_behind):
+        engine = _started_engine()
+        repo = _RecordingRepo()
+
+        assert await persist_combat_state("combat-1", engine, repo)
+        assert await persist_combat_state("combat-1", engine, repo)
+
+        # Second call had nothing to write
+        assert len(repo.deltas) == 1
+
+    async def test_write_behind_coalesces_until_end_of_turn(self):
+        buffer = CombatWriteBehindBuffer(flush_interval=60)
+        set_write_behind_buffer(buffer)
+        try:
+            engine = _started_engine()
+            repo = _RecordingRepo()
+            mover = engine.get_current_combatant().id
+            x, y = engine.state.positions[mover]
+
+            await persist_combat_state("combat-1", engine, repo)
+            engine.move_combatant(mover, x, y + 1)
+            await persist_combat_state("combat-1", engine, repo)
+            assert repo.deltas == []
+            assert buffer.has_pending("combat-1")
+
+            await persist_combat_state("combat-1", engine, repo, end_of_turn=True)
+
+            assert len(repo.deltas) == 1
+            assert repo.deltas[0][1].positions[mover] == {"x": x, "y": y + 1}
+            assert not buffer.has_pending("combat-1")
+        finally:
+            set_write_behind_buffer(None)
+
+    async def test_failed_flush_is_requeued(self):
+        buffer = CombatWriteBehindBuffer(flush_interval=60)
+
+        class FailingRepo:
+            async def apply_delta(self, combat_id, delta):
+                raise RuntimeError("database down")
+
+        buffer.add("combat-1", CombatStateDelta(round_number=3, sections={"round"}))
+        with pytest.raises(RuntimeError):
+            await buffer.flush_combat("combat-1", FailingRepo())
+
+        assert buffer.has_pending("combat-1")
+
+
+class TestEventJournal:
+    """Test the bounded event log, journal and crash recovery."""
+
+    def test_event_log_is_bounded(self):
+        engine = _started_engine()
+        for i in range(EVENT_LOG_CAPACITY + 50):
+            engine.state.add_event("note", f"event {i}")
+
+        assert len(engine.state.event_log) == EVENT_LOG_CAPACITY
+        assert engine.state.event_log[-1].sequence == engine.state.event_sequence
+        assert engine.get_combat_state()["event_count"] == engine.state.event_sequence
+
+    def test_unjournaled_events(self):
+        engine = _started_engine()
+        engine.state.mark_journaled(engine.state.event_sequence)
+
+        engine.state.add_event("note", "new")
+
+        assert [e.description for e in engine.state.get_unjournaled_events()] == ["new"]
+        engine.state.mark_journaled(engine.state.event_sequence)
+        assert engine.state.get_unjournaled_events() == []
+
+    async def test_events_are_journaled_in_batches(self, combat_repo, no_write_behind):
+        engine = _started_engine()
+        await create_combat_state("combat-1", None, [], combat_repo)
+
+        await persist_combat_state("combat-1", engine, combat_repo)
+        logs = await combat_repo.get_log_repository().get_after_sequence("combat-1", 0)
+
+        assert [log.sequence for log in logs] == list(range(1, engine.state.event_sequence + 1))
+        assert (await persist_combat_state("combat-1", engine, combat_repo)) is True
+        assert len(await combat_repo.get_log_repository().get_after_sequence("combat-1", 0)) == len(logs)
+
+    async def test_event_data_is_made_json_safe(self, combat_repo, no_write_behind):
+        engine = _started_engine()
+        await create_combat_state("combat-1", None, [], combat_repo)
+        engine.state.add_event("attack", "roll", data={"roll": object(), "targets": ("a", "b")})
+
+        await persist_combat_state("combat-1", engine, combat_repo)
+        logs = await combat_repo.get_log_repository().get_after_sequence("combat-1", 0)
+
+        assert logs[-1].data["targets"] == ["a", "b"]
+        assert isinstance(logs[-1].data["roll"], str)
+
+    async def test_recovery_replays_journal_after_snapshot(self, combat_repo, no_write_behind):
+        engine = _started_engine()
+        await create_combat_state("combat-1", None, [], combat_repo)
+        await persist_combat_state("combat-1", engine, combat_repo)
+
+        mover = engine.get_current_combatant().id
+        x, y = engine.state.positions[mover]
+        engine.move_combatant(mover, x, y + 1)
+        engine.state.combatant_stats["enemy-1"]["current_hp"] = 4
+        await persist_combat_state("combat-1", engine, combat_repo)
+
+        recovered = await recover_combat_engine("combat-1", combat_repo)
+
+        assert recovered.state.positions[mover] == (x, y + 1)
+        assert recovered.state.combatant_stats["enemy-1"]["current_hp"] == 4
+        assert recovered.state.event_sequence == engine.state.event_sequence
+        assert recovered.state.event_log[-1].event_type == "move"
+        assert recovered.collect_state_delta().is_empty()
+
+    async def test_recovery_restores_initiative_tracker(self, combat_repo, no_write_behind):
+        engine = _started_engine()
+        await create_combat_state("combat-1", None, [], combat_repo)
+        await persist_combat_state("combat-1", engine, combat_repo)
+
+        enemy = engine.state.initiative_tracker.get_combatant("enemy-1")
+        enemy.current_hp = 0
+        enemy.is_active = False
+        engine.state.combatant_stats["enemy-1"]["current_hp"] = 0
+        await persist_combat_state("combat-1", engine, combat_repo)
+
+        recovered = await recover_combat_engine("combat-1", combat_repo)
+        restored = recovered.state.initiative_tracker.get_combatant("enemy-1")
+
+        assert restored.current_hp == 0
+        assert restored.is_active is False
+        assert recovered.collect_state_delta().is_empty()
+
+    async def test_decorator_restores_missing_combat(self, combat_repo, restore_store, no_write_behind):
+        engine = _started_engine()
+        await create_combat_state("combat-1", None, [], combat_repo)
+        await persist_combat_state("combat-1", engine, combat_repo)
+        set_combat_store(InMemoryCombatSessionStore())
+
+        @with_combat_session
+        async def handler(combat_id: str, combat_repo):
+            return active_combats.get(combat_id)
+
+        restored = await handler(combat_id="combat-1", combat_repo=combat_repo)
+
+        assert restored.state.id == engine.state.id
+        assert "combat-1" in active_grids
@@ -0,0 +1,132 @@
+"""Tests for standing coordination plans."""
+import json
+
+import pytest
+
+from app.core.ai import (
+    AIDecision,
+    CombatCoordinator,
+    CoordinationStrategy,
+    coordinate_decision,
+    coordinate_enemies,
+    get_coordinator,
+)
+from app.core.combat_engine import CombatEngine
+
+
+@pytest.fixture
+def engine(start_combat_engine):
+    return start_combat_engine(
+        [("p1", "Thorin", 40, 16), ("p2", "Elara", 20, 12), ("p3", "Brom", 30, 14)],
+        [("e1", "Orc", 15, 13), ("e2", "Orc", 15, 13)],
+        {"p1": (3, 3), "p2": (4, 6), "p3": (2, 7), "e1": (6, 3), "e2": (7, 5)},
+        seed=5,
+        grid_size=20,
+    )
+
+
+ENEMIES = ["e1", "e2"]
+PLAYERS = ["p1", "p2", "p3"]
+
+
+def _primary(plan):
+    return plan.assignments[0].target_id
+
+
+class TestPlanReuse:
+    """Plans persist across turns until the fight changes."""
+
+    def test_reused_while_unchanged(self, engine):
+        coordinator = get_coordinator(engine)
+        first = coordinator.coordinate(ENEMIES, PLAYERS)
+        second = coordinator.coordinate(ENEMIES, PLAYERS)
+
+        assert first.strategy == CoordinationStrategy.FOCUS_FIRE
+        assert second is first
+        assert coordinator.plan_stats == {"built": 1, "reused": 1, "repaired": 0}
+
+    def test_convenience_function_shares_the_coordinator(self, engine):
+        plan = coordinate_enemies(engine, ENEMIES, PLAYERS)
+
+        assert coordinate_enemies(engine, ENEMIES, PLAYERS) is plan
+        assert engine.state.coordinator is get_coordinator(engine)
+
+    def test_flanks_follow_a_target_that_steps(self, engine):
+        coordinator = get_coordinator(engine)
+        plan = coordinator.coordinate(ENEMIES, PLAYERS)
+        target = _primary(plan)
+        x, y = engine.state.positions[target]
+
+        engine.state.positions[target] = (x, y + 1)
+        repaired = coordinator.coordinate(ENEMIES, PLAYERS)
+
+        assert repaired is plan
+        assert coordinator.plan_stats["repaired"] == 1
+        assert plan.flank_positions
+        for pos in plan.flank_positions.values():
+            assert abs(pos[0] - x) + abs(pos[1] - (y + 1)) == 1
+
+    def test_rebuilt_when_target_drops(self, engine):
+        coordinator = get_coordinator(engine)
+        plan = coordinator.coordinate(ENEMIES, PLAYERS)
+        engine.state.initiative_tracker.get_combatant(_primary(plan)).is_active = False
+
+        assert coordinator.coordinate(ENEMIES, PLAYERS) is not plan
+        assert coordinator.plan_stats["built"] == 2
+
+    def test_rebuilt_when_target_leaves_reach(self, engine):
+        coordinator = get_coordinator(engine)
+        plan = coordinator.coordinate(ENEMIES, PLAYERS)
+        engine.state.positions[_primary(plan)] = (19, 19)
+
+        assert coordinator.coordinate(ENEMIES, PLAYERS) is not plan
+
+
+class TestEvaluatorReuse:
+    """Target evaluators persist and follow the current snapshot."""
+
+    def test_evaluators_are_rebound(self, engine):
+        coordinator = get_coordinator(engine)
+        evaluator = coordinator.get_target_evaluator("e1")
+
+        engine.state.positions["p2"] = (5, 6)
+        coordinator.refresh()
+
+        assert coordinator.get_target_evaluator("e1") is evaluator
+        assert evaluator.battlefield is coordinator.battlefield
+        assert evaluator.battlefield.position("p2") == (5, 6)
+
+
+class TestPlanPersistence:
+    """The standing plan is saved with the engine."""
+
+    def test_plan_survives_engine_round_trip(self, engine):
+        plan = coordinate_enemies(engine, ENEMIES, PLAYERS)
+
+        restored = CombatEngine.from_dict(json.loads(json.dumps(engine.to_dict())))
+        assert isinstance(restored.state.coordinator, CombatCoordinator)
+        assert restored.state.coordinator.engine is restored
+        coordinator = get_coordinator(restored)
+        assert coordinator is restored.state.coordinator
+        again = coordinator.coordinate(ENEMIES, PLAYERS)
+
+        assert coordinator.plan_stats["built"] == 0
+        assert again.to_dict() == plan.to_dict()
+
+
+class TestCoordinatedDecisions:
+    """Greedy enemy attacks follow the coordination plan."""
+
+    def test_attack_is_retargeted(self, engine):
+        plan = coordinate_enemies(engine, ENEMIES, PLAYERS)
+        assigned = next(a.target_id for a in plan.assignments if a.enemy_id == "e1")
+        other = next(pid for pid in PLAYERS if pid != assigned)
+
+        decision = coordinate_decision(engine, "e1", AIDecision(action_type="attack", target_id=other))
+
+        assert decision.target_id == assigned
+
+    def test_players_are_not_coordinated(self, engine):
+        decision = AIDecision(action_type="attack", target_id="e2")
+
+        assert coordinate_decision(engine, "p1", decision) is decision
@@ -1,6 +1,10 @@
 """Tests for the dice rolling system."""
+import random
+import timeit
+
 import pytest
 from app.core.dice import (
+    dice_rng,
     roll_die,
     roll_d20,
     roll_damage,
@@ -8,6 +12,8 @@ from app.core.dice import (
     roll_initiative,
     D20Result,
     DamageResult,
+    DiceRoller,
+    compile_dice_notation,
 )
 
 
@@ -33,6 +39,17 @@ class TestRollDie:
         with pytest.raises(ValueError):
             roll_die(-1)
 
+    def test_context_rng(self):
+        """Rolls inside dice_rng() replay by seed and leave the global RNG alone."""
+        state = random.getstate()
+        with dice_rng(random.Random(3)):
+            first = [roll_damage("2d6+1").total for _ in range(5)]
+        with dice_rng(random.Random(3)):
+            second = [roll_damage("2d6+1").total for _ in range(5)]
+
+        assert first == second
+        assert random.getstate() == state
+
 
 class TestD20Roll:
     """Tests for d20 rolls with advantage/disadvantage."""
@@ -139,6 +156,54 @@ class TestDiceNotation:
             parse_dice_notation("abc")
 
 
+class TestCompiledNotation:
+    """Tests for compiled, cached dice expressions."""
+
+    def test_same_notation_is_interned(self):
+        """Compiling the same notation twice returns the same object."""
+        assert compile_dice_notation("2d6+3") is compile_dice_notation("2d6+3")
+
+    def test_statistics(self):
+        """Min/max/mean/variance are precomputed from the components."""
+        expression = compile_dice_notation("2d6+3")
+        assert expression.minimum == 5
+        assert expression.maximum == 15
+        assert expression.mean == 10.0
+        assert expression.variance == pytest.approx(2 * 35 / 12)
+        assert expression.dice_count == 2
+
+    def test_negative_dice_statistics(self):
+        """Subtracted dice lower the minimum by their size."""
+        expression = compile_dice_notation("1d8-1d4")
+        assert expression.minimum == 1 - 4
+        assert expression.maximum == 8 - 1
+
+    def test_critical_doubles_dice_not_modifier(self):
+        """The critical form doubles dice but keeps flat modifiers."""
+        critical = compile_dice_notation("1d8+2").critical
+        assert critical.components == ((2, 8, 2),)
+        assert critical.mean == 11.0
+
+    def test_multiplier(self):
+        """Treasure notation like '3d6x100' scales the total."""
+        expression = compile_dice_notation("3d6x100")
+        assert expression.minimum == 300
+        assert expression.maximum == 1800
+        for _ in range(20):
+            assert 300 <= expression.roll() <= 1800
+
+    def test_parse_rejects_multiplier(self):
+        """Damage parsing still rejects treasure multipliers."""
+        with pytest.raises(ValueError):
+            parse_dice_notation("3d6x100")
+
+    def test_flat_number(self):
+        """A plain number compiles to a constant."""
+        expression = compile_dice_notation("5")
+        assert expression.minimum == expression.maximum == 5
+        assert expression.roll() == 5
+
+
 class TestDamageRoll:
     """Tests for damage rolling."""
 
@@ -197,3 +262,83 @@ class TestInitiative:
         """Initiative can have negative modifier."""
         result = roll_initiative(dexterity_modifier=-2)
         assert -1 <= result <= 18  # d20 (1-20) - 2
+
+
+class TestDiceRoller:
+    """Tests for the seedable batched dice stream."""
+
+    def test_same_seed_same_rolls(self):
+        """Two rollers with the same seed should roll identically."""
+        a, b = DiceRoller(seed=7), DiceRoller(seed=7)
+        assert list(a.roll_d20_batch([0, 1, 2]).totals) == list(b.roll_d20_batch([0, 1, 2]).totals)
+        assert list(a.roll_damage_batch(["2d6", "1d8+2"])) == list(b.roll_damage_batch(["2d6", "1d8+2"]))
+
+    def test_d20_batch_ranges(self):
+        """Every row should be a d20 plus its modifier."""
+        batch = DiceRoller(seed=1).roll_d20_batch([0, 5, -2] * 20)
+        assert len(batch) == 60
+        for natural, total, modifier in zip(batch.naturals, batch.totals, batch.modifiers):
+            assert 1 <= natural <= 20
+            assert total == natural + modifier
+
+    def test_d20_batch_advantage_rows(self):
+        """Advantage rows take the higher of two dice, disadvantage the lower."""
+        batch = DiceRoller(seed=3).roll_d20_batch(
+            [0, 0, 0, 0],
+            advantage=[True, False, True, False],
+            disadvantage=[False, True, True, False],
+        )
+        assert batch.naturals[0] == max(batch.rolls[0])
+        assert batch.naturals[1] == min(batch.rolls[1])
+        # Advantage and disadvantage cancel out
+        assert len(batch.rolls[2]) == 1
+        assert len(batch.rolls[3]) == 1
+
+    def test_batch_result_matches_row(self):
+        """result(i) should expose a row as a D20Result."""
+        batch = DiceRoller(seed=5).roll_d20_batch([3, 4])
+        result = batch.result(1)
+        assert isinstance(result, D20Result)
+        assert result.total == batch.totals[1]
+        assert result.modifier == 4
+
+    def test_damage_batch_ranges(self):
+        """Damage rows should stay within their dice ranges."""
+        roller = DiceRoller(seed=11)
+        for _ in range(50):
+            fire, slash = roller.roll_damage_batch(["8d6", "1d8+3"])
+            assert 8 <= fire <= 48
+            assert 4 <= slash <= 11
+
+    def test_damage_batch_critical_doubles_dice(self):
+        """Critical rows roll twice the dice."""
+        roller = DiceRoller(seed=13)
+        for _ in range(50):
+            (total,) = roller.roll_damage_batch(["1d6"], critical=True)
+            assert 2 <= total <= 12
+
+    def test_resume_from_dict(self):
+        """A restored roller should continue the same stream."""
+        roller = DiceRoller(seed=99)
+        roller.roll_d20_batch([0])
+        restored = DiceRoller.from_dict(roller.to_dict())
+        assert list(restored.roll_d20_batch([0, 0]).totals) == list(roller.roll_d20_batch([0, 0]).totals)
+
+    def test_single_roll_advances_the_stream(self):
+        """roll_d20 and roll_d20_batch draw from the same sequence."""
+        single, batched = DiceRoller(seed=21), DiceRoller(seed=21)
+        rolls = [single.roll_d20(2).total for _ in range(4)]
+        assert rolls == list(batched.roll_d20_batch([2] * 4).totals)
+        assert single.to_dict() == {"seed": 21, "draws": 4}
+
+    def test_batch_is_faster_than_a_loop(self):
+        """Rolling a batch should beat rolling its rows one by one."""
+        roller = DiceRoller(seed=17)
+        modifiers = [3] * 8
+        batch = min(timeit.repeat(lambda: roller.roll_d20_batch(modifiers), number=500, repeat=5))
+        loop = min(timeit.repeat(lambda: [roller.roll_d20(3) for _ in modifiers], number=500, repeat=5))
+        assert batch < loop
+
+    def test_from_dict_without_data(self):
+        """Missing data should produce a fresh roller."""
+        assert isinstance(DiceRoller.from_dict(None), DiceRoller)
@@ -0,0 +1,156 @@
+"""Tests for off-event-loop enemy turns and the streamed end-turn endpoint."""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.api.routes import combat as combat_routes
+from app.core.combat_engine import CombatEngine
+from app.core.combat_storage import (
+    active_combats,
+    active_grids,
+    create_combat_state,
+    get_combat_store,
+    reactions_managers,
+    set_write_behind_buffer,
+)
+from app.core.initiative import CombatantType
+from app.core.movement import CombatGrid
+from app.core.reactions import ReactionsManager
+
+
+COMBAT_ID = "enemy-turn-combat"
+
+
+@pytest.fixture
+async def player_turn_combat(combat_repo):
+    """A registered combat paused on the player's turn, with two enemies after it."""
+    set_write_behind_buffer(None)
+    engine = CombatEngine(dice_seed=7)
+    engine.start_combat(
+        [{"id": "p1", "name": "Thorin", "hp": 40, "ac": 16, "dex_mod": 0}],
+        [
+            {"id": "e1", "name": "Goblin", "hp": 7, "ac": 13, "dex_mod": 2},
+            {"id": "e2", "name": "Goblin", "hp": 7, "ac": 13, "dex_mod": 2},
+        ],
+        positions={"p1": (1, 1), "e1": (6, 6), "e2": (6, 5)},
+    )
+    while engine.get_current_combatant().combatant_type != CombatantType.PLAYER:
+        engine.end_turn()
+
+    grid = CombatGrid(width=8, height=8)
+    for combatant_id, (x, y) in engine.state.positions.items():
+        grid.set_occupant(x, y, combatant_id)
+
+    await create_combat_state(COMBAT_ID, None, [], combat_repo)
+    active_combats[COMBAT_ID] = engine
+    active_grids[COMBAT_ID] = grid
+    reactions_managers[COMBAT_ID] = ReactionsManager()
+    yield engine
+    for view in (active_combats, active_grids, reactions_managers):
+        view.pop(COMBAT_ID, None)
+
+
+@pytest.fixture
+def round_session(combat_repo, monkeypatch):
+    """Give streamed rounds the test database instead of opening their own."""
+    @asynccontextmanager
+    async def session_context():
+        yield combat_repo.session
+
+    monkeypatch.setattr(combat_routes, "get_session_context", session_context)
+
+
+async def read_events(response):
+    body = "".join([chunk async for chunk in response.body_iterator])
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestEnemyTurnExecutor:
+    """Enemy AI runs on the executor, not the event loop."""
+
+    async def test_end_turn_runs_enemy_turns(self, player_turn_combat, combat_repo):
+        response = await combat_routes.end_turn(combat_id=COMBAT_ID, combat_repo=combat_repo)
+
+        assert {a.enemy_id for a in response.enemy_actions} == {"e1", "e2"}
+        assert response.next_combatant["id"] == "p1"
+
+    async def test_event_loop_stays_responsive(self, player_turn_combat, combat_repo, monkeypatch):
+        """A slow enemy turn must not stop other coroutines from running."""
+        def slow_turn(engine, grid, enemy):
+            time.sleep(0.1)
+            return combat_routes.EnemyAction(
+                enemy_id=enemy.id, enemy_name=enemy.name, action_type="none", description="waits"
+            )
+
+        monkeypatch.setattr(combat_routes, "resolve_enemy_turn", slow_turn)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        await combat_routes.end_turn(combat_id=COMBAT_ID, combat_repo=combat_repo)
+        ticking.cancel()
+
+        assert ticks >= 10
+
+
+class TestStreamedEndTurn:
+    """Tests for /{combat_id}/end-turn/stream."""
+
+    async def test_streams_each_action_then_result(self, player_turn_combat, round_session):
+        response = await combat_routes.end_turn_stream(combat_id=COMBAT_ID)
+        events = await read_events(response)
+
+        names = [name for name, _ in events]
+        assert names == ["enemy_action", "enemy_action", "turn_ended"]
+        final = events[-1][1]
+        assert [a["enemy_id"] for a in final["enemy_actions"]] == [data["enemy_id"] for _, data in events[:-1]]
+        assert final["next_combatant"]["id"] == "p1"
+
+    async def test_unknown_combat_streams_error(self, round_session):
+        response = await combat_routes.end_turn_stream(combat_id="missing")
+        events = await read_events(response)
+
+        assert events == [("error", {"status_code": 404, "detail": "Combat not found"})]
+
+    async def test_round_finishes_without_a_reader(self, player_turn_combat, combat_repo, round_session):
+        """The round completes and releases the lock even if nobody reads the stream."""
+        await combat_routes.end_turn_stream(combat_id=COMBAT_ID)
+        await asyncio.gather(*combat_routes._running_rounds)
+
+        assert player_turn_combat.get_current_combatant().id == "p1"
+        # Lock is free again: a normal end turn goes through
+        response = await combat_routes.end_turn(combat_id=COMBAT_ID, combat_repo=combat_repo)
+        assert response.success
+
+    async def test_round_persists_through_its_own_session(self, player_turn_combat, combat_repo, round_session):
+        await combat_routes.end_turn_stream(combat_id=COMBAT_ID)
+        await asyncio.gather(*combat_routes._running_rounds)
+
+        row = await combat_repo.get_by_id(COMBAT_ID)
+        tracker = player_turn_combat.state.initiative_tracker
+        assert row.current_turn_index == tracker.current_turn_index
+        assert row.round_number == tracker.current_round
+
+
+class TestReadRoutesLock:
+    """Read routes wait for a round that holds the combat lock."""
+
+    async def test_state_waits_for_lock(self, player_turn_combat):
+        async with get_combat_store().lock(COMBAT_ID):
+            read = asyncio.create_task(combat_routes.get_combat_state(combat_id=COMBAT_ID))
+            await asyncio.sleep(0.01)
+            assert not read.done()
+
+        assert (await read) is not None
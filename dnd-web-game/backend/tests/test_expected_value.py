@@ -0,0 +1,133 @@
+"""Tests for the AI expected-value engine."""
+from dataclasses import replace
+
+import pytest
+
+from app.core.ai import (
+    AttackProfile,
+    DefenseProfile,
+    evaluate_attacks,
+    evaluate_save,
+    evaluate_targets,
+)
+from app.core.ai.expected_value import (
+    damage_distribution,
+    expected_attack_damage,
+    get_ev_cache_stats,
+    hit_probability,
+    save_fail_probability,
+)
+
+
+CLUB = AttackProfile("Greatclub", attack_bonus=6, damage_dice="2d8+4", damage_type="bludgeoning")
+
+
+class TestProbabilities:
+    """Tests for roll probabilities."""
+
+    def test_hit_probability(self):
+        assert hit_probability(5, 15) == pytest.approx(0.55)
+        assert hit_probability(0, 30) == pytest.approx(0.05)  # Natural 20
+        assert hit_probability(20, 5) == pytest.approx(0.95)  # Natural 1
+        assert hit_probability(5, 15, advantage=True) == pytest.approx(1 - 0.45 ** 2)
+        assert hit_probability(5, 15, advantage=True, disadvantage=True) == pytest.approx(0.55)
+
+    def test_expanded_crit_range_always_hits(self):
+        assert hit_probability(0, 30, crit_range=19) == pytest.approx(0.10)
+
+    def test_save_fail_probability(self):
+        assert save_fail_probability(15, 2) == pytest.approx(0.6)
+        assert save_fail_probability(30, 0) == 1.0  # No natural-20 success on saves
+        assert save_fail_probability(15, 2, advantage=True) == pytest.approx(0.36)
+
+    def test_damage_distribution(self):
+        pmf = dict(damage_distribution("2d6"))
+
+        assert sum(pmf.values()) == pytest.approx(1.0)
+        assert pmf[7] == pytest.approx(6 / 36)
+        assert min(pmf) == 2 and max(pmf) == 12
+        assert max(dict(damage_distribution("2d6", critical=True))) == 24
+
+    def test_expected_damage_counts_crits(self):
+        # 0.45 non-crit hits for 7, 0.05 crits for 14
+        assert expected_attack_damage(5, "2d6", 16) == pytest.approx(0.45 * 7 + 0.05 * 14)
+
+
+class TestEvaluateAttacks:
+    """Tests for attack outcomes against a defense profile."""
+
+    def test_kill_chance(self):
+        # Any hit kills a 4 HP target
+        outcome = evaluate_attacks([CLUB], DefenseProfile(ac=12, hp=4))
+
+        assert outcome.hit_chance == pytest.approx(0.75)
+        assert outcome.kill_chance == pytest.approx(0.75)
+        assert outcome.kill_chance_on_hit == pytest.approx(1.0)
+
+    def test_multiattack_raises_kill_chance(self):
+        target = DefenseProfile(ac=12, hp=4)
+
+        assert evaluate_attacks([CLUB, CLUB], target).kill_chance == pytest.approx(1 - 0.25 ** 2)
+
+    def test_prone_target_gives_melee_advantage(self):
+        prone = DefenseProfile(ac=12, hp=30, conditions=frozenset({"prone"}))
+
+        assert evaluate_attacks([CLUB], prone).hit_chance == pytest.approx(1 - 0.25 ** 2)
+        # Ranged attacks from afar have disadvantage instead
+        bow = replace(CLUB, ranged=True)
+        assert evaluate_attacks([bow], prone, distance_ft=30).hit_chance == pytest.approx(0.75 ** 2)
+
+    def test_resistance_and_immunity(self):
+        plain = evaluate_attacks([CLUB], DefenseProfile(ac=12, hp=30))
+        resistant = evaluate_attacks([CLUB], DefenseProfile(
+            ac=12, hp=30, resistances=frozenset({"bludgeoning"}),
+        ))
+        immune = evaluate_attacks([CLUB], DefenseProfile(
+            ac=12, hp=30, immunities=frozenset({"bludgeoning"}),
+        ))
+
+        assert resistant.expected_damage == pytest.approx(plain.expected_damage / 2, rel=0.05)
+        assert immune.expected_damage == 0
+
+    def test_defense_from_stats(self):
+        defense = DefenseProfile.from_stats({
+            "ac": 15, "current_hp": 9, "resistances": ["Fire"], "dex_mod": 3,
+        })
+
+        assert (defense.ac, defense.hp) == (15, 9)
+        assert defense.damage_multiplier("fire") == 0.5
+        assert defense.save_bonus("dex") == 3
+
+    def test_champion_crit_range(self):
+        attack = AttackProfile.from_stats({
+            "class": "Fighter", "subclass_id": "champion", "level": 3,
+            "attack_bonus": 5, "damage_dice": "1d8+3",
+        })
+
+        assert attack.crit_range == 19
+
+    def test_identical_targets_share_one_evaluation(self):
+        goblin = DefenseProfile(ac=15, hp=7)
+        before = get_ev_cache_stats()["attacks"]["misses"]
+
+        outcomes = evaluate_targets([CLUB], {"g1": goblin, "g2": goblin, "g3": goblin})
+
+        assert outcomes["g1"] is outcomes["g2"] is outcomes["g3"]
+        assert get_ev_cache_stats()["attacks"]["misses"] - before <= 1
+
+
+class TestEvaluateSave:
+    """Tests for saving-throw effects."""
+
+    def test_save_for_half(self):
+        target = DefenseProfile(ac=10, hp=100, saves=(("dexterity", 2),))
+        outcome = evaluate_save(15, "dex", "8d6", target, "fire")
+
+        assert outcome.fail_chance == pytest.approx(0.6)
+        assert outcome.expected_damage == pytest.approx(0.6 * 28 + 0.4 * 13.78, rel=0.01)
+        assert outcome.kill_chance == 0
+
+    def test_stunned_auto_fails_dex(self):
+        target = DefenseProfile(ac=10, hp=10, conditions=frozenset({"stunned"}), saves=(("dexterity", 10),))
+
+        assert evaluate_save(10, "dexterity", "1d6", target).fail_chance == 1.0
@@ -254,6 +254,22 @@ class TestInitiativeTracker:
             next_c = tracker.combatants[i + 1]
             assert current.initiative_roll >= next_c.initiative_roll
 
+    def test_roll_all_initiative_seeded(self):
+        """The same dice seed should produce the same initiative order."""
+        from app.core.dice import DiceRoller
+
+        def roll(seed):
+            tracker = InitiativeTracker()
+            for name, dex in (("Thorin", 2), ("Goblin", -1), ("Wolf", 2)):
+                tracker.add_combatant(
+                    name=name,
+                    combatant_type=CombatantType.ENEMY,
+                    dexterity_modifier=dex,
+                )
+            return [(r.combatant_name, r.total) for r in tracker.roll_all_initiative(DiceRoller(seed=seed))]
+
+        assert roll(42) == roll(42)
+
     def test_initiative_results_have_data(self):
         """Initiative results should contain roll data."""
         tracker = InitiativeTracker()
@@ -0,0 +1,104 @@
+"""Tests for the indexed monster catalog."""
+from app.core.campaign_engine import CampaignEngine
+from app.core.monster_abilities import AbilityType
+from app.core.monster_catalog import (
+    MonsterCatalog,
+    MonsterEntry,
+    get_combatant_abilities,
+    get_monster_catalog,
+    parse_cr,
+)
+from app.core.random_encounters import RandomEncounterGenerator
+
+
+def _entry(monster_id, cr, creature_type="Beast", size="Medium", **extra):
+    return MonsterEntry.from_stat_block(
+        {"id": monster_id, "name": monster_id.title(), "challenge_rating": cr,
+         "type": creature_type, "size": size, **extra},
+        "test",
+    )
+
+
+class TestEntries:
+    """Stat blocks are normalized once."""
+
+    def test_parse_cr(self):
+        assert parse_cr("1/8") == 0.125
+        assert parse_cr("2") == 2.0
+        assert parse_cr(None) == 0.0
+
+    def test_type_size_and_tags(self):
+        entry = _entry(
+            "imp_lord", "3", "Fiend (devil)", "Small",
+            speed={"walk": 20, "fly": 40},
+            legendary_actions={"actions_per_turn": 3, "actions": [{"name": "Sting", "description": ""}]},
+        )
+
+        assert (entry.creature_type, entry.size) == ("fiend", "small")
+        assert entry.tags == {"devil", "flying", "legendary"}
+        assert entry.abilities[0].ability_type == AbilityType.LEGENDARY_ACTION
+
+    def test_enemy_template_shape(self):
+        template = get_monster_catalog().get("goblin").as_enemy_template()
+
+        assert template["abilities"]["dexterity"] == 14
+        assert template["speed"] == 30
+        assert template["challenge_rating"] == 0.25
+
+
+class TestQueries:
+    """Filters intersect the prebuilt indexes."""
+
+    def test_cr_range_is_inclusive_and_ordered(self):
+        catalog = MonsterCatalog([_entry("c", "2"), _entry("a", "1/4"), _entry("b", "1"), _entry("d", "5")])
+
+        assert [e.id for e in catalog.query(cr_min=0.25, cr_max=2)] == ["a", "b", "c"]
+        assert [e.id for e in catalog.query()] == ["a", "b", "c", "d"]
+
+    def test_combined_filters(self):
+        catalog = MonsterCatalog(
+            [_entry("wolf", "1/4"), _entry("zombie", "1/4", "Undead"), _entry("wight", "3", "Undead")],
+            environments={"dungeon": ["zombie", "wight", "not_in_catalog"]},
+        )
+
+        assert [e.id for e in catalog.query(creature_type="undead", cr_max=1)] == ["zombie"]
+        assert [e.id for e in catalog.query(environment="dungeon")] == ["zombie", "wight"]
+        assert catalog.query(environment="desert") == []
+
+    def test_shipped_catalog(self):
+        catalog = get_monster_catalog()
+
+        assert len(catalog) > 300
+        assert "solar" in catalog  # from a "creatures"-keyed file
+        assert {"dragon", "undead"} <= set(catalog.types())
+        assert "goblin" in [e.id for e in catalog.query(environment="forest")]
+        assert all(e.cr >= 20 for e in catalog.query(tag="legendary", cr_min=20))
+
+
+class TestConsumers:
+    """Encounters and campaigns read the catalog."""
+
+    def test_template_cr(self):
+        generator = RandomEncounterGenerator()
+
+        assert generator._get_template_cr("ogre") == get_monster_catalog().get("ogre").cr
+        # Not in the catalog: falls back to the table
+        assert generator._get_template_cr("harpy") == 1
+
+    def test_campaign_templates(self):
+        engine = CampaignEngine.__new__(CampaignEngine)
+        engine._enemy_cache = {}
+
+        # Hand-written template wins over the catalog
+        assert engine._load_enemy_template("goblin")["hit_points_average"] == 7
+        assert engine._load_enemy_template("owlbear")["abilities"]["strength"] == 20
+        assert engine._load_enemy_template("no_such_monster") is None
+        assert engine._load_enemy_template("owlbear")["monster_id"] == "owlbear"
+
+    def test_combatant_abilities(self):
+        owlbear = get_monster_catalog().get("owlbear")
+
+        assert get_combatant_abilities({"monster_id": "owlbear"}) is owlbear.abilities
+        # Not a catalog monster: parsed from its own actions
+        stats = {"actions": [{"name": "Multiattack", "description": "The ogre makes two attacks."}]}
+        assert get_combatant_abilities(stats)[0].ability_type == AbilityType.MULTIATTACK
@@ -15,7 +15,9 @@ from app.core.movement import (
     get_line_of_sight,
     get_cover_between,
     create_grid_with_obstacles,
+    get_visibility_from,
 )
+from app.core.surfaces import SurfaceManager, SurfaceType
 
 
 class TestGridCell:
@@ -203,6 +205,115 @@ class TestCombatGrid:
         assert restored.get_occupant(3, 3) == "player-1"
 
 
+class TestGridArrays:
+    """Test the flat arrays mirrored from grid cells."""
+
+    def test_cell_assignment_updates_arrays(self):
+        """Writing a GridCell field should update the flat arrays."""
+        grid = CombatGrid(width=10, height=6)
+        cell = grid.get_cell(7, 4)
+        index = grid.to_index(7, 4)
+
+        cell.terrain = TerrainType.DIFFICULT
+        cell.elevation = 2
+        cell.cover_value = 5
+
+        assert grid.from_index(index) == (7, 4)
+        assert grid.terrains[index] == TerrainType.DIFFICULT
+        assert grid.movement_costs[index] == 10
+        assert grid.elevations[index] == 2
+        assert grid.cover_values[index] == 5
+
+        cell.terrain = TerrainType.IMPASSABLE
+        assert not grid.is_passable(7, 4)
+
+    def test_occupant_tracking(self):
+        """Moving an occupant should keep find_combatant current."""
+        grid = CombatGrid()
+        grid.set_occupant(1, 1, "player-1")
+        grid.set_occupant(1, 1, None)
+        grid.get_cell(4, 2).occupied_by = "player-1"
+
+        assert grid.find_combatant("player-1") == (4, 2)
+        assert grid.get_occupant(4, 2) == "player-1"
+        assert grid.find_combatant("missing") is None
+
+    def test_neighbor_table_matches_offsets(self):
+        """Precomputed neighbors should match the adjacency rules."""
+        grid = CombatGrid(width=5, height=3)
+
+        assert grid.get_adjacent_cells(0, 0) == [(0, 1), (1, 0), (1, 1)]
+        assert sorted(grid.get_adjacent_cells(2, 1, include_diagonals=False)) == [
+            (1, 1), (2, 0), (2, 2), (3, 1)
+        ]
+        assert len(grid.get_adjacent_cells(2, 1)) == 8
+
+    def test_large_grid_pathfinding(self):
+        """Should path across a large dungeon-sized grid."""
+        grid = create_grid_with_obstacles(
+            width=60, height=60, obstacles=[(30, y) for y in range(0, 58)]
+        )
+
+        result = find_path(grid, 0, 0, 59, 0, max_movement=1000)
+
+        assert result.success is True
+        assert (30, 58) in result.path or (30, 59) in result.path
+        assert result.total_cost == 5 * (len(result.path) - 1)
+
+
+class TestDistanceField:
+    """Test cached distance fields."""
+
+    def test_field_is_reused_until_grid_changes(self):
+        """Queries from one origin should share a single flood fill."""
+        grid = CombatGrid()
+
+        first = grid.get_distance_field(0, 0)
+        find_path(grid, 0, 0, 5, 5)
+        get_reachable_cells(grid, 0, 0, 30)
+        assert grid.get_distance_field(0, 0) is first
+
+        grid.set_occupant(2, 2, "enemy-1")
+        assert grid.get_distance_field(0, 0) is not first
+
+    def test_ally_set_is_part_of_the_key(self):
+        """Allies can be passed through, enemies cannot."""
+        grid = CombatGrid(width=3, height=3)
+        for y in range(3):
+            grid.set_occupant(1, y, "wall-" + str(y))
+
+        assert grid.get_distance_field(0, 0).cost_to(2, 0) is None
+        allies = {"wall-0", "wall-1", "wall-2"}
+        assert grid.get_distance_field(0, 0, ally_ids=allies).cost_to(2, 0) == 10
+
+    def test_occupants_override_grid_cells(self):
+        """Live occupants replace stale grid occupancy."""
+        grid = CombatGrid(width=3, height=3)
+        for y in range(3):
+            grid.set_occupant(1, y, "stale-" + str(y))
+
+        assert grid.get_distance_field(0, 0).cost_to(2, 0) is None
+        assert grid.get_distance_field(0, 0, occupants={}).cost_to(2, 0) == 10
+        blocked = {(1, 0): "e1", (1, 1): "e2", (1, 2): "e3"}
+        assert grid.get_distance_field(0, 0, occupants=blocked).cost_to(2, 0) is None
+
+    def test_cost_to_adjacent(self):
+        """Should cost the cheapest free square next to a target."""
+        grid = CombatGrid()
+        grid.set_occupant(5, 0, "enemy-1")
+
+        field = grid.get_distance_field(0, 0)
+
+        assert field.cost_to_adjacent(5, 0) == 20
+
+    def test_matches_path_costs(self):
+        """Reachable costs should agree with find_path."""
+        grid = create_grid_with_obstacles(difficult_terrain=[(1, 1), (2, 1)])
+
+        for x, y, cost in get_reachable_cells(grid, 0, 0, 20):
+            assert find_path(grid, 0, 0, x, y).total_cost == cost
+
+
 class TestPathNode:
     """Test PathNode class."""
 
@@ -274,6 +385,17 @@ class TestPathfinding:
         assert result.success is True
         assert result.total_cost == 10  # 2 diagonal moves = 10ft
 
+    def test_trimmed_path_pays_for_surfaces(self):
+        """Surface-difficult cells cost double when an over-budget path is cut short."""
+        grid = CombatGrid(width=10, height=1)
+        grid.set_surface_difficulty(1, 0, True)
+        grid.set_surface_difficulty(2, 0, True)
+
+        result = find_path(grid, 0, 0, 9, 0, max_movement=15)
+
+        assert result.path == [(0, 0), (1, 0)]
+        assert result.total_cost == 10
+
     def test_path_around_obstacle(self):
         """Should path around obstacles."""
         grid = CombatGrid()
@@ -523,6 +645,58 @@ class TestCover:
         assert cover == 2
 
 
+class TestSightLineCache:
+    """Test cached line of sight and cover."""
+
+    def test_sight_lines_are_cached(self):
+        """Repeated queries should reuse the traced line."""
+        grid = CombatGrid()
+
+        first = grid.get_sight_line(0, 0, 5, 3)
+
+        assert grid.get_sight_line(0, 0, 5, 3) is first
+
+    def test_occupancy_keeps_cache_terrain_clears_it(self):
+        """Only terrain, cover and obscurement invalidate sight lines."""
+        grid = CombatGrid()
+        first = grid.get_sight_line(0, 0, 4, 0)
+
+        grid.set_occupant(2, 0, "player-1")
+        assert grid.get_sight_line(0, 0, 4, 0) is first
+
+        grid.get_cell(2, 0).cover_value = 2
+        assert get_cover_between(grid, 0, 0, 4, 0) == 2
+
+        grid.set_terrain(3, 0, TerrainType.IMPASSABLE)
+        has_los, _ = get_line_of_sight(grid, 0, 0, 4, 0)
+        assert has_los is False
+
+    def test_batch_visibility(self):
+        """Should report sight lines to every combatant."""
+        grid = CombatGrid()
+        grid.set_terrain(1, 1, TerrainType.IMPASSABLE)
+
+        visibility = get_visibility_from(
+            grid, 0, 0, {"a": (2, 2), "b": {"x": 3, "y": 0}}
+        )
+
+        assert visibility["a"].has_line_of_sight is False
+        assert visibility["a"].cover == 5
+        assert visibility["b"].has_line_of_sight is True
+
+    def test_surfaces_update_obscurement(self):
+        """Obscuring surfaces should refresh cached sight lines."""
+        grid = CombatGrid()
+        surfaces = SurfaceManager(grid)
+        assert grid.get_sight_line(0, 0, 4, 0).obscured is None
+
+        surfaces.add_surface(2, 0, SurfaceType.STEAM, duration_rounds=1)
+        assert grid.get_sight_line(0, 0, 4, 0).obscured is not None
+
+        surfaces.advance_round()
+        assert grid.get_sight_line(0, 0, 4, 0).obscured is None
+
+
 class TestGridCreation:
     """Test convenience grid creation."""
 
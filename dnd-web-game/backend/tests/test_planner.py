@@ -0,0 +1,157 @@
+"""Tests for the time-budgeted AI turn planner."""
+import time
+
+import pytest
+
+from app.core.ai import AnytimePlanner, BossAI, TacticalAI, execute_plan, get_planner_stats
+from app.core.ai.planner import reset_planner_stats
+
+
+BOSS_ACTIONS = [
+    {"name": "Multiattack", "description": "The ogre chief makes two attacks with its greatclub."},
+    {
+        "name": "Greatclub",
+        "description": "Melee Weapon Attack: +6 to hit, reach 5 ft., one target. "
+                       "Hit: 13 (2d8+4) bludgeoning damage.",
+    },
+]
+
+
+@pytest.fixture
+def start_boss_fight(start_combat_engine):
+    def _start(boss_position=(3, 3)):
+        engine = start_combat_engine(
+            [("p1", "Thorin", 40, 16), ("p2", "Elara", 4, 12)],
+            [("boss", "Ogre Chief", 90, 14)],
+            {"p1": (2, 2), "p2": (4, 2), "boss": boss_position},
+            seed=5,
+        )
+        stats = engine.state.combatant_stats["boss"]
+        stats["actions"] = BOSS_ACTIONS
+        stats["ai_behavior"] = {"role": "boss"}
+        return engine
+    return _start
+
+
+@pytest.fixture
+def engine(start_boss_fight):
+    return start_boss_fight()
+
+
+def _to_boss_turn(engine):
+    while engine.get_current_combatant().id != "boss":
+        engine.end_turn()
+
+
+class TestAnytimePlanner:
+    """Tests for planning a whole turn."""
+
+    def test_prefers_a_killable_target(self, engine):
+        plan = AnytimePlanner(engine, "boss", budget_ms=200).plan()
+
+        action = plan.step("action")
+        assert action.action_type == "multiattack"
+        assert action.target_id == "p2"
+        assert plan.expected_damage > 0
+
+    def test_zero_budget_returns_immediately(self, engine):
+        planner = AnytimePlanner(engine, "boss", budget_ms=0)
+        start = time.perf_counter()
+        plan = planner.plan()
+
+        assert (time.perf_counter() - start) < 0.05
+        assert planner.metrics.timed_out
+        assert planner.metrics.nodes == 0
+        # Out of time before searching: fall back to the best attack in reach
+        assert plan.step("action").action_type == "multiattack"
+        assert plan.step("move") is None
+
+    def test_node_budget_replaces_clock(self, engine):
+        plans = [AnytimePlanner(engine, "boss", budget_ms=0, max_nodes=40).plan() for _ in range(2)]
+
+        assert plans[0].to_dict() == plans[1].to_dict()
+        assert plans[0].step("action") is not None
+
+    def test_metrics_reported(self, engine):
+        reset_planner_stats()
+        planner = AnytimePlanner(engine, "boss", budget_ms=200)
+        planner.plan()
+
+        assert planner.metrics.nodes > 0
+        assert planner.metrics.time_used_ms >= 0
+        stats = get_planner_stats()
+        assert stats["decisions"] == 1
+        assert stats["nodes"] == planner.metrics.nodes
+
+    def test_catalog_monster_abilities(self, engine):
+        stats = engine.state.combatant_stats["boss"]
+        stats["actions"] = []
+        stats["monster_id"] = "brown_bear"
+
+        planner = AnytimePlanner(engine, "boss", budget_ms=200)
+        plan = planner.plan()
+
+        assert set(planner._attacks) == {"bite", "claws"}
+        assert plan.step("action").action_type == "multiattack"
+
+    def test_unpositioned_combatant_has_no_plan(self, engine):
+        del engine.state.positions["boss"]
+
+        assert AnytimePlanner(engine, "boss", budget_ms=50).plan() is None
+
+
+class TestPlannerIntegration:
+    """Bosses and opted-in AI use the planner."""
+
+    def test_boss_plans_turn(self, engine):
+        ai = BossAI(engine, "boss")
+        decision = ai.plan_turn()
+
+        # The route resolves multiattack through its attack handler
+        assert decision.action_type == "attack"
+        assert decision.target_id == "p2"
+        assert decision.reasoning.startswith("Planned:")
+        assert ai.planner_metrics.nodes > 0
+
+    def test_planner_off_without_budget(self, engine, monkeypatch):
+        monkeypatch.setattr("app.core.ai.behaviors.planner_budget_ms", lambda: 0)
+
+        assert BossAI(engine, "boss").plan_turn() is None
+
+    def test_tactical_ai_planner_mode(self, engine):
+        stats = engine.state.combatant_stats["boss"]
+        stats["ai_behavior"] = {"planner": True}
+        stats["equipment"] = {}
+        ai = TacticalAI(engine, "boss")
+        decision = ai.decide_action()
+
+        assert decision.action_type.value == "multiattack"
+        assert ai.last_plan is not None
+
+
+class TestExecutePlan:
+    """Planned turns run every planned step on the engine."""
+
+    def test_runs_full_multiattack(self, engine):
+        _to_boss_turn(engine)
+        plan = AnytimePlanner(engine, "boss", budget_ms=200).plan()
+
+        outcome = execute_plan(engine, engine.state.grid, "boss", plan)
+
+        assert outcome.action_type == "multiattack"
+        attacks = outcome.results[0].extra_data["attacks"]
+        assert len(attacks) == 2
+
+    def test_moves_before_attacking(self, start_boss_fight):
+        engine = start_boss_fight(boss_position=(7, 2))
+        _to_boss_turn(engine)
+        plan = AnytimePlanner(engine, "boss", budget_ms=200).plan()
+        assert plan.step("move") is not None
+
+        outcome = execute_plan(engine, engine.state.grid, "boss", plan)
+
+        assert outcome.moved
+        assert outcome.new_position == tuple(engine.state.positions["boss"])
+        assert engine.state.grid.get_occupant(*outcome.new_position) == "boss"
+        assert outcome.action_type == "multiattack"
+        assert engine.state.current_turn.movement_used > 0
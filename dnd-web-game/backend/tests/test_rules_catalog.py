@@ -0,0 +1,156 @@
+"""Tests for the shared rules catalog."""
+import json
+import os
+
+import pytest
+
+from app.config import get_settings
+from app.core import rules_catalog
+from app.core.combat_engine import load_weapon_data
+from app.core.rules_catalog import RulesCatalog, get_rules_catalog, reload_rules_catalog
+from app.core.spell_system import SpellRegistry
+
+
+def _write(root, name, data):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data) if not isinstance(data, str) else data)
+    return path
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    root = tmp_path / "data"
+    _write(root, "conditions.json", {"conditions": []})
+    _write(root, "rules/2024/classes/fighter.json", {"id": "fighter"})
+    _write(root, "rules/2024/classes/wizard.json", {"id": "wizard"})
+    return root
+
+
+@pytest.fixture
+def isolated(data_root, tmp_path, monkeypatch):
+    """Point the process-wide catalog at a scratch data directory."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "RULES_BUNDLE_PATH", str(tmp_path / "bundle.pickle"))
+    monkeypatch.setattr(settings, "RULES_HOT_RELOAD", False)
+    monkeypatch.setattr(rules_catalog, "DATA_ROOT", data_root)
+    monkeypatch.setattr(rules_catalog, "_catalog", None)
+    monkeypatch.setattr(rules_catalog, "_reload_callbacks", [])
+    return data_root
+
+
+class TestCompile:
+    """Tests for building a catalog from JSON."""
+
+    def test_indexes_files_by_path(self, data_root):
+        catalog = RulesCatalog.compile(data_root)
+
+        assert catalog.get("rules/2024/classes/wizard.json") == {"id": "wizard"}
+        assert [path for path, _ in catalog.directory("rules/2024/classes")] == [
+            "rules/2024/classes/fighter.json",
+            "rules/2024/classes/wizard.json",
+        ]
+        assert catalog.directory("rules/2024/spells") == []
+
+    def test_invalid_files_are_reported_and_skipped(self, data_root):
+        _write(data_root, "broken.json", "{not json")
+
+        catalog = RulesCatalog.compile(data_root)
+
+        assert "broken.json" not in catalog
+        assert catalog.errors and catalog.errors[0].startswith("broken.json")
+
+    def test_shipped_data_is_valid(self):
+        assert rules_catalog.main(["--check", "--output", ""]) == 0
+
+    def test_content_hash_follows_content(self, data_root):
+        first = RulesCatalog.compile(data_root).content_hash
+        assert RulesCatalog.compile(data_root).content_hash == first
+
+        _write(data_root, "rules/2024/classes/wizard.json", {"id": "wizard", "hit_die": "d6"})
+        assert RulesCatalog.compile(data_root).content_hash != first
+
+
+class TestBundle:
+    """The bundle is reused until the data changes."""
+
+    def test_round_trip(self, data_root, tmp_path):
+        catalog = RulesCatalog.compile(data_root)
+        catalog.save(str(tmp_path / "bundle.pickle"))
+
+        loaded = RulesCatalog.load(str(tmp_path / "bundle.pickle"))
+
+        assert loaded.content_hash == catalog.content_hash
+        assert loaded.directory("rules/2024/classes") == catalog.directory("rules/2024/classes")
+
+    def test_loaded_from_bundle_when_current(self, isolated):
+        get_rules_catalog()
+        assert rules_catalog.get_catalog_info()["source"] == "compiled"
+
+        rules_catalog._catalog = None
+        get_rules_catalog()
+        assert rules_catalog.get_catalog_info()["source"] == "bundle"
+
+    def test_off_by_default(self, isolated, monkeypatch, tmp_path):
+        monkeypatch.setattr(get_settings(), "RULES_BUNDLE_PATH", "")
+        monkeypatch.chdir(tmp_path)
+
+        get_rules_catalog()
+
+        assert rules_catalog.get_catalog_info()["bundle_path"] == ""
+        assert not list(tmp_path.glob("*.pickle"))
+
+    def test_relative_path_lives_in_cache_dir(self):
+        assert rules_catalog.resolve_bundle_path("./rules.pickle") == \
+            str(rules_catalog.CACHE_DIR / "rules.pickle")
+        assert rules_catalog.resolve_bundle_path("/srv/rules.pickle") == "/srv/rules.pickle"
+
+    def test_writable_bundle_is_ignored(self, data_root, tmp_path):
+        path = tmp_path / "bundle.pickle"
+        RulesCatalog.compile(data_root).save(str(path))
+        path.chmod(0o666)
+
+        assert RulesCatalog.load(str(path)) is None
+
+    def test_stale_bundle_is_rebuilt(self, isolated):
+        get_rules_catalog()
+        path = _write(isolated, "rules/2024/classes/rogue.json", {"id": "rogue"})
+        os.utime(path, ns=(1, 1))
+
+        rules_catalog._catalog = None
+        assert "rules/2024/classes/rogue.json" in get_rules_catalog()
+        assert rules_catalog.get_catalog_info()["source"] == "compiled"
+
+
+class TestHotReload:
+    """Changed data swaps the catalog and resets registries."""
+
+    def test_reload_runs_callbacks_on_change(self, isolated):
+        resets = []
+        rules_catalog.on_catalog_reload(lambda: resets.append(True))
+        get_rules_catalog()
+
+        assert reload_rules_catalog() is False
+        _write(isolated, "rules/2024/classes/wizard.json", {"id": "wizard", "hit_die": "d6"})
+
+        assert reload_rules_catalog() is True
+        assert resets == [True]
+        assert get_rules_catalog().get("rules/2024/classes/wizard.json")["hit_die"] == "d6"
+
+    def test_checked_on_access_when_enabled(self, isolated, monkeypatch):
+        monkeypatch.setattr(get_settings(), "RULES_HOT_RELOAD", True)
+        monkeypatch.setattr(get_settings(), "RULES_RELOAD_INTERVAL_SECONDS", 0)
+        get_rules_catalog()
+
+        _write(isolated, "conditions.json", {"conditions": [{"id": "x"}]})
+
+        assert get_rules_catalog().get("conditions.json") == {"conditions": [{"id": "x"}]}
+
+
+class TestRegistries:
+    """Registries read from the shared catalog."""
+
+    def test_weapons_and_spells(self):
+        assert load_weapon_data("longsword")["id"] == "longsword"
+        SpellRegistry.reset()
+        assert SpellRegistry.get_instance().get_spell("fireball") is not None
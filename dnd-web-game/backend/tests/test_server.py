@@ -0,0 +1,106 @@
+"""Tests for the prefork server and the warmup pass."""
+import gc
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from app.core import warmup
+from app.core.startup_profile import StartupProfile
+from app.server import bind_socket, main, prepare_master
+
+
+class TestWarmup:
+    """Warmup exercises the hot paths and never fails startup."""
+
+    def test_runs_every_step(self):
+        profile = StartupProfile()
+        state = random.getstate()
+
+        assert all(warmup.run_warmup(profile).values())
+        assert [s["name"] for s in profile.steps] == [name for name, _ in warmup.WARMUP_STEPS]
+        # The seeded AI warmup must not leave every worker with the same dice
+        assert random.getstate() == state
+
+    def test_failing_step_is_skipped(self, monkeypatch):
+        def broken():
+            raise RuntimeError("no data")
+
+        monkeypatch.setattr(warmup, "WARMUP_STEPS", [("broken", broken), ("ok", lambda: None)])
+
+        assert warmup.run_warmup(StartupProfile()) == {"broken": False, "ok": True}
+
+
+class TestMaster:
+    """The master loads shared data before forking."""
+
+    def test_prepare_freezes_shared_data(self):
+        from app.core.spell_system import SpellRegistry
+
+        try:
+            prepare_master(warmup=False)
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+        assert SpellRegistry._instance is not None
+        assert SpellRegistry._instance._search_index is not None
+
+    def test_bind_socket(self):
+        sock = bind_socket("127.0.0.1", 0)
+        try:
+            assert sock.get_inheritable()
+            assert sock.getsockname()[1] > 0
+        finally:
+            sock.close()
+
+    def test_refuses_workers_without_shared_store(self, monkeypatch, capsys):
+        from app.config import get_settings
+
+        monkeypatch.setattr(get_settings(), "COMBAT_STORE_URL", "memory://")
+
+        assert main(["--workers", "2", "--port", "0", "--no-warmup"]) == 2
+        assert "COMBAT_STORE_URL" in capsys.readouterr().err
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="prefork needs os.fork")
+def test_workers_serve_and_stop(tmp_path):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path}/game.db",
+        COMBAT_STORE_URL=f"sqlite:///{tmp_path}/combat_sessions.db",
+        ADMIN_TOKEN="t",
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    master = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "2", "--port", str(port), "--no-warmup"],
+        cwd=backend, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        profile = None
+        deadline = time.monotonic() + 30
+        while profile is None and time.monotonic() < deadline:
+            try:
+                response = httpx.get(
+                    f"http://127.0.0.1:{port}/api/admin/startup", headers={"X-Admin-Token": "t"}
+                )
+                profile = response.json()
+            except httpx.TransportError:
+                time.sleep(0.2)
+
+        assert profile is not None
+        assert profile["pid"] != master.pid
+        # Workers inherit what the master loaded
+        assert "spells" in [step["name"] for step in profile["steps"]["preload"]]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        assert master.wait(timeout=30) == 0
@@ -0,0 +1,106 @@
+"""Tests for the headless combat simulator."""
+import random
+
+import pytest
+
+from app.core.ai import get_planner_stats
+from app.core.ai.behaviors import BaseBehavior
+from app.core.ai.planner import reset_planner_stats
+from app.core.simulation import CombatSimulator, run_simulations
+
+
+PARTY = [
+    {"id": "p1", "name": "Thorin", "hp": 30, "ac": 16, "attack_bonus": 5, "damage_dice": "1d8+3"},
+    {"id": "p2", "name": "Elara", "hp": 24, "ac": 14, "attack_bonus": 5, "damage_dice": "1d8+3"},
+]
+
+
+def goblins(count):
+    return [
+        {"id": f"g{i}", "name": "Goblin", "hp": 7, "ac": 13, "attack_bonus": 4, "damage_dice": "1d6+2"}
+        for i in range(count)
+    ]
+
+
+OGRE = [{"id": "ogre", "name": "Ogre", "hp": 120, "ac": 14, "attack_bonus": 8, "damage_dice": "3d8+5"}]
+
+
+class TestCombatSimulator:
+    """Tests for single simulated combats."""
+
+    def test_fights_to_a_result(self):
+        result = CombatSimulator(PARTY, goblins(2)).run(seed=1)
+
+        assert result.outcome in ("victory", "defeat")
+        assert result.turns > 0
+        assert result.rounds >= 1
+        if result.outcome == "victory":
+            assert set(result.kill_rounds) >= {"g0", "g1"}
+            assert max(result.kill_rounds.values()) <= result.rounds
+
+    def test_same_seed_same_combat(self):
+        simulator = CombatSimulator(PARTY, goblins(3))
+
+        first, second = simulator.run(seed=9), simulator.run(seed=9)
+        assert (first.outcome, first.rounds, first.damage_taken) == \
+            (second.outcome, second.rounds, second.damage_taken)
+
+    def test_global_random_is_left_alone(self):
+        state = random.getstate()
+        CombatSimulator(PARTY, goblins(2)).run(seed=9)
+
+        assert random.getstate() == state
+
+    def test_planned_turns_replay_by_seed(self, monkeypatch):
+        # Everyone plans, with no wall-clock budget at all: the node budget decides
+        monkeypatch.setattr(BaseBehavior, "use_planner", property(lambda self: True))
+        monkeypatch.setattr("app.core.ai.planner.planner_budget_ms", lambda: 0)
+        reset_planner_stats()
+        simulator = CombatSimulator(PARTY, OGRE)
+
+        first, second = simulator.run(seed=4), simulator.run(seed=4)
+        assert (first.outcome, first.rounds, first.damage_taken) == \
+            (second.outcome, second.rounds, second.damage_taken)
+        stats = get_planner_stats()
+        assert stats["decisions"] > 0 and stats["nodes"] > 0
+
+    def test_draw_after_max_rounds(self):
+        result = CombatSimulator(PARTY, goblins(1), max_rounds=1).run(seed=2)
+
+        assert result.rounds == 1
+        assert result.outcome in ("draw", "victory")
+
+    def test_default_positions_face_off(self):
+        simulator = CombatSimulator(PARTY, goblins(2), grid_width=10, grid_height=10)
+
+        assert simulator.positions == {"p1": (0, 0), "p2": (0, 1), "g0": (9, 0), "g1": (9, 1)}
+
+
+class TestBatchRunner:
+    """Tests for run_simulations."""
+
+    def test_report(self):
+        report = run_simulations(PARTY, goblins(2), n=10, seed=0, processes=1)
+
+        assert report.simulations == 10
+        assert report.victories + report.defeats + report.draws == 10
+        assert 0 <= report.win_rate <= 1
+        assert report.rounds["min"] <= report.rounds["p50"] <= report.rounds["max"]
+        assert set(report.damage_taken) == {"p1", "p2", "g0", "g1"}
+        assert report.throughput > 0
+        assert report.to_dict()["win_rate"] == round(report.win_rate, 4)
+
+    def test_harder_encounter_is_harder(self):
+        easy = run_simulations(PARTY, goblins(1), n=10, processes=1)
+        hard = run_simulations(PARTY, OGRE, n=10, processes=1)
+
+        assert easy.win_rate > hard.win_rate
+        assert easy.party_damage_taken["mean"] < hard.party_damage_taken["mean"]
+
+    def test_process_pool_matches_inline(self):
+        inline = run_simulations(PARTY, goblins(2), n=4, seed=5, processes=1)
+        pooled = run_simulations(PARTY, goblins(2), n=4, seed=5, processes=2)
+
+        assert pooled.processes == 2
+        assert (pooled.victories, pooled.rounds, pooled.damage_taken) == \
+            (inline.victories, inline.rounds, inline.damage_taken)
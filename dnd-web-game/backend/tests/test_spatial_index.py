@@ -0,0 +1,123 @@
+"""Tests for the combatant spatial index."""
+import pickle
+
+import pytest
+
+from app.core.initiative import CombatantType, InitiativeTracker
+from app.core.spatial_index import PositionIndex
+
+
+@pytest.fixture
+def index():
+    return PositionIndex({
+        "a": (0, 0),
+        "b": (3, 4),
+        "c": [10, 10],
+        "d": {"x": 1, "y": 1},
+    })
+
+
+@pytest.fixture
+def engine(start_combat_engine):
+    return start_combat_engine(
+        [("p1", "Thorin", 40, 16)],
+        [("g1", "Goblin", 7, 13), ("g2", "Goblin", 7, 13)],
+        {"p1": (2, 2), "g1": (3, 3), "g2": (9, 9)},
+        seed=7,
+        grid_size=12,
+    )
+
+
+class TestPositionIndex:
+    """Tests for the indexed positions mapping."""
+
+    def test_behaves_like_a_dict(self, index):
+        assert index["c"] == [10, 10]
+        assert list(index) == ["a", "b", "c", "d"]
+        assert index == {"a": (0, 0), "b": (3, 4), "c": [10, 10], "d": {"x": 1, "y": 1}}
+
+    def test_cell_lookup_follows_writes(self, index):
+        assert index.occupant_at(3, 4) == "b"
+
+        index["b"] = (5, 5)
+        assert index.occupant_at(3, 4) is None
+        assert index.occupant_at(5, 5) == "b"
+
+        del index["b"]
+        assert index.occupant_at(5, 5) is None
+        assert index.cell_of("b") is None
+
+    def test_radius_queries(self, index):
+        assert index.within((0, 0), 1) == ["a", "d"]
+        assert index.within((0, 0), 4, exclude=["a"]) == ["b", "d"]
+        # (3, 4) is exactly 5 squares away in a straight line
+        assert "b" in index.within((0, 0), 5, euclidean=True)
+        assert "b" not in index.within((0, 0), 4.9, euclidean=True)
+
+    def test_results_keep_insertion_order(self, index):
+        index["a"] = (10, 11)
+
+        assert index.within((10, 10), 1) == ["a", "c"]
+
+    def test_area_templates(self):
+        index = PositionIndex({
+            "front": (3, 0),
+            "edge": (4, 2),
+            "side": (2, 3),
+            "behind": (-2, 0),
+        })
+
+        assert index.in_template("cone", 30, (0, 0), (1, 0)) == ["front", "edge"]
+        assert index.in_template("line", 30, (0, 0), (1, 0)) == ["front"]
+
+    def test_pickle_round_trip(self, index):
+        restored = pickle.loads(pickle.dumps(index))
+
+        assert isinstance(restored, PositionIndex)
+        assert restored.occupant_at(10, 10) == "c"
+
+
+class TestEngineIntegration:
+    """The engine answers position queries from the index."""
+
+    def test_state_positions_are_indexed(self, engine):
+        engine.state.positions = {"p1": (0, 0)}
+
+        assert isinstance(engine.state.positions, PositionIndex)
+        assert engine.get_combatant_at_position(0, 0).id == "p1"
+
+    def test_move_keeps_index_in_sync(self, engine):
+        engine.state.current_turn = None
+        engine.move_combatant("g2", 4, 4)
+
+        assert engine.get_combatant_at_position(9, 9) is None
+        assert engine.get_combatant_at_position(4, 4).id == "g2"
+
+    def test_valid_targets(self, engine):
+        assert engine.get_valid_targets("p1", range_ft=5) == ["g1"]
+        assert engine.get_valid_targets("p1", range_ft=60) == ["g1", "g2"]
+        assert engine.get_valid_targets("g1", range_ft=60) == ["p1"]
+
+
+class TestCombatantLookup:
+    """InitiativeTracker looks combatants up by id."""
+
+    def test_lookup_after_add_and_remove(self):
+        tracker = InitiativeTracker()
+        tracker.add_combatant("Thorin", CombatantType.PLAYER, combatant_id="p1")
+        tracker.add_combatant("Goblin", CombatantType.ENEMY, combatant_id="g1")
+
+        assert tracker.get_combatant("g1").name == "Goblin"
+        tracker.remove_combatant("g1")
+        assert tracker.get_combatant("g1") is None
+
+    def test_lookup_after_list_is_replaced(self):
+        tracker = InitiativeTracker()
+        original = tracker.add_combatant("Thorin", CombatantType.PLAYER, combatant_id="p1")
+        assert tracker.get_combatant("p1") is original
+
+        other = InitiativeTracker()
+        replacement = other.add_combatant("Elara", CombatantType.PLAYER, combatant_id="p1")
+        tracker.combatants = [replacement]
+
+        assert tracker.get_combatant("p1") is replacement
@@ -0,0 +1,84 @@
+"""Tests for the spell search index."""
+import pytest
+
+from app.core.spell_search import SpellSearchIndex, iter_bits, tokenize
+from app.core.spell_system import SpellRegistry
+from app.models.spells import Spell, SpellComponents
+
+
+def _spell(spell_id, name, level=1, school="evocation", classes=("wizard",), description="", **extra):
+    return Spell(
+        id=spell_id, name=name, level=level, school=school, casting_time="1 action",
+        range="60 feet", components=SpellComponents(verbal=True), duration="Instantaneous",
+        description=description, classes=list(classes), **extra,
+    )
+
+
+@pytest.fixture
+def index():
+    return SpellSearchIndex([
+        _spell("fire_bolt", "Fire Bolt", 0, description="You hurl a mote of fire."),
+        _spell("fireball", "Fireball", 3, description="A bright streak explodes in flame."),
+        _spell("burning_hands", "Burning Hands", 1, description="A thin sheet of fire."),
+        _spell("cure_wounds", "Cure Wounds", 1, "abjuration", ("Cleric", "Druid"),
+               description="A creature you touch regains hit points."),
+        _spell("detect_magic", "Detect Magic", 1, "divination", ("Cleric", "Wizard"),
+               description="You sense magic.", ritual=True, concentration=True),
+    ])
+
+
+def _ids(result):
+    return [spell.id for spell in result[1]]
+
+
+class TestFacets:
+    """Facet bitsets combine by intersection."""
+
+    def test_helpers(self):
+        assert tokenize("Melf's Acid-Arrow") == ["melf", "s", "acid", "arrow"]
+        assert list(iter_bits(0b10110)) == [1, 2, 4]
+
+    def test_filters_intersect(self, index):
+        assert _ids(index.search(class_name="CLERIC", level=1)) == ["cure_wounds", "detect_magic"]
+        assert _ids(index.search(class_name="cleric", ritual=False)) == ["cure_wounds"]
+        assert _ids(index.search(concentration=True, school="divination")) == ["detect_magic"]
+        assert index.search(class_name="bard") == (0, [])
+
+    def test_unranked_pages_keep_order(self, index):
+        assert index.search(limit=2, offset=1) == (5, index.spells[1:3])
+        assert index.search(offset=10) == (5, [])
+
+
+class TestText:
+    """Token, prefix and fuzzy matching with ranking."""
+
+    def test_name_hits_rank_above_description_hits(self, index):
+        assert _ids(index.search("fire")) == ["fire_bolt", "fireball", "burning_hands"]
+
+    def test_prefix_while_typing(self, index):
+        assert _ids(index.search("cure wou")) == ["cure_wounds"]
+
+    def test_typo_within_one_edit(self, index):
+        assert _ids(index.search("firebll")) == ["fireball"]
+        assert _ids(index.search("fyrebll")) == []
+
+    def test_all_terms_must_match(self, index):
+        assert _ids(index.search("fire flame")) == ["fireball"]
+
+    def test_text_with_facets_and_paging(self, index):
+        assert _ids(index.search("fire", level=1)) == ["burning_hands"]
+        total, page = index.search("fire", limit=1, offset=1)
+        assert total == 3 and [s.id for s in page] == ["fireball"]
+
+
+class TestRegistry:
+    """The registry serves searches from its index."""
+
+    def test_shipped_spells(self):
+        SpellRegistry.reset()
+        registry = SpellRegistry.get_instance()
+
+        assert registry.search_spells("fireball")[0].id == "fireball"
+        total, page = registry.search_spells_page(level=3, limit=5)
+        assert len(page) == 5 and total > 5
+        assert all(spell.level == 3 for spell in page)
@@ -0,0 +1,113 @@
+"""Tests for the surface effects engine."""
+from unittest.mock import patch
+
+from app.core.movement import CombatGrid
+from app.core.spatial_index import PositionIndex
+from app.core.surfaces import SurfaceManager, SurfaceType
+
+
+class TestSurfaceIndexes:
+    """Derived per-type and per-cell indexes stay in sync."""
+
+    def test_cells_by_type(self):
+        manager = SurfaceManager()
+        manager.add_surface(1, 1, SurfaceType.WATER)
+        manager.add_surface(2, 1, SurfaceType.WATER)
+
+        assert manager.cells_of_type(SurfaceType.WATER) == {(1, 1), (2, 1)}
+
+        manager.remove_surface(1, 1)
+        assert manager.cells_of_type(SurfaceType.WATER) == {(2, 1)}
+
+    def test_interaction_updates_types(self):
+        manager = SurfaceManager()
+        manager.add_surface(3, 3, SurfaceType.WATER)
+        manager.apply_damage_effect("lightning", 3, 3)
+
+        assert (3, 3) not in manager.cells_of_type(SurfaceType.WATER)
+        assert (3, 3) in manager.cells_of_type(SurfaceType.ELECTRIFIED_WATER)
+
+    def test_difficult_terrain_feeds_grid_costs(self):
+        grid = CombatGrid(width=6, height=6)
+        manager = SurfaceManager(grid)
+        index = grid.to_index(2, 2)
+
+        manager.add_surface(2, 2, SurfaceType.ICE, duration_rounds=1)
+        assert manager.is_difficult_terrain(2, 2)
+        assert grid.movement_costs[index] == 10
+        assert grid.get_distance_field(0, 2).cost_to(2, 2) == 15
+
+        manager.advance_round()
+        assert not manager.is_difficult_terrain(2, 2)
+        assert grid.movement_costs[index] == 5
+
+
+class TestFireSpread:
+    """Fire spreads across connected flammable cells."""
+
+    def test_long_oil_slick_burns_without_recursion(self):
+        manager = SurfaceManager()
+        for x in range(400):
+            manager.add_surface(x, 0, SurfaceType.OIL)
+
+        manager.add_surface(0, 0, SurfaceType.FIRE, duration_rounds=3)
+
+        assert manager.cells_of_type(SurfaceType.OIL) == set()
+        assert len(manager.cells_of_type(SurfaceType.FIRE)) == 400
+
+    def test_gap_stops_the_spread(self):
+        manager = SurfaceManager()
+        for x in (0, 1, 3):
+            manager.add_surface(x, 0, SurfaceType.GREASE)
+
+        manager.add_surface(0, 0, SurfaceType.FIRE)
+
+        assert manager.cells_of_type(SurfaceType.GREASE) == {(3, 0)}
+
+
+class TestRoundTick:
+    """One batched tick applies effects and decays durations."""
+
+    @patch("app.core.surfaces.roll_die", return_value=1)
+    @patch("app.core.surfaces.roll_damage")
+    def test_tick_round(self, mock_damage, _mock_d20):
+        mock_damage.return_value.total = 3
+        manager = SurfaceManager()
+        manager.add_surface(1, 1, SurfaceType.FIRE, duration_rounds=1)
+        manager.add_surface(5, 5, SurfaceType.WATER)
+        positions = PositionIndex({"p1": (1, 1), "p2": (5, 5), "p3": (8, 8)})
+
+        effects = manager.tick_round(positions, {"p1": {}, "p2": {}})
+
+        assert [e["combatant_id"] for e in effects] == ["p1"]
+        assert effects[0]["damage"] == 3
+        assert not manager.has_surface(1, 1)
+        assert manager.has_surface(5, 5)
+
+    @patch("app.core.surfaces.roll_die", return_value=1)
+    @patch("app.core.surfaces.roll_damage")
+    def test_engine_ticks_on_new_round(self, mock_damage, _mock_d20, start_combat_engine):
+        mock_damage.return_value.total = 4
+        engine = start_combat_engine(
+            [("p1", "Thorin", 40, 16)], [("g1", "Goblin", 7, 13)], {"p1": (1, 1), "g1": (5, 5)},
+        )
+        manager = SurfaceManager()
+        manager.add_surface(1, 1, SurfaceType.FIRE, duration_rounds=1)
+        engine.state.surface_manager = manager
+
+        engine.end_turn()
+        assert engine.state.combatant_stats["p1"]["current_hp"] == 40  # Same round
+        engine.end_turn()
+
+        assert engine.state.initiative_tracker.current_round == 2
+        assert engine.state.combatant_stats["p1"]["current_hp"] == 36
+        assert not manager.has_surface(1, 1)
+
+    def test_permanent_surfaces_are_not_visited(self):
+        manager = SurfaceManager()
+        manager.add_surface(0, 0, SurfaceType.WATER)
+        manager.add_surface(1, 0, SurfaceType.SMOKE, duration_rounds=2)
+
+        assert manager.advance_round() == []
+        assert manager.advance_round() == [(1, 0)]
+        assert manager.has_surface(0, 0)
@@ -0,0 +1,94 @@
+"""Tests for per-faction threat maps."""
+import pytest
+
+from app.core.threat_map import ThreatMap, ThreatSource, get_threat_map
+
+
+@pytest.fixture
+def engine(start_combat_engine):
+    return start_combat_engine(
+        [("p1", "Thorin", 40, 16)],
+        [("g1", "Goblin", 7, 13), ("g2", "Goblin", 7, 13)],
+        {"p1": (5, 5), "g1": (6, 5), "g2": (8, 5)},
+        seed=3,
+        grid_size=12,
+    )
+
+
+class TestThreatMap:
+    """Tests for building and querying the map."""
+
+    def test_counts_by_faction(self, engine):
+        threat_map = get_threat_map(engine.state)
+
+        assert threat_map.threat_count((7, 5), "player") == 2
+        assert threat_map.threateners((7, 5), "player") == ["g1", "g2"]
+        # Goblins are not threatened by each other
+        assert threat_map.threat_count((7, 5), "enemy") == 0
+        assert threat_map.heatmap("enemy")[(6, 6)] == 1
+
+    def test_clipped_to_grid(self):
+        threat_map = ThreatMap(4, 4)
+        threat_map.update(ThreatSource("a", "enemy", (0, 0)))
+
+        assert sorted(threat_map.threatened_cells("a")) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+    def test_sync_only_restamps_changes(self, engine):
+        threat_map = get_threat_map(engine.state)
+        assert threat_map.sync(engine.state) == 0
+
+        engine.state.positions["g2"] = (2, 2)
+        assert threat_map.sync(engine.state) == 1
+        assert threat_map.threateners((9, 5), "player") == []
+        assert threat_map.threateners((3, 3), "player") == ["g2"]
+
+    def test_fallen_and_incapacitated_threaten_nothing(self, engine):
+        engine.state.initiative_tracker.get_combatant("g1").is_active = False
+        engine.state.combatant_stats["g2"]["conditions"] = ["stunned"]
+
+        threat_map = get_threat_map(engine.state)
+
+        assert threat_map.sources.keys() == {"p1"}
+
+    def test_reach_weapons(self, engine):
+        engine.state.combatant_stats["g2"]["reach"] = 10
+
+        assert get_threat_map(engine.state).threat_count((10, 5), "player") == 1
+
+
+class TestMovementQueries:
+    """Who reacts to a move."""
+
+    def test_leaving_reach(self, engine):
+        threat_map = get_threat_map(engine.state)
+
+        assert threat_map.leaving_reach((7, 5), (7, 7), "player") == ["g1", "g2"]
+        # Still adjacent to g2
+        assert threat_map.leaving_reach((7, 5), (7, 6), "player") == []
+        assert threat_map.leaving_reach((7, 5), (9, 6), "player") == ["g1"]
+
+    def test_disengage_only_stops_non_sentinels(self, engine):
+        engine.state.combatant_stats["g1"]["feats"] = ["sentinel"]
+        threat_map = get_threat_map(engine.state)
+
+        assert threat_map.leaving_reach((7, 5), (7, 7), "player", disengaged=True) == ["g1"]
+
+    def test_entering_reach(self):
+        threat_map = ThreatMap()
+        threat_map.update(ThreatSource("guard", "enemy", (0, 0), reach=2, polearm_master=True))
+        threat_map.update(ThreatSource("goblin", "enemy", (0, 3)))
+
+        assert threat_map.entering_reach((0, 3), (0, 2), "player") == ["guard"]
+        assert threat_map.entering_reach((0, 2), (0, 1), "player") == []
+
+
+class TestEngineIntegration:
+    """Opportunity attacks read candidates off the threat map."""
+
+    def test_leaving_reach_provokes(self, engine):
+        results = engine._check_and_execute_opportunity_attacks("p1", (5, 5), (3, 5), [])
+
+        assert [r["attacker_id"] for r in results] == ["g1"]
+
+    def test_moving_within_reach_does_not_provoke(self, engine):
+        assert engine._check_and_execute_opportunity_attacks("p1", (5, 5), (5, 6), []) == []